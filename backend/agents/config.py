@@ -42,3 +42,170 @@ MAX_NEGOTIATION_ROUNDS = int(os.getenv("MAX_NEGOTIATION_ROUNDS", "2"))
 
 # Maximum vendors to process for now (temporary limit)
 MAX_VENDORS_LIMIT = int(os.getenv("MAX_VENDORS_LIMIT", "2"))
+
+# Share of the previous round's vendors re-engaged in the next round. Below 1
+# the rounds shrink geometrically, so total sessions stay under
+# n / (1 - fraction) however high max_rounds is
+ROUND_REENGAGE_FRACTION = float(os.getenv("ROUND_REENGAGE_FRACTION", "0.5"))
+
+# Turn limit for follow-up sessions in later rounds (first sessions use 15)
+FOLLOWUP_SESSION_TURNS = int(os.getenv("FOLLOWUP_SESSION_TURNS", "4"))
+
+# ========== HTTP Transport Configuration ==========
+
+# Keep-alive connections per host in the shared session pool
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+
+# Maximum concurrent requests when fetching vendor details in bulk
+VENDOR_DETAILS_CONCURRENCY = int(os.getenv("VENDOR_DETAILS_CONCURRENCY", "8"))
+
+# Deadline (seconds) for each vendor details request
+VENDOR_DETAILS_TIMEOUT = float(os.getenv("VENDOR_DETAILS_TIMEOUT", "15"))
+
+# ========== Caching & Warm-up Configuration ==========
+
+# Number of encoded vendor documents kept in memory
+FILE_CACHE_SIZE = int(os.getenv("FILE_CACHE_SIZE", "64"))
+
+# Seconds an unused speculative warm-up (started by /api/extract) is kept
+WARMUP_TTL_SECONDS = float(os.getenv("WARMUP_TTL_SECONDS", "300"))
+
+# Maximum warm-ups tracked at once (oldest are evicted first)
+WARMUP_MAX_ENTRIES = int(os.getenv("WARMUP_MAX_ENTRIES", "32"))
+
+# Parallel vendor evaluations across all warm-ups
+WARMUP_EVAL_CONCURRENCY = int(os.getenv("WARMUP_EVAL_CONCURRENCY", "4"))
+
+# Seconds a graph node waits for an in-flight warm-up result before going cold
+WARMUP_WAIT_SECONDS = float(os.getenv("WARMUP_WAIT_SECONDS", "120"))
+
+# ========== Extraction Service Configuration ==========
+
+# Window (milliseconds) for collecting concurrent /api/extract calls into one batch
+EXTRACT_BATCH_WINDOW_MS = float(os.getenv("EXTRACT_BATCH_WINDOW_MS", "20"))
+
+# Maximum distinct texts extracted in one LLM call
+EXTRACT_MAX_BATCH_SIZE = int(os.getenv("EXTRACT_MAX_BATCH_SIZE", "8"))
+
+# Resolve simple orders with the deterministic parser instead of the LLM
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Minimum parser completeness/confidence (0-1) to skip the LLM
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "0.8"))
+
+# Concurrent extractions per bulk (CSV/JSONL) extraction request
+BULK_EXTRACT_CONCURRENCY = int(os.getenv("BULK_EXTRACT_CONCURRENCY", "8"))
+
+# Largest ?concurrency= a client may ask for on POST /api/extract/bulk
+BULK_EXTRACT_MAX_CONCURRENCY = int(os.getenv("BULK_EXTRACT_MAX_CONCURRENCY", "32"))
+
+# ========== Ranking Configuration ==========
+
+# Weights applied to per-criterion vendor scores (0-100 each) in the final ranking
+SCORE_WEIGHT_PRICE = float(os.getenv("SCORE_WEIGHT_PRICE", "0.6"))
+SCORE_WEIGHT_DELIVERY = float(os.getenv("SCORE_WEIGHT_DELIVERY", "0.25"))
+SCORE_WEIGHT_PAYMENT = float(os.getenv("SCORE_WEIGHT_PAYMENT", "0.15"))
+SCORE_WEIGHT_STATUS = float(os.getenv("SCORE_WEIGHT_STATUS", "0"))
+
+# ========== Run Results Configuration ==========
+
+# Directory where each run's final leaderboard is stored for what-if re-scoring
+RUN_RESULTS_DIR = os.getenv("RUN_RESULTS_DIR", str(Path(__file__).parent.parent / "run_results"))
+
+# Stored runs kept in memory (all runs stay on disk)
+RUN_RESULTS_CACHE_SIZE = int(os.getenv("RUN_RESULTS_CACHE_SIZE", "128"))
+
+# Maximum scenarios evaluated per what-if request
+WHAT_IF_MAX_SCENARIOS = int(os.getenv("WHAT_IF_MAX_SCENARIOS", "50"))
+
+# ========== Run Deadline Configuration ==========
+
+# Default wall-clock budget of a negotiation run (overridable per run in the
+# WebSocket start message as "deadline_seconds", up to the maximum)
+RUN_DEADLINE_SECONDS = float(os.getenv("RUN_DEADLINE_SECONDS", "600"))
+RUN_DEADLINE_MAX_SECONDS = float(os.getenv("RUN_DEADLINE_MAX_SECONDS", "3600"))
+
+# Share of the deadline given to each phase; unused time carries over
+RUN_PHASE_BUDGETS = os.getenv("RUN_PHASE_BUDGETS", "evaluation:0.15,strategy:0.15,negotiation:0.6,report:0.1")
+
+# p99 run latency objective reported by GET /api/runs/latency
+RUN_LATENCY_SLO_SECONDS = float(os.getenv("RUN_LATENCY_SLO_SECONDS", str(RUN_DEADLINE_SECONDS)))
+
+# Finished runs kept for the latency percentiles
+RUN_LATENCY_WINDOW = int(os.getenv("RUN_LATENCY_WINDOW", "1000"))
+
+# ========== Run Jobs Configuration ==========
+
+# Negotiation runs executed at once by the background worker pool (further
+# runs wait in the queue with status "queued")
+RUN_WORKERS = int(os.getenv("RUN_WORKERS", "4"))
+
+# Finished runs kept in memory for GET /api/runs/{run_id} and late subscribers
+# (older ones are served from the stored results)
+RUN_JOB_RETENTION = int(os.getenv("RUN_JOB_RETENTION", "256"))
+
+# Deltas between snapshots in the compact event protocol
+EVENT_SNAPSHOT_INTERVAL = int(os.getenv("EVENT_SNAPSHOT_INTERVAL", "200"))
+
+# Events kept per run for late and reconnecting subscribers (a client that
+# fell further behind resumes from a snapshot)
+EVENT_LOG_MAX_EVENTS = int(os.getenv("EVENT_LOG_MAX_EVENTS", "2000"))
+
+# How long a run started over a WebSocket keeps going after its last
+# subscriber disconnected, waiting to be resumed (0 cancels at once)
+RUN_RESUME_GRACE_SECONDS = float(os.getenv("RUN_RESUME_GRACE_SECONDS", "30"))
+
+# Messages waiting to be sent to one subscriber; a client that falls this far
+# behind has its queued progress coalesced into one snapshot
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("SUBSCRIBER_QUEUE_SIZE", "256"))
+
+# Runs one multiplexed WebSocket connection (/api/runs/ws) can follow at once
+MUX_MAX_RUNS = int(os.getenv("MUX_MAX_RUNS", "64"))
+
+# Accept permessage-deflate compression of WebSocket frames when clients offer it
+WS_PER_MESSAGE_DEFLATE = os.getenv("WS_PER_MESSAGE_DEFLATE", "true").lower() in ("1", "true", "yes")
+
+# ========== Admission Control Configuration ==========
+
+# Runs waiting for a worker (beyond RUN_WORKERS running); further runs are
+# rejected with 503 and a Retry-After estimate
+RUN_QUEUE_LIMIT = int(os.getenv("RUN_QUEUE_LIMIT", "32"))
+
+# Extraction requests (/api/extract, /api/extract/bulk) handled at once, and
+# how many more may wait; a separate pool from negotiation runs
+EXTRACT_MAX_CONCURRENT = int(os.getenv("EXTRACT_MAX_CONCURRENT", "16"))
+EXTRACT_QUEUE_LIMIT = int(os.getenv("EXTRACT_QUEUE_LIMIT", "64"))
+
+# Retry-After (seconds) suggested to rejected clients before any durations have been measured
+ADMISSION_RETRY_AFTER_SECONDS = float(os.getenv("ADMISSION_RETRY_AFTER_SECONDS", "30"))
+
+# ========== Team Scheduling Configuration ==========
+
+# Relative share of run slots, LLM calls and vendor API requests per team id
+# when teams compete, e.g. "1:2,7:1" (unlisted teams weigh 1)
+TEAM_WEIGHTS = os.getenv("TEAM_WEIGHTS", "")
+
+# LLM calls and vendor API requests in flight at once across all runs,
+# handed out in weighted fair order by team (0 = unlimited)
+LLM_MAX_CONCURRENT = int(os.getenv("LLM_MAX_CONCURRENT", "16"))
+VENDOR_API_MAX_CONCURRENT = int(os.getenv("VENDOR_API_MAX_CONCURRENT", "16"))
+
+# Per-team quotas (0 = unlimited): queued or running runs (more are rejected
+# with 429), LLM tokens and vendor API requests per minute (calls wait)
+TEAM_MAX_CONCURRENT_RUNS = int(os.getenv("TEAM_MAX_CONCURRENT_RUNS", "0"))
+TEAM_TOKENS_PER_MINUTE = int(os.getenv("TEAM_TOKENS_PER_MINUTE", "0"))
+TEAM_MESSAGES_PER_MINUTE = int(os.getenv("TEAM_MESSAGES_PER_MINUTE", "0"))
+
+# ========== Tracing Configuration ==========
+
+# Record spans for every node, LLM call, vendor API request and negotiation
+# turn of a run (GET /api/runs/{run_id}/trace and /critical-path)
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() in ("1", "true", "yes")
+
+# Directory where each finished run's trace is written as <run_id>.json in
+# OTLP/JSON (importable by OpenTelemetry tooling); empty = memory only
+TRACE_EXPORT_DIR = os.getenv("TRACE_EXPORT_DIR", "")
+
+# Finished run traces kept in memory, and spans recorded per run
+TRACE_RETENTION = int(os.getenv("TRACE_RETENTION", "50"))
+TRACE_MAX_SPANS = int(os.getenv("TRACE_MAX_SPANS", "5000"))
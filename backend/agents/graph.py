@@ -7,18 +7,28 @@ Constructs the multi-agent negotiation graph with:
 - Phase 3: Negotiation loop (map-reduce with cycle)
 """
 
+import asyncio
 import logging
-from typing import Any, Dict, List, Literal
+import time
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Union
 from langgraph.graph import StateGraph, END, START
 from langgraph.types import Send
 
-from agents.state import GraphState
+from agents.state import GraphState, index_vendors
 from agents.nodes.extractor import extract_order_node
 from agents.nodes.database_fetcher import fetch_vendors_node
 from agents.nodes.vendor_evaluator import evaluate_vendor_node
 from agents.nodes.strategist import start_strategy_phase, generate_strategy_node
 from agents.nodes.negotiator import negotiate_node
-from agents.nodes.aggregator import aggregator_node
+from agents.nodes.aggregator import aggregator_node, best_so_far_update
+from agents.live_leaderboard import live_leaderboards
+from agents.metrics import timed_node
+from agents.run_context import current_run_id, new_run_id, run_config
+from agents.run_deadline import RunDeadline, phase_expired, run_latencies
+from agents.run_cancellation import CancelToken, RunCancelled, cancellation_metrics
+from agents.run_results import STATUS_CANCELLED, run_results
+from agents.run_stream import STREAM_KEY
+from agents.tracing import run_traces, traced_node
 
 logger = logging.getLogger(__name__)
 
@@ -48,18 +58,22 @@ def continue_to_evaluation(state: GraphState) -> List[Send]:
 def fan_out_to_strategies(state: GraphState) -> List[Send]:
     """
     Fan-out: Create strategy generation tasks for each relevant vendor.
+    
+    relevant_vendors only holds slim references; the strategist needs the
+    full vendor profile, which is looked up in all_vendors by id.
     """
     relevant_vendors = state.get("relevant_vendors", [])
     order = state.get("order_object", {})
+    vendors_by_id = index_vendors(state.get("all_vendors", []))
     
     logger.info(f"[ROUTER] Fanning out strategies for {len(relevant_vendors)} vendors")
     
     return [
         Send("generate_strategy", {
-            "vendor": vendor,
+            "vendor": {**vendors_by_id.get(str(ref.get("id")), {}), **ref},
             "order": order
         })
-        for vendor in relevant_vendors
+        for ref in relevant_vendors
     ]
 
 
@@ -83,6 +97,9 @@ def continue_to_negotiation(state: GraphState) -> List[Send]:
     Fan-out function for parallel negotiation (Map operation).
     
     Creates a Send() object for each vendor to negotiate with them in parallel.
+    The first round engages every relevant vendor; later rounds only the
+    vendors the aggregator selected (market_analysis.next_round_vendor_ids),
+    continuing their existing conversations with the market feedback.
     """
     relevant_vendors = state.get("relevant_vendors", [])
     vendor_strategies = state.get("vendor_strategies", {})
@@ -90,8 +107,14 @@ def continue_to_negotiation(state: GraphState) -> List[Send]:
     market_analysis = state.get("market_analysis")
     conversation_ids = state.get("conversation_ids", {})
     leaderboard = state.get("leaderboard", {})
+    negotiation_history = state.get("negotiation_history", {})
     
-    logger.info(f"[ROUTER] Fanning out to negotiate with {len(relevant_vendors)} vendors in parallel")
+    if rounds_completed and market_analysis:
+        selected = set(market_analysis.get("next_round_vendor_ids") or [])
+        relevant_vendors = [vendor for vendor in relevant_vendors if str(vendor["id"]) in selected]
+        logger.info(f"[ROUTER] Round {rounds_completed + 1}: re-engaging {len(relevant_vendors)} vendors")
+    else:
+        logger.info(f"[ROUTER] Fanning out to negotiate with {len(relevant_vendors)} vendors in parallel")
     
     # Create a Send for each vendor with their strategy
     return [
@@ -103,6 +126,7 @@ def continue_to_negotiation(state: GraphState) -> List[Send]:
             "market_analysis": market_analysis,
             "conversation_id": conversation_ids.get(vendor["id"]),
             "last_offer": leaderboard.get(vendor["id"]),
+            "prior_turns": [turn for entry in negotiation_history.get(vendor["id"], []) for turn in entry.get("turns", [])],
             "product_id": vendor.get("relevant_product_id"),
             "order_details": state.get("order_object", {})  # Pass explicit order details
         })
@@ -117,20 +141,31 @@ def should_continue_negotiation(state: GraphState) -> Literal["continue_negotiat
     Logic:
     - If best quote <= budget: SUCCESS → end
     - If rounds >= max_rounds: MAX_ROUNDS → end
-    - Otherwise: CONTINUE → loop back to strategist
+    - If the aggregator found no vendor worth re-engaging: end
+    - Otherwise: CONTINUE → another negotiation round
     """
     leaderboard = state.get("leaderboard", {})
     order = state.get("order_object") or {}
     budget = order.get("budget", 20000) if order else 20000
     rounds_completed = state.get("rounds_completed", 0)
     max_rounds = state.get("max_rounds", 3)
+    market_analysis = state.get("market_analysis") or {}
     
     if not leaderboard:
         logger.info("[DECISION_GATE] No quotes - ending")
         return "end"
     
-    # Find best price
-    valid_prices = [quote["price_total"] for quote in leaderboard.values() if quote.get("price_total") is not None]
+    # Best total price as the aggregator computed it (unit price x quantity),
+    # else the run's live leaderboard, else a scan of the offers
+    board = live_leaderboards.get(current_run_id())
+    analysed_best = (market_analysis.get("benchmarks") or {}).get("best_price")
+    if analysed_best is not None:
+        valid_prices = [analysed_best]
+    elif board is not None:
+        best_unit_price = board.best_unit_price()
+        valid_prices = [best_unit_price] if best_unit_price is not None else []
+    else:
+        valid_prices = [quote["price_total"] for quote in leaderboard.values() if quote.get("price_total") is not None]
     
     if not valid_prices:
         logger.info("[DECISION_GATE] No valid prices yet")
@@ -148,11 +183,31 @@ def should_continue_negotiation(state: GraphState) -> Literal["continue_negotiat
     elif rounds_completed >= max_rounds:
         logger.info("[DECISION_GATE] ✗ Max rounds reached - ENDING")
         return "end"
+    elif market_analysis and not market_analysis.get("next_round_vendor_ids"):
+        logger.info("[DECISION_GATE] ✗ No vendor likely to improve - ENDING")
+        return "end"
     else:
         logger.info("[DECISION_GATE] → Continuing negotiation")
         return "continue_negotiating"
 
 
+def route_after_aggregator(state: GraphState) -> Union[List[Send], str]:
+    """
+    Loop back into another negotiation round, or end the run.
+    """
+    if phase_expired("negotiation"):
+        logger.info("[ROUTER] Negotiation budget spent - ending")
+        return END
+    if should_continue_negotiation(state) == "end":
+        return END
+    sends = continue_to_negotiation(state)
+    if not sends:
+        logger.info("[ROUTER] No vendors to re-engage - ending")
+        return END
+    print(f"[COORDINATOR] ↻ Starting round {state.get('rounds_completed', 0) + 1} with {len(sends)} vendors", flush=True)
+    return sends
+
+
 # ========== Build the Graph ==========
 
 def create_negotiation_graph() -> StateGraph:
@@ -168,18 +223,22 @@ def create_negotiation_graph() -> StateGraph:
     workflow = StateGraph(GraphState)
     
     # ========== Add Nodes ==========
-    # ========== Add Nodes ==========
-    # workflow.add_node("extract_order", extract_order_node)
-    workflow.add_node("fetch_vendors", fetch_vendors_node)
-    workflow.add_node("evaluate_vendor", evaluate_vendor_node)
+    # Each node records its latency in evaepic_node_duration_seconds and a
+    # span in the run's trace
+    def add_node(name, fn):
+        workflow.add_node(name, timed_node(name, traced_node(name, fn)))
+
+    # add_node("extract_order", extract_order_node)
+    add_node("fetch_vendors", fetch_vendors_node)
+    add_node("evaluate_vendor", evaluate_vendor_node)
     
     # New strategy nodes
-    workflow.add_node("start_strategy_phase", start_strategy_phase)
-    workflow.add_node("generate_strategy", generate_strategy_node)
-    workflow.add_node("start_negotiation_phase", start_negotiation_phase)
+    add_node("start_strategy_phase", start_strategy_phase)
+    add_node("generate_strategy", generate_strategy_node)
+    add_node("start_negotiation_phase", start_negotiation_phase)
     
-    workflow.add_node("negotiate", negotiate_node)
-    workflow.add_node("aggregator", aggregator_node)
+    add_node("negotiate", negotiate_node)
+    add_node("aggregator", aggregator_node)
     
     # ========== Define Edges ==========
     
@@ -218,8 +277,12 @@ def create_negotiation_graph() -> StateGraph:
     # Reduce: All negotiators → Aggregator
     workflow.add_edge("negotiate", "aggregator")
     
-    # End
-    workflow.add_edge("aggregator", END)
+    # Cycle: Aggregator → next round with selected vendors, or End
+    workflow.add_conditional_edges(
+        "aggregator",
+        route_after_aggregator,
+        ["negotiate", END]
+    )
     
     logger.info("Graph built successfully")
     
@@ -237,6 +300,136 @@ logger.info("Negotiation graph compiled and ready")
 
 # ========== Helper function to run the graph ==========
 
+def stream_run(initial_state: Dict[str, Any], run_id: str, deadline: Optional[RunDeadline] = None):
+    """
+    Stream graph updates for one run, tagged with its run id.
+    
+    Per-run structures (the live leaderboard) are released when the stream
+    finishes or is abandoned.
+    """
+    run_traces.start(run_id)
+    try:
+        yield from app.stream(initial_state, config=run_config(run_id, deadline))
+    finally:
+        live_leaderboards.discard(run_id)
+        run_traces.finish(run_id)
+
+
+async def astream_run(
+    initial_state: Dict[str, Any],
+    run_id: str,
+    deadline: Optional[RunDeadline] = None,
+    cancel: Optional[CancelToken] = None,
+    stream_output: bool = False,
+    team_id: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Async stream of graph updates for one run, bounded by its deadline.
+    
+    Nodes fall back on their own as their phase budgets run out; if the
+    run is still going when the whole deadline passes (e.g. a call stuck
+    past its timeout), the stream stops waiting, yields an "aggregator"
+    update with the best offers so far and ends.
+    
+    If `cancel` is cancelled (or the consuming task is), in-flight node
+    calls are abandoned, the offers received so far are stored with status
+    "cancelled" and the stream ends.
+    
+    With stream_output, the nodes' activity, tokens and vendor turns (see
+    agents.run_stream) are interleaved with the updates as
+    {STREAM_KEY: event} events.
+    
+    Args:
+        initial_state: Initial graph state
+        run_id: Run id from new_run_id()
+        deadline: Run deadline (unbounded if None)
+        cancel: Token to stop the run cooperatively
+        stream_output: Also yield the nodes' streamed events
+        team_id: Team the run's LLM and vendor API calls are scheduled for
+        
+    Yields:
+        {node_name: state_update} events (and {STREAM_KEY: event} ones)
+    """
+    started = time.monotonic()
+    leaderboard: Dict[str, Any] = dict(initial_state.get("leaderboard") or {})
+    rounds_completed = initial_state.get("rounds_completed", 0)
+    order = initial_state.get("order_object") or {}
+    deadline_reached = False
+    cancelled = False
+    failure: Optional[BaseException] = None
+    
+    run_traces.start(run_id, team_id=team_id)
+    stream = app.astream(
+        initial_state,
+        config=run_config(run_id, deadline, cancel, stream=stream_output, team_id=team_id),
+        stream_mode=["updates", "custom"] if stream_output else "updates"
+    )
+    try:
+        while True:
+            timeout = deadline.remaining() if deadline is not None else None
+            try:
+                event = await asyncio.wait_for(stream.__anext__(), timeout)
+            except StopAsyncIteration:
+                break
+            except asyncio.TimeoutError:
+                deadline_reached = True
+                yield {"aggregator": best_so_far_update(leaderboard, order, rounds_completed, run_id)}
+                break
+            
+            if stream_output:
+                mode, event = event
+                if mode == "custom":
+                    yield {STREAM_KEY: event}
+                    continue
+            
+            # Track what a best-so-far report would need
+            for update in event.values():
+                if isinstance(update, dict):
+                    leaderboard.update(update.get("leaderboard") or {})
+                    rounds_completed = update.get("rounds_completed", rounds_completed)
+            yield event
+    except RunCancelled:
+        # A node saw the token first; end the stream quietly
+        cancelled = True
+    except (asyncio.CancelledError, GeneratorExit):
+        cancelled = cancel is not None and cancel.cancelled
+        raise
+    except Exception as e:
+        failure = e
+        raise
+    finally:
+        if cancel is not None and cancel.cancelled:
+            cancelled = True
+        if cancelled:
+            _record_cancelled_run(run_id, cancel, deadline, order, leaderboard, rounds_completed)
+        await stream.aclose()
+        live_leaderboards.discard(run_id)
+        if not cancelled:
+            run_latencies.record(time.monotonic() - started, deadline_reached)
+        status = STATUS_CANCELLED if cancelled else "deadline_reached" if deadline_reached else "completed"
+        run_traces.finish(run_id, "failed" if failure is not None else status, failure)
+
+
+def _record_cancelled_run(
+    run_id: str,
+    cancel: Optional[CancelToken],
+    deadline: Optional[RunDeadline],
+    order: Dict[str, Any],
+    leaderboard: Dict[str, Any],
+    rounds_completed: int
+) -> None:
+    """Store a cancelled run's offers so far and count what it freed."""
+    reason = cancel.reason if cancel is not None else None
+    freed = deadline.remaining() if deadline is not None else 0.0
+    cancellation_metrics.record_run(reason, freed_seconds=freed)
+    logger.info(f"[COORDINATOR] Run {run_id} cancelled ({reason}), {len(leaderboard)} offers kept")
+    print(f"[COORDINATOR] ✗ Run cancelled ({reason})", flush=True)
+    try:
+        run_results.save(run_id, order, leaderboard, rounds_completed, status=STATUS_CANCELLED)
+    except Exception as e:
+        logger.warning(f"[COORDINATOR] Could not store cancelled run {run_id}: {e}")
+
+
 def run_negotiation(user_input: str, webhook_url: str = None, max_rounds: int = 3) -> Dict[str, Any]:
     """
     Helper function to run the negotiation graph.
@@ -267,6 +460,7 @@ def run_negotiation(user_input: str, webhook_url: str = None, max_rounds: int =
         "rounds_completed": 0,
         "max_rounds": max_rounds,
         "market_analysis": None,
+        "live_market": None,
         "final_comparison_report": None,
         "phase": "starting",
         "error": None
@@ -276,7 +470,7 @@ def run_negotiation(user_input: str, webhook_url: str = None, max_rounds: int =
     print("\n🔄 Execution Stream:")
     final_state = initial_state.copy()
     
-    for event in app.stream(initial_state):
+    for event in stream_run(initial_state, new_run_id()):
         for node_name, state_update in event.items():
             print(f"   👉 Node Completed: {node_name}")
             # Update local state tracking (though app.invoke equivalent returns full state)
@@ -0,0 +1,329 @@
+"""
+Live Leaderboard
+
+Tracks market benchmarks incrementally while negotiations are still
+running. Each negotiate_node result updates the run's LiveLeaderboard in
+O(log n):
+
+- best price: min-heap
+- highest price (for spread): max-heap
+- median: two balanced heaps (lower half / upper half)
+
+A vendor can post a new offer in a later round, so every heap uses lazy
+deletion: superseded entries stay in place and are discarded when they
+reach the top.
+
+Benchmarks match create_market_analysis exactly (total price =
+price_total * preferred quantity, offers with a positive price only), so
+the aggregator can reuse them when it finalizes the round, provided the
+board holds exactly the offers it is finalizing (see benchmarks_for).
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Heaps are rebuilt once stale entries outnumber live ones by this factor
+COMPACT_FACTOR = 2
+
+# Live leaderboards kept per process (oldest runs are dropped first)
+MAX_LIVE_LEADERBOARDS = 256
+
+# Heap entry: (price key, sequence, vendor_id). The sequence makes entries
+# unique and identifies the current offer for lazy deletion.
+HeapEntry = Tuple[float, int, str]
+
+
+class LiveLeaderboard:
+    """
+    Order-statistics view of the current offers in one run.
+
+    Thread-safe: parallel negotiate nodes update it from worker threads.
+    """
+
+    def __init__(self, quantity: Any = 1):
+        self.quantity = quantity
+        self.version = 0
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        # vendor_id -> (sequence, total price, vendor name, unit price)
+        self._current: Dict[str, Tuple[int, float, str, float]] = {}
+        self._min: List[HeapEntry] = []
+        self._max: List[HeapEntry] = []  # keys negated
+        self._low: List[HeapEntry] = []  # lower half, keys negated (max-heap)
+        self._high: List[HeapEntry] = []  # upper half (min-heap)
+        # vendor_id -> half holding its live median entry
+        self._side: Dict[str, List[HeapEntry]] = {}
+        self._low_size = 0
+        self._high_size = 0
+
+    # ========== Updates ==========
+
+    def update(self, vendor_id: Any, offer: Optional[Dict[str, Any]]) -> bool:
+        """
+        Record a vendor's latest offer, replacing any earlier one.
+
+        Offers without a positive price_total remove the vendor from the
+        benchmarks, as create_market_analysis would ignore them.
+
+        Args:
+            vendor_id: Vendor identifier
+            offer: OfferSnapshot as dict (or None)
+
+        Returns:
+            True if the benchmarks changed
+        """
+        vendor_id = str(vendor_id)
+        unit_price = _positive_price(offer)
+
+        with self._lock:
+            current = self._current.get(vendor_id)
+            if unit_price is None:
+                if current is None:
+                    return False
+                self._remove_locked(vendor_id)
+            else:
+                if current is not None:
+                    if current[3] == unit_price:
+                        return False
+                    self._remove_locked(vendor_id)
+                self._add_locked(vendor_id, unit_price, (offer or {}).get("vendor_name", "Unknown"))
+            self.version += 1
+            self._maybe_compact_locked()
+            return True
+
+    def _add_locked(self, vendor_id: str, unit_price: float, vendor_name: str) -> None:
+        total = unit_price * self.quantity
+        seq = next(self._seq)
+        self._current[vendor_id] = (seq, total, vendor_name, unit_price)
+        heapq.heappush(self._min, (total, seq, vendor_id))
+        heapq.heappush(self._max, (-total, seq, vendor_id))
+
+        self._prune(self._low)
+        if not self._low or total <= -self._low[0][0]:
+            heapq.heappush(self._low, (-total, seq, vendor_id))
+            self._side[vendor_id] = self._low
+            self._low_size += 1
+        else:
+            heapq.heappush(self._high, (total, seq, vendor_id))
+            self._side[vendor_id] = self._high
+            self._high_size += 1
+        self._rebalance()
+
+    def _remove_locked(self, vendor_id: str) -> None:
+        # The heap entries become stale; only the bookkeeping changes here
+        del self._current[vendor_id]
+        side = self._side.pop(vendor_id)
+        if side is self._low:
+            self._low_size -= 1
+        else:
+            self._high_size -= 1
+        self._rebalance()
+
+    def _is_live(self, entry: HeapEntry) -> bool:
+        current = self._current.get(entry[2])
+        return current is not None and current[0] == entry[1]
+
+    def _prune(self, heap: List[HeapEntry]) -> None:
+        """Pop superseded entries off the top of a heap."""
+        while heap and not self._is_live(heap[0]):
+            heapq.heappop(heap)
+
+    def _rebalance(self) -> None:
+        """Keep the lower half equal to, or one larger than, the upper half."""
+        while self._low_size > self._high_size + 1:
+            self._prune(self._low)
+            key, seq, vendor_id = heapq.heappop(self._low)
+            heapq.heappush(self._high, (-key, seq, vendor_id))
+            self._side[vendor_id] = self._high
+            self._low_size -= 1
+            self._high_size += 1
+        while self._high_size > self._low_size:
+            self._prune(self._high)
+            key, seq, vendor_id = heapq.heappop(self._high)
+            heapq.heappush(self._low, (-key, seq, vendor_id))
+            self._side[vendor_id] = self._low
+            self._high_size -= 1
+            self._low_size += 1
+        self._prune(self._low)
+        self._prune(self._high)
+
+    def _maybe_compact_locked(self) -> None:
+        """Rebuild the heaps when stale entries dominate them."""
+        live = len(self._current)
+        if len(self._min) <= COMPACT_FACTOR * live + 32:
+            return
+        self._min = [entry for entry in self._min if self._is_live(entry)]
+        self._max = [entry for entry in self._max if self._is_live(entry)]
+        low = [entry for entry in self._low if self._is_live(entry)]
+        high = [entry for entry in self._high if self._is_live(entry)]
+        for heap in (self._min, self._max, low, high):
+            heapq.heapify(heap)
+        self._low, self._high = low, high
+        for entry in low:
+            self._side[entry[2]] = low
+        for entry in high:
+            self._side[entry[2]] = high
+
+    # ========== Queries ==========
+
+    def __len__(self) -> int:
+        return len(self._current)
+
+    def best(self) -> Optional[Tuple[str, str, float]]:
+        """(vendor_id, vendor_name, total price) of the cheapest offer."""
+        with self._lock:
+            self._prune(self._min)
+            if not self._min:
+                return None
+            total, _, vendor_id = self._min[0]
+            return vendor_id, self._current[vendor_id][2], total
+
+    def best_unit_price(self) -> Optional[float]:
+        """Cheapest offer's price_total (per unit), as quoted by the vendor."""
+        with self._lock:
+            self._prune(self._min)
+            if not self._min:
+                return None
+            return self._current[self._min[0][2]][3]
+
+    def benchmarks(self) -> Dict[str, Any]:
+        """
+        Current best/median/spread, shaped like MarketBenchmarks.
+
+        Returns:
+            Dict with best_price, median_price, spread_percent, total_vendors
+        """
+        with self._lock:
+            return self._benchmarks_locked()
+
+    def benchmarks_for(self, unit_prices: Dict[str, float], quantity: Any) -> Optional[Dict[str, Any]]:
+        """
+        Current benchmarks, only if they were computed from exactly these offers.
+
+        A board can hold as many offers as the leaderboard while holding
+        different ones (a vendor re-engaged with a new price, another dropped
+        out), so every vendor's current price is compared, not the count.
+
+        Args:
+            unit_prices: {vendor_id: price_total} of the offers to benchmark
+            quantity: Preferred quantity the totals are based on
+
+        Returns:
+            Benchmarks as from benchmarks(), or None if the board differs
+        """
+        with self._lock:
+            if quantity != self.quantity or len(unit_prices) != len(self._current):
+                return None
+            for vendor_id, unit_price in unit_prices.items():
+                current = self._current.get(str(vendor_id))
+                if current is None or current[3] != unit_price:
+                    return None
+            return self._benchmarks_locked()
+
+    def _benchmarks_locked(self) -> Dict[str, Any]:
+        total_vendors = len(self._current)
+        if not total_vendors:
+            return {"best_price": None, "median_price": None, "spread_percent": None, "total_vendors": 0}
+
+        self._prune(self._min)
+        self._prune(self._max)
+        best_price = self._min[0][0]
+        highest = -self._max[0][0]
+        if total_vendors == 1:
+            median_price = best_price
+        elif total_vendors % 2:
+            median_price = -self._low[0][0]
+        else:
+            median_price = (-self._low[0][0] + self._high[0][0]) / 2
+        spread = ((highest - best_price) / best_price * 100) if best_price > 0 else 0
+
+        return {
+            "best_price": best_price,
+            "median_price": median_price,
+            "spread_percent": round(spread, 2),
+            "total_vendors": total_vendors,
+        }
+
+    def snapshot(self, round_index: int) -> Dict[str, Any]:
+        """
+        Partial market analysis for the stream, taken mid-round.
+
+        Args:
+            round_index: Round the offers belong to
+
+        Returns:
+            Dict with round_index, version, benchmarks, current best vendor and a summary
+        """
+        benchmarks = self.benchmarks()
+        best = self.best()
+        if best:
+            vendor_id, vendor_name, total = best
+            summary = (
+                f"Live: {benchmarks['total_vendors']} offers, best ${total:.2f} from {vendor_name}, "
+                f"median ${benchmarks['median_price']:.2f}"
+            )
+        else:
+            vendor_id = vendor_name = None
+            summary = "Live: no valid offers yet"
+
+        return {
+            "round_index": round_index,
+            "version": self.version,
+            "is_final": False,
+            "benchmarks": benchmarks,
+            "best_vendor_id": vendor_id,
+            "best_vendor_name": vendor_name,
+            "summary": summary,
+        }
+
+
+def _positive_price(offer: Optional[Dict[str, Any]]) -> Optional[float]:
+    """Offer's price_total if it counts towards benchmarks, else None."""
+    if not offer:
+        return None
+    price = offer.get("price_total")
+    if not price:
+        return None
+    price = float(price)
+    return price if price > 0 else None
+
+
+class LiveLeaderboardRegistry:
+    """Live leaderboards by run id, bounded to the most recent runs."""
+
+    def __init__(self, max_entries: int = MAX_LIVE_LEADERBOARDS):
+        self.max_entries = max_entries
+        self._boards: "OrderedDict[str, LiveLeaderboard]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_create(self, run_id: str, quantity: Any = 1) -> LiveLeaderboard:
+        """Return the run's leaderboard, creating it on first use."""
+        with self._lock:
+            board = self._boards.get(run_id)
+            if board is None:
+                board = LiveLeaderboard(quantity=quantity)
+                self._boards[run_id] = board
+                while len(self._boards) > self.max_entries:
+                    self._boards.popitem(last=False)
+            return board
+
+    def get(self, run_id: Optional[str]) -> Optional[LiveLeaderboard]:
+        if run_id is None:
+            return None
+        with self._lock:
+            return self._boards.get(run_id)
+
+    def discard(self, run_id: Optional[str]) -> None:
+        """Forget a finished run."""
+        with self._lock:
+            self._boards.pop(run_id, None)
+
+
+# Process-wide registry shared by the graph nodes
+live_leaderboards = LiveLeaderboardRegistry()
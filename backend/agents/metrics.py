@@ -0,0 +1,350 @@
+"""
+Runtime Metrics
+
+Prometheus-style metrics, served in the text exposition format at
+GET /metrics:
+
+- evaepic_node_duration_seconds{node}: latency of each graph node
+- evaepic_llm_calls_total{node,outcome}, evaepic_llm_call_duration_seconds{node}
+  and evaepic_llm_tokens_total{node,type}: LLM calls per graph node, with
+  input, output, cache_read and cache_creation tokens
+- evaepic_vendor_api_requests_total{endpoint,outcome} and
+  evaepic_vendor_api_request_duration_seconds{endpoint}: vendor API
+  latency and errors (see agents.utils.http)
+- evaepic_negotiation_turns: exchanges per negotiation session
+- evaepic_websocket_connections, evaepic_runs{state}: current load
+
+Recording never takes a lock: every thread updates its own shard of the
+values (no other thread writes it) and a scrape adds the shards up. Shards
+of threads that have ended are folded into a base total, so the short-lived
+threads of cancellable() and the graph's executors do not pile up.
+"""
+
+import functools
+import inspect
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Fold the shards of ended threads once this many exist (also done on every scrape)
+MAX_SHARDS = 256
+
+# Label value for LLM calls made outside a graph node (e.g. /api/extract)
+NO_NODE = "none"
+
+LabelValues = Tuple[str, ...]
+
+
+class _Shard:
+    __slots__ = ("thread", "values")
+
+    def __init__(self, thread: threading.Thread):
+        self.thread = thread
+        # (metric name, label values) -> float, or bucket counts + [sum, count]
+        self.values: Dict[Tuple[str, LabelValues], Any] = {}
+
+
+class MetricsRegistry:
+    """Metric definitions and per-thread value shards."""
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, Dict[str, str], float]]]] = []
+        self._shards: List[_Shard] = []
+        self._base: Dict[Tuple[str, LabelValues], Any] = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _values(self) -> Dict[Tuple[str, LabelValues], Any]:
+        """The calling thread's shard (created on its first recording)."""
+        try:
+            return self._local.values
+        except AttributeError:
+            shard = _Shard(threading.current_thread())
+            with self._lock:
+                if len(self._shards) >= MAX_SHARDS:
+                    self._fold_locked()
+                self._shards.append(shard)
+            self._local.values = shard.values
+            return shard.values
+
+    def _fold_locked(self) -> None:
+        """Add the shards of ended threads to the base total."""
+        alive = []
+        for shard in self._shards:
+            if shard.thread.is_alive():
+                alive.append(shard)
+            else:
+                _merge(self._base, shard.values)
+        self._shards = alive
+
+    def register(self, metric: "_Metric") -> "_Metric":
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> "Counter":
+        return self.register(Counter(self, name, help, labels))
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> "Gauge":
+        return self.register(Gauge(self, name, help, labels))
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float], labels: Sequence[str] = ()) -> "Histogram":
+        return self.register(Histogram(self, name, help, labels, buckets))
+
+    def add_collector(self, collect: Callable[[], Iterable[Tuple[str, Dict[str, str], float]]]) -> None:
+        """
+        Add a function returning (gauge name, labels, value) samples computed
+        at scrape time, for state owned elsewhere (e.g. active runs).
+        """
+        self._collectors.append(collect)
+
+    def collect(self) -> Dict[Tuple[str, LabelValues], Any]:
+        """Current values, summed over every shard."""
+        with self._lock:
+            self._fold_locked()
+            totals: Dict[Tuple[str, LabelValues], Any] = {}
+            _merge(totals, self._base)
+            for shard in self._shards:
+                # list() copies the dict in one step while its thread may be writing
+                _merge(totals, dict(list(shard.values.items())))
+        return totals
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        totals = self.collect()
+        for collect in self._collectors:
+            try:
+                for name, labels, value in collect():
+                    metric = self._metrics[name]
+                    totals[(name, tuple(str(labels.get(label, "")) for label in metric.labels))] = value
+            except Exception as e:
+                logger.warning(f"[METRICS] Collector failed: {e}")
+
+        by_metric: Dict[str, List[Tuple[LabelValues, Any]]] = {}
+        for (name, label_values), value in totals.items():
+            by_metric.setdefault(name, []).append((label_values, value))
+
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for label_values, value in sorted(by_metric.get(name, [])):
+                lines.extend(metric.samples(label_values, value))
+        return "\n".join(lines) + "\n"
+
+
+def _merge(into: Dict[Tuple[str, LabelValues], Any], values: Dict[Tuple[str, LabelValues], Any]) -> None:
+    for key, value in values.items():
+        if isinstance(value, list):
+            current = into.get(key)
+            into[key] = list(value) if current is None else [a + b for a, b in zip(current, value)]
+        else:
+            into[key] = into.get(key, 0.0) + value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labels: Sequence[str]):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, LabelValues]:
+        return self.name, tuple(str(labels.get(label, "")) for label in self.labels)
+
+    def samples(self, label_values: LabelValues, value: Any) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        values = self.registry._values()
+        key = self._key(labels)
+        values[key] = values.get(key, 0.0) + amount
+
+
+class Gauge(Counter):
+    """Up/down value (per-thread deltas add up to the current value)."""
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, registry: MetricsRegistry, name: str, help: str, labels: Sequence[str], buckets: Sequence[float]):
+        super().__init__(registry, name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        values = self.registry._values()
+        key = self._key(labels)
+        counts = values.get(key)
+        if counts is None:
+            # One count per bucket plus +Inf, then sum and count
+            counts = values[key] = [0] * (len(self.buckets) + 3)
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def samples(self, label_values: LabelValues, value: Any) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), value):
+            cumulative += count
+            labels = _format_labels(self.labels + ("le",), label_values + (_format_value(bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labels, label_values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(value[-2])}")
+        lines.append(f"{self.name}_count{labels} {_format_value(value[-1])}")
+        return lines
+
+
+# ========== Metrics ==========
+
+metrics = MetricsRegistry()
+
+NODE_DURATION = metrics.histogram(
+    "evaepic_node_duration_seconds", "Graph node latency",
+    (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300), labels=("node",)
+)
+LLM_CALLS = metrics.counter("evaepic_llm_calls_total", "LLM calls by graph node", labels=("node", "outcome"))
+LLM_DURATION = metrics.histogram(
+    "evaepic_llm_call_duration_seconds", "LLM call latency by graph node",
+    (0.25, 0.5, 1, 2, 5, 10, 20, 40, 60, 120), labels=("node",)
+)
+LLM_TOKENS = metrics.counter("evaepic_llm_tokens_total", "LLM tokens by graph node", labels=("node", "type"))
+VENDOR_API_REQUESTS = metrics.counter(
+    "evaepic_vendor_api_requests_total", "Vendor API requests by endpoint and outcome", labels=("endpoint", "outcome")
+)
+VENDOR_API_DURATION = metrics.histogram(
+    "evaepic_vendor_api_request_duration_seconds", "Vendor API request latency by endpoint",
+    (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30), labels=("endpoint",)
+)
+NEGOTIATION_TURNS = metrics.histogram(
+    "evaepic_negotiation_turns", "Agent/vendor exchanges per negotiation session", (1, 2, 3, 4, 5, 6, 8, 10, 15)
+)
+WEBSOCKET_CONNECTIONS = metrics.gauge("evaepic_websocket_connections", "Open WebSocket connections")
+RUNS = metrics.gauge("evaepic_runs", "Negotiation runs by state", labels=("state",))
+
+
+# ========== Instrumentation ==========
+
+def timed_node(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a graph node so its latency is recorded in evaepic_node_duration_seconds."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def timed_async(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                NODE_DURATION.observe(time.perf_counter() - started, node=name)
+        return timed_async
+
+    @functools.wraps(fn)
+    def timed(*args: Any, **kwargs: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            NODE_DURATION.observe(time.perf_counter() - started, node=name)
+    return timed
+
+
+def counts_websocket(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a WebSocket endpoint so its open connections are counted in evaepic_websocket_connections."""
+    @functools.wraps(endpoint)
+    async def counted(*args: Any, **kwargs: Any) -> Any:
+        WEBSOCKET_CONNECTIONS.inc()
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            WEBSOCKET_CONNECTIONS.dec()
+    return counted
+
+
+# ========== LLM calls ==========
+
+class _LLMMetrics(BaseCallbackHandler):
+    """Counts LLM calls, latency and tokens per graph node for every model."""
+
+    def __init__(self):
+        # LangChain run id -> (start time, node); dict updates are atomic
+        self._started: Dict[UUID, Tuple[float, str]] = {}
+
+    def _start(self, run_id: UUID, metadata: Optional[Dict[str, Any]]) -> None:
+        self._started[run_id] = (time.perf_counter(), (metadata or {}).get("langgraph_node") or NO_NODE)
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, metadata: Any = None, **kwargs: Any) -> None:
+        self._start(run_id, metadata)
+
+    def on_llm_start(self, serialized: Any, prompts: Any, *, run_id: UUID, metadata: Any = None, **kwargs: Any) -> None:
+        self._start(run_id, metadata)
+
+    def _finish(self, run_id: UUID, outcome: str) -> str:
+        started, node = self._started.pop(run_id, (None, NO_NODE))
+        if started is not None:
+            LLM_DURATION.observe(time.perf_counter() - started, node=node)
+        LLM_CALLS.inc(node=node, outcome=outcome)
+        return node
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        node = self._finish(run_id, "ok")
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if not usage:
+                    continue
+                details = usage.get("input_token_details") or {}
+                for kind, count in (
+                    ("input", usage.get("input_tokens", 0)),
+                    ("output", usage.get("output_tokens", 0)),
+                    ("cache_read", details.get("cache_read", 0)),
+                    ("cache_creation", details.get("cache_creation", 0)),
+                ):
+                    if count:
+                        LLM_TOKENS.inc(count, node=node, type=kind)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id, "error")
+
+
+# Always set, so LangChain attaches the handler to every model call
+_llm_metrics: ContextVar[Optional[_LLMMetrics]] = ContextVar("llm_metrics", default=_LLMMetrics())
+register_configure_hook(_llm_metrics, inheritable=True)
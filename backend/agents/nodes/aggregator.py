@@ -6,9 +6,26 @@ and provides feedback for the next negotiation round.
 """
 
 import logging
+import numpy as np
 from typing import Dict, Any, List, Optional
 from pydantic import BaseModel, Field
-from statistics import median
+
+from agents.config import ROUND_REENGAGE_FRACTION
+from agents.live_leaderboard import LiveLeaderboard, live_leaderboards
+from agents.run_context import current_run_id
+from agents.run_results import STATUS_DEADLINE_REACHED, run_results
+from agents.utils.ranking import RANKING_PROFILES, ParetoRanking, criteria_matrix, rank_criteria
+from agents.utils.scoring import (
+    DEFAULT_WEIGHTS,
+    DELIVERY_POINTS_PER_DAY,
+    NO_DELIVERY_SCORE,
+    PAYMENT_CODE_SCORES,
+    OfferColumns,
+    ScoreWeights,
+    classify_payment_terms,
+    rank_order,
+    status_score,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +63,7 @@ class MarketAnalysis(BaseModel):
     rankings: List[VendorRanking] = Field(description="Vendor rankings")
     vendor_overrides: Dict[str, VendorOverride] = Field(description="Vendor-specific guidance")
     summary: str = Field(description="Overall market summary")
+    next_round_vendor_ids: List[str] = Field(default_factory=list, description="Vendors worth re-engaging if another round runs, best first")
 
 
 class VendorComparison(BaseModel):
@@ -57,6 +75,27 @@ class VendorComparison(BaseModel):
     score: float = Field(description="Final score")
     delta_to_best: Optional[float] = Field(default=None, description="Price difference from best offer")
     status: str = Field(description="Status: completed, walked_away, no_offer")
+    on_pareto_frontier: bool = Field(default=False, description="No other offer is at least as good on every criterion")
+
+
+class FrontierOffer(BaseModel):
+    """An offer on the Pareto frontier, with the criterion scores needed to re-rank it"""
+    vendor_id: str = Field(description="Vendor identifier")
+    vendor_name: str = Field(description="Vendor name")
+    price: float = Field(description="Total price offered")
+    delivery_days: Optional[int] = Field(default=None, description="Delivery time in days")
+    payment_terms: Optional[str] = Field(default=None, description="Payment terms offered")
+    status: str = Field(description="Negotiation status")
+    criteria: Dict[str, float] = Field(description="Score (0-100) per criterion: price, delivery, payment, status")
+
+
+class WeightedRanking(BaseModel):
+    """Frontier ranking under one weighting of the criteria"""
+    profile: str = Field(description="Weighting profile name")
+    weights: Dict[str, float] = Field(description="Weight per criterion")
+    recommended_vendor_id: str = Field(description="Best vendor under these weights")
+    ranking: List[str] = Field(description="Frontier vendor IDs, best first")
+    scores: Dict[str, float] = Field(description="Weighted score per frontier vendor")
 
 
 class FinalComparisonReport(BaseModel):
@@ -67,63 +106,130 @@ class FinalComparisonReport(BaseModel):
     vendors: List[VendorComparison] = Field(description="All vendor comparisons")
     human_action: str = Field(default="Select supplier and confirm purchase", description="Next action for human")
     market_summary: str = Field(description="Overall market summary")
+    weights: Dict[str, float] = Field(default_factory=dict, description="Criterion weights used for vendor scores and ranks")
+    pareto_frontier: List[FrontierOffer] = Field(default_factory=list, description="Non-dominated offers, cheapest first")
+    weighted_rankings: List[WeightedRanking] = Field(default_factory=list, description="Frontier ranking per weighting profile")
 
 
-def calculate_vendor_score(offer: Dict[str, Any], best_price: float, order: Dict[str, Any]) -> float:
+def calculate_vendor_score(
+    offer: Dict[str, Any],
+    best_price: float,
+    order: Dict[str, Any],
+    weights: ScoreWeights = DEFAULT_WEIGHTS
+) -> float:
     """
     Calculate vendor score based on offer.
     
-    Scoring rules:
+    Scoring rules (default weights, configurable via SCORE_WEIGHT_*):
     - Price: 60% weight (lower is better)
     - Delivery: 25% weight (faster is better)
     - Payment terms: 15% weight
+    - Deal status: 0% weight (finalized > in progress > walked away)
+    
+    Whole leaderboards are scored with OfferColumns.scores(), which applies
+    the same rules in bulk.
     
     Args:
         offer: Vendor's offer snapshot
         best_price: Best price in market
         order: Order requirements
+        weights: Weight per criterion
         
     Returns:
         Score (0-100, higher is better)
     """
     score = 0.0
     
-    # Price score (60% weight)
+    # Price score
     price = offer.get("price_total")
     if price and best_price:
         # Inverse relationship: lower price = higher score
         price_ratio = best_price / price
         price_score = min(100, price_ratio * 100)
-        score += price_score * 0.6
+        score += price_score * weights.price
     
-    # Delivery score (25% weight)
+    # Delivery score
     delivery_days = offer.get("delivery_days")
     if delivery_days:
         # Assume reasonable range: 1-30 days
         # Lower days = higher score
-        delivery_score = max(0, 100 - (delivery_days * 3))
-        score += delivery_score * 0.25
+        delivery_score = max(0, 100 - (delivery_days * DELIVERY_POINTS_PER_DAY))
+        score += delivery_score * weights.delivery
     else:
         # No delivery info = average score
-        score += 50 * 0.25
-    
-    # Payment terms score (15% weight)
-    payment_terms = offer.get("payment_terms") or ""
-    if "net 30" in payment_terms.lower() or "30 days" in payment_terms.lower():
-        score += 80 * 0.15
-    elif "net 60" in payment_terms.lower() or "60 days" in payment_terms.lower():
-        score += 60 * 0.15
-    elif "advance" in payment_terms.lower() or "upfront" in payment_terms.lower():
-        score += 40 * 0.15
-    else:
-        score += 50 * 0.15
+        score += NO_DELIVERY_SCORE * weights.delivery
+    
+    # Payment terms score
+    payment_code = classify_payment_terms(offer.get("payment_terms"))
+    score += PAYMENT_CODE_SCORES[payment_code] * weights.payment
     
-    return round(score, 2)
+    # Deal status score
+    score += status_score(offer.get("status")) * weights.status
+    
+    return round(float(score), 2)
+
+
+# Pressure classes used by create_market_analysis
+PRESSURE_LEADER, PRESSURE_WALKAWAY, PRESSURE_HIGH, PRESSURE_MEDIUM, PRESSURE_LOW = range(5)
+
+
+def _build_override(pressure: int, price: float, best_price: float) -> VendorOverride:
+    """Next-round guidance for one vendor's pressure class."""
+    if pressure == PRESSURE_LEADER:
+        # Best vendor: maintain position
+        return VendorOverride(
+            suggested_next_move="You have the best offer. Can you provide any additional value or services?",
+            pressure_level="low",
+            walkaway_recommended=False,
+            reference_price=best_price
+        )
+    if pressure == PRESSURE_WALKAWAY:
+        # Far above budget: recommend walk-away
+        return VendorOverride(
+            suggested_next_move=f"Your price of ${price:.2f} significantly exceeds our budget. We may need to consider other options.",
+            pressure_level="high",
+            walkaway_recommended=True,
+            reference_price=best_price
+        )
+    if pressure == PRESSURE_HIGH:
+        # Significantly higher: high pressure
+        return VendorOverride(
+            suggested_next_move=f"We have an offer at ${best_price:.2f}. To move forward, we need you to match or beat this price.",
+            pressure_level="high",
+            walkaway_recommended=False,
+            reference_price=best_price
+        )
+    if pressure == PRESSURE_MEDIUM:
+        # Moderately higher: medium pressure
+        return VendorOverride(
+            suggested_next_move=f"Your offer is competitive, but we have a better price at ${best_price:.2f}. Can you improve your terms?",
+            pressure_level="medium",
+            walkaway_recommended=False,
+            reference_price=best_price
+        )
+    # Close to best: low pressure
+    return VendorOverride(
+        suggested_next_move=f"You're very close to the best offer at ${best_price:.2f}. Any improvement would be appreciated.",
+        pressure_level="low",
+        walkaway_recommended=False,
+        reference_price=best_price
+    )
 
 
-def create_market_analysis(leaderboard: Dict[str, Dict[str, Any]], order: Dict[str, Any], rounds_completed: int) -> MarketAnalysis:
+def create_market_analysis(
+    leaderboard: Dict[str, Dict[str, Any]],
+    order: Dict[str, Any],
+    rounds_completed: int,
+    live_board: Optional[LiveLeaderboard] = None,
+    weights: ScoreWeights = DEFAULT_WEIGHTS
+) -> MarketAnalysis:
     """
     Create market analysis from current leaderboard.
+
+    Prices, scores, ranks and pressure levels are computed column-wise
+    (see agents.utils.scoring); only the per-vendor messages are built row
+    by row. Benchmarks already maintained by the run's LiveLeaderboard are
+    reused when it holds exactly these offers (same vendors, same prices).
     """
     # Filter valid offers (must have price)
     valid_offers = {}
@@ -150,133 +256,77 @@ def create_market_analysis(leaderboard: Dict[str, Dict[str, Any]], order: Dict[s
     # Calculate benchmarks
     quantity = order.get("quantity", {}).get("preferred", 1)
     
-    prices = [float(offer["price_total"]) * quantity for offer in valid_offers.values()]
-    best_price = min(prices)
-    median_price = median(prices) if len(prices) > 1 else best_price
-    spread = ((max(prices) - best_price) / best_price * 100) if best_price > 0 else 0
+    columns = OfferColumns.from_offers(valid_offers)
+    prices = columns.unit_prices * quantity
     
-    benchmarks = MarketBenchmarks(
-        best_price=best_price,
-        median_price=median_price,
-        spread_percent=round(spread, 2),
-        total_vendors=len(valid_offers)
-    )
+    live_benchmarks = None
+    if live_board is not None:
+        live_benchmarks = live_board.benchmarks_for(dict(zip(columns.vendor_ids, columns.unit_prices.tolist())), quantity)
+
+    if live_benchmarks is not None:
+        benchmarks = MarketBenchmarks(**live_benchmarks)
+        best_price = benchmarks.best_price
+        median_price = benchmarks.median_price
+        spread = benchmarks.spread_percent
+    else:
+        best_price = float(prices.min())
+        median_price = float(np.median(prices)) if len(prices) > 1 else best_price
+        spread = ((float(prices.max()) - best_price) / best_price * 100) if best_price > 0 else 0
+
+        benchmarks = MarketBenchmarks(
+            best_price=best_price,
+            median_price=median_price,
+            spread_percent=round(spread, 2),
+            total_vendors=len(valid_offers)
+        )
     
     logger.info(f"[AGGREGATOR] Benchmarks: Best=${best_price:.2f}, Median=${median_price:.2f}, Spread={spread:.1f}%")
     
-    # Calculate scores and rank vendors
-    scored_vendors = []
-    for vendor_id_raw, offer in valid_offers.items():
-        score = calculate_vendor_score(offer, best_price, order)
+    # Calculate scores and rank vendors (rank order = descending score)
+    scores = columns.scores(best_price, weights)
+    order_idx = rank_order(scores)
+    ranked_prices = prices[order_idx]
+    ranked_deltas = ranked_prices - best_price
+    
+    # Create vendor-specific overrides for next round
+    budget = order.get("budget", float('inf'))
+    if not budget or budget == 0:
+        budget = float('inf')
         
-        # Safe string conversion
-        vendor_id_str = str(vendor_id_raw)
-        if hasattr(offer, "get"):
-             v_name = offer.get("vendor_name", "Unknown")
-             v_unit_price = float(offer.get("price_total", 0))
-             v_price = v_unit_price * quantity
-        else:
-             v_name = "Unknown"
-             v_price = 0
-             
-        scored_vendors.append({
-            "vendor_id": vendor_id_str,
-            "vendor_name": v_name,
-            "score": score,
-            "price": v_price,
-            "offer": offer
-        })
-    
-    # Sort by score (descending)
-    scored_vendors.sort(key=lambda x: x["score"], reverse=True)
-    
-    # Create rankings
+    # Pressure class per ranked vendor; first matching condition wins
+    delta_percents = ranked_deltas / best_price * 100 if best_price > 0 else np.zeros_like(ranked_deltas)
+    is_leader = np.arange(len(order_idx)) == 0
+    pressure_classes = np.select(
+        [is_leader, ranked_prices > budget * 1.1, delta_percents > 15, delta_percents > 5],
+        [PRESSURE_LEADER, PRESSURE_WALKAWAY, PRESSURE_HIGH, PRESSURE_MEDIUM],
+        default=PRESSURE_LOW
+    )
+    competitive = ranked_deltas < best_price * 0.05
+
     rankings = []
-    for rank, v_data in enumerate(scored_vendors, 1):
-        price = float(v_data["price"]) if v_data["price"] else 0.0
-        delta = price - best_price if price else 0
-        
+    vendor_overrides = {}
+    for rank, (idx, price, delta, pressure, is_competitive) in enumerate(
+        zip(order_idx.tolist(), ranked_prices.tolist(), ranked_deltas.tolist(), pressure_classes.tolist(), competitive.tolist()),
+        1
+    ):
+        vendor_id = columns.vendor_ids[idx]
+    
         if rank == 1:
             reason = f"Best overall offer: ${price:.2f}"
-        elif delta < best_price * 0.05:
+        elif is_competitive:
             reason = f"Competitive: ${price:.2f} (${delta:.2f} above best)"
         else:
             reason = f"Higher price: ${price:.2f} (${delta:.2f} above best)"
         
         rankings.append(VendorRanking(
-            vendor_id=v_data["vendor_id"], # Already str
-            vendor_name=v_data["vendor_name"],
+            vendor_id=vendor_id,
+            vendor_name=columns.offers[idx].get("vendor_name", "Unknown"),
             rank=rank,
-            score=v_data["score"],
+            score=float(scores[idx]),
             price=price,
             reason=reason
         ))
-    
-    # Create vendor-specific overrides for next round
-    budget = order.get("budget", float('inf'))
-    if not budget or budget == 0:
-        budget = float('inf')
-        
-    vendor_overrides = {}
-    
-    for v_data in scored_vendors:
-        try:
-            vendor_id = v_data["vendor_id"]
-            price = float(v_data["price"]) if v_data["price"] else 0.0
-            # We need to find the rank from the iteration.
-            current_rank = scored_vendors.index(v_data) + 1
-        except Exception as e:
-            print(f"DEBUG: CRASH in overrides loop. v_data type: {type(v_data)}", flush=True)
-            print(f"DEBUG: v_data content: {v_data}", flush=True)
-            raise e
-        
-        # Determine pressure level and suggested move
-        if current_rank == 1:
-            # Best vendor: maintain position
-            override = VendorOverride(
-                suggested_next_move="You have the best offer. Can you provide any additional value or services?",
-                pressure_level="low",
-                walkaway_recommended=False,
-                reference_price=best_price
-            )
-        else:
-            delta = price - best_price
-            delta_percent = (delta / best_price * 100) if best_price > 0 else 0
-            
-            if price > budget * 1.1:
-                # Far above budget: recommend walk-away
-                override = VendorOverride(
-                    suggested_next_move=f"Your price of ${price:.2f} significantly exceeds our budget. We may need to consider other options.",
-                    pressure_level="high",
-                    walkaway_recommended=True,
-                    reference_price=best_price
-                )
-            elif delta_percent > 15:
-                # Significantly higher: high pressure
-                override = VendorOverride(
-                    suggested_next_move=f"We have an offer at ${best_price:.2f}. To move forward, we need you to match or beat this price.",
-                    pressure_level="high",
-                    walkaway_recommended=False,
-                    reference_price=best_price
-                )
-            elif delta_percent > 5:
-                # Moderately higher: medium pressure
-                override = VendorOverride(
-                    suggested_next_move=f"Your offer is competitive, but we have a better price at ${best_price:.2f}. Can you improve your terms?",
-                    pressure_level="medium",
-                    walkaway_recommended=False,
-                    reference_price=best_price
-                )
-            else:
-                # Close to best: low pressure
-                override = VendorOverride(
-                    suggested_next_move=f"You're very close to the best offer at ${best_price:.2f}. Any improvement would be appreciated.",
-                    pressure_level="low",
-                    walkaway_recommended=False,
-                    reference_price=best_price
-                )
-        
-        vendor_overrides[vendor_id] = override
+        vendor_overrides[vendor_id] = _build_override(pressure, price, best_price)
     
     # Create summary
     if best_price <= budget:
@@ -293,13 +343,24 @@ def create_market_analysis(leaderboard: Dict[str, Dict[str, Any]], order: Dict[s
     )
 
 
-def create_final_comparison_report(leaderboard: Dict[str, Dict[str, Any]], order: Dict[str, Any]) -> FinalComparisonReport:
+def create_final_comparison_report(
+    leaderboard: Dict[str, Dict[str, Any]],
+    order: Dict[str, Any],
+    weights: ScoreWeights = DEFAULT_WEIGHTS,
+    profiles: Dict[str, ScoreWeights] = RANKING_PROFILES
+) -> FinalComparisonReport:
     """
     Create final comparison report for human decision-making.
+
+    Besides the ranking under `weights`, the report carries the Pareto
+    frontier of the offers and the frontier ranking under each profile, so
+    other weightings can be compared without re-scoring the leaderboard.
     
     Args:
         leaderboard: Final offers from all vendors
         order: Order requirements
+        weights: Criterion weights for scores and ranks
+        profiles: Alternative weightings to report, by name
         
     Returns:
         FinalComparisonReport with recommendation
@@ -320,61 +381,33 @@ def create_final_comparison_report(leaderboard: Dict[str, Dict[str, Any]], order
     
     # Calculate scores
     quantity = order.get("quantity", {}).get("preferred", 1)
-    prices = [float(offer["price_total"]) * quantity for offer in valid_offers.values()]
-    best_price = min(prices)
-    
-    vendor_comparisons = []
-    for vendor_id_raw, offer in valid_offers.items():
-        score = calculate_vendor_score(offer, best_price, order)
-        unit_price = offer.get("price_total")
-        
-        if unit_price is not None:
-            price = float(unit_price) * quantity
-            delta = price - best_price
-        else:
-            price = None
-            delta = None
+    columns = OfferColumns.from_offers(valid_offers)
+    prices = columns.unit_prices * quantity
+    best_price = float(prices.min())
+    pareto = ParetoRanking(columns, best_price, quantity)
+    scores = columns.scores(best_price, weights)
+    deltas = prices - best_price
+    
+    # Build comparisons in rank order (descending score)
+    comparisons_list = []
+    for rank, idx in enumerate(rank_order(scores).tolist(), 1):
+        offer = columns.offers[idx]
         
         # Update final offer with total price for display
         final_offer_dict = dict(offer)
-        final_offer_dict["price_total"] = price
+        final_offer_dict["price_total"] = float(prices[idx])
         if "final_price" in final_offer_dict and final_offer_dict["final_price"]:
             final_offer_dict["final_price"] = float(final_offer_dict["final_price"]) * quantity
 
-        vendor_comparisons.append({
-            "vendor_id": str(vendor_id_raw),
-            "vendor_name": offer.get("vendor_name", "Unknown"),
-            "final_offer": final_offer_dict,
-            "score": score,
-            "delta": delta,
-            "status": offer.get("status", "completed")
-        })
-    
-    # Sort by score
-    vendor_comparisons.sort(key=lambda x: x["score"], reverse=True)
-    
-    # Assign ranks
-    comparisons_list = []
-    for rank, vc in enumerate(vendor_comparisons, 1):
-        # Extract summary if available, else fall back to default string
-        offer_data = vc["final_offer"]
-        summary = offer_data.get("final_offer_summary")
-        if not summary:
-            # Fallback construction
-            price = offer_data.get("price_total")
-            currency = offer_data.get("currency", "USD")
-            items = offer_data.get("bundled_items", [])
-            item_str = f" ({', '.join(items)})" if items else ""
-            summary = f"Offer of {currency} {price}{item_str}"
-            
         comparisons_list.append(VendorComparison(
-            vendor_id=vc["vendor_id"],
-            vendor_name=vc["vendor_name"],
-            final_offer=vc["final_offer"],
+            vendor_id=columns.vendor_ids[idx],
+            vendor_name=offer.get("vendor_name", "Unknown"),
+            final_offer=final_offer_dict,
             rank=rank,
-            score=vc["score"],
-            delta_to_best=vc["delta"],
-            status=vc["status"]
+            score=float(scores[idx]),
+            delta_to_best=float(deltas[idx]),
+            status=offer.get("status", "completed"),
+            on_pareto_frontier=pareto.is_on_frontier(idx)
         ))
     
     # Recommend best vendor
@@ -401,9 +434,28 @@ def create_final_comparison_report(leaderboard: Dict[str, Dict[str, Any]], order
         recommended_name = "None"
         reason = "No valid offers available."
 
-    market_summary = f"Evaluated {len(valid_offers)} vendors. Price range: ${best_price:.2f} - ${max(prices):.2f}"
+    market_summary = f"Evaluated {len(valid_offers)} vendors. Price range: ${best_price:.2f} - ${float(prices.max()):.2f}"
+
+    # Pareto frontier and its ranking under each weighting profile
+    frontier = []
+    for idx in pareto.frontier.tolist():
+        offer = columns.offers[idx]
+        frontier.append(FrontierOffer(
+            vendor_id=columns.vendor_ids[idx],
+            vendor_name=offer.get("vendor_name", "Unknown"),
+            price=float(prices[idx]),
+            delivery_days=offer.get("delivery_days"),
+            payment_terms=offer.get("payment_terms"),
+            status=offer.get("status", "completed"),
+            criteria=pareto.frontier_criteria(idx)
+        ))
+    weighted_rankings = [
+        weighted_ranking(profile, frontier, profile_weights)
+        for profile, profile_weights in {**profiles, "configured": weights}.items()
+    ]
     
     logger.info(f"[AGGREGATOR] Final recommendation: {recommended_name} - {reason}")
+    logger.info(f"[AGGREGATOR] Pareto frontier: {len(frontier)}/{len(valid_offers)} offers")
     
     return FinalComparisonReport(
         recommended_vendor_id=recommended_id,
@@ -411,10 +463,108 @@ def create_final_comparison_report(leaderboard: Dict[str, Dict[str, Any]], order
         recommendation_reason=reason,
         vendors=comparisons_list,
         human_action="Review the recommendation and confirm your selection to proceed with purchase",
-        market_summary=market_summary
+        market_summary=market_summary,
+        weights=weights.as_dict(),
+        pareto_frontier=frontier,
+        weighted_rankings=weighted_rankings
     )
 
 
+def weighted_ranking(profile: str, frontier: List[FrontierOffer], weights: ScoreWeights) -> WeightedRanking:
+    """
+    Rank Pareto-frontier offers under a weighting, using only their criterion scores.
+
+    Args:
+        profile: Name to report the ranking under
+        frontier: FinalComparisonReport.pareto_frontier
+        weights: Criterion weights
+
+    Returns:
+        WeightedRanking (recommended_vendor_id is "none" for an empty frontier)
+    """
+    order, scores = rank_criteria(criteria_matrix([offer.criteria for offer in frontier]), weights)
+    ranking = [frontier[i].vendor_id for i in order.tolist()]
+    return WeightedRanking(
+        profile=profile,
+        weights=weights.as_dict(),
+        recommended_vendor_id=ranking[0] if ranking else "none",
+        ranking=ranking,
+        scores={frontier[i].vendor_id: float(scores[i]) for i in order.tolist()}
+    )
+
+
+# Deals that another round cannot improve
+CLOSED_STATUSES = ("finalized", "walked_away")
+
+
+def _stalled(entries: List[Dict[str, Any]]) -> bool:
+    """True if the vendor's latest round did not lower its price."""
+    if len(entries) < 2:
+        return False
+    previous = (entries[-2].get("offer") or {}).get("price_total")
+    latest = (entries[-1].get("offer") or {}).get("price_total")
+    if latest is None:
+        return True
+    return previous is not None and latest >= previous
+
+
+def select_next_round_vendors(
+    market_analysis: MarketAnalysis,
+    report: FinalComparisonReport,
+    negotiation_history: Dict[Any, List[Dict[str, Any]]],
+    previous_round_size: int,
+    fraction: float = ROUND_REENGAGE_FRACTION
+) -> List[str]:
+    """
+    Pick the vendors worth another negotiation round.
+    
+    A vendor is re-engaged only when improvement is likely:
+    - its override does not recommend walking away
+    - its deal is still open (not finalized or walked away)
+    - its offer is on the Pareto frontier (a dominated offer loses under
+      any weighting, however it moves on price)
+    - it lowered its price in the round just played (or has played one round)
+    
+    Candidates are taken in rank order, at most `fraction` of the previous
+    round's vendors (at least one for the first follow-up round), so the
+    number of sessions shrinks geometrically from round to round.
+    
+    Args:
+        market_analysis: Analysis of the round just completed
+        report: Comparison report of the same leaderboard
+        negotiation_history: vendor_id -> per-round entries
+        previous_round_size: Vendors negotiated with in the round just completed
+        fraction: Share of those vendors to re-engage
+        
+    Returns:
+        Vendor IDs (as strings), best ranked first
+    """
+    limit = int(previous_round_size * fraction)
+    if market_analysis.round_index == 1 and previous_round_size:
+        limit = max(limit, 1)
+    if limit <= 0:
+        return []
+    
+    comparisons = {comparison.vendor_id: comparison for comparison in report.vendors}
+    history = {str(vendor_id): entries for vendor_id, entries in negotiation_history.items()}
+    
+    selected = []
+    for ranking in market_analysis.rankings:
+        vendor_id = ranking.vendor_id
+        override = market_analysis.vendor_overrides.get(vendor_id)
+        comparison = comparisons.get(vendor_id)
+        if override is None or override.walkaway_recommended:
+            continue
+        if comparison is None or comparison.status in CLOSED_STATUSES or not comparison.on_pareto_frontier:
+            continue
+        if _stalled(history.get(vendor_id, [])):
+            continue
+        selected.append(vendor_id)
+        if len(selected) >= limit:
+            break
+    return selected
+
+
 def aggregator_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     Aggregate negotiation results and provide market analysis.
@@ -448,8 +598,12 @@ def aggregator_node(state: Dict[str, Any]) -> Dict[str, Any]:
     logger.info(f"[AGGREGATOR] Analyzing {len(leaderboard)} vendor offers")
     print(f"[AGGREGATOR] Analyzing round {rounds_completed} results ({len(leaderboard)} offers)...", flush=True)
     
+    # Benchmarks were kept up to date by the negotiators; only finalize here
+    run_id = current_run_id()
+    board = live_leaderboards.get(run_id)
+    
     # Create market analysis
-    market_analysis = create_market_analysis(leaderboard, order, rounds_completed)
+    market_analysis = create_market_analysis(leaderboard, order, rounds_completed, live_board=board)
     
     # Log analysis results
     logger.info(f"[AGGREGATOR] Market Summary: {market_analysis.summary}")
@@ -468,11 +622,73 @@ def aggregator_node(state: Dict[str, Any]) -> Dict[str, Any]:
     # Create final comparison report (will be used if negotiation ends)
     final_report = create_final_comparison_report(leaderboard, order)
     
+    # Vendors to re-engage if the decision gate asks for another round
+    previous_analysis = state.get("market_analysis")
+    if previous_analysis:
+        previous_round_size = len(previous_analysis.get("next_round_vendor_ids") or [])
+    else:
+        previous_round_size = len(leaderboard)
+    market_analysis.next_round_vendor_ids = select_next_round_vendors(
+        market_analysis, final_report, state.get("negotiation_history") or {}, previous_round_size
+    )
+    logger.info(f"[AGGREGATOR] Next round candidates: {market_analysis.next_round_vendor_ids or 'none'}")
+    
+    # Persist the leaderboard so the run can be re-scored later (what-if API)
+    if run_id:
+        try:
+            run_results.save(run_id, order, leaderboard, rounds_completed)
+        except Exception as e:
+            logger.warning(f"[AGGREGATOR] Could not store results for run {run_id}: {e}")
+    
     logger.info("=" * 60)
     
-    return {
+    result = {
         "rounds_completed": rounds_completed,
         "market_analysis": market_analysis.model_dump(),
         "final_comparison_report": final_report.model_dump(),
         "phase": "negotiation"
     }
+    if board is not None:
+        result["live_market"] = {**board.snapshot(rounds_completed), "is_final": True}
+    return result
+
+
+def best_so_far_update(
+    leaderboard: Dict[str, Dict[str, Any]],
+    order: Dict[str, Any],
+    rounds_completed: int,
+    run_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Report the best offers so far when the run deadline passes before the
+    aggregator has run.
+    
+    Args:
+        leaderboard: Offers received so far
+        order: Order requirements
+        rounds_completed: Rounds finished before the deadline
+        run_id: Run to store the results under (what-if API)
+        
+    Returns:
+        Update shaped like aggregator_node's, with deadline_reached set
+    """
+    logger.warning(f"[AGGREGATOR] Run deadline reached, reporting best so far ({len(leaderboard)} offers)")
+    print(f"[AGGREGATOR] ⏱ Deadline reached: reporting best of {len(leaderboard)} offers so far", flush=True)
+    
+    market_analysis = create_market_analysis(leaderboard, order, rounds_completed)
+    final_report = create_final_comparison_report(leaderboard, order)
+    final_report.market_summary = f"Best so far at the run deadline. {final_report.market_summary}"
+    
+    if run_id:
+        try:
+            run_results.save(run_id, order, leaderboard, rounds_completed, status=STATUS_DEADLINE_REACHED)
+        except Exception as e:
+            logger.warning(f"[AGGREGATOR] Could not store results for run {run_id}: {e}")
+    
+    return {
+        "rounds_completed": rounds_completed,
+        "market_analysis": market_analysis.model_dump(),
+        "final_comparison_report": final_report.model_dump(),
+        "phase": "deadline_reached",
+        "deadline_reached": True
+    }
@@ -5,9 +5,11 @@ Fetches vendors from external API.
 """
 
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from agents.utils.vendor_api import VendorAPIClient
 from agents.config import NEGOTIATION_API_BASE, NEGOTIATION_TEAM_ID, MAX_VENDORS_LIMIT
+from agents.run_cancellation import CALL_VENDOR_API, cancellable
+from agents.run_stream import EVENT_ACTIVITY, emit
 
 logger = logging.getLogger(__name__)
 
@@ -47,12 +49,68 @@ def validate_vendors(vendors: List[Dict[str, Any]]) -> bool:
     return True
 
 
+def resolve_team_id() -> Optional[int]:
+    """
+    Read the optional team id from centralized config.
+    
+    Returns:
+        Team id as int, or None if unset or invalid
+    """
+    if not NEGOTIATION_TEAM_ID:
+        logger.info("[DATABASE_FETCHER] No NEGOTIATION_TEAM_ID in config, fetching all vendors")
+        return None
+    try:
+        team_id = int(NEGOTIATION_TEAM_ID)
+        logger.info(f"[DATABASE_FETCHER] Using team_id from config: {team_id}")
+        return team_id
+    except ValueError:
+        logger.warning(f"[DATABASE_FETCHER] Invalid NEGOTIATION_TEAM_ID in config: {NEGOTIATION_TEAM_ID}, ignoring")
+        return None
+
+
+def load_vendors() -> List[Dict[str, Any]]:
+    """
+    Fetch, limit and validate the vendor list from the external API.
+    
+    Shared by fetch_vendors_node and the speculative warm-up so both see
+    exactly the same vendor set.
+    
+    Returns:
+        List of validated vendor dictionaries
+        
+    Raises:
+        ValueError: If the vendor data fails validation
+        Exception: If the API request fails
+    """
+    team_id = resolve_team_id()
+    
+    # Initialize API client with centralized config
+    client = VendorAPIClient(api_base_url=NEGOTIATION_API_BASE)
+    
+    # Fetch vendors from API
+    vendors = client.get_all_vendors(team_id=team_id)
+    
+    if MAX_VENDORS_LIMIT > 0:
+        vendors = vendors[:MAX_VENDORS_LIMIT]
+        logger.info(f"[DATABASE_FETCHER] Limited to {len(vendors)} vendors (MAX_VENDORS_LIMIT={MAX_VENDORS_LIMIT})")
+    
+    logger.info(f"[DATABASE_FETCHER] Retrieved {len(vendors)} vendors from API")
+    
+    # Validate the vendor data
+    if not validate_vendors(vendors):
+        raise ValueError("Vendor data validation failed")
+    
+    return vendors
+
+
 def fetch_vendors_node(state: Dict[str, Any]) -> Dict[str, Any]:
     """
     LangGraph node function that fetches vendors from external API.
     
     Reads NEGOTIATION_TEAM_ID from centralized config (optional) and calls
-    the vendor API to retrieve all available vendors.
+    the vendor API to retrieve all available vendors. If /api/extract started
+    a warm-up for the same order, its (possibly still in-flight) vendor list
+    is reused instead of fetching again.
     
     Args:
         state: GraphState
@@ -61,53 +119,37 @@ def fetch_vendors_node(state: Dict[str, Any]) -> Dict[str, Any]:
         Dict with updated fields: all_vendors, phase
     """
     logger.info("[DATABASE_FETCHER] Starting vendor fetch")
+    emit(EVENT_ACTIVITY, "Searching the vendor database...", node="fetch_vendors")
     
-    # Read team_id from centralized config (optional)
-    team_id = None
-    if NEGOTIATION_TEAM_ID:
-        try:
-            team_id = int(NEGOTIATION_TEAM_ID)
-            logger.info(f"[DATABASE_FETCHER] Using team_id from config: {team_id}")
-        except ValueError:
-            logger.warning(f"[DATABASE_FETCHER] Invalid NEGOTIATION_TEAM_ID in config: {NEGOTIATION_TEAM_ID}, ignoring")
-    else:
-        logger.info("[DATABASE_FETCHER] No NEGOTIATION_TEAM_ID in config, fetching all vendors")
+    # Imported here to avoid a circular import (warmup depends on this module)
+    from agents.warmup import warmup_registry
     
     try:
-        # Initialize API client with centralized config
-        client = VendorAPIClient(api_base_url=NEGOTIATION_API_BASE)
-        
-        # Fetch vendors from API
-        vendors = client.get_all_vendors(team_id=team_id)
-        
-        if MAX_VENDORS_LIMIT > 0:
-            vendors = vendors[:MAX_VENDORS_LIMIT]
-            logger.info(f"[DATABASE_FETCHER] Limited to {len(vendors)} vendors (MAX_VENDORS_LIMIT={MAX_VENDORS_LIMIT})")
-        
-        logger.info(f"[DATABASE_FETCHER] Retrieved {len(vendors)} vendors from API")
-        
-        # Validate the vendor data
-        if not validate_vendors(vendors):
-            logger.error(f"[DATABASE_FETCHER] Validation failed for vendor data")
-            return {
-                "phase": "filtering",
-                "error": "Vendor data validation failed"
-            }
-        
-        if len(vendors) == 0:
-            logger.warning("[DATABASE_FETCHER] No vendors found - negotiation may not be possible")
-        
-        # Return updated state
-        logger.info(f"[DATABASE_FETCHER] Successfully fetched and validated {len(vendors)} vendors")
-        print(f"[DATABASE_FETCHER] ✓ Fetched {len(vendors)} vendors", flush=True)
+        vendors = warmup_registry.wait_for_vendors(state.get("order_object"))
+        if vendors is not None:
+            logger.info(f"[DATABASE_FETCHER] Reusing {len(vendors)} vendors from warm-up")
+        else:
+            vendors = cancellable(load_vendors, kind=CALL_VENDOR_API)
+    except ValueError:
+        logger.error(f"[DATABASE_FETCHER] Validation failed for vendor data")
         return {
-            "all_vendors": vendors,
-            "phase": "filtering"
+            "phase": "filtering",
+            "error": "Vendor data validation failed"
         }
-        
     except Exception as e:
         logger.error(f"[DATABASE_FETCHER] Error during vendor fetch: {e}")
         return {
             "phase": "filtering",
             "error": f"Vendor fetch failed: {str(e)}"
         }
+    
+    if len(vendors) == 0:
+        logger.warning("[DATABASE_FETCHER] No vendors found - negotiation may not be possible")
+    
+    # Return updated state
+    logger.info(f"[DATABASE_FETCHER] Successfully fetched and validated {len(vendors)} vendors")
+    print(f"[DATABASE_FETCHER] ✓ Fetched {len(vendors)} vendors", flush=True)
+    return {
+        "all_vendors": vendors,
+        "phase": "filtering"
+    }
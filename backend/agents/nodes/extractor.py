@@ -5,34 +5,25 @@ Adapts the existing OrderExtractorAgent to work as a LangGraph node.
 This is the only node with full implementation - others are stubs.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, List, Optional, Union
+from pydantic import BaseModel, Field
 from langchain_anthropic import ChatAnthropic
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
 
 from models.order import OrderObject
-from agents.config import DEFAULT_MODEL, DEFAULT_TEMPERATURE
+from agents.config import DEFAULT_MODEL, DEFAULT_TEMPERATURE, FAST_PATH_ENABLED, FAST_PATH_MIN_CONFIDENCE
+from agents.utils.order_parser import parse_order
 
 logger = logging.getLogger(__name__)
 
 
-class OrderExtractorAgent:
-    """Agent that extracts structured order data from user input"""
-    
-    def __init__(self):
-        # Initialize Claude with centralized config
-        self.llm = ChatAnthropic(
-            model=DEFAULT_MODEL,
-            temperature=DEFAULT_TEMPERATURE
-        )
-
-        # Setup output parser
-        self.parser = PydanticOutputParser(pydantic_object=OrderObject)
-
-        # Create prompt template
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert at extracting structured order information from casual user input.
+EXTRACTION_SYSTEM_PROMPT = """You are an expert at extracting structured order information from casual user input.
 
 Extract the following information:
 - Item: What product/service they want
@@ -49,21 +40,185 @@ Be intelligent about:
 - Vague amounts: "around 100" → min:90, max:110, preferred:100
 - Budget: "4.5k" or "$4500" → 4500
 - Requirements: "need warranty" = mandatory, "would be nice to have warranty" = optional
-"""),
+"""
+
+
+class ExtractionPathStats:
+    """
+    Per-path counters and latency samples for order extraction.
+    
+    "fast_path" covers orders resolved by the deterministic parser,
+    "llm" covers everything that had to go to the model.
+    """
+    PATHS = ("fast_path", "llm")
+    
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._counts = {path: 0 for path in self.PATHS}
+        self._latencies = {path: deque(maxlen=window) for path in self.PATHS}
+    
+    def record(self, path: str, seconds: float, count: int = 1) -> None:
+        with self._lock:
+            self._counts[path] += count
+            self._latencies[path].extend([seconds] * count)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Coverage plus count/p50/p99 (over the recent window) per path."""
+        with self._lock:
+            total = sum(self._counts.values())
+            report: Dict[str, Any] = {
+                "total": total,
+                "fast_path_coverage": round(self._counts["fast_path"] / total, 4) if total else None,
+            }
+            for path in self.PATHS:
+                samples = sorted(self._latencies[path])
+                report[path] = {
+                    "count": self._counts[path],
+                    "p50_ms": round(samples[len(samples) // 2] * 1000, 3) if samples else None,
+                    "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 3) if samples else None,
+                }
+            return report
+
+
+# Process-wide stats shared by every OrderExtractorAgent
+extraction_path_stats = ExtractionPathStats()
+
+
+def try_fast_path(user_input: str) -> Optional[OrderObject]:
+    """
+    Resolve an order with the deterministic parser if it is confident enough.
+    
+    Returns:
+        OrderObject, or None if the input needs the LLM
+    """
+    if not FAST_PATH_ENABLED:
+        return None
+    start = time.perf_counter()
+    result = parse_order(user_input)
+    if result.resolved and result.confidence >= FAST_PATH_MIN_CONFIDENCE:
+        extraction_path_stats.record("fast_path", time.perf_counter() - start)
+        logger.info(f"[EXTRACTOR] Fast path resolved order (confidence {result.confidence:.2f})")
+        return result.order
+    logger.debug(f"[EXTRACTOR] Fast path unresolved (confidence {result.confidence:.2f}, missing: {result.missing})")
+    return None
+
+
+class OrderBatch(BaseModel):
+    """Several orders extracted in a single LLM call"""
+    orders: List[OrderObject] = Field(description="One order per numbered request, in the same order")
+
+
+class OrderExtractorAgent:
+    """Agent that extracts structured order data from user input"""
+    
+    def __init__(self):
+        # Initialize Claude with centralized config
+        self.llm = ChatAnthropic(
+            model=DEFAULT_MODEL,
+            temperature=DEFAULT_TEMPERATURE
+        )
+
+        # Setup output parser
+        self.parser = PydanticOutputParser(pydantic_object=OrderObject)
+        self.batch_parser = PydanticOutputParser(pydantic_object=OrderBatch)
+
+        # Create prompt template
+        self.prompt = ChatPromptTemplate.from_messages([
+            ("system", EXTRACTION_SYSTEM_PROMPT),
             ("human", "{user_input}")
         ])
+        
+        # Batch prompt: several independent requests answered in one call
+        self.batch_prompt = ChatPromptTemplate.from_messages([
+            ("system", EXTRACTION_SYSTEM_PROMPT + """
+You will receive several independent numbered requests. Extract each one on its own
+and return exactly one order per request, in the same order as the requests.
+"""),
+            ("human", "{user_inputs}")
+        ])
 
-        # Create chain
+        # Create chains
         self.chain = self.prompt | self.llm | self.parser
+        self.batch_chain = self.batch_prompt | self.llm | self.batch_parser
 
     def extract(self, user_input: str) -> OrderObject:
-        """Extract order object from user input"""
+        """Extract order object from user input (fast path first, then LLM)"""
+        order = try_fast_path(user_input)
+        if order is not None:
+            return order
+        
+        start = time.perf_counter()
         result = self.chain.invoke({
             "user_input": user_input,
             "format_instructions": self.parser.get_format_instructions()
         })
+        extraction_path_stats.record("llm", time.perf_counter() - start)
         return result
 
+    async def aextract(self, user_input: str) -> OrderObject:
+        """Extract order object from user input without blocking the event loop"""
+        order = try_fast_path(user_input)
+        if order is not None:
+            return order
+        return await self._allm_extract(user_input)
+
+    async def _allm_extract(self, user_input: str) -> OrderObject:
+        start = time.perf_counter()
+        result = await self.chain.ainvoke({
+            "user_input": user_input,
+            "format_instructions": self.parser.get_format_instructions()
+        })
+        extraction_path_stats.record("llm", time.perf_counter() - start)
+        return result
+
+    async def aextract_many(self, user_inputs: List[str]) -> List[Union[OrderObject, Exception]]:
+        """
+        Extract several independent orders, using one LLM call where possible.
+        
+        Inputs the deterministic parser resolves never reach the LLM. If the
+        combined call fails or returns the wrong number of orders, each
+        remaining input is retried individually (concurrently) so one odd
+        request cannot fail the whole batch.
+        
+        Args:
+            user_inputs: Raw user requests
+            
+        Returns:
+            One OrderObject (or the Exception raised for it) per input, in order
+        """
+        results: List[Union[OrderObject, Exception, None]] = [try_fast_path(text) for text in user_inputs]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        
+        llm_results = await self._allm_extract_many([user_inputs[i] for i in pending])
+        for i, result in zip(pending, llm_results):
+            results[i] = result
+        return results
+
+    async def _allm_extract_many(self, user_inputs: List[str]) -> List[Union[OrderObject, Exception]]:
+        if len(user_inputs) == 1:
+            try:
+                return [await self._allm_extract(user_inputs[0])]
+            except Exception as e:
+                return [e]
+        
+        numbered = "\n\n".join(f"REQUEST {i}:\n{text}" for i, text in enumerate(user_inputs, 1))
+        start = time.perf_counter()
+        try:
+            batch = await self.batch_chain.ainvoke({
+                "user_inputs": numbered,
+                "format_instructions": self.batch_parser.get_format_instructions()
+            })
+            if len(batch.orders) == len(user_inputs):
+                extraction_path_stats.record("llm", time.perf_counter() - start, count=len(user_inputs))
+                return list(batch.orders)
+            logger.warning(f"[EXTRACTOR] Batch returned {len(batch.orders)} orders for {len(user_inputs)} requests, retrying individually")
+        except Exception as e:
+            logger.warning(f"[EXTRACTOR] Batch extraction failed ({e}), retrying individually")
+        
+        return await asyncio.gather(*(self._allm_extract(text) for text in user_inputs), return_exceptions=True)
+
 
 def validate_order(order: OrderObject) -> bool:
     """Validates the extracted order object"""
@@ -17,7 +17,14 @@ from agents.config import NEGOTIATION_API_BASE, NEGOTIATION_TEAM_ID
 from agents.utils.conversation_api import ConversationAPIClient
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
-from agents.config import DEFAULT_MODEL, DEFAULT_TEMPERATURE
+from agents.config import DEFAULT_MODEL, DEFAULT_TEMPERATURE, FOLLOWUP_SESSION_TURNS
+from agents.live_leaderboard import live_leaderboards
+from agents.metrics import NEGOTIATION_TURNS
+from agents.tracing import span, traced
+from agents.run_context import current_run_id
+from agents.run_deadline import phase_expired, phase_timeout
+from agents.run_cancellation import CALL_VENDOR_API, cancellable, check_cancelled
+from agents.run_stream import EVENT_TURN, emit, invoke_streaming
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +45,7 @@ class NegotiateInput(TypedDict):
     market_analysis: Optional[Dict[str, Any]]  # Market analysis from aggregator
     conversation_id: Optional[str]  # Existing conversation ID (if any)
     last_offer: Optional[Dict[str, Any]]  # Last offer from this vendor
+    prior_turns: List[Dict[str, str]]  # Transcript of earlier rounds (empty in round one)
     product_id: Optional[str]  # Specific product ID being negotiated
     order_details: Dict[str, Any]  # Explicit order requirements
 
@@ -85,15 +93,29 @@ class VendorResponseAnalysis(BaseModel):
     next_action_suggestion:  Literal["continue", "accept", "walk_away", "clarify"] = Field(description="Suggested next action")
 
 
+# Vendor API request timeout (shortened to what is left of the negotiation budget)
+VENDOR_API_TIMEOUT = 30
+
+
 def create_conversation(vendor_id: str, title: str) -> Optional[str]:
     """Create a new conversation with a vendor."""
     team_id = TEAM_ID if TEAM_ID else 1
-    return api_client.create_conversation(vendor_id, team_id, title)
+    return cancellable(
+        api_client.create_conversation,
+        vendor_id, team_id, title,
+        timeout=phase_timeout("negotiation", VENDOR_API_TIMEOUT),
+        kind=CALL_VENDOR_API
+    )
 
 
 def send_message(conversation_id: str, message: str) -> Optional[str]:
     """Send a message in a conversation."""
-    return api_client.send_message(conversation_id, message)
+    return cancellable(
+        api_client.send_message,
+        conversation_id, message,
+        timeout=phase_timeout("negotiation", VENDOR_API_TIMEOUT),
+        kind=CALL_VENDOR_API
+    )
 
 
 # Number of max internal turns to prevent infinite loops (safety brake)
@@ -101,23 +123,62 @@ def send_message(conversation_id: str, message: str) -> Optional[str]:
 MAX_SESSION_TURNS = 15
 
 
+def build_market_context(market_analysis: Optional[Dict[str, Any]], vendor_id: Any) -> Optional[str]:
+    """
+    Summarize the aggregator's feedback for one vendor's follow-up round.
+    
+    Args:
+        market_analysis: MarketAnalysis dict from the previous round (or None)
+        vendor_id: Vendor being negotiated with
+        
+    Returns:
+        Prompt section text, or None in the first round
+    """
+    if not market_analysis:
+        return None
+    override = (market_analysis.get("vendor_overrides") or {}).get(str(vendor_id)) or {}
+    rank = next(
+        (r.get("rank") for r in market_analysis.get("rankings", []) if r.get("vendor_id") == str(vendor_id)),
+        None
+    )
+    lines = [f"- Market after round {market_analysis.get('round_index')}: {market_analysis.get('summary', '')}"]
+    if rank:
+        lines.append(f"- This vendor ranks #{rank} of {len(market_analysis.get('rankings', []))}")
+    if override:
+        lines.append(f"- Pressure level: {override.get('pressure_level')}")
+        if override.get("reference_price"):
+            lines.append(f"- Best competing total: ${override['reference_price']:.2f}")
+        lines.append(f"- Suggested next move: {override.get('suggested_next_move')}")
+    return "\n".join(lines)
+
+
 class NegotiationAgent:
     """
     Agent that handles a multi-turn negotiation conversation with a single vendor.
     Runs a continuous loop until a deal is reached or broken.
     """
-    def __init__(self, vendor_id: str, vendor_name: str, strategy: Dict[str, Any], order_details: Dict[str, Any] = None):
+    def __init__(
+        self,
+        vendor_id: str,
+        vendor_name: str,
+        strategy: Dict[str, Any],
+        order_details: Dict[str, Any] = None,
+        market_context: Optional[str] = None
+    ):
         self.vendor_id = vendor_id
         self.vendor_name = vendor_name
         self.strategy = strategy
         self.order_details = order_details or {}
+        self.market_context = market_context
         self.llm = ChatAnthropic(
             model=DEFAULT_MODEL,
-            temperature=DEFAULT_TEMPERATURE
+            temperature=DEFAULT_TEMPERATURE,
+            default_request_timeout=phase_timeout("negotiation")
         )
         self.structured_analyzer = self.llm.with_structured_output(VendorResponseAnalysis)
         self.deal_extractor = self.llm.with_structured_output(DealExtraction)
 
+    @traced("analyze_response")
     def analyze_response(self, vendor_response: str, history: List[Dict[str, str]]) -> VendorResponseAnalysis:
         """
         Analyze the vendor's response to extract price and sentiment.
@@ -148,7 +209,7 @@ INSTRUCTIONS:
 Return JSON matching the schema.
 """
         try:
-            return self.structured_analyzer.invoke(prompt)
+            return cancellable(self.structured_analyzer.invoke, prompt)
         except Exception as e:
             logger.error(f"[NEGOTIATOR] Analysis failed: {e}")
             return VendorResponseAnalysis(
@@ -158,6 +219,7 @@ Return JSON matching the schema.
                 next_action_suggestion="continue"
             )
 
+    @traced("extract_final_deal_details")
     def extract_final_deal_details(self, history: List[Dict[str, str]]) -> DealExtraction:
         """
         Parse the full negotiation transcript to extract final deal details.
@@ -181,7 +243,7 @@ INSTRUCTIONS:
 Return JSON matching the schema.
 """
         try:
-            return self.deal_extractor.invoke(prompt)
+            return cancellable(self.deal_extractor.invoke, prompt)
         except Exception as e:
             logger.error(f"[NEGOTIATOR] Deal extraction failed: {e}")
             return DealExtraction(
@@ -192,6 +254,7 @@ Return JSON matching the schema.
                 deal_status="in_progress"
             )
 
+    @traced("generate_message")
     def generate_message(
         self, 
         history: List[Dict[str, str]], 
@@ -280,9 +343,13 @@ CURRENT TACTICAL PHASE: {tactical_phase}
 CONTEXT:
 - Product ID: {product_id if product_id else "General item"}
 - Current Analysis: {analysis.reasoning if analysis else "Start of conversation"}
-- Suggested Action: {analysis.next_action_suggestion if analysis else "Open negotiation"}
+- Suggested Action: {analysis.next_action_suggestion if analysis else ("Follow up using the market feedback" if self.market_context else "Open negotiation")}
 
-COMPETITION CONTEXT:
+{f"""MARKET FEEDBACK (FOLLOW-UP ROUND):
+{self.market_context}
+- Resume the existing conversation; do not re-introduce yourself or restart the negotiation.
+
+""" if self.market_context else ""}COMPETITION CONTEXT:
 - We are evaluating other vendors securely. 
 - IF ASKED about other vendors: Say "We are evaluating a few other competitive options" but DO NOT disclose specific names or their prices.
 - Use the competition as leverage ONLY if necessary ("We have other offers closer to our target").
@@ -308,78 +375,144 @@ Your turn. Draft the message:"""
 
         messages.append(HumanMessage(content=final_prompt))
         
-        response = self.llm.invoke(messages)
-        return response.content.strip()
+        # Tokens reach the UI as they are generated when the run streams
+        response = cancellable(
+            invoke_streaming, self.llm, messages,
+            source="negotiator", vendor_id=str(self.vendor_id), exchange=turns_completed
+        )
+        return response.text.strip()
+
+    def emit_turn(self, role: str, content: str, exchange: int, round_index: int) -> None:
+        """Stream one complete message of the conversation to the UI."""
+        message = f"Message sent to {self.vendor_name}." if role == "agent" else f"{self.vendor_name} replied."
+        emit(
+            EVENT_TURN, message,
+            vendor_id=str(self.vendor_id), vendor_name=self.vendor_name,
+            role=role, content=content, exchange=exchange, round=round_index
+        )
 
     def run_negotiation_session(
         self,
         conversation_id: str,
-        product_id: Optional[str]
+        product_id: Optional[str],
+        round_index: int = 0,
+        prior_turns: Optional[List[Dict[str, str]]] = None,
+        max_turns: int = MAX_SESSION_TURNS,
+        last_price: Optional[float] = None
     ) -> Dict[str, Any]:
         """
         Run the full negotiation session until conclusion (or safety limit).
+        
+        Follow-up rounds pass the earlier transcript in prior_turns: the
+        session continues the same conversation instead of re-opening it,
+        and only the new turns are returned.
+        
+        If the run's negotiation budget runs out, the session stops between
+        turns and returns a partial in_progress snapshot with the last price
+        the vendor quoted, or last_price from an earlier round (no final
+        extraction call).
         """
-        history = []
+        prior_turns = list(prior_turns or [])
+        history = list(prior_turns)
         turns = 0
         best_offer: Optional[OfferSnapshot] = None
-        current_price = None
+        current_price = last_price
         consecutive_firm_responses = 0
+        last_analysis: Optional[VendorResponseAnalysis] = None
         
         # Initial status
         session_status = "completed"
         
-        while turns < MAX_SESSION_TURNS:
-            # 1. Generate Message
-            if turns == 0:
-                # Use strategy opening, ensure no Subject line
-                msg_text = self.strategy.get("opening_message", "Hello.")
-                # Clean up if strategy generated a subject line despite instructions
-                if "Subject:" in msg_text:
-                    msg_text = msg_text.split("Subject:")[-1].split("\n", 1)[-1].strip()
-            else:
-                msg_text = self.generate_message(history, last_analysis, product_id)
-
-            logger.info(f"[NEGOTIATOR] {self.vendor_name} (Turn {turns}): Sending: {msg_text}")
-            
-            # 2. Send
-            vendor_response = send_message(conversation_id, msg_text)
-            if not vendor_response:
-                logger.error("[NEGOTIATOR] Failed to send/receive.")
-                session_status = "error"
+        deadline_reached = False
+        
+        while turns < max_turns:
+            check_cancelled()
+            if phase_expired("negotiation"):
+                logger.warning(f"[NEGOTIATOR] {self.vendor_name}: negotiation budget spent, stopping session")
+                deadline_reached = True
                 break
+            
+            # One span per exchange, covering the message, the vendor reply and its analysis
+            with span("negotiation_turn", {
+                "evaepic.vendor_id": str(self.vendor_id),
+                "evaepic.vendor_name": self.vendor_name,
+                "evaepic.round_index": round_index,
+                "evaepic.turn": turns
+            }):
+                # 1. Generate Message
+                if turns == 0 and not prior_turns:
+                    # Use strategy opening, ensure no Subject line
+                    msg_text = self.strategy.get("opening_message", "Hello.")
+                    # Clean up if strategy generated a subject line despite instructions
+                    if "Subject:" in msg_text:
+                        msg_text = msg_text.split("Subject:")[-1].split("\n", 1)[-1].strip()
+                else:
+                    msg_text = self.generate_message(history, last_analysis, product_id)
+
+                logger.info(f"[NEGOTIATOR] {self.vendor_name} (Turn {turns}): Sending: {msg_text}")
+                exchange = len(history) // 2
+                self.emit_turn("agent", msg_text, exchange, round_index)
+            
+                # 2. Send
+                vendor_response = send_message(conversation_id, msg_text)
+                if not vendor_response:
+                    logger.error("[NEGOTIATOR] Failed to send/receive.")
+                    session_status = "error"
+                    break
                 
-            logger.info(f"[NEGOTIATOR] {self.vendor_name} (Turn {turns}): Received: {vendor_response}")
+                logger.info(f"[NEGOTIATOR] {self.vendor_name} (Turn {turns}): Received: {vendor_response}")
+                self.emit_turn("vendor", vendor_response, exchange, round_index)
             
-            # Update history
-            history.append({"role": "agent", "content": msg_text})
-            history.append({"role": "vendor", "content": vendor_response})
+                # Update history
+                history.append({"role": "agent", "content": msg_text})
+                history.append({"role": "vendor", "content": vendor_response})
             
-            # 3. Analyze Response
-            last_analysis = self.analyze_response(vendor_response, history)
+                # 3. Analyze Response
+                last_analysis = self.analyze_response(vendor_response, history)
+                if last_analysis.has_offer and last_analysis.price:
+                    current_price = last_analysis.price
             
-            # 4. Check Termination Conditions
+                # 4. Check Termination Conditions
             
-            # A. Deal Agreed
-            if last_analysis.sentiment == "deal_agreed":
-                logger.info("[NEGOTIATOR] Deal agreed!")
-                break
-                
-            # B. Walk Away / Refused
-            if last_analysis.sentiment == "refused" or last_analysis.next_action_suggestion == "walk_away":
-                 logger.info("[NEGOTIATOR] Negotiation ended (refused/walk-away).")
-                 break
-
-            # C. Firm Price (Stalling)
-            if last_analysis.sentiment == "firm":
-                consecutive_firm_responses += 1
-                if consecutive_firm_responses >= 2:
-                    logger.info("[NEGOTIATOR] Vendor is firm twice in a row. Stopping.")
+                # A. Deal Agreed
+                if last_analysis.sentiment == "deal_agreed":
+                    logger.info("[NEGOTIATOR] Deal agreed!")
                     break
-            else:
-                consecutive_firm_responses = 0
+                
+                # B. Walk Away / Refused
+                if last_analysis.sentiment == "refused" or last_analysis.next_action_suggestion == "walk_away":
+                     logger.info("[NEGOTIATOR] Negotiation ended (refused/walk-away).")
+                     break
+
+                # C. Firm Price (Stalling)
+                if last_analysis.sentiment == "firm":
+                    consecutive_firm_responses += 1
+                    if consecutive_firm_responses >= 2:
+                        logger.info("[NEGOTIATOR] Vendor is firm twice in a row. Stopping.")
+                        break
+                else:
+                    consecutive_firm_responses = 0
                 
             turns += 1
 
+        # 5a. Deadline: partial snapshot from what the vendor quoted so far
+        if deadline_reached:
+            print(f"[NEGOTIATOR] ⏱ Deadline: partial offer from {self.vendor_name}", flush=True)
+            partial_offer = OfferSnapshot(
+                vendor_id=str(self.vendor_id),
+                vendor_name=self.vendor_name,
+                conversation_id=conversation_id,
+                round_index=round_index,
+                price_total=current_price,
+                status="in_progress",
+                notes="Run deadline reached before the session concluded",
+                last_vendor_message=history[-1]["content"] if history else "No response",
+                sentiment=last_analysis.sentiment if last_analysis else "neutral",
+                final_offer_summary=f"Last quote ${current_price}" if current_price else "No offer before deadline",
+                final_price=current_price
+            )
+            return partial_offer, history[len(prior_turns):]
+        
         # 5. Final Deal Extraction (Post-Session)
         logger.info("[NEGOTIATOR] running final deal extraction...")
         deal_details = self.extract_final_deal_details(history)
@@ -389,7 +522,7 @@ Your turn. Draft the message:"""
             vendor_id=str(self.vendor_id),
             vendor_name=self.vendor_name,
             conversation_id=conversation_id,
-            round_index=0,
+            round_index=round_index,
             price_total=deal_details.final_price,
             currency="USD", # Defaulting for now
             status=deal_details.deal_status,
@@ -403,7 +536,7 @@ Your turn. Draft the message:"""
             final_price=deal_details.final_price
         )
             
-        return best_offer, history
+        return best_offer, history[len(prior_turns):]
 
 
 def negotiate_node(input_data: NegotiateInput) -> Dict[str, Any]:
@@ -415,12 +548,20 @@ def negotiate_node(input_data: NegotiateInput) -> Dict[str, Any]:
     strategy = input_data["strategy"]
     conversation_id = input_data.get("conversation_id")
     product_id = input_data.get("product_id")
+    round_index = input_data.get("round_index", 0)
+    prior_turns = input_data.get("prior_turns") or []
     
     logger.info("=" * 60)
-    logger.info(f"[NEGOTIATOR] Starting negotiation session with {vendor_name}")
-    print(f"[NEGOTIATOR] 💬 contacting {vendor_name}...", flush=True)
+    logger.info(f"[NEGOTIATOR] Starting negotiation session with {vendor_name} (round {round_index + 1})")
+    if prior_turns:
+        print(f"[NEGOTIATOR] 💬 following up with {vendor_name} (round {round_index + 1})...", flush=True)
+    else:
+        print(f"[NEGOTIATOR] 💬 contacting {vendor_name}...", flush=True)
     
     # 1. Setup Conversation
+    if not conversation_id and phase_expired("negotiation"):
+        logger.warning(f"[NEGOTIATOR] Negotiation budget spent, not contacting {vendor_name}")
+        return {"leaderboard": {}}
     if not conversation_id:
         conversation_id = create_conversation(vendor_id, f"Negotiation {vendor_name}")
         if not conversation_id:
@@ -428,8 +569,23 @@ def negotiate_node(input_data: NegotiateInput) -> Dict[str, Any]:
             return {"leaderboard": {}} 
             
     # 2. Run Agent (Full Session)
-    agent = NegotiationAgent(vendor_id, vendor_name, strategy, order_details=input_data.get("order_details"))
-    offer, history = agent.run_negotiation_session(conversation_id, product_id)
+    # Later rounds continue the same conversation with the aggregator's feedback
+    market_context = build_market_context(input_data.get("market_analysis"), vendor_id) if prior_turns else None
+    agent = NegotiationAgent(
+        vendor_id, vendor_name, strategy,
+        order_details=input_data.get("order_details"),
+        market_context=market_context
+    )
+    offer, history = agent.run_negotiation_session(
+        conversation_id,
+        product_id,
+        round_index=round_index,
+        prior_turns=prior_turns,
+        max_turns=FOLLOWUP_SESSION_TURNS if prior_turns else MAX_SESSION_TURNS,
+        last_price=(input_data.get("last_offer") or {}).get("price_total")
+    )
+    
+    NEGOTIATION_TURNS.observe(len(history) // 2)
     
     # 3. Format Output
     price_display = f"${offer.price_total}" if offer.price_total else "No Offer"
@@ -437,12 +593,12 @@ def negotiate_node(input_data: NegotiateInput) -> Dict[str, Any]:
 
     # Return structure needed for graph state
     history_entry = {
-        "round": 0,
+        "round": round_index,
         "turns": history,
         "offer": offer.model_dump()
     }
     
-    return {
+    result = {
         "negotiation_history": {
             vendor_id: [history_entry]
         },
@@ -453,3 +609,14 @@ def negotiate_node(input_data: NegotiateInput) -> Dict[str, Any]:
             vendor_id: conversation_id
         }
     }
+    
+    # 4. Update the run's live leaderboard and stream a partial market analysis
+    run_id = current_run_id()
+    if run_id:
+        quantity = (input_data.get("order_details") or {}).get("quantity", {}).get("preferred", 1)
+        board = live_leaderboards.get_or_create(run_id, quantity=quantity)
+        board.update(vendor_id, offer.model_dump())
+        result["live_market"] = board.snapshot(input_data.get("round_index", 0) + 1)
+        logger.info(f"[NEGOTIATOR] {result['live_market']['summary']}")
+    
+    return result
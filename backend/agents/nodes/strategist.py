@@ -15,6 +15,9 @@ from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage
 from agents.config import DEFAULT_MODEL, DEFAULT_TEMPERATURE, MAX_NEGOTIATION_ROUNDS
 from agents.utils.file_utils import get_file_message_content
+from agents.run_deadline import phase_expired, phase_timeout
+from agents.run_cancellation import cancellable, check_cancelled
+from agents.run_stream import EVENT_ACTIVITY, emit, invoke_streaming
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +48,8 @@ class StrategyPlan(BaseModel):
 def create_strategy_for_vendor(
     vendor: Dict[str, Any],
     order: Dict[str, Any],
-    product_id: str = None
+    product_id: str = None,
+    timeout: float = None
 ) -> StrategyPlan:
     """
     Generate a negotiation strategy for a specific vendor using LLM.
@@ -54,13 +58,15 @@ def create_strategy_for_vendor(
         vendor: Vendor info from state (includes behavioral_prompt and documents)
         order: Order requirements and constraints
         product_id: Output from evaluator, specific product to negotiate for
+        timeout: LLM request timeout in seconds (client default if None)
         
     Returns:
         StrategyPlan with complete negotiation strategy
     """
     llm = ChatAnthropic(
         model=DEFAULT_MODEL,
-        temperature=DEFAULT_TEMPERATURE
+        temperature=DEFAULT_TEMPERATURE,
+        default_request_timeout=timeout
     )
     
     # Extract key information
@@ -139,7 +145,8 @@ Return a complete StrategyPlan."""
     
     logger.info(f"[STRATEGIST] Generating strategy for vendor {vendor_name} (Product: {product_id})...")
     
-    strategy = structured_llm.invoke(messages)
+    # Streams the strategy's JSON as it is generated when the run streams
+    strategy = cancellable(invoke_streaming, structured_llm, messages, source="strategist", vendor_id=str(vendor_id))
     
     logger.info(f"[STRATEGIST] ✓ Strategy created for {vendor_name}")
     logger.info(f"[STRATEGIST]   Objective: {strategy.objective}")
@@ -149,6 +156,28 @@ Return a complete StrategyPlan."""
     return strategy
 
 
+def fallback_strategy(vendor: Dict[str, Any], order: Dict[str, Any]) -> Dict[str, Any]:
+    """Budget-based default strategy used when the LLM strategy is unavailable."""
+    return {
+        "vendor_id": str(vendor.get("id")),
+        "vendor_name": vendor.get("name", "Unknown"),
+        "objective": f"Negotiate best price for {order.get('item', 'product')}",
+        "price_targets": {
+            "anchor": order.get("budget", 10000) * 0.7,
+            "target": order.get("budget", 10000) * 0.8,
+            "walk_away": order.get("budget", 10000) * 0.95,
+            "currency": order.get("currency", "USD")
+        },
+        "tone": "professional",
+        "approach": "standard negotiation",
+        "arguments": ["competitive pricing", "volume commitment"],
+        "concessions": ["payment terms", "delivery timeline"],
+        "opening_message": f"Hello, we are interested in purchasing {order.get('item', 'product')}. What are your best terms?",
+        "assumptions": ["Standard market rates"],
+        "behavioral_notes": "Unknown vendor profile"
+    }
+
+
 class GenerateStrategyInput(TypedDict):
     """Input for parallel strategy generation"""
     vendor: Dict[str, Any]
@@ -171,11 +200,24 @@ def generate_strategy_node(input_data: GenerateStrategyInput) -> Dict[str, Any]:
     vendor_name = vendor.get("name", "Unknown")
     product_id = vendor.get("relevant_product_id") # Propagated from evaluator
     
+    check_cancelled()
+    
+    # Strategy budget of the run spent: don't start an LLM call
+    if phase_expired("strategy"):
+        logger.warning(f"[STRATEGIST] Strategy budget spent, using fallback strategy for {vendor_name}")
+        print(f"[STRATEGIST] ⏱ Deadline: fallback strategy for {vendor_name}", flush=True)
+        return {
+            "vendor_strategies": {
+                str(vendor_id): fallback_strategy(vendor, order)
+            }
+        }
+    
     print(f"[STRATEGIST] Generating strategy for {vendor_name}...", flush=True)
+    emit(EVENT_ACTIVITY, f"Drafting a strategy for {vendor_name}...", node="generate_strategy", vendor_id=str(vendor_id))
     
     try:
         # Generate strategy using LLM
-        strategy = create_strategy_for_vendor(vendor, order, product_id)
+        strategy = create_strategy_for_vendor(vendor, order, product_id, timeout=phase_timeout("strategy"))
         
         # Return state update for this specific vendor
         return {
@@ -187,24 +229,7 @@ def generate_strategy_node(input_data: GenerateStrategyInput) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"[STRATEGIST] Failed to create strategy for {vendor_name}: {e}")
         # Create fallback strategy
-        fallback = {
-            "vendor_id": str(vendor_id),
-            "vendor_name": vendor_name,
-            "objective": f"Negotiate best price for {order.get('item', 'product')}",
-            "price_targets": {
-                "anchor": order.get("budget", 10000) * 0.7,
-                "target": order.get("budget", 10000) * 0.8,
-                "walk_away": order.get("budget", 10000) * 0.95,
-                "currency": order.get("currency", "USD")
-            },
-            "tone": "professional",
-            "approach": "standard negotiation",
-            "arguments": ["competitive pricing", "volume commitment"],
-            "concessions": ["payment terms", "delivery timeline"],
-            "opening_message": f"Hello, we are interested in purchasing {order.get('item', 'product')}. What are your best terms?",
-            "assumptions": ["Standard market rates"],
-            "behavioral_notes": "Unknown vendor profile"
-        }
+        fallback = fallback_strategy(vendor, order)
         return {
             "vendor_strategies": {
                 str(vendor_id): fallback
@@ -20,7 +20,11 @@ from langchain_core.messages import HumanMessage
 
 from models.order import OrderObject
 from models.vendor import Vendor
-from agents.config import DEFAULT_MODEL, DEFAULT_TEMPERATURE
+from agents.config import DEFAULT_MODEL, DEFAULT_TEMPERATURE, WARMUP_WAIT_SECONDS
+from agents.state import vendor_ref
+from agents.run_deadline import phase_expired, phase_timeout
+from agents.run_cancellation import cancellable, check_cancelled
+from agents.run_stream import EVENT_ACTIVITY, emit
 
 logger = logging.getLogger(__name__)
 
@@ -43,10 +47,11 @@ from agents.utils.file_utils import get_file_message_content
 class RelevantVendorEvaluatorAgent:
     """Evaluates if a vendor can deliver the product and finds the specific product ID."""
 
-    def __init__(self):
+    def __init__(self, timeout: Optional[float] = None):
         self.llm = ChatAnthropic(
             model=DEFAULT_MODEL,
-            temperature=DEFAULT_TEMPERATURE
+            temperature=DEFAULT_TEMPERATURE,
+            default_request_timeout=timeout
         )
         self.parser = PydanticOutputParser(pydantic_object=SuitabilityResult)
         
@@ -135,9 +140,28 @@ Please analyze the attached documents to find the product.
             raise
 
 
+def evaluate_vendor_suitability(
+    vendor_dict: Dict[str, Any],
+    order_dict: Dict[str, Any],
+    timeout: Optional[float] = None
+) -> SuitabilityResult:
+    """
+    Run a fresh LLM suitability evaluation for one vendor.
+    
+    Shared by evaluate_vendor_node and the speculative warm-up.
+    """
+    vendor = Vendor(**vendor_dict)
+    order = OrderObject(**order_dict)
+    agent = RelevantVendorEvaluatorAgent(timeout=timeout)
+    return agent.evaluate(vendor, order)
+
+
 def evaluate_vendor_node(input_data: EvaluateInput) -> Dict[str, Any]:
     """
     LangGraph node function.
+    
+    Reuses a warm-up evaluation for the same order and vendor when one
+    exists, falling back to a fresh evaluation otherwise.
     """
     vendor_dict = input_data["vendor"]
     order_dict = input_data["order_requirements"]
@@ -148,22 +172,43 @@ def evaluate_vendor_node(input_data: EvaluateInput) -> Dict[str, Any]:
     
     try:
         vendor = Vendor(**vendor_dict)
-        order = OrderObject(**order_dict)
         
-        agent = RelevantVendorEvaluatorAgent()
+        check_cancelled()
         
-        print(f"[EVALUATOR] Evaluating: {vendor.name} ...", flush=True)
-        result = agent.evaluate(vendor, order)
+        # Evaluation budget of the run spent: leave the vendor out rather
+        # than negotiate with one that was never checked
+        if phase_expired("evaluation"):
+            print(f"[EVALUATOR] ⏱ Deadline: skipping {vendor.name}", flush=True)
+            logger.warning(f"[EVALUATOR] Evaluation budget spent, skipping {vendor.name}")
+            return {
+                "relevant_vendors": [],
+                "_evaluated_vendor_id": [str(vendor.id)]
+            }
+        
+        emit(EVENT_ACTIVITY, f"Evaluating {vendor.name}...", node="evaluate_vendor", vendor_id=str(vendor.id))
+        
+        # Imported here to avoid a circular import (warmup depends on this module)
+        from agents.warmup import warmup_registry
+        
+        result = warmup_registry.wait_for_evaluation(
+            order_dict, vendor.id, timeout=phase_timeout("evaluation", WARMUP_WAIT_SECONDS)
+        )
+        if result is not None:
+            print(f"[EVALUATOR] Reusing warm-up evaluation: {vendor.name}", flush=True)
+        else:
+            print(f"[EVALUATOR] Evaluating: {vendor.name} ...", flush=True)
+            result = cancellable(
+                evaluate_vendor_suitability, vendor_dict, order_dict, timeout=phase_timeout("evaluation")
+            )
         
         if result.suitable:
             print(f"[EVALUATOR] ✓ {vendor.name} - RELEVANT (Product ID: {result.product_id})", flush=True)
             logger.info(f"[EVALUATOR] ✓ {vendor.name} - RELEVANT (ID: {result.product_id})")
             
-            # Inject the found product ID into the vendor dict for downstream nodes
-            vendor_dict_out = vendor_dict.copy()
-            vendor_dict_out["relevant_product_id"] = result.product_id
+            # Slim reference carrying the found product ID for downstream nodes;
+            # the full vendor record stays in all_vendors
             return {
-                "relevant_vendors": [vendor_dict_out],
+                "relevant_vendors": [vendor_ref(vendor_dict, result.product_id)],
                 "_evaluated_vendor_id": [str(vendor.id)]
             }
         else:
@@ -0,0 +1,255 @@
+"""
+Run Cancellation
+
+A run started with a CancelToken (passed through the LangGraph config as
+`configurable.cancel`) can be stopped cooperatively, e.g. when its
+WebSocket client disconnects or sends a cancel message:
+
+- nodes call check_cancelled() between steps; once the token is cancelled
+  it raises RunCancelled instead of starting the next LLM or vendor call
+- LLM and vendor API calls run through cancellable(), which returns
+  control to the node as soon as the token is cancelled instead of
+  waiting for the in-flight request (its result is discarded)
+- LLM calls of cancellable runs are streamed (see
+  agents.run_stream.invoke_streaming), and the stream is closed at the
+  next chunk once the run is cancelled, so generation stops early
+
+cancellable() is also where calls wait for their team's share of the LLM
+and vendor API (see agents.team_scheduling); a cancelled run stops waiting,
+and an abandoned call gives its slot back at once.
+
+RunCancelled derives from BaseException, like asyncio.CancelledError, so
+the nodes' broad `except Exception` fallbacks do not swallow it.
+
+Cancelled runs and their calls are counted in cancellation_metrics, by
+what became of each call:
+
+- skipped: never started, so no LLM or vendor API quota was used
+- abandoned: in flight when the run was cancelled; the node stopped
+  waiting, but the request itself may still finish (and spend its tokens
+  or send its vendor message) in the background
+- stopped: a streamed LLM call closed mid-generation
+"""
+
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Set
+
+from langgraph.config import get_config
+
+from agents.team_scheduling import current_team_id, team_scheduler
+
+logger = logging.getLogger(__name__)
+
+# Cancellation reasons
+REASON_DISCONNECTED = "client_disconnected"
+REASON_REQUESTED = "cancel_requested"
+
+# Call kinds for metrics
+CALL_LLM = "llm"
+CALL_VENDOR_API = "vendor_api"
+CALL_STEP = "step"
+
+# What became of a call of a cancelled run
+OUTCOME_SKIPPED = "skipped"
+OUTCOME_ABANDONED = "abandoned"
+OUTCOME_STOPPED = "stopped"
+
+
+class RunCancelled(BaseException):
+    """Raised inside a node when its run has been cancelled."""
+
+    def __init__(self, reason: Optional[str] = None):
+        super().__init__(reason or "Run cancelled")
+        self.reason = reason
+
+
+class CancelToken:
+    """Cancellation flag shared by every node of one run. Thread-safe."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._waiters: Set[threading.Event] = set()
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = REASON_REQUESTED) -> bool:
+        """
+        Cancel the run and wake every cancellable() call waiting on it.
+
+        Returns:
+            True on the first call, False if already cancelled
+        """
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self.reason = reason
+            self._event.set()
+            waiters = list(self._waiters)
+        for waiter in waiters:
+            waiter.set()
+        logger.info(f"[CANCEL] Run cancelled ({reason})")
+        return True
+
+    def check(self, kind: str = CALL_STEP) -> None:
+        """
+        Raise RunCancelled if cancelled, counting `kind` as a skipped call.
+        """
+        if self._event.is_set():
+            cancellation_metrics.record_call(kind, OUTCOME_SKIPPED)
+            raise RunCancelled(self.reason)
+
+    def _add_waiter(self, waiter: threading.Event) -> None:
+        with self._lock:
+            self._waiters.add(waiter)
+            if self._event.is_set():
+                waiter.set()
+
+    def _remove_waiter(self, waiter: threading.Event) -> None:
+        with self._lock:
+            self._waiters.discard(waiter)
+
+
+def current_cancel_token() -> Optional[CancelToken]:
+    """
+    Cancel token of the graph run the caller is running in.
+
+    Returns:
+        CancelToken, or None outside a graph run or for a run without one
+    """
+    try:
+        config = get_config()
+    except RuntimeError:
+        return None
+    return (config.get("configurable") or {}).get("cancel")
+
+
+def check_cancelled(kind: str = CALL_STEP) -> None:
+    """Raise RunCancelled if the current run has been cancelled."""
+    token = current_cancel_token()
+    if token is not None:
+        token.check(kind)
+
+
+def stop_if_cancelled(kind: str = CALL_LLM) -> None:
+    """
+    Raise RunCancelled from inside an in-flight call of a cancelled run,
+    counting the call as stopped (e.g. between the chunks of a stream).
+    """
+    token = current_cancel_token()
+    if token is not None and token.cancelled:
+        cancellation_metrics.record_call(kind, OUTCOME_STOPPED)
+        raise RunCancelled(token.reason)
+
+
+def cancellable(fn: Callable[..., Any], *args: Any, kind: str = CALL_LLM, **kwargs: Any) -> Any:
+    """
+    Call fn(*args, **kwargs), giving up as soon as the run is cancelled.
+
+    LLM and vendor API calls first wait for a slot, in fair order by team
+    and within the team's quotas (agents.team_scheduling).
+
+    Without a cancel token this is a plain call. With one, the call runs on
+    a helper thread (in the caller's context, so run config lookups still
+    work) while the node waits for either the result or the cancellation.
+    An abandoned call finishes in the background and its result is dropped;
+    the node sees RunCancelled right away, and the call's scheduler slot is
+    handed to the next waiting call.
+
+    Args:
+        fn: Blocking call (LLM invoke, vendor API request)
+        kind: CALL_LLM or CALL_VENDOR_API, for metrics
+
+    Returns:
+        fn's result
+
+    Raises:
+        RunCancelled: The run was cancelled before or during the call
+    """
+    token = current_cancel_token()
+    team = current_team_id()
+    if token is None:
+        lease = team_scheduler.acquire(kind, team)
+        return team_scheduler.run_acquired(lease, fn, *args, **kwargs)
+    token.check(kind)
+    lease = team_scheduler.acquire(kind, team, token)
+    if lease is None:
+        cancellation_metrics.record_call(kind, OUTCOME_SKIPPED)
+        raise RunCancelled(token.reason)
+    if token.cancelled:
+        lease.release()
+        token.check(kind)
+
+    future: Future = Future()
+    done = threading.Event()
+    future.add_done_callback(lambda _: done.set())
+    context = contextvars.copy_context()
+
+    def run() -> None:
+        if not future.set_running_or_notify_cancel():
+            lease.release()
+            return
+        try:
+            future.set_result(context.run(team_scheduler.run_acquired, lease, fn, *args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    token._add_waiter(done)
+    try:
+        threading.Thread(target=run, name=f"cancellable-{kind}", daemon=True).start()
+        done.wait()
+    finally:
+        token._remove_waiter(done)
+
+    if not future.done():
+        lease.abandon()
+        cancellation_metrics.record_call(kind, OUTCOME_ABANDONED)
+        logger.info(f"[CANCEL] Abandoned in-flight {kind} call")
+        raise RunCancelled(token.reason)
+    return future.result()
+
+
+class CancellationMetrics:
+    """Counters of cancelled runs and the work they did not do."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._runs: Dict[str, int] = {}
+        # outcome -> call kind -> count
+        self._calls: Dict[str, Dict[str, int]] = {
+            outcome: {} for outcome in (OUTCOME_SKIPPED, OUTCOME_ABANDONED, OUTCOME_STOPPED)
+        }
+        self._freed_seconds = 0.0
+
+    def record_run(self, reason: Optional[str], freed_seconds: float = 0.0) -> None:
+        """Count a cancelled run and the unused part of its deadline."""
+        with self._lock:
+            key = reason or REASON_REQUESTED
+            self._runs[key] = self._runs.get(key, 0) + 1
+            self._freed_seconds += max(0.0, freed_seconds)
+
+    def record_call(self, kind: str, outcome: str) -> None:
+        """Count a call that was skipped, abandoned in flight or stopped."""
+        with self._lock:
+            counters = self._calls[outcome]
+            counters[kind] = counters.get(kind, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "runs_cancelled": dict(self._runs),
+                "calls_skipped": dict(self._calls[OUTCOME_SKIPPED]),
+                "calls_abandoned": dict(self._calls[OUTCOME_ABANDONED]),
+                "calls_stopped": dict(self._calls[OUTCOME_STOPPED]),
+                "deadline_seconds_freed": round(self._freed_seconds, 3),
+            }
+
+
+# Process-wide metrics
+cancellation_metrics = CancellationMetrics()
@@ -0,0 +1,65 @@
+"""
+Run Context
+
+Each graph execution is tagged with a run id passed through the LangGraph
+config (`configurable.run_id`). Nodes use it to reach per-run structures
+that do not belong in the graph state, such as the live leaderboard.
+"""
+
+import uuid
+from typing import Any, Dict, Optional
+
+from langgraph.config import get_config
+
+
+def new_run_id() -> str:
+    """Generate a run id for a new graph execution."""
+    return uuid.uuid4().hex
+
+
+def run_config(
+    run_id: str,
+    deadline: Any = None,
+    cancel: Any = None,
+    stream: bool = False,
+    team_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Build the config to pass to graph.stream/astream/invoke for a run.
+
+    Args:
+        run_id: Id from new_run_id()
+        deadline: Optional RunDeadline (see agents.run_deadline)
+        cancel: Optional CancelToken (see agents.run_cancellation)
+        stream: Stream tokens and activity from the nodes (see agents.run_stream)
+        team_id: Team whose share of the LLM and vendor API the run uses
+            (see agents.team_scheduling)
+
+    Returns:
+        RunnableConfig dict
+    """
+    configurable = {"run_id": run_id}
+    if deadline is not None:
+        configurable["deadline"] = deadline
+    if cancel is not None:
+        configurable["cancel"] = cancel
+    if stream:
+        configurable["stream"] = True
+    if team_id is not None:
+        configurable["team_id"] = team_id
+    return {"configurable": configurable}
+
+
+def current_run_id() -> Optional[str]:
+    """
+    Run id of the graph execution the caller is running in.
+
+    Returns:
+        Run id, or None when called outside a graph run (e.g. a node
+        invoked directly in tests) or for a run started without one
+    """
+    try:
+        config = get_config()
+    except RuntimeError:
+        return None
+    return (config.get("configurable") or {}).get("run_id")
@@ -0,0 +1,237 @@
+"""
+Run Deadlines
+
+A run can carry a wall-clock deadline, passed through the LangGraph config
+next to the run id (`configurable.deadline`). The deadline is split into
+cumulative per-phase budgets (evaluation, strategy, negotiation, report):
+a phase ends at its share of the deadline plus everything before it, so
+time an early phase does not use carries over to later ones.
+
+Nodes ask how long their phase has left: LLM and vendor API calls get it as
+their timeout, and a node whose phase is over falls back (fallback
+strategy, partial offer snapshot, no further rounds) instead of starting
+new work. The run stream reports the best offers so far if the whole
+deadline passes before the aggregator does.
+
+Finished run latencies are kept in a window so the p99 can be checked
+against RUN_LATENCY_SLO_SECONDS.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional
+
+from langgraph.config import get_config
+
+from agents.config import (
+    RUN_DEADLINE_MAX_SECONDS,
+    RUN_DEADLINE_SECONDS,
+    RUN_LATENCY_SLO_SECONDS,
+    RUN_LATENCY_WINDOW,
+    RUN_PHASE_BUDGETS,
+)
+
+# Phases in run order
+PHASES = ("evaluation", "strategy", "negotiation", "report")
+
+# Shortest timeout handed to a call, so a nearly spent phase still fails fast
+# instead of passing a zero/negative timeout to the client libraries
+MIN_CALL_TIMEOUT = 1.0
+
+
+def parse_phase_budgets(spec: str) -> Dict[str, float]:
+    """
+    Parse "phase:share,..." into normalized shares, one per phase.
+
+    Args:
+        spec: e.g. "evaluation:0.15,strategy:0.15,negotiation:0.6,report:0.1"
+
+    Returns:
+        Shares in PHASES order summing to 1 (missing phases get 0)
+
+    Raises:
+        ValueError: Unknown phase, negative share or all shares zero
+    """
+    shares = {phase: 0.0 for phase in PHASES}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        phase, _, share = item.partition(":")
+        phase = phase.strip()
+        if phase not in shares:
+            raise ValueError(f"Unknown run phase: {phase}")
+        shares[phase] = float(share)
+        if shares[phase] < 0:
+            raise ValueError(f"Negative budget share for phase {phase}")
+    total = sum(shares.values())
+    if total <= 0:
+        raise ValueError("Run phase budgets must not all be zero")
+    return {phase: share / total for phase, share in shares.items()}
+
+
+PHASE_BUDGETS = parse_phase_budgets(RUN_PHASE_BUDGETS)
+
+
+def resolve_deadline_seconds(requested: Any = None) -> float:
+    """
+    Deadline for a new run: the requested seconds capped at the maximum,
+    or the configured default.
+
+    Raises:
+        ValueError: requested is not a positive number
+    """
+    if requested is None:
+        return min(RUN_DEADLINE_SECONDS, RUN_DEADLINE_MAX_SECONDS)
+    try:
+        seconds = float(requested)
+    except (TypeError, ValueError):
+        raise ValueError(f"deadline_seconds must be a number, got {requested!r}")
+    if not math.isfinite(seconds) or seconds <= 0:
+        raise ValueError("deadline_seconds must be positive")
+    return min(seconds, RUN_DEADLINE_MAX_SECONDS)
+
+
+class RunDeadline:
+    """Deadline of one run and the end of each of its phases."""
+
+    def __init__(
+        self,
+        seconds: float,
+        budgets: Dict[str, float] = PHASE_BUDGETS,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.seconds = seconds
+        self._clock = clock
+        self.started_at = clock()
+        self.ends_at = self.started_at + seconds
+
+        self._phase_ends: Dict[str, float] = {}
+        elapsed_share = 0.0
+        for phase in PHASES:
+            elapsed_share += budgets.get(phase, 0.0)
+            self._phase_ends[phase] = self.started_at + seconds * elapsed_share
+        # Rounding must never end the last phase before the run
+        self._phase_ends[PHASES[-1]] = self.ends_at
+
+    def elapsed(self) -> float:
+        return self._clock() - self.started_at
+
+    def remaining(self) -> float:
+        """Seconds left before the run deadline (0 once passed)."""
+        return max(0.0, self.ends_at - self._clock())
+
+    def expired(self) -> bool:
+        return self._clock() >= self.ends_at
+
+    def phase_remaining(self, phase: str) -> float:
+        """Seconds left in a phase's budget (0 once spent)."""
+        return max(0.0, min(self._phase_ends[phase], self.ends_at) - self._clock())
+
+    def phase_expired(self, phase: str) -> bool:
+        return self.phase_remaining(phase) <= 0
+
+    def call_timeout(self, phase: str, cap: Optional[float] = None) -> float:
+        """
+        Timeout for one call made in a phase.
+
+        Args:
+            phase: Phase making the call
+            cap: Client's own timeout, if shorter
+
+        Returns:
+            Seconds, at least MIN_CALL_TIMEOUT
+        """
+        timeout = self.phase_remaining(phase)
+        if cap is not None:
+            timeout = min(timeout, cap)
+        return max(MIN_CALL_TIMEOUT, timeout)
+
+
+def current_deadline() -> Optional[RunDeadline]:
+    """
+    Deadline of the graph run the caller is running in.
+
+    Returns:
+        RunDeadline, or None outside a graph run or for a run without one
+    """
+    try:
+        config = get_config()
+    except RuntimeError:
+        return None
+    return (config.get("configurable") or {}).get("deadline")
+
+
+def phase_expired(phase: str) -> bool:
+    """True if the current run's budget for `phase` is spent (False without a deadline)."""
+    deadline = current_deadline()
+    return deadline is not None and deadline.phase_expired(phase)
+
+
+def phase_timeout(phase: str, default: Optional[float] = None) -> Optional[float]:
+    """
+    Timeout for a call in `phase` of the current run.
+
+    Args:
+        phase: Phase making the call
+        default: Timeout without a deadline (also used as a cap)
+
+    Returns:
+        Seconds, or default when the run has no deadline
+    """
+    deadline = current_deadline()
+    if deadline is None:
+        return default
+    return deadline.call_timeout(phase, cap=default)
+
+
+# ========== Run Latency SLO ==========
+
+class LatencyWindow:
+    """Latencies of the most recent finished runs, for percentile checks."""
+
+    def __init__(self, size: int = RUN_LATENCY_WINDOW, slo_seconds: float = RUN_LATENCY_SLO_SECONDS):
+        self.slo_seconds = slo_seconds
+        self._latencies: Deque[float] = deque(maxlen=size)
+        self._deadline_reached: Deque[bool] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, deadline_reached: bool = False) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+            self._deadline_reached.append(deadline_reached)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Nearest-rank percentile of the window (None when empty)."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if not latencies:
+            return None
+        rank = max(1, math.ceil(p / 100 * len(latencies)))
+        return latencies[rank - 1]
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Percentiles and SLO status of the window.
+
+        Returns:
+            Dict with runs, p50/p95/p99 seconds, slo_seconds, slo_met,
+            slo_breaches and deadline_reached counts
+        """
+        with self._lock:
+            latencies = list(self._latencies)
+            deadline_reached = sum(self._deadline_reached)
+        p99 = self.percentile(99)
+        return {
+            "runs": len(latencies),
+            "p50_seconds": self.percentile(50),
+            "p95_seconds": self.percentile(95),
+            "p99_seconds": p99,
+            "slo_seconds": self.slo_seconds,
+            "slo_met": p99 is None or p99 <= self.slo_seconds,
+            "slo_breaches": sum(1 for latency in latencies if latency > self.slo_seconds),
+            "deadline_reached": deadline_reached,
+        }
+
+
+# Process-wide window fed by the run streams
+run_latencies = LatencyWindow()
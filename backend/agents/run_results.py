@@ -0,0 +1,136 @@
+"""
+Run Results Store
+
+Persists each run's final leaderboard (plus the order and round count it
+was scored with) so results can be re-scored later under different
+weights, budgets or quantities without re-running the graph.
+
+Results are written as one JSON file per run under RUN_RESULTS_DIR, with
+the most recently used runs also kept in memory.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from agents.config import RUN_RESULTS_DIR, RUN_RESULTS_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Run ids become file names; anything else is rejected
+RUN_ID_RE = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# How a stored run ended
+STATUS_COMPLETED = "completed"
+STATUS_DEADLINE_REACHED = "deadline_reached"
+STATUS_CANCELLED = "cancelled"
+
+
+@dataclass
+class RunResult:
+    """Final leaderboard of one run"""
+    run_id: str
+    order: Dict[str, Any]
+    leaderboard: Dict[str, Dict[str, Any]]
+    rounds_completed: int
+    status: str = STATUS_COMPLETED
+    saved_at: float = field(default_factory=time.time)
+
+
+class RunResultStore:
+    """File-backed store of run results with an in-memory LRU in front."""
+
+    def __init__(self, directory: str = RUN_RESULTS_DIR, cache_size: int = RUN_RESULTS_CACHE_SIZE):
+        self.directory = Path(directory)
+        self.cache_size = max(0, cache_size)
+        self._cache: "OrderedDict[str, RunResult]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, run_id: str) -> Path:
+        if not RUN_ID_RE.match(run_id or ""):
+            raise ValueError(f"Invalid run id: {run_id!r}")
+        return self.directory / f"{run_id}.json"
+
+    def _remember(self, result: RunResult) -> None:
+        if not self.cache_size:
+            return
+        with self._lock:
+            self._cache[result.run_id] = result
+            self._cache.move_to_end(result.run_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def save(
+        self,
+        run_id: str,
+        order: Dict[str, Any],
+        leaderboard: Dict[str, Dict[str, Any]],
+        rounds_completed: int,
+        status: str = STATUS_COMPLETED
+    ) -> RunResult:
+        """
+        Store (or replace) a run's leaderboard.
+        
+        Runs stopped early (deadline, cancellation) are stored with the
+        offers they had and their status.
+
+        Writes go to a temporary file first so readers never see a partial file.
+
+        Raises:
+            ValueError: If the run id is not a safe file name
+        """
+        path = self._path(run_id)
+        result = RunResult(
+            run_id=run_id,
+            order=dict(order or {}),
+            leaderboard={str(vid): dict(offer) for vid, offer in (leaderboard or {}).items()},
+            rounds_completed=rounds_completed,
+            status=status
+        )
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(asdict(result), f, default=str)
+        os.replace(tmp_path, path)
+
+        self._remember(result)
+        logger.info(f"[RUN_RESULTS] Saved {len(result.leaderboard)} offers for run {run_id}")
+        return result
+
+    def load(self, run_id: str) -> Optional[RunResult]:
+        """
+        Fetch a run's stored leaderboard.
+
+        Returns:
+            RunResult, or None if the run is unknown
+
+        Raises:
+            ValueError: If the run id is not a safe file name
+        """
+        path = self._path(run_id)
+        with self._lock:
+            cached = self._cache.get(run_id)
+            if cached is not None:
+                self._cache.move_to_end(run_id)
+                return cached
+
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = RunResult(**json.load(f))
+        except FileNotFoundError:
+            return None
+
+        self._remember(result)
+        return result
+
+
+# Process-wide store shared by the aggregator and the runs API
+run_results = RunResultStore()
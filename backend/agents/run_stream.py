@@ -0,0 +1,114 @@
+"""
+Run Output Streaming
+
+Nodes report what they are doing while they do it, ahead of their state
+update at the end of the node:
+
+- "activity": a node started a step (searching vendors, evaluating or
+  drafting a strategy for a vendor), so the UI shows progress within
+  moments of the run starting instead of after the first node finishes
+- "token": a chunk of a negotiator message or strategy being generated
+- "turn": a complete message exchanged with a vendor (the negotiator's
+  message as it is sent, the vendor's reply as it arrives)
+
+Events go through LangGraph's custom stream (get_stream_writer) and are
+only produced for runs started with streaming enabled (`configurable.stream`,
+see run_config); everywhere else emit() is a no-op. LLM calls stay plain
+invokes unless the run can be cancelled, in which case they are streamed
+without events so cancellation can stop them mid-generation.
+
+The graph stream hands them to the consumer as {STREAM_KEY: event} next to
+the {node: state_update} events (see agents.graph.astream_run).
+"""
+
+import logging
+from typing import Any, Dict, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langgraph.config import get_config, get_stream_writer
+
+from agents.run_cancellation import CALL_LLM, current_cancel_token, stop_if_cancelled
+
+logger = logging.getLogger(__name__)
+
+# Key of streamed events in the graph's update events
+STREAM_KEY = "__stream__"
+
+# Event kinds
+EVENT_ACTIVITY = "activity"
+EVENT_TOKEN = "token"
+EVENT_TURN = "turn"
+
+
+def streaming_enabled() -> bool:
+    """True inside a graph run started with streaming enabled."""
+    try:
+        config = get_config()
+    except RuntimeError:
+        return False
+    return bool((config.get("configurable") or {}).get("stream"))
+
+
+def emit(event: str, message: Optional[str] = None, **payload: Any) -> None:
+    """
+    Stream an event of the current run (no-op if the run does not stream).
+
+    Args:
+        event: EVENT_ACTIVITY, EVENT_TOKEN or EVENT_TURN
+        message: Short user-facing description, if any
+        **payload: Event fields (vendor_id, text, ...)
+    """
+    if not streaming_enabled():
+        return
+    try:
+        get_stream_writer()({"event": event, "message": message, "payload": payload})
+    except RuntimeError:
+        # The consumer's event loop is gone (run abandoned); nothing to tell
+        logger.debug(f"[STREAM] Dropped {event} event of a finished stream")
+
+
+class _TokenForwarder(BaseCallbackHandler):
+    """Streams each new LLM token (text or tool-call arguments) as a token event."""
+
+    raise_error = True
+
+    def __init__(self, payload: Dict[str, Any]):
+        self.payload = payload
+
+    def on_llm_new_token(self, token: str, *, chunk: Any = None, **kwargs: Any) -> None:
+        # Raising here closes the stream, so the model stops generating
+        stop_if_cancelled(CALL_LLM)
+        if not token and chunk is not None:
+            # Structured output: the JSON arguments of the forced tool call
+            message = getattr(chunk, "message", None)
+            token = "".join(c.get("args") or "" for c in getattr(message, "tool_call_chunks", None) or [])
+        if token:
+            emit(EVENT_TOKEN, **self.payload, text=token)
+
+
+def invoke_streaming(runnable: Any, input: Any, **payload: Any) -> Any:
+    """
+    Invoke an LLM runnable, streaming its tokens when the run streams.
+
+    Works for chat models (returns the complete AIMessage) and structured
+    output runnables (returns the parsed object). Runs that can be cancelled
+    stream too (emitting nothing when they do not stream), so a cancelled
+    run stops the generation at the next chunk. Otherwise this is
+    runnable.invoke(input).
+
+    Args:
+        runnable: Chat model or with_structured_output() runnable
+        input: Prompt messages
+        **payload: Fields added to every token event (vendor_id, kind, ...)
+
+    Raises:
+        RunCancelled: The run was cancelled while generating
+    """
+    if not streaming_enabled() and current_cancel_token() is None:
+        return runnable.invoke(input)
+
+    result = None
+    for output in runnable.stream(input, config={"callbacks": [_TokenForwarder(payload)]}):
+        # Chat models yield message chunks to add up; parsers yield the latest parse
+        result = output if result is None or not hasattr(output, "tool_call_chunks") else result + output
+    return result
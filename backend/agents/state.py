@@ -7,14 +7,81 @@ The GraphState defines all data that flows through the graph nodes.
 from typing import TypedDict, Dict, List, Optional, Annotated
 
 
+class KeyedDict(dict):
+    """Dict owned by a state channel; merge_dicts updates it in place"""
+
+
+class AppendList(list):
+    """List owned by a state channel; merge_lists extends it in place"""
+
+
 def merge_dicts(left: dict, right: dict) -> dict:
-    """Merge two dictionaries, with right values taking precedence"""
-    return {**left, **right}
+    """
+    Merge two dictionaries, with right values taking precedence.
+    
+    The accumulated value is copied once into a KeyedDict owned by the
+    channel and then updated in place, so each parallel result costs
+    O(len(right)) instead of copying everything merged so far. Node outputs
+    (right) and caller-supplied input are never mutated.
+    """
+    if not isinstance(left, KeyedDict):
+        left = KeyedDict(left or {})
+    left.update(right or {})
+    return left
 
 
 def merge_lists(left: list, right: list) -> list:
-    """Merge two lists by concatenation"""
-    return left + right
+    """
+    Merge two lists by concatenation.
+    
+    Like merge_dicts, appends in place to a channel-owned AppendList.
+    """
+    if not isinstance(left, AppendList):
+        left = AppendList(left or [])
+    left.extend(right or [])
+    return left
+
+
+def merge_history(left: dict, right: dict) -> dict:
+    """
+    Per-key list concatenation, so each vendor's entries accumulate across
+    negotiation rounds. Updates a channel-owned KeyedDict like merge_dicts;
+    the per-vendor lists are rebuilt rather than extended, so lists from
+    node outputs are never mutated.
+    """
+    if not isinstance(left, KeyedDict):
+        left = KeyedDict(left or {})
+    for key, entries in (right or {}).items():
+        left[key] = [*left.get(key, ()), *entries]
+    return left
+
+
+def vendor_ref(vendor: dict, product_id: Optional[str] = None) -> dict:
+    """
+    Slim reference to a vendor for relevant_vendors.
+    
+    Full vendor records (behavioral prompt, documents, ...) stay in
+    all_vendors; downstream nodes look them up by id.
+    """
+    return {
+        "id": vendor.get("id"),
+        "name": vendor.get("name", "Unknown Vendor"),
+        "relevant_product_id": product_id,
+    }
+
+
+def index_vendors(vendors: List[dict]) -> Dict[str, dict]:
+    """Map str(vendor id) -> full vendor record."""
+    return {str(vendor.get("id")): vendor for vendor in vendors or []}
+
+
+def keep_latest_version(left: Optional[dict], right: Optional[dict]) -> Optional[dict]:
+    """Keep whichever snapshot has the higher "version" (parallel writers may land out of order)"""
+    if right is None:
+        return left
+    if left is None or right.get("version", 0) >= left.get("version", 0):
+        return right
+    return left
 
 
 class GraphState(TypedDict):
@@ -38,12 +105,12 @@ class GraphState(TypedDict):
     # ========== Phase 2: Vendor Filtering ==========
     all_vendors: List[dict]  # List of Vendor objects from API
     # Annotated because parallel evaluators update this concurrently
-    relevant_vendors: Annotated[List[dict], merge_lists]  # Vendors that passed yes/no evaluation
+    relevant_vendors: Annotated[List[dict], merge_lists]  # vendor_ref() of vendors that passed yes/no evaluation
     
     # ========== Phase 3: Negotiation ==========
     # Annotated because parallel strategists update this concurrently
     vendor_strategies: Annotated[Dict[str, dict], merge_dicts]  # vendor_id -> strategy dict
-    negotiation_history: Annotated[Dict[str, List[dict]], merge_dicts]  # vendor_id -> list of messages
+    negotiation_history: Annotated[Dict[str, List[dict]], merge_history]  # vendor_id -> one entry (turns + offer) per round
     # Annotated because parallel negotiators update this concurrently
     leaderboard: Annotated[Dict[str, dict], merge_dicts]  # vendor_id -> latest Quote object
     # Annotated because parallel negotiators update this concurrently
@@ -51,6 +118,8 @@ class GraphState(TypedDict):
     rounds_completed: int
     max_rounds: int
     market_analysis: Optional[dict]  # Market analysis from aggregator
+    # Annotated because parallel negotiators update this concurrently
+    live_market: Annotated[Optional[dict], keep_latest_version]  # Partial market analysis from the live leaderboard
     final_comparison_report: Optional[dict]  # Final comparison report
     
     # ========== Meta ==========
@@ -0,0 +1,489 @@
+"""
+Per-Team Fair Scheduling
+
+Each run belongs to a team (RunRequest.team_id, else NEGOTIATION_TEAM_ID),
+passed through the LangGraph config as `configurable.team_id`. Capacity
+shared by every run is handed out by weighted fair queuing keyed by team,
+so one team launching a bulk batch cannot crowd out the others:
+
+- run admission: queued runs start in fair order (RunJobManager)
+- LLM calls: at most LLM_MAX_CONCURRENT in flight
+- vendor API requests: at most VENDOR_API_MAX_CONCURRENT in flight
+
+LLM and vendor API calls are scheduled by cancellable() (see
+agents.run_cancellation), so a run cancelled while waiting for a slot
+leaves the line at once. When teams compete, each gets a share of the
+slots proportional to its weight (TEAM_WEIGHTS); an idle team's share goes
+to the others.
+
+A call abandoned by its cancelled run hands its slot back right away and
+stops counting towards its team's usage, so cancelling frees capacity for
+the other teams. The request itself may still be finishing in the
+background (counted as abandoned_running in TeamScheduler.stats()), so for
+a moment more calls than the limit can be in flight.
+
+Per-team quotas (0 = unlimited):
+- TEAM_MAX_CONCURRENT_RUNS: queued or running runs; more are rejected
+- TEAM_TOKENS_PER_MINUTE: LLM calls wait while the team's tokens over the
+  last minute are at the limit
+- TEAM_MESSAGES_PER_MINUTE: likewise for vendor API requests
+
+team_usage counts runs, LLM calls and tokens, vendor requests and time
+spent throttled per team (GET /api/runs/teams).
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+from langgraph.config import get_config
+
+from agents.config import (
+    LLM_MAX_CONCURRENT,
+    NEGOTIATION_TEAM_ID,
+    TEAM_MESSAGES_PER_MINUTE,
+    TEAM_TOKENS_PER_MINUTE,
+    TEAM_WEIGHTS,
+    VENDOR_API_MAX_CONCURRENT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Team of runs started without one while NEGOTIATION_TEAM_ID is unset
+DEFAULT_TEAM = "default"
+
+# Scheduled resources (same names as the call kinds of agents.run_cancellation)
+RESOURCE_LLM = "llm"
+RESOURCE_VENDOR_API = "vendor_api"
+
+# Window of the per-minute quotas (seconds)
+RATE_WINDOW = 60.0
+
+
+# ========== Teams ==========
+
+def parse_team_weights(spec: str) -> Dict[str, float]:
+    """
+    Parse "team:weight,..." into weights per team id.
+
+    Raises:
+        ValueError: Missing or non-positive weight
+    """
+    weights = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        team, _, weight = item.partition(":")
+        weights[team.strip()] = float(weight)
+        if weights[team.strip()] <= 0:
+            raise ValueError(f"Team weight must be positive: {item}")
+    return weights
+
+
+TEAM_WEIGHT_TABLE = parse_team_weights(TEAM_WEIGHTS)
+
+
+def team_weight(team: str) -> float:
+    return TEAM_WEIGHT_TABLE.get(team, 1.0)
+
+
+def resolve_team_id(requested: Optional[Any] = None) -> str:
+    """Team of a run: the requested one, else NEGOTIATION_TEAM_ID, else DEFAULT_TEAM."""
+    if requested is not None and str(requested).strip():
+        return str(requested).strip()
+    return NEGOTIATION_TEAM_ID or DEFAULT_TEAM
+
+
+def current_team_id() -> str:
+    """
+    Team of the graph run the caller is running in.
+
+    Returns:
+        Team id, or the default team outside a graph run
+    """
+    try:
+        config = get_config()
+    except RuntimeError:
+        return resolve_team_id()
+    return (config.get("configurable") or {}).get("team_id") or resolve_team_id()
+
+
+# ========== Weighted fair queuing ==========
+
+class FairQueue:
+    """
+    Waiting items in weighted fair order by team (self-clocked fair queuing).
+
+    An item's tag is its team's previous tag (or the current virtual time,
+    if later) plus cost / weight; the lowest tag goes first. A team with
+    twice the weight thus gets twice the turns while teams compete, and a
+    team that was idle does not bank turns for later.
+
+    Not thread-safe: callers hold their own lock.
+    """
+
+    def __init__(self, weight: Callable[[str], float] = team_weight):
+        self._weight = weight
+        self._heap: List[list] = []
+        self._entries: Dict[Any, list] = {}
+        self._last_tag: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._counter = itertools.count()
+
+    def push(self, team: str, item: Any, cost: float = 1.0) -> None:
+        tag = max(self._virtual_time, self._last_tag.get(team, 0.0)) + cost / self._weight(team)
+        self._last_tag[team] = tag
+        entry = [tag, next(self._counter), team, item, True]
+        self._entries[item] = entry
+        heapq.heappush(self._heap, entry)
+
+    def pop(self) -> Tuple[str, Any]:
+        """
+        Raises:
+            IndexError: The queue is empty
+        """
+        while self._heap:
+            tag, _, team, item, alive = heapq.heappop(self._heap)
+            if alive:
+                del self._entries[item]
+                self._virtual_time = tag
+                return team, item
+        raise IndexError("pop from an empty FairQueue")
+
+    def remove(self, item: Any) -> bool:
+        """Take an item out of line; False if it was not waiting."""
+        entry = self._entries.pop(item, None)
+        if entry is None:
+            return False
+        entry[4] = False
+        return True
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Any]:
+        """Waiting items in the order they would be popped."""
+        return (entry[3] for entry in sorted(self._entries.values()))
+
+    def waiting_by_team(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for entry in self._entries.values():
+            counts[entry[2]] = counts.get(entry[2], 0) + 1
+        return counts
+
+
+class _Waiter(threading.Event):
+    granted = False
+
+
+class FairScheduler:
+    """Concurrency limit of one shared resource, granted in weighted fair order by team. Thread-safe."""
+
+    def __init__(self, name: str, capacity: int, weight: Callable[[str], float] = team_weight):
+        self.name = name
+        # 0 = unlimited
+        self.capacity = max(0, capacity)
+        self._queue = FairQueue(weight)
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, team: str, token: Any = None) -> bool:
+        """
+        Wait for a slot.
+
+        Args:
+            team: Team the slot is charged to
+            token: CancelToken that stops the wait when cancelled
+
+        Returns:
+            False if the token was cancelled before a slot was granted
+        """
+        with self._lock:
+            if self.capacity == 0 or (self._active < self.capacity and not self._queue):
+                self._active += 1
+                return True
+            waiter = _Waiter()
+            self._queue.push(team, waiter)
+
+        if token is not None:
+            token._add_waiter(waiter)
+        try:
+            waiter.wait()
+        finally:
+            if token is not None:
+                token._remove_waiter(waiter)
+
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._queue.remove(waiter)
+            return False
+
+    def release(self) -> None:
+        """Hand the slot to the next waiter in fair order, or free it."""
+        with self._lock:
+            if self._queue:
+                _, waiter = self._queue.pop()
+                waiter.granted = True
+                waiter.set()
+                return
+            self._active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "active": self._active,
+                "waiting": self._queue.waiting_by_team(),
+            }
+
+
+# ========== Quotas and usage ==========
+
+class TeamUsage:
+    """Usage counters per team and the last minute of rate-limited usage. Thread-safe."""
+
+    def __init__(
+        self,
+        tokens_per_minute: int = TEAM_TOKENS_PER_MINUTE,
+        messages_per_minute: int = TEAM_MESSAGES_PER_MINUTE
+    ):
+        self.limits = {RESOURCE_LLM: max(0, tokens_per_minute), RESOURCE_VENDOR_API: max(0, messages_per_minute)}
+        self._counters: Dict[str, Dict[str, float]] = {}
+        # (time, amount) per team and resource, within RATE_WINDOW
+        self._windows: Dict[Tuple[str, str], Deque[Tuple[float, int]]] = {}
+        self._lock = threading.Lock()
+
+    def _add_locked(self, team: str, **amounts: float) -> None:
+        counters = self._counters.setdefault(team, {})
+        for name, amount in amounts.items():
+            counters[name] = counters.get(name, 0) + amount
+
+    def _window_locked(self, team: str, resource: str, now: float) -> Deque[Tuple[float, int]]:
+        window = self._windows.setdefault((team, resource), deque())
+        while window and window[0][0] <= now - RATE_WINDOW:
+            window.popleft()
+        return window
+
+    def record_run(self, team: str, admitted: bool) -> None:
+        with self._lock:
+            self._add_locked(team, **{"runs_started" if admitted else "runs_rejected": 1})
+
+    def record_message(self, team: str) -> None:
+        """One vendor API request."""
+        now = time.monotonic()
+        with self._lock:
+            self._add_locked(team, vendor_requests=1)
+            self._window_locked(team, RESOURCE_VENDOR_API, now).append((now, 1))
+
+    def record_llm(self, team: str, input_tokens: int, output_tokens: int) -> None:
+        """One finished LLM call."""
+        now = time.monotonic()
+        with self._lock:
+            self._add_locked(team, llm_calls=1, input_tokens=input_tokens, output_tokens=output_tokens)
+            if input_tokens + output_tokens:
+                self._window_locked(team, RESOURCE_LLM, now).append((now, input_tokens + output_tokens))
+
+    def delay(self, team: str, resource: str) -> float:
+        """Seconds until the team is back under its per-minute quota (0 if it is)."""
+        limit = self.limits.get(resource, 0)
+        if limit <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            window = self._window_locked(team, resource, now)
+            used = sum(amount for _, amount in window)
+            if used < limit:
+                return 0.0
+            # Oldest usage leaves the window first
+            for at, amount in window:
+                used -= amount
+                if used < limit:
+                    return max(0.0, at + RATE_WINDOW - now)
+        return 0.0
+
+    def wait_for_quota(self, team: str, resource: str, token: Any = None) -> bool:
+        """
+        Wait until the team is under its per-minute quota for the resource.
+
+        Returns:
+            False if the token was cancelled while waiting
+        """
+        delay = self.delay(team, resource)
+        if delay <= 0:
+            return True
+        started = time.monotonic()
+        logger.info(f"[TEAMS] Team {team} is over its {resource} quota, waiting {delay:.1f}s")
+        wakeup = threading.Event()
+        if token is not None:
+            token._add_waiter(wakeup)
+        try:
+            while delay > 0:
+                if wakeup.wait(delay):
+                    return False
+                delay = self.delay(team, resource)
+            return True
+        finally:
+            if token is not None:
+                token._remove_waiter(wakeup)
+            with self._lock:
+                self._add_locked(team, throttled_seconds=time.monotonic() - started)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Counters and last-minute usage per team."""
+        now = time.monotonic()
+        with self._lock:
+            teams = {}
+            for team, counters in self._counters.items():
+                teams[team] = {
+                    **counters,
+                    "tokens_last_minute": sum(a for _, a in self._window_locked(team, RESOURCE_LLM, now)),
+                    "requests_last_minute": sum(a for _, a in self._window_locked(team, RESOURCE_VENDOR_API, now)),
+                }
+            return teams
+
+
+team_usage = TeamUsage()
+
+
+class _UsageRecorder(BaseCallbackHandler):
+    """Counts the tokens of every LLM call made while it is installed."""
+
+    def __init__(self, lease: "SlotLease"):
+        self.lease = lease
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        # An abandoned call is no longer charged to the team
+        if self.lease.abandoned:
+            return
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+        team_usage.record_llm(self.lease.team, input_tokens, output_tokens)
+
+
+# Installed for the duration of a scheduled LLM call; LangChain adds it to
+# the callbacks of every model invoked inside the call
+_usage_recorder: ContextVar[Optional[_UsageRecorder]] = ContextVar("team_usage_recorder", default=None)
+register_configure_hook(_usage_recorder, inheritable=True)
+
+
+# ========== Scheduler ==========
+
+# SlotLease states
+_HELD = "held"
+_ABANDONED = "abandoned"
+_DONE = "done"
+
+
+class SlotLease:
+    """
+    A slot held for one call, freed exactly once: when the call finishes,
+    or as soon as its caller abandons it. Thread-safe.
+    """
+
+    def __init__(self, scheduler: "TeamScheduler", resource: str, team: str):
+        self.resource = resource
+        self.team = team
+        self._scheduler = scheduler
+        self._state = _HELD
+        self._lock = threading.Lock()
+
+    @property
+    def abandoned(self) -> bool:
+        return self._state == _ABANDONED
+
+    def release(self) -> None:
+        """The call finished (or never started): free the slot if still held."""
+        with self._lock:
+            state, self._state = self._state, _DONE
+            if state == _ABANDONED:
+                self._scheduler._count_abandoned(self.resource, -1)
+        if state == _HELD:
+            self._scheduler.release(self.resource)
+
+    def abandon(self) -> None:
+        """Nobody will read the call's result: free the slot for other teams and stop charging this one."""
+        with self._lock:
+            if self._state != _HELD:
+                return
+            self._state = _ABANDONED
+            self._scheduler._count_abandoned(self.resource, 1)
+        self._scheduler.release(self.resource)
+
+
+class TeamScheduler:
+    """Fair, quota-aware access to the LLM and the vendor API for every run."""
+
+    def __init__(self, usage: TeamUsage = team_usage):
+        self.usage = usage
+        self.resources = {
+            RESOURCE_LLM: FairScheduler(RESOURCE_LLM, LLM_MAX_CONCURRENT),
+            RESOURCE_VENDOR_API: FairScheduler(RESOURCE_VENDOR_API, VENDOR_API_MAX_CONCURRENT),
+        }
+        # Abandoned calls still running, per resource
+        self._abandoned = {name: 0 for name in self.resources}
+        self._lock = threading.Lock()
+
+    def acquire(self, resource: str, team: str, token: Any = None) -> Optional[SlotLease]:
+        """
+        Wait for the team's quota and then for a slot of the resource
+        (other call kinds pass straight through).
+
+        Returns:
+            Lease on the slot, or None if the token was cancelled while
+            waiting (no slot is held)
+        """
+        scheduler = self.resources.get(resource)
+        if scheduler is None:
+            return SlotLease(self, resource, team)
+        if not self.usage.wait_for_quota(team, resource, token):
+            return None
+        if not scheduler.acquire(team, token):
+            return None
+        if resource == RESOURCE_VENDOR_API:
+            self.usage.record_message(team)
+        return SlotLease(self, resource, team)
+
+    def release(self, resource: str) -> None:
+        scheduler = self.resources.get(resource)
+        if scheduler is not None:
+            scheduler.release()
+
+    def _count_abandoned(self, resource: str, delta: int) -> None:
+        if resource in self._abandoned:
+            with self._lock:
+                self._abandoned[resource] += delta
+
+    def run_acquired(self, lease: SlotLease, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Any:
+        """Call fn holding a leased slot, counting its LLM usage for the team, then release the slot."""
+        reset = _usage_recorder.set(_UsageRecorder(lease)) if lease.resource == RESOURCE_LLM else None
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if reset is not None:
+                _usage_recorder.reset(reset)
+            lease.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            abandoned = dict(self._abandoned)
+        return {
+            name: {**scheduler.stats(), "abandoned_running": abandoned[name]}
+            for name, scheduler in self.resources.items()
+        }
+
+
+# Process-wide scheduler used by cancellable()
+team_scheduler = TeamScheduler()
@@ -0,0 +1,535 @@
+"""
+Run Tracing
+
+Spans for every graph node, LLM call, vendor API request and negotiation
+turn of a run, in one trace per run (the trace id is the run id). A span's
+parent is the span open in the calling context, or the run's root span, so
+work handed to other threads (node executors, cancellable() helpers) stays
+linked to the step that started it.
+
+Finished traces are kept in memory (GET /api/runs/{run_id}/trace) and, with
+TRACE_EXPORT_DIR set, written to <run_id>.json in the OTLP/JSON format that
+OpenTelemetry collectors and viewers import.
+
+critical_path() walks a trace back from the end of the run and returns the
+chain of spans that determined its wall time (GET
+/api/runs/{run_id}/critical-path, or python -m agents.tracing <trace.json>).
+"""
+
+import argparse
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+from agents.config import TRACE_EXPORT_DIR, TRACE_MAX_SPANS, TRACE_RETENTION, TRACING_ENABLED
+from agents.run_context import current_run_id
+
+logger = logging.getLogger(__name__)
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_CLIENT = 3
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+SERVICE_NAME = "evaepic"
+
+
+def _span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+def trace_id_for(run_id: str) -> str:
+    """OTLP trace id (32 hex digits) of a run: the run id itself when it is a uuid hex."""
+    if len(run_id) == 32:
+        try:
+            int(run_id, 16)
+            return run_id.lower()
+        except ValueError:
+            pass
+    return hashlib.md5(run_id.encode()).hexdigest()
+
+
+class Span:
+    """One timed operation; recorded in its run's trace when it ends."""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind",
+        "start_ns", "end_ns", "attributes", "status", "message", "_trace"
+    )
+
+    def __init__(
+        self,
+        trace_id: str,
+        name: str,
+        parent_id: Optional[str] = None,
+        kind: int = KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_ns: Optional[int] = None,
+        span_id: Optional[str] = None,
+        trace: Optional["RunTrace"] = None
+    ):
+        self.trace_id = trace_id
+        self.span_id = span_id or _span_id()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_OK
+        self.message = ""
+        self._trace = trace
+
+    def child(self, name: str, kind: int = KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None) -> "Span":
+        return Span(self.trace_id, name, self.span_id, kind, attributes, trace=self._trace)
+
+    def fail(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.message = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if self._trace is not None:
+                self._trace.record(self)
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status, "message": self.message} if self.message else {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+    @classmethod
+    def from_otlp(cls, data: Dict[str, Any]) -> "Span":
+        span = cls(
+            data["traceId"], data["name"], data.get("parentSpanId") or None, data.get("kind", KIND_INTERNAL),
+            {item["key"]: _otlp_value(item["value"]) for item in data.get("attributes", [])},
+            start_ns=int(data["startTimeUnixNano"]), span_id=data["spanId"]
+        )
+        span.end_ns = int(data["endTimeUnixNano"])
+        span.status = data.get("status", {}).get("code", STATUS_OK)
+        span.message = data.get("status", {}).get("message", "")
+        return span
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    items = []
+    for key, value in attributes.items():
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        items.append({"key": key, "value": typed})
+    return items
+
+
+def _otlp_value(value: Dict[str, Any]) -> Any:
+    if "intValue" in value:
+        return int(value["intValue"])
+    for kind in ("boolValue", "doubleValue", "stringValue"):
+        if kind in value:
+            return value[kind]
+    return None
+
+
+class RunTrace:
+    """The spans of one run, under its root "run" span."""
+
+    def __init__(self, run_id: str, attributes: Optional[Dict[str, Any]] = None, max_spans: int = TRACE_MAX_SPANS):
+        self.run_id = run_id
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped = 0
+        self.root = Span(
+            trace_id_for(run_id), "run", attributes={"evaepic.run_id": run_id, **(attributes or {})}, trace=self
+        )
+
+    def record(self, span: Span) -> None:
+        # list.append is atomic, so spans ending in any thread are recorded without a lock
+        if span is self.root:
+            return
+        if len(self.spans) < self.max_spans:
+            self.spans.append(span)
+        else:
+            self.dropped += 1
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The trace as an OTLP/JSON ExportTraceServiceRequest."""
+        spans = [self.root] + list(self.spans)
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({
+                    "service.name": SERVICE_NAME, "evaepic.run_id": self.run_id, "evaepic.dropped_spans": self.dropped
+                })},
+                "scopeSpans": [{
+                    "scope": {"name": "agents.tracing"},
+                    "spans": [span.to_otlp() for span in spans]
+                }]
+            }]
+        }
+
+
+class RunTraces:
+    """Traces of active runs and the most recent finished ones."""
+
+    def __init__(
+        self,
+        enabled: bool = TRACING_ENABLED,
+        retention: int = TRACE_RETENTION,
+        export_dir: str = TRACE_EXPORT_DIR,
+        max_spans: int = TRACE_MAX_SPANS
+    ):
+        self.enabled = enabled
+        self.retention = retention
+        self.export_dir = export_dir
+        self.max_spans = max_spans
+        self._active: Dict[str, RunTrace] = {}
+        self._finished: "OrderedDict[str, RunTrace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, run_id: str, **attributes: Any) -> Optional[RunTrace]:
+        """Open the trace of a run (its root span starts now)."""
+        if not self.enabled:
+            return None
+        trace = RunTrace(run_id, {f"evaepic.{key}": value for key, value in attributes.items()}, self.max_spans)
+        with self._lock:
+            self._active[run_id] = trace
+        return trace
+
+    def active(self, run_id: Optional[str]) -> Optional[RunTrace]:
+        return self._active.get(run_id) if run_id else None
+
+    def finish(self, run_id: str, status: Optional[str] = None, error: Optional[BaseException] = None) -> Optional[RunTrace]:
+        """
+        End the run's root span, keep the trace for lookups and export it.
+
+        Args:
+            run_id: Run to finish
+            status: Final run status, stored as evaepic.status
+            error: Exception the run failed with, if any
+        """
+        with self._lock:
+            trace = self._active.pop(run_id, None)
+            if trace is None:
+                return None
+            self._finished[run_id] = trace
+            while len(self._finished) > self.retention:
+                self._finished.popitem(last=False)
+        if status:
+            trace.root.attributes["evaepic.status"] = status
+        if error is not None:
+            trace.root.fail(error)
+        trace.root.end()
+        if self.export_dir:
+            self.export(trace)
+        return trace
+
+    def export(self, trace: RunTrace) -> Optional[Path]:
+        """Write the trace to <export_dir>/<run_id>.json."""
+        try:
+            directory = Path(self.export_dir)
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"{trace.run_id}.json"
+            path.write_text(json.dumps(trace.to_otlp()), encoding="utf-8")
+            return path
+        except OSError as e:
+            logger.warning(f"[TRACE] Could not export trace of run {trace.run_id}: {e}")
+            return None
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """OTLP/JSON trace of a run: active, recently finished or exported earlier."""
+        trace = self._active.get(run_id) or self._finished.get(run_id)
+        if trace is not None:
+            return trace.to_otlp()
+        if self.export_dir and run_id.isalnum():
+            path = Path(self.export_dir) / f"{run_id}.json"
+            if path.exists():
+                return json.loads(path.read_text(encoding="utf-8"))
+        return None
+
+
+# Process-wide trace store
+run_traces = RunTraces()
+
+# Span the calling code runs in
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def _parent() -> Optional[Span]:
+    """Span new spans hang under: the open one, else the current run's root."""
+    parent = _current_span.get()
+    if parent is not None:
+        return parent
+    trace = run_traces.active(current_run_id())
+    return trace.root if trace is not None else None
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = KIND_INTERNAL) -> Iterator[Optional[Span]]:
+    """
+    Record the enclosed block as a span of the current run (no-op outside runs).
+
+    Yields:
+        The span, to add attributes to, or None when not tracing
+    """
+    parent = _parent()
+    if parent is None:
+        yield None
+        return
+    current = parent.child(name, kind, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.fail(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def traced(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorator recording each call of a function as a span."""
+    def decorate(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def _node_attributes(args: Any) -> Dict[str, Any]:
+    """Vendor and round of a fanned-out node's input, if present."""
+    data = args[0] if args and isinstance(args[0], dict) else {}
+    vendor = data.get("vendor") if isinstance(data.get("vendor"), dict) else {}
+    return {
+        "evaepic.vendor_id": data["vendor_id"] if "vendor_id" in data else vendor.get("id"),
+        "evaepic.vendor_name": data.get("vendor_name", vendor.get("name")),
+        "evaepic.round_index": data.get("round_index"),
+    }
+
+
+def traced_node(name: str, fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a graph node so each execution is a span of the run."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def traced_async(*args: Any, **kwargs: Any) -> Any:
+            with span(name, _node_attributes(args)):
+                return await fn(*args, **kwargs)
+        return traced_async
+
+    @functools.wraps(fn)
+    def traced_sync(*args: Any, **kwargs: Any) -> Any:
+        with span(name, _node_attributes(args)):
+            return fn(*args, **kwargs)
+    return traced_sync
+
+
+# ========== LLM calls ==========
+
+class _LLMSpans(BaseCallbackHandler):
+    """Records every LLM call of a run as a span with its token usage."""
+
+    def __init__(self):
+        # LangChain run id -> open span
+        self._open: Dict[UUID, Span] = {}
+
+    def _start(self, run_id: UUID, metadata: Optional[Dict[str, Any]]) -> None:
+        parent = _parent()
+        if parent is None:
+            return
+        metadata = metadata or {}
+        model = metadata.get("ls_model_name") or "model"
+        self._open[run_id] = parent.child(f"llm {model}", KIND_CLIENT, {
+            "gen_ai.request.model": metadata.get("ls_model_name"),
+            "gen_ai.system": metadata.get("ls_provider"),
+            "evaepic.node": metadata.get("langgraph_node"),
+        })
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, *, run_id: UUID, metadata: Any = None, **kwargs: Any) -> None:
+        self._start(run_id, metadata)
+
+    def on_llm_start(self, serialized: Any, prompts: Any, *, run_id: UUID, metadata: Any = None, **kwargs: Any) -> None:
+        self._start(run_id, metadata)
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        current = self._open.pop(run_id, None)
+        if current is None:
+            return
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    details = usage.get("input_token_details") or {}
+                    current.attributes.update({
+                        "gen_ai.usage.input_tokens": usage.get("input_tokens", 0),
+                        "gen_ai.usage.output_tokens": usage.get("output_tokens", 0),
+                        "gen_ai.usage.cache_read_tokens": details.get("cache_read"),
+                    })
+        current.end()
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        current = self._open.pop(run_id, None)
+        if current is not None:
+            current.fail(error)
+            current.end()
+
+
+# Always set, so LangChain attaches the handler to every model call
+_llm_spans: ContextVar[Optional[_LLMSpans]] = ContextVar("llm_spans", default=_LLMSpans())
+register_configure_hook(_llm_spans, inheritable=True)
+
+
+# ========== Critical path ==========
+
+def spans_from_otlp(document: Dict[str, Any]) -> List[Span]:
+    """All spans of an OTLP/JSON document."""
+    return [
+        Span.from_otlp(data)
+        for resource in document.get("resourceSpans", [])
+        for scope in resource.get("scopeSpans", [])
+        for data in scope.get("spans", [])
+    ]
+
+
+def critical_path(spans: List[Span]) -> Dict[str, Any]:
+    """
+    The chain of spans that determined a trace's wall time.
+
+    Starting from the end of the longest root span, each span's time is
+    walked backwards: the child that finished last before the cursor is on
+    the path (recursively), the cursor moves to its start, and so on. Time
+    not covered by a child on the path is the span's own ("self") time, so
+    the self times of the path add up to the wall time. Children that ran
+    in parallel with a path child (e.g. the other vendors of a fan-out)
+    are off the path.
+
+    Args:
+        spans: Spans of one trace (see spans_from_otlp)
+
+    Returns:
+        {"wall_seconds", "path": [span entries in start order], "by_name":
+        self seconds summed per span name, largest first}
+    """
+    finished = [span for span in spans if span.end_ns is not None]
+    ids = {span.span_id for span in finished}
+    children: Dict[Optional[str], List[Span]] = defaultdict(list)
+    roots = []
+    for span in finished:
+        if span.parent_id in ids:
+            children[span.parent_id].append(span)
+        else:
+            roots.append(span)
+    if not roots:
+        return {"wall_seconds": 0.0, "path": [], "by_name": {}}
+
+    root = max(roots, key=lambda span: span.end_ns - span.start_ns)
+    path = []
+
+    def walk(span: Span, start: int, end: int) -> None:
+        cursor = end
+        self_ns = 0
+        for child in sorted(children[span.span_id], key=lambda c: c.end_ns, reverse=True):
+            child_start = max(child.start_ns, start)
+            if child_start >= cursor or child.end_ns <= start:
+                continue
+            child_end = min(child.end_ns, cursor)
+            self_ns += cursor - child_end
+            walk(child, child_start, child_end)
+            cursor = child_start
+        self_ns += cursor - start
+        path.append({
+            "name": span.name,
+            "span_id": span.span_id,
+            "start_offset": round((start - root.start_ns) / 1e9, 6),
+            "seconds": round((end - start) / 1e9, 6),
+            "self_seconds": round(self_ns / 1e9, 6),
+            "status": "error" if span.status == STATUS_ERROR else "ok",
+            "attributes": {key: value for key, value in span.attributes.items() if value is not None},
+        })
+
+    walk(root, root.start_ns, root.end_ns)
+    path.sort(key=lambda entry: (entry["start_offset"], -entry["seconds"]))
+
+    by_name: Dict[str, float] = defaultdict(float)
+    for entry in path:
+        by_name[entry["name"]] += entry["self_seconds"]
+    return {
+        "wall_seconds": round((root.end_ns - root.start_ns) / 1e9, 6),
+        "path": path,
+        "by_name": {name: round(seconds, 6) for name, seconds in sorted(by_name.items(), key=lambda item: -item[1])},
+    }
+
+
+# ========== CLI ==========
+
+def format_critical_path(report: Dict[str, Any]) -> str:
+    """Human-readable critical path report."""
+    lines = [f"Wall time: {report['wall_seconds']:.3f}s", "", "  start     total      self  span"]
+    for entry in report["path"]:
+        label = entry["name"]
+        vendor = entry["attributes"].get("evaepic.vendor_name") or entry["attributes"].get("evaepic.vendor_id")
+        if vendor:
+            label += f" [{vendor}]"
+        if entry["status"] == "error":
+            label += " (error)"
+        lines.append(
+            f"{entry['start_offset']:7.3f} {entry['seconds']:8.3f}s {entry['self_seconds']:8.3f}s  {label}"
+        )
+    lines += ["", "Self time on the critical path by span:"]
+    for name, seconds in report["by_name"].items():
+        share = seconds / report["wall_seconds"] * 100 if report["wall_seconds"] else 0.0
+        lines.append(f"{seconds:9.3f}s {share:5.1f}%  {name}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Print the critical path of an exported run trace")
+    parser.add_argument("trace", type=Path, help="OTLP/JSON trace file (TRACE_EXPORT_DIR/<run_id>.json)")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    report = critical_path(spans_from_otlp(json.loads(args.trace.read_text(encoding="utf-8"))))
+    print(json.dumps(report, indent=2) if args.json else format_critical_path(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
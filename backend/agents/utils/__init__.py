@@ -2,10 +2,11 @@
 Utility modules for the negotiation system
 """
 
-from .vendor_api import VendorAPIClient
+from .vendor_api import VendorAPIClient, VendorDetailsResult
 from .webhook import send_webhook
 
 __all__ = [
     "VendorAPIClient",
+    "VendorDetailsResult",
     "send_webhook",
 ]
@@ -10,6 +10,9 @@ import json
 from typing import Dict, Any, Optional
 from requests.exceptions import RequestException
 
+from agents.utils.http import get_session
+from agents.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,7 +31,8 @@ class ConversationAPIClient:
         self.api_base_url = api_base_url
         logger.info(f"[CONV_API] Initialized with base URL: {self.api_base_url}")
     
-    def create_conversation(self, vendor_id: str, team_id: int, title: str = None) -> Optional[str]:
+    @traced("conversation_api.create_conversation")
+    def create_conversation(self, vendor_id: str, team_id: int, title: str = None, timeout: float = 30) -> Optional[str]:
         """
         Create a new conversation with a vendor.
         
@@ -36,6 +40,7 @@ class ConversationAPIClient:
             vendor_id: Vendor identifier
             team_id: Team identifier (for auth/context)
             title: Optional title for the conversation
+            timeout: Per-attempt request timeout in seconds
             
         Returns:
             Conversation ID or None if failed
@@ -52,7 +57,7 @@ class ConversationAPIClient:
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                response = requests.post(url, json=payload, timeout=30)
+                response = get_session().post(url, json=payload, timeout=timeout)
                 response.raise_for_status()
                 
                 data = response.json()
@@ -76,13 +81,15 @@ class ConversationAPIClient:
                          print(f"[CONV_API]    Body: {e.response.text}", flush=True)
                     return None
 
-    def send_message(self, conversation_id: str, message: str) -> Optional[str]:
+    @traced("conversation_api.send_message")
+    def send_message(self, conversation_id: str, message: str, timeout: float = 30) -> Optional[str]:
         """
         Send a message in a conversation using multipart/form-data.
         
         Args:
             conversation_id: Conversation identifier
             message: Message content to send
+            timeout: Per-attempt request timeout in seconds
             
         Returns:
             Vendor's response message or None if failed
@@ -100,10 +107,10 @@ class ConversationAPIClient:
         max_retries = 3
         for attempt in range(max_retries):
             try:
-                response = requests.post(
+                response = get_session().post(
                     url,
                     files=files,
-                    timeout=30
+                    timeout=timeout
                 )
                 response.raise_for_status()
                 
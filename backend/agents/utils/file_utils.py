@@ -6,11 +6,16 @@ import os
 import base64
 import logging
 import mimetypes
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable
+
+from agents.config import FILE_CACHE_SIZE
+from agents.tracing import traced
 
 logger = logging.getLogger(__name__)
 
+@traced("read_vendor_file")
 def get_file_message_content(filename: str) -> Optional[Dict[str, Any]]:
     """
     Read a local file from backend/data and return the content block for Anthropic API.
@@ -42,53 +47,85 @@ def get_file_message_content(filename: str) -> Optional[Dict[str, Any]]:
                 logger.warning(f"[FILE_UTILS] File not found: {file_path}")
                 return None
             
-        mime_type, _ = mimetypes.guess_type(file_path)
+        stat = file_path.stat()
+        block = _read_content_block(str(file_path), filename, stat.st_mtime_ns, stat.st_size)
+        return dict(block) if block else None
+                
+    except Exception as e:
+        logger.error(f"[FILE_UTILS] Error reading file {filename}: {e}")
+        return None
+
+
+@lru_cache(maxsize=FILE_CACHE_SIZE)
+def _read_content_block(path: str, filename: str, mtime_ns: int, size: int) -> Optional[Dict[str, Any]]:
+    """
+    Read and encode a file into a message content block.
+    
+    Cached on (path, mtime, size) so the same catalog is read and base64
+    encoded once per process instead of once per evaluator/strategist call,
+    while edits to the file on disk still invalidate the entry.
+    """
+    file_path = Path(path)
+    mime_type, _ = mimetypes.guess_type(file_path)
+    
+    if not mime_type:
+        # Default to text if unknown
+        mime_type = "text/plain"
         
-        if not mime_type:
-            # Default to text if unknown
-            mime_type = "text/plain"
+    logger.info(f"[FILE_UTILS] Reading {filename} as {mime_type}")
+    
+    # 1. PDF Handling
+    if mime_type == "application/pdf":
+        with open(file_path, "rb") as f:
+            data = base64.b64encode(f.read()).decode("utf-8")
+            return {
+                "type": "document",
+                "source": {
+                    "type": "base64",
+                    "media_type": mime_type,
+                    "data": data
+                }
+            }
             
-        logger.info(f"[FILE_UTILS] Reading {filename} as {mime_type}")
-        
-        # 1. PDF Handling
-        if mime_type == "application/pdf":
-            with open(file_path, "rb") as f:
-                data = base64.b64encode(f.read()).decode("utf-8")
-                return {
-                    "type": "document",
-                    "source": {
-                        "type": "base64",
-                        "media_type": mime_type,
-                        "data": data
-                    }
+    # 2. Image Handling
+    elif mime_type.startswith("image/"):
+        with open(file_path, "rb") as f:
+            data = base64.b64encode(f.read()).decode("utf-8")
+            return {
+                "type": "image",
+                "source": {
+                    "type": "base64",
+                    "media_type": mime_type,
+                    "data": data
                 }
-                
-        # 2. Image Handling
-        elif mime_type.startswith("image/"):
-            with open(file_path, "rb") as f:
-                data = base64.b64encode(f.read()).decode("utf-8")
+            }
+            
+    # 3. Text Handling (default)
+    else:
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                text_content = f.read()
                 return {
-                    "type": "image",
-                    "source": {
-                        "type": "base64",
-                        "media_type": mime_type,
-                        "data": data
-                    }
+                    "type": "text", 
+                    "text": f"--- DOCUMENT: {filename} ---\n{text_content}\n--- END DOCUMENT ---\n"
                 }
-                
-        # 3. Text Handling (default)
-        else:
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    text_content = f.read()
-                    return {
-                        "type": "text", 
-                        "text": f"--- DOCUMENT: {filename} ---\n{text_content}\n--- END DOCUMENT ---\n"
-                    }
-            except UnicodeDecodeError:
-                logger.warning(f"[FILE_UTILS] Could not read {filename} as text. Skipping.")
-                return None
-                
-    except Exception as e:
-        logger.error(f"[FILE_UTILS] Error reading file {filename}: {e}")
-        return None
+        except UnicodeDecodeError:
+            logger.warning(f"[FILE_UTILS] Could not read {filename} as text. Skipping.")
+            return None
+
+
+def preload_files(filenames: Iterable[str]) -> int:
+    """
+    Warm the content block cache for the given files.
+    
+    Args:
+        filenames: Names of files in backend/data (or absolute paths)
+        
+    Returns:
+        Number of files successfully loaded
+    """
+    loaded = 0
+    for filename in filenames:
+        if filename and get_file_message_content(filename):
+            loaded += 1
+    return loaded
@@ -0,0 +1,91 @@
+"""
+Shared HTTP Transport
+
+Provides a single pooled requests.Session for all vendor-facing API clients,
+so connections (and TLS handshakes) are reused across calls and threads.
+Every request through it is recorded in the vendor API metrics and, during
+a run, as a span of the run's trace.
+"""
+
+import logging
+import re
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from agents.config import HTTP_POOL_SIZE
+from agents.metrics import VENDOR_API_DURATION, VENDOR_API_REQUESTS
+from agents.tracing import KIND_CLIENT, span
+
+logger = logging.getLogger(__name__)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+# Path segments holding ids (anything with a digit) are grouped as ":id"
+_ID_SEGMENT = re.compile(r"[^/]*\d[^/]*")
+
+
+def endpoint_label(method: str, url: str) -> str:
+    """Metric label for a request, e.g. "POST /messages/:id"."""
+    path = _ID_SEGMENT.sub(":id", urlsplit(url).path) or "/"
+    return f"{method} {path}"
+
+
+class MeteredAdapter(HTTPAdapter):
+    """HTTPAdapter recording latency and outcome (status class or "error") per endpoint."""
+
+    def send(self, request, *args, **kwargs):
+        endpoint = endpoint_label(request.method, request.url)
+        started = time.perf_counter()
+        outcome = "error"
+        with span(f"HTTP {endpoint}", {"http.request.method": request.method, "url.full": request.url}, KIND_CLIENT) as current:
+            try:
+                response = super().send(request, *args, **kwargs)
+                outcome = f"{response.status_code // 100}xx"
+                if current is not None:
+                    current.attributes["http.response.status_code"] = response.status_code
+                return response
+            finally:
+                VENDOR_API_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+                VENDOR_API_REQUESTS.inc(endpoint=endpoint, outcome=outcome)
+
+
+def get_session() -> requests.Session:
+    """
+    Return the process-wide pooled session, creating it on first use.
+
+    The adapter keeps up to HTTP_POOL_SIZE keep-alive connections per host,
+    which must be at least as large as the highest fan-out concurrency used
+    by the clients (otherwise extra connections are opened and discarded).
+
+    Returns:
+        Shared requests.Session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = MeteredAdapter(
+                    pool_connections=HTTP_POOL_SIZE,
+                    pool_maxsize=HTTP_POOL_SIZE
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                logger.info(f"[HTTP] Created pooled session (pool size: {HTTP_POOL_SIZE})")
+                _session = session
+    return _session
+
+
+def close_session() -> None:
+    """Close the shared session and release its pooled connections."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,246 @@
+"""
+Deterministic Order Parser
+
+Applies the same rules the OrderExtractorAgent prompt gives the LLM
+("100-150" → min 100/max 150/preferred 125, "4.5k" → 4500, "$" → USD, ...)
+to simple, single-item requests such as "I need 50 laptops for $20k ASAP".
+
+Inputs with anything the rules cannot account for (requirements, several
+items, unrecognized phrasing) are reported as unresolved so the caller can
+fall back to the LLM.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from models.order import OrderObject, QuantityRange, Requirements
+
+
+# ========== Vocabulary ==========
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11,
+    "twelve": 12, "dozen": 12, "a dozen": 12, "twenty": 20, "fifty": 50,
+    "hundred": 100, "a hundred": 100,
+}
+
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP"}
+
+CURRENCY_CODES = {
+    "usd": "USD", "dollar": "USD", "dollars": "USD",
+    "eur": "EUR", "euro": "EUR", "euros": "EUR",
+    "gbp": "GBP", "pound": "GBP", "pounds": "GBP",
+    "chf": "CHF",
+}
+
+MULTIPLIERS = {"k": 1_000, "thousand": 1_000, "million": 1_000_000}
+
+# Checked in order; first match wins
+URGENCY_PATTERNS = [
+    ("low", r"no rush|no hurry|not urgent|whenever(?: possible)?|take your time"),
+    ("urgent", r"asap|a\.s\.a\.p\.?|as soon as possible|urgent(?:ly)?|immediately|right away"),
+    ("high", r"fast|quickly|quick|soon|this week|by tomorrow"),
+]
+
+# Phrases the LLM would turn into requirements, or that signal a request
+# too complex for the rules (alternatives, multiple items, conditions)
+COMPLEX_CUES = re.compile(
+    r"\b(must|need(?:s)? to|has to|have to|require[sd]?|requirement|warranty|nice to have|"
+    r"would be nice|ideally|prefer(?:ably|red)?|should|include[sd]?|including|with|without|"
+    r"and|or|plus|if|but|except|for|per|each|by|from|to|delivered|delivery|shipping|install(?:ed|ation)?|"
+    # Timing and specs ("in 2 weeks", "within a month", "27 inch")
+    r"in|within|until|before|after|next|days?|weeks?|months?|"
+    r"inch(?:es)?|cm|mm|gb|tb|size[sd]?|model)\b",
+    re.IGNORECASE
+)
+
+# An item name is plain words; digits, punctuation or fragments such as
+# "-ish" left over mean part of the request was not understood
+ITEM_RE = re.compile(r"^[^\W\d_]+(?:['’][^\W\d_]+)?(?:\s+[^\W\d_]+(?:['’][^\W\d_]+)?)*$")
+
+LEAD_IN = re.compile(
+    r"^(?:(?:hi|hello|hey)[,!]?\s+)?(?:please\s+)?"
+    r"(?:(?:i|we)\s+(?:want|would like|'d like|need)\s+to\s+(?:buy|order|purchase|get)"
+    r"|(?:i|we)\s+(?:need|want|would like|'d like|require|am looking for|are looking for|'m looking for|'re looking for)"
+    r"|looking for|(?:buy|order|purchase|get)(?:\s+(?:me|us))?)\s+",
+    re.IGNORECASE
+)
+
+BUDGET_LEAD = (
+    r"for|under|below|budget(?:\s+is|\s+of)?|max(?:imum)?|up\s+to|within|at\s+most|"
+    r"no\s+more\s+than|with\s+a\s+budget\s+of|total(?:\s+budget)?|costing"
+)
+
+BUDGET_RE = re.compile(
+    rf"(?P<lead>\b(?:{BUDGET_LEAD})\s*:?\s*)?"
+    r"(?P<sym>[$€£])?\s*(?P<num>\d+(?:,\d{3})*(?:\.\d+)?)\s*(?P<mult>k|thousand|million)?\b"
+    r"(?:\s*(?P<code>usd|eur|gbp|chf|dollars?|euros?|pounds?)\b)?",
+    re.IGNORECASE
+)
+
+QUANTITY_NUMBER = r"\d[\d,]*"
+RANGE_RE = re.compile(rf"^({QUANTITY_NUMBER})\s*(?:-|–|to)\s*({QUANTITY_NUMBER})\s+", re.IGNORECASE)
+APPROX_RE = re.compile(rf"^(?:around|about|approximately|approx\.?|roughly|~)\s*({QUANTITY_NUMBER})\s+", re.IGNORECASE)
+SINGLE_RE = re.compile(
+    rf"^({QUANTITY_NUMBER}|{'|'.join(sorted(map(re.escape, NUMBER_WORDS), key=len, reverse=True))})\s+",
+    re.IGNORECASE
+)
+UNIT_PREFIX_RE = re.compile(r"^(?:x\s+|units?\s+of\s+|pieces?\s+of\s+|pcs\.?\s+of\s+|pcs\.?\s+)", re.IGNORECASE)
+
+# Maximum words accepted as an item name
+MAX_ITEM_WORDS = 6
+
+# Field weights for the completeness/confidence score
+FIELD_WEIGHTS = {"item": 0.3, "quantity": 0.25, "budget": 0.25, "currency": 0.1, "urgency": 0.1}
+
+
+@dataclass
+class ParseResult:
+    """Outcome of a deterministic parse attempt"""
+    order: Optional[OrderObject]
+    confidence: float
+    missing: List[str] = field(default_factory=list)
+
+    @property
+    def resolved(self) -> bool:
+        """True if the parse accounts for the whole input."""
+        return self.order is not None and not self.missing
+
+
+def _to_int(raw: str) -> int:
+    return int(raw.replace(",", ""))
+
+
+def _extract_urgency(text: str) -> Tuple[str, str]:
+    """Return (urgency, text without the urgency phrase)."""
+    for urgency, pattern in URGENCY_PATTERNS:
+        match = re.search(rf"(?:,\s*|\s+(?:and\s+)?)?\b(?:{pattern})\b[.!]?", text, re.IGNORECASE)
+        if match:
+            return urgency, (text[:match.start()] + " " + text[match.end():]).strip()
+    return "medium", text
+
+
+def _extract_budget(text: str) -> Tuple[Optional[float], Optional[str], str, bool]:
+    """
+    Return (budget, currency or None, text without the budget phrase, labelled).
+
+    labelled is False for an amount without a budget lead word ("at $500",
+    "50 laptops, $20k"), which may be a unit price rather than the total.
+    """
+    for match in BUDGET_RE.finditer(text):
+        sym, mult, code, lead = match.group("sym"), match.group("mult"), match.group("code"), match.group("lead")
+        # A bare number is a quantity, not a budget
+        if not (sym or mult or code or lead):
+            continue
+        # "for 3 chairs" - a lead word followed by an item is not a budget
+        rest = text[match.end():].lstrip()
+        if not (sym or mult or code) and rest and not rest.startswith((",", ".", "!")):
+            if not re.match(rf"^(?:{'|'.join(p for _, p in URGENCY_PATTERNS)})\b", rest, re.IGNORECASE):
+                continue
+
+        amount = float(match.group("num").replace(",", ""))
+        if mult:
+            amount *= MULTIPLIERS[mult.lower()]
+        currency = CURRENCY_SYMBOLS.get(sym) if sym else None
+        if code:
+            currency = CURRENCY_CODES[code.lower()]
+
+        remaining = (text[:match.start()] + " " + text[match.end():]).strip()
+        return amount, currency, remaining, bool(lead)
+    return None, None, text, False
+
+
+def _extract_quantity(text: str) -> Tuple[Optional[QuantityRange], str]:
+    """Parse a quantity at the start of text; return (quantity, rest)."""
+    match = RANGE_RE.match(text)
+    if match:
+        low, high = sorted((_to_int(match.group(1)), _to_int(match.group(2))))
+        return QuantityRange(min=low, max=high, preferred=(low + high) // 2), text[match.end():]
+
+    match = APPROX_RE.match(text)
+    if match:
+        value = _to_int(match.group(1))
+        return QuantityRange(min=round(value * 0.9), max=round(value * 1.1), preferred=value), text[match.end():]
+
+    match = SINGLE_RE.match(text)
+    if match:
+        token = " ".join(match.group(1).lower().split())
+        value = NUMBER_WORDS[token] if token in NUMBER_WORDS else _to_int(token)
+        return QuantityRange(min=value, max=value, preferred=value), text[match.end():]
+
+    return None, text
+
+
+def parse_order(text: str) -> ParseResult:
+    """
+    Parse a simple order request without an LLM.
+
+    Args:
+        text: Raw user request
+
+    Returns:
+        ParseResult with the order (if item and quantity were found), a 0-1
+        completeness/confidence score, and the parts that could not be resolved
+    """
+    missing: List[str] = []
+    remaining = " ".join(text.split()).strip().rstrip(".!")
+    if not remaining:
+        return ParseResult(order=None, confidence=0.0, missing=["item", "quantity"])
+
+    urgency, remaining = _extract_urgency(remaining)
+    budget, currency, remaining, budget_labelled = _extract_budget(remaining)
+    remaining = remaining.strip(" ,;.!")
+
+    lead_in = LEAD_IN.match(remaining)
+    if lead_in:
+        remaining = remaining[lead_in.end():]
+
+    quantity, remaining = _extract_quantity(remaining)
+    item = UNIT_PREFIX_RE.sub("", remaining.strip(" ,;.!")).strip(" ,;.!")
+    item = re.sub(r"\s+(?:for|at|,)$", "", item, flags=re.IGNORECASE).strip()
+
+    # Score what was found
+    score = 0.0
+    if item:
+        score += FIELD_WEIGHTS["item"]
+    else:
+        missing.append("item")
+    if quantity:
+        score += FIELD_WEIGHTS["quantity"]
+    else:
+        missing.append("quantity")
+    # No budget phrase at all means "unknown budget" (0), exactly what the
+    # LLM returns for such inputs, but it earns no credit
+    if budget is not None:
+        score += FIELD_WEIGHTS["budget"] * (1.0 if budget_labelled else 0.5)
+    # An unstated currency defaults to USD, as the LLM would, at half credit
+    score += FIELD_WEIGHTS["currency"] * (1.0 if currency else 0.5)
+    # No urgency cue is a confident "medium", same as an explicit one
+    score += FIELD_WEIGHTS["urgency"]
+
+    # Leftovers the rules cannot place make the whole parse unreliable
+    if item and (not ITEM_RE.match(item) or COMPLEX_CUES.search(item) or len(item.split()) > MAX_ITEM_WORDS):
+        missing.append("unparsed_text")
+        score = min(score, 0.5)
+    # Total or unit price? Only the LLM can tell "10 laptops at $500" apart
+    if budget is not None and not budget_labelled:
+        missing.append("budget")
+        score = min(score, 0.5)
+    if quantity and (quantity.min <= 0 or quantity.preferred <= 0):
+        missing.append("quantity")
+        score = min(score, 0.5)
+
+    if not item or not quantity:
+        return ParseResult(order=None, confidence=round(score, 2), missing=missing)
+
+    order = OrderObject(
+        item=item,
+        quantity=quantity,
+        budget=budget if budget is not None else 0.0,
+        currency=currency or "USD",
+        requirements=Requirements(mandatory=[], optional=[]),
+        urgency=urgency
+    )
+    return ParseResult(order=order, confidence=round(score, 2), missing=missing)
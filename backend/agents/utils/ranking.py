@@ -0,0 +1,134 @@
+"""
+Pareto-Frontier Ranking
+
+An offer is on the Pareto frontier when no other offer is at least as good
+on every criterion and strictly better on one: lower total price, faster
+delivery, better payment terms, more certain deal status.
+
+Every criterion score (see agents.utils.scoring) is monotone in these
+objectives, so for any non-negative weights the best weighted score is
+always reached on the frontier. The frontier is therefore computed once per
+run, and alternative weightings are ranked over the frontier alone, without
+re-reading the leaderboard or calling an LLM.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from agents.utils.scoring import (
+    CRITERIA,
+    DEFAULT_WEIGHTS,
+    OfferColumns,
+    ScoreWeights,
+    rank_order,
+    weighted_scores,
+)
+
+# Alternative weightings reported next to the configured one
+RANKING_PROFILES: Dict[str, ScoreWeights] = {
+    "configured": DEFAULT_WEIGHTS,
+    "price_first": ScoreWeights(price=0.8, delivery=0.1, payment=0.1, status=0.0),
+    "fast_delivery": ScoreWeights(price=0.3, delivery=0.6, payment=0.1, status=0.0),
+    "payment_terms": ScoreWeights(price=0.3, delivery=0.1, payment=0.6, status=0.0),
+    "deal_certainty": ScoreWeights(price=0.4, delivery=0.15, payment=0.1, status=0.35),
+}
+
+
+def pareto_frontier(objectives: np.ndarray) -> np.ndarray:
+    """
+    Find the non-dominated rows of an objective matrix.
+
+    Rows are visited best-first in lexicographic order, so a row can only be
+    dominated by one already on the frontier; each check is one vectorized
+    comparison against the (usually small) frontier.
+
+    Args:
+        objectives: (n, k) array, higher is better in every column
+
+    Returns:
+        Row indices on the frontier, in lexicographic best-first order.
+        Identical rows are all kept.
+    """
+    n, k = objectives.shape
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+
+    # np.lexsort uses the last key as primary; negate for descending
+    order = np.lexsort(tuple(-objectives[:, column] for column in reversed(range(k))))
+
+    front = np.empty((n, k), dtype=np.float64)
+    members: List[int] = []
+    for idx in order.tolist():
+        row = objectives[idx]
+        if members:
+            current = front[:len(members)]
+            dominated = np.all(current >= row, axis=1) & np.any(current > row, axis=1)
+            if dominated.any():
+                continue
+        front[len(members)] = row
+        members.append(idx)
+    return np.array(members, dtype=np.intp)
+
+
+def rank_criteria(criteria: np.ndarray, weights: ScoreWeights) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rank rows of criterion scores under a weighting.
+
+    Args:
+        criteria: (n, len(CRITERIA)) criterion scores
+        weights: Weight per criterion
+
+    Returns:
+        (row indices best first, weighted score per row)
+    """
+    scores = weighted_scores(criteria, weights)
+    return rank_order(scores), scores
+
+
+def criteria_matrix(rows: Sequence[Dict[str, float]]) -> np.ndarray:
+    """Stack {criterion: score} dicts into a criterion-score matrix."""
+    return np.array([[float(row.get(name, 0.0)) for name in CRITERIA] for row in rows], dtype=np.float64).reshape(-1, len(CRITERIA))
+
+
+class ParetoRanking:
+    """
+    Pareto frontier of one leaderboard plus the per-criterion scores needed
+    to rank it under any weighting.
+    """
+
+    def __init__(self, columns: OfferColumns, best_price: float, quantity: float = 1):
+        self.columns = columns
+        self.criteria = columns.criteria(best_price)
+
+        # Objectives: raw total price (not the capped price score) so cheaper
+        # offers always dominate; the other criteria use their scores. A
+        # missing or zero price scores 0 on price, so it ranks as the most
+        # expensive total rather than the cheapest.
+        unit_prices = columns.unit_prices
+        has_price = ~np.isnan(unit_prices) & (unit_prices != 0)
+        totals = np.where(has_price, unit_prices * quantity, np.inf)
+        objectives = np.column_stack([-totals, self.criteria[:, 1:]])
+        self.frontier = pareto_frontier(objectives)
+        self._on_frontier = set(self.frontier.tolist())
+
+    def is_on_frontier(self, idx: int) -> bool:
+        return idx in self._on_frontier
+
+    def frontier_criteria(self, idx: int) -> Dict[str, float]:
+        """Criterion scores of one offer, keyed by criterion name."""
+        return {name: float(value) for name, value in zip(CRITERIA, self.criteria[idx].tolist())}
+
+    def rerank(self, weights: ScoreWeights) -> List[Tuple[int, float]]:
+        """
+        Rank the frontier under a weighting.
+
+        Args:
+            weights: Weight per criterion
+
+        Returns:
+            (offer index, weighted score) pairs, best first; the first entry
+            is the best offer in the whole leaderboard under these weights
+        """
+        order, scores = rank_criteria(self.criteria[self.frontier], weights)
+        return [(int(self.frontier[i]), float(scores[i])) for i in order.tolist()]
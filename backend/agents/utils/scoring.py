@@ -0,0 +1,237 @@
+"""
+Columnar Offer Scoring
+
+Vectorized form of the aggregator's vendor scoring rules. Offers are loaded
+once into NumPy columns (unit price, delivery days and a pre-classified
+payment-term code) so a whole leaderboard can be scored and ranked in bulk
+instead of one offer at a time.
+
+Each offer gets a 0-100 score per criterion (price, delivery, payment
+terms, deal status); the vendor score is their weighted sum. Results are
+identical to scoring each offer with calculate_vendor_score: the same
+weights, the same missing-value rules, Python's round() for the final
+2-decimal score and a stable descending sort for ranks.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from agents.config import (
+    SCORE_WEIGHT_PRICE,
+    SCORE_WEIGHT_DELIVERY,
+    SCORE_WEIGHT_PAYMENT,
+    SCORE_WEIGHT_STATUS,
+)
+
+
+# ========== Scoring Rules ==========
+
+# Criteria in weight/column order
+CRITERIA = ("price", "delivery", "payment", "status")
+
+
+@dataclass(frozen=True)
+class ScoreWeights:
+    """Weight of each criterion score in the vendor score"""
+    price: float = SCORE_WEIGHT_PRICE
+    delivery: float = SCORE_WEIGHT_DELIVERY
+    payment: float = SCORE_WEIGHT_PAYMENT
+    status: float = SCORE_WEIGHT_STATUS
+
+    def __post_init__(self):
+        if any(weight < 0 for weight in self.as_tuple()):
+            raise ValueError("Score weights must be non-negative")
+
+    def as_tuple(self) -> Tuple[float, ...]:
+        return tuple(getattr(self, name) for name in CRITERIA)
+
+    def as_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, weights: Dict[str, float]) -> "ScoreWeights":
+        """Build weights from a partial mapping; unspecified criteria weigh 0."""
+        unknown = set(weights) - set(CRITERIA)
+        if unknown:
+            raise ValueError(f"Unknown score criteria: {', '.join(sorted(unknown))}")
+        return cls(**{name: float(weights.get(name, 0.0)) for name in CRITERIA})
+
+
+# Configured weights (60/25/15/0 unless overridden in the environment)
+DEFAULT_WEIGHTS = ScoreWeights()
+
+# Delivery: 100 points minus 3 per day; offers without delivery info get 50
+DELIVERY_POINTS_PER_DAY = 3
+NO_DELIVERY_SCORE = 50
+
+# Payment-term classes, checked in order; first class with a matching
+# phrase wins. The class index is the payment code.
+PAYMENT_TERM_CLASSES: List[Tuple[Tuple[str, ...], int]] = [
+    (("net 30", "30 days"), 80),
+    (("net 60", "60 days"), 60),
+    (("advance", "upfront"), 40),
+]
+
+# Code and score for terms that match no class (including missing terms)
+PAYMENT_CODE_OTHER = len(PAYMENT_TERM_CLASSES)
+OTHER_PAYMENT_SCORE = 50
+
+# Points per payment code, indexable by a code array
+PAYMENT_CODE_SCORES = np.array(
+    [points for _, points in PAYMENT_TERM_CLASSES] + [OTHER_PAYMENT_SCORE],
+    dtype=np.float64
+)
+
+# Deal status: an agreed deal beats one still open; a walk-away scores 0
+STATUS_SCORES = {"finalized": 100, "completed": 75, "in_progress": 50, "walked_away": 0}
+OTHER_STATUS_SCORE = 50
+
+
+def status_score(status: Optional[str]) -> float:
+    """Criterion score for an offer's negotiation status."""
+    return float(STATUS_SCORES.get((status or "").lower(), OTHER_STATUS_SCORE))
+
+
+def classify_payment_terms(payment_terms: Optional[str]) -> int:
+    """
+    Map free-text payment terms to a payment code.
+
+    Args:
+        payment_terms: Offer's payment terms (may be None)
+
+    Returns:
+        Index into PAYMENT_TERM_CLASSES, or PAYMENT_CODE_OTHER
+    """
+    terms = (payment_terms or "").lower()
+    for code, (phrases, _) in enumerate(PAYMENT_TERM_CLASSES):
+        if any(phrase in terms for phrase in phrases):
+            return code
+    return PAYMENT_CODE_OTHER
+
+
+def _as_float(value: Any) -> float:
+    """Column value for an optional number; NaN marks a missing one."""
+    return np.nan if value is None else float(value)
+
+
+@dataclass
+class OfferColumns:
+    """A leaderboard laid out as parallel arrays, one row per offer"""
+    vendor_ids: List[str]
+    offers: List[Dict[str, Any]]
+    unit_prices: np.ndarray
+    delivery_days: np.ndarray
+    payment_codes: np.ndarray
+    status_scores: np.ndarray
+
+    @classmethod
+    def from_offers(cls, offers: Dict[Any, Dict[str, Any]]) -> "OfferColumns":
+        """
+        Build columns from a {vendor_id: offer dict} mapping, preserving order.
+
+        Args:
+            offers: Offer snapshots keyed by vendor id
+
+        Returns:
+            OfferColumns with NaN for missing prices/delivery days
+        """
+        rows = list(offers.values())
+        return cls(
+            vendor_ids=[str(vendor_id) for vendor_id in offers],
+            offers=rows,
+            unit_prices=np.fromiter(
+                (_as_float(offer.get("price_total")) for offer in rows), dtype=np.float64, count=len(rows)
+            ),
+            delivery_days=np.fromiter(
+                (_as_float(offer.get("delivery_days")) for offer in rows), dtype=np.float64, count=len(rows)
+            ),
+            payment_codes=np.fromiter(
+                (classify_payment_terms(offer.get("payment_terms")) for offer in rows), dtype=np.intp, count=len(rows)
+            ),
+            status_scores=np.fromiter(
+                (status_score(offer.get("status")) for offer in rows), dtype=np.float64, count=len(rows)
+            ),
+        )
+
+    def __len__(self) -> int:
+        return len(self.vendor_ids)
+
+    def criteria(self, best_price: float) -> np.ndarray:
+        """Per-criterion scores, one row per offer (columns in CRITERIA order)."""
+        return criterion_scores(self.unit_prices, self.delivery_days, self.payment_codes, self.status_scores, best_price)
+
+    def scores(self, best_price: float, weights: ScoreWeights = DEFAULT_WEIGHTS) -> np.ndarray:
+        """Score every offer against the market's best price."""
+        return weighted_scores(self.criteria(best_price), weights)
+
+
+def criterion_scores(
+    unit_prices: np.ndarray,
+    delivery_days: np.ndarray,
+    payment_codes: np.ndarray,
+    status_scores: np.ndarray,
+    best_price: float
+) -> np.ndarray:
+    """
+    Score each criterion of each offer (0-100, higher is better).
+
+    Mirrors calculate_vendor_score term by term: a price that is missing or
+    zero (or a zero best price) scores 0, and missing or zero delivery days
+    count as NO_DELIVERY_SCORE.
+
+    Args:
+        unit_prices: Offered price_total per offer (NaN if missing)
+        delivery_days: Delivery days per offer (NaN if missing)
+        payment_codes: classify_payment_terms() code per offer
+        status_scores: status_score() per offer
+        best_price: Best price in the market
+
+    Returns:
+        (n, len(CRITERIA)) float array
+    """
+    has_price = ~np.isnan(unit_prices) & (unit_prices != 0) & bool(best_price)
+    safe_prices = np.where(has_price, unit_prices, 1.0)
+    price_scores = np.where(has_price, np.minimum(100, best_price / safe_prices * 100), 0.0)
+
+    has_delivery = ~np.isnan(delivery_days) & (delivery_days != 0)
+    delivery_scores = np.where(
+        has_delivery,
+        np.maximum(0, 100 - np.nan_to_num(delivery_days) * DELIVERY_POINTS_PER_DAY),
+        NO_DELIVERY_SCORE
+    )
+
+    payment_scores = PAYMENT_CODE_SCORES[payment_codes]
+
+    return np.column_stack([price_scores, delivery_scores, payment_scores, status_scores]).astype(np.float64)
+
+
+def weighted_scores(criteria: np.ndarray, weights: ScoreWeights = DEFAULT_WEIGHTS) -> np.ndarray:
+    """
+    Combine criterion scores into vendor scores.
+
+    Args:
+        criteria: Output of criterion_scores (or rows of it)
+        weights: Weight per criterion
+
+    Returns:
+        Float array of scores rounded to 2 decimals
+    """
+    # Same summation order as the scalar version so floats match exactly
+    raw = np.zeros(len(criteria), dtype=np.float64)
+    for column, weight in enumerate(weights.as_tuple()):
+        raw = raw + criteria[:, column] * weight
+
+    # Python's round() (correctly rounded decimal) rather than np.round, which
+    # can disagree on values that sit just below a .xx5 boundary
+    return np.array([round(value, 2) for value in raw.tolist()], dtype=np.float64)
+
+
+def rank_order(scores: Sequence[float]) -> np.ndarray:
+    """
+    Indices that sort offers by score, best first.
+
+    Ties keep their leaderboard order, matching list.sort(reverse=True).
+    """
+    return np.argsort(-np.asarray(scores, dtype=np.float64), kind="stable")
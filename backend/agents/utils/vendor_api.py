@@ -4,14 +4,46 @@ Vendor API Client
 Handles communication with external vendor APIs.
 """
 
+import asyncio
+import contextvars
 import logging
 import requests
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Iterable, Iterator, AsyncIterator
 from requests.exceptions import RequestException, Timeout, ConnectionError
 
+from agents.config import VENDOR_DETAILS_CONCURRENCY, VENDOR_DETAILS_TIMEOUT
+from agents.utils.http import get_session
+from agents.tracing import traced
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class VendorDetailsResult:
+    """Outcome of a single vendor details request in a bulk fetch"""
+    vendor_id: str
+    details: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _unique_ids(vendor_ids: Iterable[Any]) -> List[str]:
+    """Normalize ids to strings and drop repeats, keeping first-seen order."""
+    seen = set()
+    unique = []
+    for vendor_id in vendor_ids:
+        key = str(vendor_id)
+        if key not in seen:
+            seen.add(key)
+            unique.append(key)
+    return unique
+
+
 class VendorAPIClient:
     """
     Client for interacting with vendor APIs.
@@ -34,6 +66,7 @@ class VendorAPIClient:
         self.api_base_url = api_base_url or "https://api.vendors.example.com"
         logger.info(f"[VENDOR_API] Initialized with base URL: {self.api_base_url}")
     
+    @traced("vendor_api.get_all_vendors")
     def get_all_vendors(self, team_id: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Fetch all vendors from external API.
@@ -63,7 +96,7 @@ class VendorAPIClient:
         
         while retry_count < max_retries:
             try:
-                response = requests.get(
+                response = get_session().get(
                     endpoint,
                     params=params,
                     timeout=30  # 30 second timeout
@@ -127,12 +160,13 @@ class VendorAPIClient:
         # Should not reach here, but just in case
         raise Exception("Failed to fetch vendors: Unknown error")
     
-    def get_vendor_details(self, vendor_id: str) -> Dict[str, Any]:
+    def get_vendor_details(self, vendor_id: str, timeout: float = VENDOR_DETAILS_TIMEOUT) -> Dict[str, Any]:
         """
         Get detailed information about a specific vendor.
         
         Args:
             vendor_id: ID of the vendor
+            timeout: Request timeout in seconds
             
         Returns:
             Vendor details dictionary
@@ -141,9 +175,130 @@ class VendorAPIClient:
         logger.info(f"[VENDOR_API] Fetching vendor details from {endpoint}")
         
         try:
-            response = requests.get(endpoint, timeout=15)
+            response = get_session().get(endpoint, timeout=timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             logger.error(f"[VENDOR_API] Failed to fetch vendor details: {e}")
             raise
+
+    def _fetch_details_result(self, vendor_id: str, timeout: float) -> VendorDetailsResult:
+        """Fetch one vendor's details, capturing failures instead of raising."""
+        try:
+            return VendorDetailsResult(vendor_id=vendor_id, details=self.get_vendor_details(vendor_id, timeout=timeout))
+        except Exception as e:
+            return VendorDetailsResult(vendor_id=vendor_id, error=str(e))
+
+    def get_vendor_details_bulk(
+        self,
+        vendor_ids: Iterable[Any],
+        max_concurrency: int = VENDOR_DETAILS_CONCURRENCY,
+        timeout: float = VENDOR_DETAILS_TIMEOUT
+    ) -> Iterator[VendorDetailsResult]:
+        """
+        Fetch details for many vendors concurrently over the pooled session.
+        
+        Repeated ids are requested once. Results are yielded in completion
+        order, so callers can start using fast vendors while slow ones are
+        still in flight. A failed or timed-out vendor yields a result with
+        `error` set rather than aborting the whole batch.
+        
+        Args:
+            vendor_ids: Vendor ids to fetch (duplicates are ignored)
+            max_concurrency: Maximum requests in flight at once
+            timeout: Deadline in seconds for each request
+            
+        Yields:
+            VendorDetailsResult per unique vendor id, as each one arrives
+        """
+        unique_ids = _unique_ids(vendor_ids)
+        if not unique_ids:
+            return
+        
+        workers = max(1, min(max_concurrency, len(unique_ids)))
+        logger.info(f"[VENDOR_API] Bulk fetching details for {len(unique_ids)} vendors (concurrency: {workers})")
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vendor-details") as executor:
+            # Each request runs in the caller's context, so it is traced as part of the run
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._fetch_details_result, vendor_id, timeout)
+                for vendor_id in unique_ids
+            ]
+            for future in as_completed(futures):
+                yield future.result()
+
+    async def aget_vendor_details_bulk(
+        self,
+        vendor_ids: Iterable[Any],
+        max_concurrency: int = VENDOR_DETAILS_CONCURRENCY,
+        timeout: float = VENDOR_DETAILS_TIMEOUT
+    ) -> AsyncIterator[VendorDetailsResult]:
+        """
+        Async variant of get_vendor_details_bulk.
+        
+        Requests run in worker threads on the pooled session, bounded by a
+        semaphore, and each one is cut off by an asyncio deadline of
+        `timeout` seconds (measured from when it acquires a slot).
+        
+        Args:
+            vendor_ids: Vendor ids to fetch (duplicates are ignored)
+            max_concurrency: Maximum requests in flight at once
+            timeout: Deadline in seconds for each request
+            
+        Yields:
+            VendorDetailsResult per unique vendor id, as each one arrives
+        """
+        unique_ids = _unique_ids(vendor_ids)
+        if not unique_ids:
+            return
+        
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def fetch(vendor_id: str) -> VendorDetailsResult:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        asyncio.to_thread(self._fetch_details_result, vendor_id, timeout),
+                        timeout=timeout
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning(f"[VENDOR_API] Vendor {vendor_id} details exceeded {timeout}s deadline")
+                    return VendorDetailsResult(vendor_id=vendor_id, error=f"Deadline of {timeout}s exceeded")
+        
+        tasks = [asyncio.create_task(fetch(vendor_id)) for vendor_id in unique_ids]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def enrich_vendors(
+        self,
+        vendors: List[Dict[str, Any]],
+        max_concurrency: int = VENDOR_DETAILS_CONCURRENCY,
+        timeout: float = VENDOR_DETAILS_TIMEOUT
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge full details (including documents) into a vendor list.
+        
+        Vendors whose details could not be fetched are returned unchanged.
+        
+        Args:
+            vendors: Vendor dicts as returned by get_all_vendors
+            max_concurrency: Maximum requests in flight at once
+            timeout: Deadline in seconds for each request
+            
+        Returns:
+            New list of vendor dicts, in the original order
+        """
+        details_by_id = {}
+        for result in self.get_vendor_details_bulk(
+            (vendor.get("id") for vendor in vendors),
+            max_concurrency=max_concurrency,
+            timeout=timeout
+        ):
+            if result.ok and isinstance(result.details, dict):
+                details_by_id[result.vendor_id] = result.details
+        
+        return [{**vendor, **details_by_id.get(str(vendor.get("id")), {})} for vendor in vendors]
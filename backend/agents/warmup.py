@@ -0,0 +1,264 @@
+"""
+Speculative Pipeline Warm-up
+
+After /api/extract returns, the frontend typically waits for the user to
+confirm the order before opening the negotiation WebSocket. A warm-up uses
+that idle gap to fetch vendors, pre-load their documents and run the vendor
+evaluations in the background, keyed by a fingerprint of the order.
+
+When the graph later runs for a matching order, fetch_vendors_node and
+evaluate_vendor_node pick up the in-flight or finished results instead of
+starting cold. Warm-ups that are never claimed expire after
+WARMUP_TTL_SECONDS.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from agents.config import (
+    WARMUP_TTL_SECONDS,
+    WARMUP_MAX_ENTRIES,
+    WARMUP_EVAL_CONCURRENCY,
+    WARMUP_WAIT_SECONDS,
+)
+from agents.nodes.database_fetcher import load_vendors
+from agents.nodes.vendor_evaluator import SuitabilityResult, evaluate_vendor_suitability
+from agents.utils.file_utils import preload_files
+
+logger = logging.getLogger(__name__)
+
+
+def order_fingerprint(order: Optional[Dict[str, Any]]) -> Optional[str]:
+    """
+    Compute a stable fingerprint for an order.
+
+    Only fields that influence vendor selection are included, and the item
+    name is case/whitespace-normalized, so an order that round-trips through
+    the frontend unchanged maps to the same key.
+
+    Args:
+        order: OrderObject as dict
+
+    Returns:
+        Hex digest, or None if no order was given
+    """
+    if not order:
+        return None
+
+    quantity = order.get("quantity") or {}
+    requirements = order.get("requirements") or {}
+    canonical = {
+        "item": " ".join(str(order.get("item", "")).lower().split()),
+        "quantity": [quantity.get("min"), quantity.get("max"), quantity.get("preferred")],
+        "budget": float(order.get("budget") or 0),
+        "currency": str(order.get("currency", "")).upper(),
+        "mandatory": sorted(requirements.get("mandatory") or []),
+        "optional": sorted(requirements.get("optional") or []),
+        "urgency": str(order.get("urgency", "")).lower(),
+    }
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class WarmupEntry:
+    """Background work started for one order fingerprint"""
+    fingerprint: str
+    order: Dict[str, Any]
+    expires_at: float
+    vendors: Future = field(default_factory=Future)
+    evaluations: Dict[str, Future] = field(default_factory=dict)
+    # Set once the vendor list is known and every evaluation future exists
+    evaluations_ready: threading.Event = field(default_factory=threading.Event)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def cancel(self) -> None:
+        """Cancel any evaluations that have not started yet."""
+        for future in self.evaluations.values():
+            future.cancel()
+
+
+class WarmupRegistry:
+    """
+    Tracks speculative warm-ups by order fingerprint.
+
+    Evaluations from all warm-ups share one bounded executor so a burst of
+    extract calls cannot flood the LLM. The driver for each warm-up (vendor
+    fetch + document pre-load) runs on its own daemon thread.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = WARMUP_TTL_SECONDS,
+        max_entries: int = WARMUP_MAX_ENTRIES,
+        eval_concurrency: int = WARMUP_EVAL_CONCURRENCY
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, WarmupEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, eval_concurrency),
+            thread_name_prefix="warmup-eval"
+        )
+
+    def start(self, order: Dict[str, Any]) -> Optional[str]:
+        """
+        Start a warm-up for an order, unless one is already live.
+
+        Args:
+            order: OrderObject as dict
+
+        Returns:
+            Fingerprint the warm-up is keyed by
+        """
+        fingerprint = order_fingerprint(order)
+        if fingerprint is None:
+            return None
+
+        with self._lock:
+            self._prune_locked()
+            if fingerprint in self._entries:
+                logger.info(f"[WARMUP] Already warming {fingerprint}")
+                return fingerprint
+
+            entry = WarmupEntry(
+                fingerprint=fingerprint,
+                order=dict(order),
+                expires_at=time.monotonic() + self.ttl_seconds
+            )
+            self._entries[fingerprint] = entry
+            while len(self._entries) > self.max_entries:
+                _, evicted = self._entries.popitem(last=False)
+                evicted.cancel()
+
+        logger.info(f"[WARMUP] Starting warm-up {fingerprint} for {order.get('item')}")
+        threading.Thread(
+            target=self._run,
+            args=(entry,),
+            name=f"warmup-{fingerprint[:8]}",
+            daemon=True
+        ).start()
+        return fingerprint
+
+    def _run(self, entry: WarmupEntry) -> None:
+        """Fetch vendors, pre-load documents and schedule evaluations."""
+        try:
+            vendors = load_vendors()
+        except Exception as e:
+            logger.warning(f"[WARMUP] Vendor fetch failed for {entry.fingerprint}: {e}")
+            entry.vendors.set_exception(e)
+            entry.evaluations_ready.set()
+            return
+
+        entry.vendors.set_result(vendors)
+
+        # Pre-load documents before evaluating so evaluator and strategist
+        # calls (warm or cold) hit the file cache
+        filenames = {
+            doc.get("filename")
+            for vendor in vendors
+            for doc in vendor.get("documents") or []
+            if isinstance(doc, dict)
+        }
+        loaded = preload_files(filenames)
+        logger.info(f"[WARMUP] Pre-loaded {loaded}/{len(filenames)} documents for {entry.fingerprint}")
+
+        for vendor in vendors:
+            if entry.expired:
+                break
+            entry.evaluations[str(vendor.get("id"))] = self._executor.submit(
+                evaluate_vendor_suitability, vendor, entry.order
+            )
+        entry.evaluations_ready.set()
+        logger.info(f"[WARMUP] Scheduled {len(entry.evaluations)} evaluations for {entry.fingerprint}")
+
+    def _get(self, order: Optional[Dict[str, Any]]) -> Optional[WarmupEntry]:
+        """Look up the live warm-up for an order, if any."""
+        fingerprint = order_fingerprint(order)
+        if fingerprint is None:
+            return None
+        with self._lock:
+            self._prune_locked()
+            return self._entries.get(fingerprint)
+
+    def wait_for_vendors(
+        self,
+        order: Optional[Dict[str, Any]],
+        timeout: float = WARMUP_WAIT_SECONDS
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return the warm-up's vendor list, waiting if it is still in flight.
+
+        Returns:
+            Vendor list, or None if there is no usable warm-up (caller fetches cold)
+        """
+        entry = self._get(order)
+        if entry is None:
+            return None
+        # A claimed warm-up must outlive the evaluation phase that follows
+        entry.expires_at = max(entry.expires_at, time.monotonic() + self.ttl_seconds)
+        try:
+            return entry.vendors.result(timeout=timeout)
+        except FutureTimeoutError:
+            logger.warning(f"[WARMUP] Timed out waiting for vendors of {entry.fingerprint}")
+        except Exception as e:
+            logger.info(f"[WARMUP] Warm-up vendor fetch unusable ({e}), fetching cold")
+        return None
+
+    def wait_for_evaluation(
+        self,
+        order: Optional[Dict[str, Any]],
+        vendor_id: Any,
+        timeout: float = WARMUP_WAIT_SECONDS
+    ) -> Optional[SuitabilityResult]:
+        """
+        Return the warm-up's evaluation of a vendor, waiting if in flight.
+
+        Returns:
+            SuitabilityResult, or None if there is none (caller evaluates cold)
+        """
+        entry = self._get(order)
+        if entry is None:
+            return None
+
+        deadline = time.monotonic() + timeout
+        if not entry.evaluations_ready.wait(timeout=timeout):
+            return None
+        future = entry.evaluations.get(str(vendor_id))
+        if future is None or future.cancelled():
+            return None
+        try:
+            return future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            logger.warning(f"[WARMUP] Timed out waiting for evaluation of vendor {vendor_id}")
+        except Exception as e:
+            logger.info(f"[WARMUP] Warm-up evaluation of vendor {vendor_id} failed ({e}), evaluating cold")
+        return None
+
+    def _prune_locked(self) -> None:
+        """Drop expired entries. Caller must hold the lock."""
+        expired = [fp for fp, entry in self._entries.items() if entry.expired]
+        for fingerprint in expired:
+            self._entries.pop(fingerprint).cancel()
+            logger.info(f"[WARMUP] Expired unused warm-up {fingerprint}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._prune_locked()
+            return len(self._entries)
+
+
+# Process-wide registry shared by the API and the graph nodes
+warmup_registry = WarmupRegistry()
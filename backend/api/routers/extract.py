@@ -1,31 +1,105 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from typing import Optional
 import logging
-from agents.nodes.extractor import OrderExtractorAgent
+from agents.config import BULK_EXTRACT_CONCURRENCY, BULK_EXTRACT_MAX_CONCURRENCY
+from agents.nodes.extractor import extraction_path_stats
+from agents.warmup import warmup_registry
+from api.services.admission import AdmissionRejected
+from api.services.extraction import extraction_admission, extraction_service
+from api.services.bulk_extraction import detect_format, read_rows, stream_bulk_extraction, ndjson_lines
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 class ExtractRequest(BaseModel):
     text: str
+    # Speculatively fetch and evaluate vendors while the user reviews the order
+    warmup: bool = False
 
 @router.post("/extract")
 async def extract_order(request: ExtractRequest):
     """
     Extracts structured order data from natural language text.
     """
-    try:
-        if not request.text:
-            raise HTTPException(status_code=400, detail="Text input is required")
+    if not request.text:
+        raise HTTPException(status_code=400, detail="Text input is required")
 
+    try:
         logger.info(f"Extracting order from text: {request.text[:50]}...")
         
-        agent = OrderExtractorAgent()
-        order = agent.extract(request.text)
+        async with extraction_admission.admit():
+            order = await extraction_service.extract(request.text)
         
         logger.info(f"Successfully extracted order for: {order.item}")
+        
+        if request.warmup:
+            warmup_registry.start(order.model_dump())
+            
         return order
         
+    except AdmissionRejected as e:
+        raise e.http_exception()
     except Exception as e:
         logger.error(f"Error extracting order: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/extract/bulk")
+async def extract_bulk(
+    request: Request,
+    format: Optional[str] = None,
+    concurrency: int = Query(BULK_EXTRACT_CONCURRENCY, ge=1, le=BULK_EXTRACT_MAX_CONCURRENCY)
+):
+    """
+    Extracts orders from a CSV (with header) or JSONL request body.
+    
+    Streams one NDJSON record per row as each extraction completes, followed
+    by a summary record. The format comes from `?format=csv|jsonl`, else the
+    Content-Type, else the body itself.
+    """
+    body = (await request.body()).decode("utf-8-sig", errors="replace")
+    if not body.strip():
+        raise HTTPException(status_code=400, detail="Request body is empty")
+    
+    fmt = format or detect_format(request.headers.get("content-type"), body[:256])
+    try:
+        rows = read_rows(body, fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        extraction_admission.check()
+    except AdmissionRejected as e:
+        raise e.http_exception()
+    
+    async def admitted_extract(text: str):
+        # Every row takes a slot like a single extraction request, so a bulk
+        # request never runs more extractions than the pool allows
+        async with extraction_admission.admit(reject=False):
+            return await extraction_service.extract(text)
+    
+    async def admitted_lines():
+        extractions = stream_bulk_extraction(
+            rows,
+            extract=admitted_extract,
+            max_concurrency=min(concurrency, extraction_admission.max_concurrent)
+        )
+        async for line in ndjson_lines(extractions):
+            yield line
+    
+    logger.info(f"Bulk extracting {len(rows)} rows ({fmt})")
+    return StreamingResponse(admitted_lines(), media_type="application/x-ndjson")
+
+
+@router.get("/extract/stats")
+async def extraction_stats():
+    """
+    Reports fast-path coverage and per-path latency, plus batching counters.
+    """
+    return {
+        "paths": extraction_path_stats.snapshot(),
+        "service": extraction_service.stats.as_dict(),
+        "admission": extraction_admission.stats()
+    }
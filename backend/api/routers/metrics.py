@@ -0,0 +1,15 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from agents.metrics import CONTENT_TYPE, metrics
+
+router = APIRouter()
+
+
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Node and LLM latency, token usage, vendor API outcomes, runs, WebSocket
+    connections and negotiation turns in the Prometheus text format.
+    """
+    return Response(metrics.render(), media_type=CONTENT_TYPE)
@@ -1,17 +1,30 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 import logging
 import json
 import asyncio
+from typing import Any, AsyncIterator, Dict, Optional
 
-# Import the graph application
-# We need to make sure this import works based on python path, usually 'agents.graph' should work if running from backend root
-from agents.graph import app as graph_app
+from agents.run_cancellation import REASON_DISCONNECTED, REASON_REQUESTED
+from agents.metrics import counts_websocket
+from api.services.admission import AdmissionRejected
+from api.services.event_protocol import PROTOCOL_FULL, resolve_protocol
+from api.services.event_protocol import dumps
+from api.services.run_jobs import RunJob, RunRequest, parse_last_offset, run_jobs
+from api.services.wire_format import ENCODING_JSON, encode, negotiated_compression, resolve_encoding, send_encoded
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Fields of the run's final "result" line on the NDJSON stream
+RESULT_FIELDS = (
+    "run_id", "status", "rounds_completed", "leaderboard", "live_market", "final_comparison_report", "error"
+)
+
 @router.websocket("/ws")
+@counts_websocket
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
     logger.info("WebSocket connection established")
@@ -21,73 +34,41 @@ async def websocket_endpoint(websocket: WebSocket):
         initial_data = await websocket.receive_json()
         logger.info(f"Received start command: {initial_data}")
         
-        user_input = initial_data.get("user_input", "")
-        order_object = initial_data.get("order_object")
-        
-        if not order_object and user_input:
-             # Fallback if no order object provided - but typically it should be provided now
-             # We could technically call the agent here or let the graph fail, but let's just log warning
-             logger.warning("No order_object provided in start command")
-
-        # Prepare initial state
-        initial_state = {
-            "user_input": user_input,
-            "webhook_url": None,
-            "order_object": order_object,
-            "all_vendors": [],
-            "relevant_vendors": [],
-            "vendor_strategies": {},
-            "negotiation_history": {},
-            "leaderboard": {},
-            "conversation_ids": {},
-            "rounds_completed": 0,
-            "max_rounds": 3,
-            "market_analysis": None,
-            "final_comparison_report": None,
-            "phase": "starting",
-            "error": None
-        }
-
-        # Override defaults if provided
-        if "max_rounds" in initial_data:
-            initial_state["max_rounds"] = initial_data["max_rounds"]
-            
-        # 2. Run the graph stream
-        # Using a sync wrapper if needed, or if app.stream is sync/async compatible
-        # LangGraph app.stream is usually synchronous generator, but can be async?
-        # If app.stream is sync, we might need run_in_executor to not block the event loop
-        
-        # Let's try iterating directly assuming it yields events
-        # We need to send updates back to the frontend
+        # "compact" streams deltas and snapshots instead of raw state updates
+        protocol = resolve_protocol(initial_data.get("protocol"))
         
-        logger.info("Starting graph execution stream...")
+        # "msgpack" sends binary MessagePack frames instead of JSON text
+        encoding = resolve_encoding(initial_data.get("encoding"))
         
-        # Note: If app.stream is blocking, we should wrap it. 
-        # Standard LangGraph compiled graph .stream() is usually synchronous unless async nodes are used.
-        # However, for this environment, let's assume we can iterate.
-        # To be safe against blocking the WS heartbeat, we might need to be careful.
+        # Offset of the last event received before the connection dropped
+        last_offset = parse_last_offset(initial_data.get("last_offset"))
         
-        # Ideally we use app.astream if available for async support
-        if hasattr(graph_app, "astream"):
-            async for event in graph_app.astream(initial_state):
-                await process_and_send_event(websocket, event)
+        if initial_data.get("run_id"):
+            # Attach to (or resume) a run started earlier (POST /api/runs or another socket)
+            job = run_jobs.get(initial_data["run_id"])
+            if job is None:
+                await websocket.send_json({
+                    "type": "error",
+                    "payload": {"message": f"Unknown run {initial_data['run_id']}"}
+                })
+                return
         else:
-            # Fallback for sync stream - might block
-            for event in graph_app.stream(initial_state):
-                await process_and_send_event(websocket, event)
-                # Small yield to let other tasks run
-                await asyncio.sleep(0.01)
-
-        # 3. Send completion message
-        await websocket.send_json({
-            "type": "complete",
-            "payload": {}
-        })
-        logger.info("Graph execution completed")
+            # The run belongs to this connection: it is cancelled if the client
+            # does not come back soon after a disconnect
+            request = RunRequest(**{
+                key: initial_data[key]
+                for key in ("user_input", "order_object", "max_rounds", "deadline_seconds", "team_id")
+                if initial_data.get(key) is not None
+            })
+            try:
+                job, _ = run_jobs.submit(request, cancel_on_disconnect=True)
+            except AdmissionRejected as e:
+                await websocket.send_json({"type": "error", "payload": e.payload()})
+                return
         
-        # Keep connection open until client closes? Or close it?
-        # Usually keep it open so client can read everything
-        await websocket.receive_text() # Wait for close
+        # 2. Forward the run's events; the run executes on the worker pool
+        logger.info(f"Streaming run {job.run_id}...")
+        await stream_job(websocket, job, protocol, last_offset, encoding)
 
     except WebSocketDisconnect:
         logger.info("WebSocket disconnected")
@@ -101,44 +82,146 @@ async def websocket_endpoint(websocket: WebSocket):
         except:
             pass
 
-async def process_and_send_event(websocket: WebSocket, event: Dict[str, Any]):
+
+@router.post("/stream")
+async def stream_negotiation(request: RunRequest, protocol: Optional[str] = None):
+    """
+    Start a negotiation and stream it as newline-delimited JSON, for
+    clients that do not speak WebSocket (batch tooling, ERP integrations).
+    
+    Every line is one message of the WebSocket stream (same run job, same
+    messages; ?protocol=compact sends deltas and snapshots). The first line
+    names the run, the last one is a "result" line with the final
+    leaderboard and comparison report.
+    
+    Like a run started over the WebSocket, the run is cancelled if the
+    client disconnects and does not resume it (GET /api/runs/{run_id}/events
+    ?last_offset=) within the grace period.
+    """
+    try:
+        protocol = resolve_protocol(protocol)
+        job, _ = run_jobs.submit(request, cancel_on_disconnect=True)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionRejected as e:
+        raise e.http_exception()
+    logger.info(f"Streaming run {job.run_id} as NDJSON...")
+    return StreamingResponse(
+        ndjson_lines(job, protocol),
+        media_type=NDJSON_MEDIA_TYPE,
+        # Proxies (nginx) must not buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def ndjson_lines(job: RunJob, protocol: str = PROTOCOL_FULL) -> AsyncIterator[str]:
+    """Lines of a run's NDJSON stream, from the same subscription as a WebSocket client."""
+    subscription = job.subscribe(protocol)
+    try:
+        yield ndjson_line({
+            "type": "subscribed",
+            "payload": {"run_id": job.run_id, "status": job.status, "protocol": protocol}
+        })
+        async for _, _, text in subscription:
+            yield text + "\n"
+        yield ndjson_line({"type": "result", "payload": run_result(job)})
+    finally:
+        # A disconnect only detaches the stream (see stream_negotiation)
+        subscription.close()
+
+
+def ndjson_line(message: Dict[str, Any]) -> str:
+    return dumps(message) + "\n"
+
+
+def run_result(job: RunJob) -> Dict[str, Any]:
+    """Final report of a finished run."""
+    snapshot = job.snapshot()
+    return {field: snapshot[field] for field in RESULT_FIELDS}
+
+
+async def stream_job(
+    websocket: WebSocket,
+    job: RunJob,
+    protocol: str = PROTOCOL_FULL,
+    last_offset: Optional[int] = None,
+    encoding: str = ENCODING_JSON
+) -> None:
     """
-    Process a LangGraph event and send a formatted message to the frontend.
+    Forward a run's events to one WebSocket subscriber until the run ends,
+    while watching the socket for a cancel message or a disconnect.
+    
+    The first message names the run, so the client can resume it with
+    {"run_id", "last_offset"} if the connection drops; events then carry
+    their offset as "seq". It also reports the wire encoding and
+    compression in effect; every message, this one included, uses them.
+    
+    A cancel message cancels the run for every subscriber; the run then
+    publishes a "cancelled" message. A disconnect only detaches this
+    subscriber (runs started by the connection itself are cancelled once
+    nobody has resumed it for a while). After the run ends the socket stays open until
+    the client closes it.
     """
-    for node_name, state_update in event.items():
-        # Determine the message type based on the node
-        msg_type = "progress"
-        payload = {"node": node_name, "state_update": state_update}
+    subscription = job.subscribe(protocol, last_offset, encoding)
+    await send_encoded(websocket, encode({
+        "type": "subscribed",
+        "payload": {
+            "run_id": job.run_id,
+            "status": job.status,
+            "protocol": protocol,
+            "last_offset": last_offset,
+            "encoding": encoding,
+            "compression": negotiated_compression(websocket),
+        }
+    }, encoding))
+    forward_task = asyncio.create_task(forward_events(websocket, subscription))
+    listen_task = asyncio.create_task(wait_for_cancel(websocket))
+    try:
+        await asyncio.wait({forward_task, listen_task}, return_when=asyncio.FIRST_COMPLETED)
         
-        # Create a more user-friendly message based on the node
-        user_message = f"Completed step: {node_name}"
+        if listen_task.done():
+            reason = listen_task.result()
+            if reason != REASON_REQUESTED:
+                return
+            logger.info(f"Cancelling run {job.run_id} ({reason})")
+            job.cancel(reason)
+            await forward_task
+            return
         
-        if node_name == "extract_order":
-            # should not happen anymore in new flow, but keeping for safety
-            user_message = "Order details extracted successfully."
-            
-        elif node_name == "fetch_vendors":
-            count = len(state_update.get("all_vendors", []))
-            user_message = f"Found {count} potential vendors in the database."
-            
-        elif node_name == "evaluate_vendor":
-            # This might happen multiple times in parallel/sequence
-            user_message = "Evaluated vendor suitability."
-            
-        elif node_name == "generate_strategy":
-            user_message = "Generated negotiation strategy."
-            
-        elif node_name == "negotiate":
-            # This is a big one, maybe we can extract partial results
-            # state_update might contain 'leaderboard'
-            user_message = "Negotiation round completed."
-            
-        elif node_name == "aggregator":
-            user_message = "Finalizing market analysis and reports."
-            
-        # Send the raw event + formatted text
-        await websocket.send_json({
-            "type": msg_type,
-            "message": user_message,
-            "payload": payload
-        })
+        # Surface send failures; then keep the connection until the client closes it
+        forward_task.result()
+        await listen_task
+    finally:
+        for task in (forward_task, listen_task):
+            if not task.done():
+                task.cancel()
+        subscription.close()
+
+
+async def forward_events(websocket: WebSocket, subscription) -> None:
+    """
+    Sender task: drain a subscription's outbound queue to the client
+    (messages are serialized once per run). A slow client only lets its own
+    queue fill up; the run keeps going and the queue is coalesced.
+    """
+    async for _, _, data in subscription:
+        await send_encoded(websocket, data)
+
+
+async def wait_for_cancel(websocket: WebSocket) -> str:
+    """
+    Wait for a {"type": "cancel"} message or a disconnect.
+    
+    Returns:
+        Cancellation reason
+    """
+    while True:
+        try:
+            message = await websocket.receive_json()
+        except WebSocketDisconnect:
+            return REASON_DISCONNECTED
+        except ValueError:
+            continue
+        if isinstance(message, dict) and message.get("type") == "cancel":
+            return REASON_REQUESTED
+
@@ -0,0 +1,288 @@
+from fastapi import APIRouter, Header, HTTPException, Response, WebSocket
+from fastapi.responses import StreamingResponse
+from typing import Optional
+import asyncio
+import logging
+
+from agents.config import WHAT_IF_MAX_SCENARIOS
+from agents.metrics import counts_websocket
+from agents.run_cancellation import cancellation_metrics
+from agents.run_deadline import run_latencies
+from agents.run_results import run_results
+from agents.team_scheduling import TEAM_WEIGHT_TABLE, team_scheduler, team_usage
+from agents.tracing import critical_path, run_traces, spans_from_otlp
+from api.routers.negotiation import stream_job
+from api.services.admission import AdmissionRejected
+from api.services.event_protocol import resolve_protocol
+from api.services.run_jobs import RunRequest, broadcast_metrics, parse_last_offset, run_jobs
+from api.services.run_multiplexer import RunMultiplexer
+from api.services.wire_format import resolve_encoding
+from api.services.what_if import WhatIfRequest, WhatIfResponse, evaluate_scenarios
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+
+def _load_run(run_id: str):
+    try:
+        result = run_results.load(run_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"No stored results for run {run_id}")
+    return result
+
+
+def _load_trace(run_id: str):
+    trace = run_traces.get(run_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"No trace for run {run_id}")
+    return trace
+
+
+def _get_job(run_id: str):
+    job = run_jobs.get(run_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown or expired run {run_id}")
+    return job
+
+
+@router.post("", status_code=202)
+async def create_run(
+    request: RunRequest,
+    response: Response,
+    idempotency_key: Optional[str] = Header(default=None)
+):
+    """
+    Start a negotiation run in the background and return its id.
+    
+    Re-submitting the same request (or the same Idempotency-Key) while the
+    run is queued or running returns that run with 200 instead of starting
+    a duplicate. When too many runs are already waiting for a worker the
+    request is rejected with 503 and a Retry-After header.
+    """
+    try:
+        job, created = run_jobs.submit(request, key=idempotency_key or request.dedupe_key())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except AdmissionRejected as e:
+        raise e.http_exception()
+    if not created:
+        response.status_code = 200
+    return {"run_id": job.run_id, "status": job.status, "deduplicated": not created}
+
+
+@router.get("/latency")
+async def get_run_latency():
+    """
+    Run latency percentiles over recent runs and the p99 SLO status.
+    """
+    return run_latencies.summary()
+
+
+@router.get("/cancellations")
+async def get_cancellation_metrics():
+    """
+    Cancelled runs and their LLM/vendor API calls: skipped (never made),
+    abandoned in flight (left to finish in the background) or stopped
+    mid-generation.
+    """
+    return cancellation_metrics.snapshot()
+
+
+@router.get("/broadcast")
+async def get_broadcast_metrics():
+    """
+    Outbound queue depth of live subscribers and the messages dropped or
+    coalesced for clients that could not keep up.
+    """
+    return broadcast_metrics.snapshot()
+
+
+@router.get("/admission")
+async def get_admission_stats():
+    """
+    Runs executing and waiting for a worker, and runs turned away.
+    """
+    return run_jobs.admission_stats()
+
+
+@router.get("/teams")
+async def get_team_usage():
+    """
+    Per-team runs, LLM calls and tokens, vendor API requests and time spent
+    waiting for quota, plus the fair schedulers' slots in use and waiting and
+    the abandoned calls still finishing outside their slots.
+    """
+    usage = team_usage.snapshot()
+    for team, counts in run_jobs.team_stats().items():
+        usage.setdefault(team, {}).update(counts)
+    return {"teams": usage, "weights": TEAM_WEIGHT_TABLE, "schedulers": team_scheduler.stats()}
+
+
+@router.get("/{run_id}/results")
+async def get_run_results(run_id: str):
+    """
+    Return the stored final leaderboard of a run.
+    """
+    result = _load_run(run_id)
+    return {
+        "run_id": result.run_id,
+        "order": result.order,
+        "rounds_completed": result.rounds_completed,
+        "status": result.status,
+        "saved_at": result.saved_at,
+        "leaderboard": result.leaderboard,
+    }
+
+
+@router.get("/{run_id}/trace")
+async def get_run_trace(run_id: str):
+    """
+    Spans of a run's nodes, LLM calls, vendor API requests and negotiation
+    turns as OTLP/JSON (in progress runs return the spans ended so far).
+    """
+    return _load_trace(run_id)
+
+
+@router.get("/{run_id}/critical-path")
+async def get_run_critical_path(run_id: str):
+    """
+    The chain of spans that determined a run's wall time, with each span's
+    own time on the path and the totals per span name.
+    """
+    return {"run_id": run_id, **critical_path(spans_from_otlp(_load_trace(run_id)))}
+
+
+@router.post("/{run_id}/what-if", response_model=WhatIfResponse)
+async def what_if(run_id: str, request: WhatIfRequest):
+    """
+    Re-score a finished run under alternative weights, budgets or quantities.
+    
+    Uses only the run's stored leaderboard (no LLM calls); every scenario in
+    the batch is answered in one response.
+    """
+    if len(request.scenarios) > WHAT_IF_MAX_SCENARIOS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {WHAT_IF_MAX_SCENARIOS} scenarios per request"
+        )
+    result = _load_run(run_id)
+    # Scoring is CPU-bound; keep it off the event loop
+    return await asyncio.to_thread(evaluate_scenarios, result, request)
+
+
+@router.get("/{run_id}")
+async def get_run(run_id: str):
+    """
+    Status and current leaderboard of a run.
+    
+    Runs no longer kept in memory are answered from their stored results.
+    """
+    job = run_jobs.get(run_id)
+    if job is not None:
+        return job.snapshot()
+    result = _load_run(run_id)
+    return {
+        "run_id": result.run_id,
+        "status": result.status,
+        "finished_at": result.saved_at,
+        "rounds_completed": result.rounds_completed,
+        "leaderboard": result.leaderboard,
+    }
+
+
+@router.post("/{run_id}/cancel")
+async def cancel_run(run_id: str):
+    """
+    Cancel a queued or running run for all of its subscribers.
+    """
+    job = _get_job(run_id)
+    return {"run_id": run_id, "cancelled": job.cancel(), "status": job.status}
+
+
+@router.get("/{run_id}/events")
+async def stream_run_events(
+    run_id: str,
+    protocol: Optional[str] = None,
+    last_offset: Optional[str] = None,
+    last_event_id: Optional[str] = Header(default=None)
+):
+    """
+    Server-sent events of a run: everything published so far, then live
+    events until the run ends. ?protocol=compact sends deltas and snapshots.
+    
+    Event ids are log offsets, so a reconnecting EventSource (Last-Event-ID
+    header) or ?last_offset= resumes with only the missed events.
+    """
+    try:
+        protocol = resolve_protocol(protocol)
+        last_offset = parse_last_offset(last_offset if last_offset is not None else last_event_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job = _get_job(run_id)
+    subscription = job.subscribe(protocol, last_offset)
+
+    async def events():
+        try:
+            async for offset, message_type, text in subscription:
+                # Live-only messages (tokens) have no id, so Last-Event-ID stays on the log
+                event_id = f"id: {offset}\n" if offset is not None else ""
+                yield f"{event_id}event: {message_type}\ndata: {text}\n\n"
+        finally:
+            subscription.close()
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@router.websocket("/ws")
+@counts_websocket
+async def multiplexed_websocket(websocket: WebSocket, encoding: Optional[str] = None):
+    """
+    One connection for many runs: start, subscribe to, unsubscribe from and
+    cancel runs by id; every event is tagged with its run id (see
+    api.services.run_multiplexer).
+    """
+    await websocket.accept()
+    try:
+        encoding = resolve_encoding(encoding)
+    except ValueError as e:
+        await websocket.send_json({"run_id": None, "event": {"type": "error", "payload": {"message": str(e)}}})
+        await websocket.close()
+        return
+    try:
+        await RunMultiplexer(websocket, run_jobs, encoding).serve()
+    except Exception as e:
+        logger.info(f"Multiplexed subscriber left: {e}")
+
+
+@router.websocket("/{run_id}/ws")
+@counts_websocket
+async def run_websocket(
+    websocket: WebSocket,
+    run_id: str,
+    protocol: Optional[str] = None,
+    last_offset: Optional[str] = None,
+    encoding: Optional[str] = None
+):
+    """
+    WebSocket subscriber of a run; accepts {"type": "cancel"} like /api/negotiate/ws.
+    ?last_offset= resumes after the last event received, ?encoding=msgpack
+    sends binary MessagePack frames.
+    """
+    await websocket.accept()
+    try:
+        protocol = resolve_protocol(protocol)
+        encoding = resolve_encoding(encoding)
+        last_offset = parse_last_offset(last_offset)
+        job = run_jobs.get(run_id)
+        if job is None:
+            raise ValueError(f"Unknown run {run_id}")
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "payload": {"message": str(e)}})
+        await websocket.close()
+        return
+    try:
+        await stream_job(websocket, job, protocol, last_offset, encoding)
+    except Exception as e:
+        logger.info(f"Run {run_id} subscriber left: {e}")
@@ -0,0 +1,3 @@
+"""
+Request-independent services shared by the API routers
+"""
@@ -0,0 +1,176 @@
+"""
+Admission Control
+
+Bounds how much LLM-heavy work the API takes on at once, so a burst of
+users waits briefly or is turned away quickly instead of slowing every run
+down:
+
+- Negotiation runs: RUN_WORKERS run at once on the worker pool and at most
+  RUN_QUEUE_LIMIT more wait with status "queued". Waiting runs publish
+  "queued" messages with their position whenever it changes (see
+  RunJobManager).
+- Extraction: EXTRACT_MAX_CONCURRENT requests at once, at most
+  EXTRACT_QUEUE_LIMIT waiting (AdmissionPool).
+
+The pools are independent, so a burst of cheap extraction calls cannot hold
+back negotiation runs and vice versa. A request that finds its pool's queue
+full is rejected at once (503) with a Retry-After estimate based on how long
+the pool's work typically takes.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from fastapi import HTTPException
+
+from agents.config import ADMISSION_RETRY_AFTER_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Smoothing of the typical duration of admitted work
+DURATION_EWMA_ALPHA = 0.2
+
+# Longest Retry-After suggested (seconds)
+MAX_RETRY_AFTER = 3600
+
+
+class AdmissionRejected(Exception):
+    """The pool is at capacity and its wait queue is full."""
+
+    def __init__(self, pool: str, retry_after: int, status_code: int = 503, message: Optional[str] = None):
+        super().__init__(message or f"Too many {pool} requests, retry in {retry_after}s")
+        self.pool = pool
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+    def http_exception(self) -> HTTPException:
+        return HTTPException(
+            status_code=self.status_code, detail=str(self), headers={"Retry-After": str(self.retry_after)}
+        )
+
+    def payload(self) -> Dict[str, Any]:
+        """Error payload for streaming clients (WebSocket, NDJSON)."""
+        return {"message": str(self), "status": self.status_code, "retry_after": self.retry_after}
+
+
+def retry_after_estimate(typical_seconds: Optional[float], waiting: int, capacity: int) -> int:
+    """
+    Seconds until a slot is likely to free up for a new request.
+
+    Args:
+        typical_seconds: Typical duration of one unit of work (None if unknown)
+        waiting: Requests already queued ahead
+        capacity: Units of work running at once
+    """
+    if typical_seconds is None:
+        return int(ADMISSION_RETRY_AFTER_SECONDS)
+    waves = (waiting + 1) / max(1, capacity)
+    return max(1, min(MAX_RETRY_AFTER, math.ceil(typical_seconds * waves)))
+
+
+class AdmissionPool:
+    """
+    Concurrency limit with a bounded FIFO wait queue, for async handlers.
+
+    Usage:
+        async with pool.admit():
+            ...
+
+    Not thread-safe: used from the API's event loop only.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int):
+        self.name = name
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.admitted = 0
+        self.rejected = 0
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._typical_seconds: Optional[float] = None
+
+    def check(self) -> None:
+        """
+        Reject at once if a new request would find the queue full.
+
+        For handlers that admit their work later (streamed responses) but
+        must answer with an error status before the response starts.
+
+        Raises:
+            AdmissionRejected: Every slot is taken and the queue is full
+        """
+        if self._active >= self.max_concurrent and len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            logger.warning(f"[ADMISSION] Rejected {self.name} request ({len(self._waiters)} waiting)")
+            raise AdmissionRejected(self.name, self.retry_after())
+
+    @asynccontextmanager
+    async def admit(self, reject: bool = True) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of the block, waiting in line if needed.
+
+        Args:
+            reject: Reject when the queue is full; False waits in line
+                regardless (the request already passed check())
+
+        Raises:
+            AdmissionRejected: Every slot is taken and the queue is full
+        """
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+        else:
+            if reject:
+                self.check()
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # A slot was handed over just as the client went away
+                    self._release()
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+
+        self.admitted += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._record(time.monotonic() - started)
+            self._release()
+
+    def _release(self) -> None:
+        """Hand the slot to the next waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def _record(self, seconds: float) -> None:
+        if self._typical_seconds is None:
+            self._typical_seconds = seconds
+        else:
+            self._typical_seconds += DURATION_EWMA_ALPHA * (seconds - self._typical_seconds)
+
+    def retry_after(self) -> int:
+        return retry_after_estimate(self._typical_seconds, len(self._waiters), self.max_concurrent)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "active": self._active,
+            "waiting": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "typical_seconds": self._typical_seconds,
+        }
@@ -0,0 +1,238 @@
+"""
+Bulk Order Extraction
+
+Streams procurement requests from a CSV or JSONL file through order
+extraction with bounded concurrency and emits one NDJSON record per row as
+soon as it is ready (completion order, tagged with the row number).
+
+Identical rows (after whitespace normalization) are extracted once; later
+copies reuse the first row's result and are marked with `duplicate_of`.
+
+Used by POST /api/extract/bulk and as a CLI:
+
+    python -m api.services.bulk_extraction requests.csv -o orders.ndjson
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+
+from agents.config import BULK_EXTRACT_CONCURRENCY
+from api.services.extraction import extraction_service, normalize_text
+from models.order import OrderObject
+
+logger = logging.getLogger(__name__)
+
+# Column / key names accepted as the request text, in priority order
+TEXT_FIELDS = ("text", "request", "input", "description", "order")
+
+# Column / key names accepted as a caller-supplied row id
+ID_FIELDS = ("id", "row_id", "request_id")
+
+
+@dataclass
+class BulkRow:
+    """One request read from the input file"""
+    index: int
+    row_id: str
+    text: str
+
+
+def _pick(record: Dict[str, Any], names: Iterable[str]) -> Optional[str]:
+    lowered = {str(k).strip().lower(): k for k in record}
+    for name in names:
+        if name in lowered:
+            return lowered[name]
+    return None
+
+
+def iter_csv_rows(lines: Iterable[str]) -> Iterator[BulkRow]:
+    """
+    Read requests from CSV with a header row.
+
+    The text column is the first of TEXT_FIELDS present, otherwise the first
+    column. An id column (see ID_FIELDS) is used as row_id when present.
+    """
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames:
+        raise ValueError("CSV input has no header row")
+
+    text_field = _pick({name: None for name in reader.fieldnames}, TEXT_FIELDS) or reader.fieldnames[0]
+    id_field = _pick({name: None for name in reader.fieldnames}, ID_FIELDS)
+
+    for index, record in enumerate(reader, 1):
+        text = (record.get(text_field) or "").strip()
+        row_id = (record.get(id_field) or "").strip() if id_field else ""
+        yield BulkRow(index=index, row_id=row_id or str(index), text=text)
+
+
+def iter_jsonl_rows(lines: Iterable[str]) -> Iterator[BulkRow]:
+    """
+    Read requests from JSONL: each line is a string or an object with a text
+    field (see TEXT_FIELDS). Blank lines are skipped.
+    """
+    index = 0
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        index += 1
+        try:
+            value = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}")
+
+        if isinstance(value, str):
+            yield BulkRow(index=index, row_id=str(index), text=value.strip())
+        elif isinstance(value, dict):
+            text_key = _pick(value, TEXT_FIELDS)
+            id_key = _pick(value, ID_FIELDS)
+            text = str(value.get(text_key) or "").strip() if text_key else ""
+            row_id = str(value[id_key]) if id_key and value.get(id_key) is not None else str(index)
+            yield BulkRow(index=index, row_id=row_id, text=text)
+        else:
+            raise ValueError(f"Line {line_number} must be a string or an object")
+
+
+def detect_format(name_or_type: Optional[str], sample: str) -> str:
+    """Pick 'csv' or 'jsonl' from a filename/content type, else from the content."""
+    hint = (name_or_type or "").lower()
+    if "csv" in hint:
+        return "csv"
+    if any(marker in hint for marker in ("jsonl", "ndjson", "json")):
+        return "jsonl"
+    return "jsonl" if sample.lstrip().startswith(("{", '"')) else "csv"
+
+
+def read_rows(content: str, fmt: str) -> List[BulkRow]:
+    """
+    Parse a whole CSV/JSONL document into rows.
+
+    Raises:
+        ValueError: If the format is unknown or the content is malformed
+    """
+    content = content.lstrip("\ufeff")
+    if fmt == "csv":
+        return list(iter_csv_rows(io.StringIO(content, newline="")))
+    if fmt == "jsonl":
+        return list(iter_jsonl_rows(content.splitlines()))
+    raise ValueError(f"Unsupported format: {fmt} (expected csv or jsonl)")
+
+
+def _record(row: BulkRow, order: Optional[OrderObject], error: Optional[str], duplicate_of: Optional[str]) -> Dict[str, Any]:
+    return {
+        "row": row.index,
+        "id": row.row_id,
+        "order": order.model_dump() if order is not None else None,
+        "error": error,
+        "duplicate_of": duplicate_of,
+    }
+
+
+async def stream_bulk_extraction(
+    rows: Iterable[BulkRow],
+    extract: Callable[[str], Awaitable[OrderObject]] = extraction_service.extract,
+    max_concurrency: int = BULK_EXTRACT_CONCURRENCY
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Extract every row, yielding a record per row as soon as it completes.
+
+    A final {"summary": {...}} record reports row, unique and error counts.
+
+    Args:
+        rows: Parsed input rows
+        extract: Coroutine function turning text into an OrderObject
+        max_concurrency: Maximum extractions in flight at once
+
+    Yields:
+        NDJSON-ready dicts
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    originals: Dict[str, Any] = {}
+    tasks: List[asyncio.Task] = []
+
+    async def run_extraction(text: str):
+        async with semaphore:
+            try:
+                return await extract(text), None
+            except Exception as e:
+                logger.warning(f"[BULK_EXTRACT] Extraction failed: {e}")
+                return None, str(e)
+
+    async def finish(row: BulkRow, extraction: Optional[asyncio.Task], duplicate_of: Optional[str]):
+        if extraction is None:
+            return _record(row, None, "Empty request text", None)
+        order, error = await asyncio.shield(extraction)
+        return _record(row, order, error, duplicate_of)
+
+    for row in rows:
+        if not row.text:
+            tasks.append(asyncio.create_task(finish(row, None, None)))
+            continue
+        key = normalize_text(row.text)
+        if key in originals:
+            first_row, extraction = originals[key]
+            tasks.append(asyncio.create_task(finish(row, extraction, first_row.row_id)))
+        else:
+            extraction = asyncio.create_task(run_extraction(row.text))
+            originals[key] = (row, extraction)
+            tasks.append(asyncio.create_task(finish(row, extraction, None)))
+
+    logger.info(f"[BULK_EXTRACT] {len(tasks)} rows, {len(originals)} unique requests")
+    errors = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            record = await next_done
+            if record["error"]:
+                errors += 1
+            yield record
+    finally:
+        for task in tasks:
+            task.cancel()
+        for _, extraction in originals.values():
+            extraction.cancel()
+
+    yield {"summary": {"rows": len(tasks), "unique": len(originals), "errors": errors}}
+
+
+async def ndjson_lines(records: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Serialize records as newline-delimited JSON."""
+    async for record in records:
+        yield json.dumps(record, default=str) + "\n"
+
+
+# ========== CLI ==========
+
+async def _run_cli(path: Path, fmt: Optional[str], output, concurrency: int) -> int:
+    content = path.read_text(encoding="utf-8-sig")
+    rows = read_rows(content, fmt or detect_format(path.name, content[:256]))
+    failed = False
+    async for record in stream_bulk_extraction(rows, max_concurrency=concurrency):
+        output.write(json.dumps(record, default=str) + "\n")
+        output.flush()
+        failed = failed or bool(record.get("error"))
+    return 1 if failed else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Extract OrderObjects from a CSV or JSONL file as NDJSON")
+    parser.add_argument("input", type=Path, help="CSV (with header) or JSONL file of requests")
+    parser.add_argument("-o", "--output", type=Path, help="Write NDJSON here instead of stdout")
+    parser.add_argument("--format", choices=("csv", "jsonl"), help="Input format (default: detect)")
+    parser.add_argument("--concurrency", type=int, default=BULK_EXTRACT_CONCURRENCY, help="Extractions in flight at once")
+    args = parser.parse_args(argv)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            return asyncio.run(_run_cli(args.input, args.format, output, args.concurrency))
+    return asyncio.run(_run_cli(args.input, args.format, sys.stdout, args.concurrency))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
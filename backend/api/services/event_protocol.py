@@ -0,0 +1,231 @@
+"""
+Compact Run Event Protocol
+
+The full protocol sends every node's raw state update. The compact
+protocol keeps a mirror of the state the client has seen and sends only
+what changed:
+
+    {"type": "delta", "seq": 12, "node": "negotiate", "message": "...",
+     "ops": [["s", ["leaderboard", "3", "price_total"], 95.0],
+             ["a", ["negotiation_history", "3"], [{...new entry...}]]]}
+
+Ops are applied in order to the client's copy of the state:
+
+- ["s", path, value]  set the value at path (creating missing dicts)
+- ["a", path, items]  append items to the list at path (creating it)
+- ["d", path]         delete the key at path
+
+Merged channels (leaderboard, conversation_ids, ...) are diffed per key,
+appended channels (relevant_vendors, negotiation_history entries) only
+send the new items, and replaced values (market analysis, final report,
+live market) are diffed recursively against the previous value.
+
+Every message carries a sequence number (its offset in the run's event
+log); a client that sees a gap resynchronizes from the next snapshot:
+
+    {"type": "snapshot", "seq": 40, "state": {...}}
+
+A snapshot is sent to every subscriber that joins a run in progress and
+after every EVENT_SNAPSHOT_INTERVAL deltas. Other messages (activity,
+turn, complete, cancelled, error) keep their full-protocol shape plus
+"seq"; live-only token messages are the same in both protocols and have
+no "seq".
+
+Full-protocol messages carry "seq" as well, so either kind of client can
+resume a dropped stream from its last offset; one resuming after its
+missed events have left the run's event log gets the same snapshot.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, get_type_hints
+
+from agents.state import GraphState, merge_dicts, merge_history, merge_lists
+
+try:
+    import orjson
+except ImportError:  # optional: pip install orjson
+    orjson = None
+
+PROTOCOL_FULL = "full"
+PROTOCOL_COMPACT = "compact"
+PROTOCOLS = (PROTOCOL_FULL, PROTOCOL_COMPACT)
+
+# How each channel's updates combine with the current value
+MERGE = "merge"
+APPEND = "append"
+APPEND_PER_KEY = "append_per_key"
+REPLACE = "replace"
+
+_REDUCER_MODES = {merge_dicts: MERGE, merge_lists: APPEND, merge_history: APPEND_PER_KEY}
+
+
+def _channel_modes() -> Dict[str, str]:
+    """Update mode of each GraphState channel, from its reducer annotation."""
+    modes = {}
+    for name, hint in get_type_hints(GraphState, include_extras=True).items():
+        reducer = next(iter(getattr(hint, "__metadata__", ())), None)
+        modes[name] = _REDUCER_MODES.get(reducer, REPLACE)
+    return modes
+
+
+CHANNEL_MODES = _channel_modes()
+
+
+def dumps(message: Dict[str, Any]) -> str:
+    """Serialize a message once for every subscriber (with orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(message, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+    return json.dumps(message, separators=(",", ":"), default=str)
+
+
+def normalize(value: Any) -> Any:
+    """Value as the client sees it after a JSON round trip (string keys, lists)."""
+    if isinstance(value, dict):
+        return {str(key): normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    return value
+
+
+def diff_values(old: Any, new: Any, path: List[str], ops: List[list]) -> None:
+    """
+    Append the ops that turn `old` into `new` (both normalized).
+
+    Dicts are diffed per key and equal-length lists per index (paths then
+    hold the int index), a list that extends the old one becomes an
+    append, anything else is set whole.
+    """
+    if old == new:
+        return
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old.keys() - new.keys():
+            ops.append(["d", path + [key]])
+        for key, value in new.items():
+            if key in old:
+                diff_values(old[key], value, path + [key], ops)
+            else:
+                ops.append(["s", path + [key], value])
+        return
+    if isinstance(old, list) and isinstance(new, list):
+        if len(new) == len(old):
+            for index, (old_item, new_item) in enumerate(zip(old, new)):
+                diff_values(old_item, new_item, path + [index], ops)
+            return
+        if len(new) > len(old) and new[:len(old)] == old:
+            ops.append(["a", path, new[len(old):]])
+            return
+    ops.append(["s", path, new])
+
+
+class DeltaEncoder:
+    """
+    Mirror of the state sent to compact subscribers of one run, and the
+    encoder of each node update against it.
+
+    Updates are normalized (copied) before use, so the mirror never shares
+    containers with the full-protocol messages of the same event.
+    """
+
+    def __init__(self, modes: Dict[str, str] = CHANNEL_MODES):
+        self.modes = modes
+        self.state: Dict[str, Any] = {}
+
+    def encode(self, state_update: Dict[str, Any]) -> List[list]:
+        """
+        Ops for one node update, applied to the mirror as a side effect.
+
+        Args:
+            state_update: Update as returned by the node
+
+        Returns:
+            Ops list (empty if nothing changed)
+        """
+        ops: List[list] = []
+        for channel, value in normalize(state_update or {}).items():
+            mode = self.modes.get(channel, REPLACE)
+            if mode == APPEND and isinstance(value, list):
+                if value:
+                    self.state.setdefault(channel, []).extend(value)
+                    ops.append(["a", [channel], value])
+            elif mode == APPEND_PER_KEY and isinstance(value, dict):
+                current = self.state.setdefault(channel, {})
+                for key, items in value.items():
+                    if items:
+                        current[key] = [*current.get(key, ()), *items]
+                        ops.append(["a", [channel, key], items])
+            elif mode == MERGE and isinstance(value, dict):
+                current = self.state.setdefault(channel, {})
+                for key, item in value.items():
+                    if key in current:
+                        diff_values(current[key], item, [channel, key], ops)
+                    else:
+                        ops.append(["s", [channel, key], item])
+                    current[key] = item
+            elif channel in self.state:
+                diff_values(self.state[channel], value, [channel], ops)
+                self.state[channel] = value
+            else:
+                ops.append(["s", [channel], value])
+                self.state[channel] = value
+        return ops
+
+    def snapshot(self, seq: int) -> Dict[str, Any]:
+        """Snapshot message of the mirror, covering every event up to `seq`."""
+        return {"type": "snapshot", "seq": seq, "state": self.state}
+
+
+def compact_message(message: Dict[str, Any], seq: int, encoder: DeltaEncoder) -> Dict[str, Any]:
+    """
+    Compact form of a full-protocol message.
+
+    Progress messages become deltas; other messages get a sequence number.
+    """
+    if message.get("type") != "progress":
+        return {**message, "seq": seq}
+    payload = message.get("payload") or {}
+    return {
+        "type": "delta",
+        "seq": seq,
+        "node": payload.get("node"),
+        "message": message.get("message"),
+        "ops": encoder.encode(payload.get("state_update")),
+    }
+
+
+def apply_ops(state: Dict[str, Any], ops: List[list]) -> Dict[str, Any]:
+    """
+    Apply delta ops to a client-side state (reference implementation).
+
+    Returns:
+        The updated state (modified in place)
+    """
+    for op in ops:
+        kind, path = op[0], op[1]
+        parent = state
+        for key in path[:-1]:
+            parent = parent[key] if isinstance(parent, list) else parent.setdefault(key, {})
+        last = path[-1]
+        if kind == "s":
+            parent[last] = op[2]
+        elif kind == "a":
+            current = parent[last] if isinstance(parent, list) else parent.get(last, ())
+            parent[last] = [*current, *op[2]]
+        elif kind == "d":
+            parent.pop(last, None)
+        else:
+            raise ValueError(f"Unknown delta op: {kind!r}")
+    return state
+
+
+def resolve_protocol(requested: Optional[str]) -> str:
+    """
+    Validate a requested protocol name (default: full).
+
+    Raises:
+        ValueError: Unknown protocol
+    """
+    if requested is None:
+        return PROTOCOL_FULL
+    if requested not in PROTOCOLS:
+        raise ValueError(f"Unknown event protocol {requested!r}, expected one of {', '.join(PROTOCOLS)}")
+    return requested
@@ -0,0 +1,152 @@
+"""
+Async Order Extraction Service
+
+Fronts OrderExtractorAgent for the /api/extract endpoint:
+- Single-flight: identical in-flight texts share one extraction.
+- Micro-batching: distinct texts arriving within a short window are sent
+  to the LLM together via OrderExtractorAgent.aextract_many.
+- Non-blocking: only async LLM calls are made on the event loop.
+
+extraction_admission bounds how many extraction requests the API handles
+at once (see api.services.admission), independently of negotiation runs.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from agents.config import (
+    EXTRACT_BATCH_WINDOW_MS,
+    EXTRACT_MAX_BATCH_SIZE,
+    EXTRACT_MAX_CONCURRENT,
+    EXTRACT_QUEUE_LIMIT,
+)
+from agents.nodes.extractor import OrderExtractorAgent
+from api.services.admission import AdmissionPool
+from models.order import OrderObject
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Key used for single-flight: whitespace-insensitive, otherwise exact."""
+    return " ".join(text.split())
+
+
+@dataclass
+class ExtractionStats:
+    """Counters describing how much work coalescing and batching saved"""
+    requests: int = 0
+    coalesced: int = 0
+    batches: int = 0
+    batched_texts: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class ExtractionService:
+    """
+    Coalescing, micro-batching front end for order extraction.
+
+    The agent is created lazily on first use and reused for all requests.
+    """
+
+    def __init__(
+        self,
+        agent_factory: Callable[[], Any] = OrderExtractorAgent,
+        batch_window_ms: float = EXTRACT_BATCH_WINDOW_MS,
+        max_batch_size: int = EXTRACT_MAX_BATCH_SIZE
+    ):
+        self.agent_factory = agent_factory
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.stats = ExtractionStats()
+        self._agent = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._pending: List[Tuple[str, str]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+    def _get_agent(self):
+        if self._agent is None:
+            self._agent = self.agent_factory()
+        return self._agent
+
+    async def extract(self, text: str) -> OrderObject:
+        """
+        Extract an order, sharing work with concurrent identical requests.
+
+        Args:
+            text: Raw user request
+
+        Returns:
+            Extracted OrderObject
+
+        Raises:
+            Exception: Whatever the underlying extraction raised for this text
+        """
+        loop = asyncio.get_running_loop()
+        key = normalize_text(text)
+        self.stats.requests += 1
+
+        future = self._inflight.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+            logger.info("[EXTRACT_SERVICE] Coalesced with identical in-flight request")
+        else:
+            future = loop.create_future()
+            # Avoid "exception was never retrieved" when every waiter went away
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._inflight[key] = future
+            self._pending.append((key, text))
+
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        # Shield so a cancelled client does not cancel the shared result
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        """Send everything collected so far as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._batch_tasks.add(task)
+        task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, str]]) -> None:
+        self.stats.batches += 1
+        self.stats.batched_texts += len(batch)
+        logger.info(f"[EXTRACT_SERVICE] Extracting batch of {len(batch)} texts")
+
+        try:
+            results = await self._get_agent().aextract_many([text for _, text in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        if len(results) != len(batch):
+            results = [RuntimeError("Extraction returned an incomplete batch")] * len(batch)
+
+        for (key, _), result in zip(batch, results):
+            future = self._inflight.pop(key, None)
+            if future is None or future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+# Process-wide service used by the extract router
+extraction_service = ExtractionService()
+
+# Admission pool of the extract router (each row of a bulk request takes a slot)
+extraction_admission = AdmissionPool("extraction", EXTRACT_MAX_CONCURRENT, EXTRACT_QUEUE_LIMIT)
@@ -0,0 +1,988 @@
+"""
+Negotiation Run Jobs
+
+Runs live independently of any one connection: POST /api/runs queues a
+job and returns its run id, GET /api/runs/{run_id} reports its status and
+current leaderboard, and any number of WebSocket / SSE subscribers can
+attach to its event stream at any time (a late subscriber first receives
+every event published so far, or a snapshot with the compact protocol; see
+api.services.event_protocol).
+
+Every event gets the next offset ("seq") in the run's bounded event log. A
+client whose connection dropped resubscribes with the last offset it saw
+and receives only the events it missed, or a snapshot if they have left
+the log, before switching to live delivery. Runs started over a WebSocket
+survive a disconnect for RUN_RESUME_GRACE_SECONDS so the client can
+resume them instead of starting a new run.
+
+Jobs execute on a bounded worker pool, separate from request handling:
+each worker thread drives one run on its own event loop, so graph nodes
+never compete with the API's event loop or its default executor. Jobs
+beyond the pool size wait with status "queued" and publish "queued"
+messages with their position in line; once RUN_QUEUE_LIMIT jobs wait, new
+ones are rejected (see api.services.admission). Waiting jobs start in
+weighted fair order by team rather than first come, first served, and a
+team with TEAM_MAX_CONCURRENT_RUNS active runs cannot submit more (see
+agents.team_scheduling).
+
+Submitting the same request again while its run is still queued or running
+(e.g. after a page refresh) returns the existing run instead of starting a
+duplicate.
+
+Besides the node updates ("progress"), jobs stream what the nodes are
+doing as they do it (see agents.run_stream): "activity" and "turn" messages
+are logged like any other event, while "token" messages (chunks of a
+message or strategy being generated) are only delivered live: they carry
+no "seq", are never replayed, and a resumed client gets the complete text
+from the "turn" message or node update instead.
+
+Publishing never waits for a client: each subscriber has a bounded
+outbound queue (SUBSCRIBER_QUEUE_SIZE) drained by its connection's sender
+task. A subscriber that falls behind loses queued tokens and has its queued
+progress coalesced into one snapshot of the latest state; queue depths and
+losses are reported by broadcast_metrics.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+from pydantic import BaseModel, Field
+
+from agents.config import (
+    EVENT_LOG_MAX_EVENTS,
+    EVENT_SNAPSHOT_INTERVAL,
+    RUN_JOB_RETENTION,
+    RUN_QUEUE_LIMIT,
+    RUN_RESUME_GRACE_SECONDS,
+    RUN_WORKERS,
+    SUBSCRIBER_QUEUE_SIZE,
+    TEAM_MAX_CONCURRENT_RUNS,
+)
+from agents.graph import astream_run
+from agents.metrics import RUNS, metrics
+from agents.run_cancellation import REASON_DISCONNECTED, REASON_REQUESTED, CancelToken
+from agents.run_context import new_run_id
+from agents.run_deadline import RunDeadline, resolve_deadline_seconds, run_latencies
+from agents.run_results import STATUS_CANCELLED, STATUS_COMPLETED, STATUS_DEADLINE_REACHED
+from agents.run_stream import EVENT_TOKEN, STREAM_KEY
+from agents.team_scheduling import FairQueue, resolve_team_id, team_usage
+from api.services.admission import AdmissionRejected, retry_after_estimate
+from api.services.event_protocol import PROTOCOL_COMPACT, PROTOCOL_FULL, DeltaEncoder, compact_message, dumps
+from api.services.wire_format import ENCODING_JSON, encode
+
+logger = logging.getLogger(__name__)
+
+# Job lifecycle (finished jobs end with one of the run result statuses)
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_FAILED = "failed"
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+# Message types delivered to current subscribers only, outside the event log
+LIVE_ONLY_TYPES = (EVENT_TOKEN,)
+
+# Last message of a run; never dropped for a lagging subscriber
+FINAL_TYPES = ("complete", "cancelled", "error")
+
+# RunSubscription.poll() result when nothing is queued
+EMPTY = object()
+
+
+class RunRequest(BaseModel):
+    """Parameters of a negotiation run (same fields as the WebSocket start message)"""
+    user_input: str = ""
+    order_object: Optional[Dict[str, Any]] = None
+    max_rounds: int = Field(default=3, ge=1)
+    deadline_seconds: Optional[float] = None
+    # Team sharing LLM and vendor API capacity (default: NEGOTIATION_TEAM_ID)
+    team_id: Optional[str] = None
+
+    def dedupe_key(self) -> str:
+        """Hash identifying identical requests."""
+        canonical = json.dumps(self.model_dump(), sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def build_initial_state(request: RunRequest) -> Dict[str, Any]:
+    """Initial graph state for a run request."""
+    if not request.order_object and request.user_input:
+        logger.warning("No order_object provided in run request")
+    return {
+        "user_input": request.user_input,
+        "webhook_url": None,
+        "order_object": request.order_object,
+        "all_vendors": [],
+        "relevant_vendors": [],
+        "vendor_strategies": {},
+        "negotiation_history": {},
+        "leaderboard": {},
+        "conversation_ids": {},
+        "rounds_completed": 0,
+        "max_rounds": request.max_rounds,
+        "market_analysis": None,
+        "live_market": None,
+        "final_comparison_report": None,
+        "phase": "starting",
+        "error": None
+    }
+
+
+def parse_last_offset(value: Any) -> Optional[int]:
+    """
+    Validate a client's last received offset (None when not resuming).
+
+    Raises:
+        ValueError: Not an integer >= -1
+    """
+    if value is None or value == "":
+        return None
+    try:
+        offset = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"last_offset must be an integer, got {value!r}")
+    if offset < -1:
+        raise ValueError("last_offset must be >= -1")
+    return offset
+
+
+def format_event(event: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Turn a LangGraph event into the messages sent to the frontend.
+
+    Returns:
+        One {"type": "progress", "message", "payload": {node, state_update}} per
+        node, or one {"type": activity|token|turn, "message", "payload"} for a
+        streamed event
+    """
+    messages = []
+    for node_name, state_update in event.items():
+        if node_name == STREAM_KEY:
+            messages.append(stream_message(state_update))
+            continue
+        state_update = state_update or {}
+        user_message = f"Completed step: {node_name}"
+
+        if node_name == "fetch_vendors":
+            count = len(state_update.get("all_vendors", []))
+            user_message = f"Found {count} potential vendors in the database."
+        elif node_name == "evaluate_vendor":
+            user_message = "Evaluated vendor suitability."
+        elif node_name == "generate_strategy":
+            user_message = "Generated negotiation strategy."
+        elif node_name == "negotiate":
+            user_message = "Negotiation round completed."
+            live_market = state_update.get("live_market")
+            if live_market:
+                user_message = f"Negotiation round completed. {live_market['summary']}"
+        elif node_name == "aggregator":
+            user_message = "Finalizing market analysis and reports."
+            if state_update.get("deadline_reached"):
+                user_message = "Deadline reached. Reporting the best offers so far."
+
+        messages.append({
+            "type": "progress",
+            "message": user_message,
+            "payload": {"node": node_name, "state_update": state_update}
+        })
+    return messages
+
+
+def stream_message(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Message for an event streamed from inside a node (see agents.run_stream)."""
+    message = {"type": event["event"], "payload": event.get("payload") or {}}
+    if event.get("message"):
+        message["message"] = event["message"]
+    return message
+
+
+class RunEvent:
+    """One entry of a job's event log, serialized once for all subscribers."""
+
+    __slots__ = ("offset", "type", "message", "compact", "_full_text", "_compact_message", "_packed")
+
+    def __init__(
+        self,
+        offset: int,
+        type: str,
+        message: Optional[Dict[str, Any]],
+        compact: str,
+        full_text: Optional[str] = None,
+        compact_message: Optional[Dict[str, Any]] = None
+    ):
+        # None for live-only events (not in the log)
+        self.offset = offset
+        self.type = type
+        # Full-protocol message (None for compact-only snapshots)
+        self.message = message
+        self.compact = compact
+        self._full_text = full_text
+        # Compact message as built, to encode without parsing `compact` back
+        self._compact_message = compact_message
+        self._packed: Dict[str, bytes] = {}
+
+    def text(self, protocol: str) -> Optional[str]:
+        """Serialized message in a protocol, or None if it has no such form."""
+        if protocol == PROTOCOL_COMPACT:
+            return self.compact
+        if self._full_text is None and self.message is not None:
+            self._full_text = dumps({**self.message, "seq": self.offset})
+        return self._full_text
+
+    def encoded(self, protocol: str, encoding: str = ENCODING_JSON) -> Optional[Union[str, bytes]]:
+        """Message in a protocol and wire encoding (see api.services.wire_format)."""
+        if encoding == ENCODING_JSON:
+            return self.text(protocol)
+        if protocol not in self._packed:
+            # Compact and parsed messages already have string keys only
+            normalized = protocol == PROTOCOL_COMPACT
+            if protocol == PROTOCOL_COMPACT:
+                message = self._compact_message
+            elif self.message is not None:
+                message = {**self.message, "seq": self.offset} if self.offset is not None else self.message
+            else:
+                message = None
+            if message is None:
+                text = self.text(protocol)
+                if text is None:
+                    return None
+                # Snapshots keep only their text (the mirror they came from changes)
+                message, normalized = json.loads(text), True
+            self._packed[protocol] = encode(message, encoding, normalized)
+        return self._packed[protocol]
+
+
+class BroadcastMetrics:
+    """Outbound queue depth of live subscribers and the messages lagging ones lost."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions: "weakref.WeakSet[RunSubscription]" = weakref.WeakSet()
+        self._dropped: Dict[str, int] = {}
+        self._coalesced = 0
+        self._max_depth = 0
+
+    def track(self, subscription: "RunSubscription") -> None:
+        with self._lock:
+            self._subscriptions.add(subscription)
+
+    def record_drop(self, message_type: str) -> None:
+        with self._lock:
+            self._dropped[message_type] = self._dropped.get(message_type, 0) + 1
+
+    def record_coalesce(self) -> None:
+        with self._lock:
+            self._coalesced += 1
+
+    def record_depth(self, depth: int) -> None:
+        if depth > self._max_depth:
+            with self._lock:
+                self._max_depth = max(self._max_depth, depth)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            depths = [s.depth for s in self._subscriptions if not s.closed]
+            return {
+                "subscribers": len(depths),
+                "queued_messages": sum(depths),
+                "queue_depth_max": max(depths, default=0),
+                "queue_depth_peak": self._max_depth,
+                "queue_size": SUBSCRIBER_QUEUE_SIZE,
+                "messages_dropped": dict(self._dropped),
+                "coalesced": self._coalesced,
+            }
+
+
+# Process-wide broadcast metrics (GET /api/runs/broadcast)
+broadcast_metrics = BroadcastMetrics()
+
+
+class RunSubscription:
+    """
+    One subscriber's view of a job's events: the backlog at subscription
+    time followed by live events, ending after the job's final message.
+
+    Messages wait in a bounded outbound queue until the connection's sender
+    takes them, so a slow client never holds up the run. When the queue is
+    full, a live-only message (token) is dropped; any other message
+    coalesces everything queued into one snapshot of the current state
+    (latest leaderboard included) so the client catches up in one step.
+    Final messages are always delivered.
+
+    Subscriptions drained by one sender (several runs multiplexed over a
+    connection) share its `ready` event and are read with poll().
+    """
+
+    def __init__(
+        self,
+        job: "RunJob",
+        loop: asyncio.AbstractEventLoop,
+        protocol: str = PROTOCOL_FULL,
+        max_queue: int = SUBSCRIBER_QUEUE_SIZE,
+        encoding: str = ENCODING_JSON,
+        ready: Optional[asyncio.Event] = None
+    ):
+        self.job = job
+        self.protocol = protocol
+        self.encoding = encoding
+        self.max_queue = max(1, max_queue)
+        self._loop = loop
+        self._lock = threading.Lock()
+        self._pending: Deque[Optional[RunEvent]] = deque()
+        self._ready = ready if ready is not None else asyncio.Event()
+        self._wakeup_scheduled = False
+        self.closed = False
+        self.max_depth = 0
+        self.dropped: Dict[str, int] = {}
+        self.coalesced = 0
+        broadcast_metrics.track(self)
+
+    @property
+    def depth(self) -> int:
+        """Messages queued for the client."""
+        return len(self._pending)
+
+    def _put(self, event: Optional[RunEvent]) -> None:
+        """Queue a message without the size limit (backlog at subscription time)."""
+        with self._lock:
+            self._pending.append(event)
+        self._wake()
+
+    def _deliver(self, event: Optional[RunEvent]) -> None:
+        """Queue a live message; called from the job's worker thread with the job locked."""
+        if self.closed:
+            return
+        with self._lock:
+            if event is not None and len(self._pending) >= self.max_queue:
+                if event.offset is None:
+                    self._drop_locked(event)
+                    return
+                final = event.type in FINAL_TYPES
+                # A final message changes no state: it follows the snapshot
+                snapshot = self.job._lag_snapshot_locked(event.offset - 1 if final else event.offset)
+                for queued in self._pending:
+                    self._drop_locked(queued)
+                self._pending.clear()
+                self._pending.append(snapshot)
+                self.coalesced += 1
+                broadcast_metrics.record_coalesce()
+                if final:
+                    self._pending.append(event)
+                else:
+                    self._drop_locked(event)
+            else:
+                self._pending.append(event)
+                if len(self._pending) > self.max_depth:
+                    self.max_depth = len(self._pending)
+                    broadcast_metrics.record_depth(self.max_depth)
+        self._wake()
+
+    def _drop_locked(self, event: RunEvent) -> None:
+        self.dropped[event.type] = self.dropped.get(event.type, 0) + 1
+        broadcast_metrics.record_drop(event.type)
+
+    def _wake(self) -> None:
+        """Wake the sender (at most one pending wakeup)."""
+        with self._lock:
+            if self._wakeup_scheduled:
+                return
+            self._wakeup_scheduled = True
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # The subscriber's event loop is gone
+            self.closed = True
+
+    def poll(self) -> Any:
+        """
+        Next queued message without waiting: a RunEvent, None once the job
+        has finished, or EMPTY. EMPTY re-arms the wakeup, so clear the
+        ready event before polling, not after.
+        """
+        with self._lock:
+            if self._pending:
+                return self._pending.popleft()
+            self._wakeup_scheduled = False
+            return EMPTY
+
+    async def _next(self) -> Optional[RunEvent]:
+        while True:
+            self._ready.clear()
+            event = self.poll()
+            if event is not EMPTY:
+                return event
+            await self._ready.wait()
+
+    async def __aiter__(self) -> AsyncIterator[Tuple[Optional[int], str, Union[str, bytes]]]:
+        """
+        Yield (offset, message type, encoded message) until the job has
+        finished; offset is None for live-only messages.
+        """
+        while not self.closed:
+            event = await self._next()
+            if event is None:
+                break
+            data = event.encoded(self.protocol, self.encoding)
+            if data is not None:
+                yield event.offset, event.type, data
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and losses of this subscriber."""
+        return {
+            "protocol": self.protocol,
+            "encoding": self.encoding,
+            "queue_depth": self.depth,
+            "queue_depth_max": self.max_depth,
+            "messages_dropped": dict(self.dropped),
+            "coalesced": self.coalesced,
+        }
+
+    def close(self) -> None:
+        """Stop receiving events."""
+        if not self.closed:
+            self.closed = True
+            self.job._unsubscribe(self)
+
+
+class RunJob:
+    """
+    One negotiation run and its published events.
+
+    Thread-safe: the worker thread publishes while API handlers read the
+    status and subscribe.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        request: RunRequest,
+        key: Optional[str] = None,
+        cancel_on_disconnect: bool = False,
+        snapshot_interval: int = EVENT_SNAPSHOT_INTERVAL,
+        max_events: int = EVENT_LOG_MAX_EVENTS,
+        disconnect_grace: float = RUN_RESUME_GRACE_SECONDS,
+        subscriber_queue: int = SUBSCRIBER_QUEUE_SIZE
+    ):
+        self.run_id = run_id
+        self.request = request
+        self.team = resolve_team_id(request.team_id)
+        self.key = key
+        # Cancel when the last subscriber has been gone for disconnect_grace
+        # seconds (runs started over a WebSocket)
+        self.cancel_on_disconnect = cancel_on_disconnect
+        self.disconnect_grace = disconnect_grace
+        self.snapshot_interval = max(1, snapshot_interval)
+        self.subscriber_queue = subscriber_queue
+        self.cancel_token = CancelToken()
+        self.status = JOB_QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.first_event_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[str] = None
+        self.phase: Optional[str] = None
+        # Place in line while queued (1 = next to start), None otherwise
+        self.queue_position: Optional[int] = None
+        self.rounds_completed = 0
+        self.leaderboard: Dict[str, Any] = {}
+        self.live_market: Optional[Dict[str, Any]] = None
+        self.final_comparison_report: Optional[Dict[str, Any]] = None
+
+        self._lock = threading.Lock()
+        # Most recent events; older ones are only reachable through snapshots
+        self._events: Deque[RunEvent] = deque(maxlen=max(1, max_events))
+        self._next_offset = 0
+        self._orphan_timer: Optional[threading.Timer] = None
+        self._encoder = DeltaEncoder()
+        self._deltas_since_snapshot = 0
+        self._lag_snapshot: Optional[RunEvent] = None
+        self._subscribers: List[RunSubscription] = []
+        self._worker_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker_task: Optional[asyncio.Task] = None
+        # Told when the job leaves the queue: (job, started)
+        self._on_dequeue: Optional[Callable[["RunJob", bool], None]] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status not in ACTIVE_STATUSES
+
+    # ========== Events ==========
+
+    def publish(self, message: Dict[str, Any]) -> None:
+        """
+        Append a message to the event log and queue it for every subscriber.
+
+        Never waits for a client: delivery only fills the subscribers'
+        bounded queues (coalescing those that lag).
+        """
+        with self._lock:
+            if self.first_event_at is None:
+                self.first_event_at = time.time()
+            if message["type"] in LIVE_ONLY_TYPES:
+                text = dumps(message)
+                events = [RunEvent(None, message["type"], message, text, full_text=text, compact_message=message)]
+            else:
+                events = self._append_locked(message)
+            # Delivered under the lock so a coalescing snapshot matches the queue
+            for subscription in self._subscribers:
+                for event in events:
+                    subscription._deliver(event)
+
+    def _append_locked(self, message: Dict[str, Any]) -> List[RunEvent]:
+        """Log a message, plus a compact snapshot when one is due."""
+        offset = self._next_offset
+        compact = compact_message(message, offset, self._encoder)
+        events = [RunEvent(offset, message["type"], message, dumps(compact), compact_message=compact)]
+        self._track(message)
+
+        if compact["type"] == "delta":
+            self._deltas_since_snapshot += 1
+            if self._deltas_since_snapshot >= self.snapshot_interval:
+                self._deltas_since_snapshot = 0
+                events.append(RunEvent(offset + 1, "snapshot", None, dumps(self._encoder.snapshot(offset + 1))))
+        self._events.extend(events)
+        self._next_offset += len(events)
+        return events
+
+    def _lag_snapshot_locked(self, seq: int) -> RunEvent:
+        """Snapshot for lagging subscribers, shared by all that lag at the same offset."""
+        if self._lag_snapshot is None or self._lag_snapshot.offset != seq:
+            text = dumps(self._encoder.snapshot(seq))
+            self._lag_snapshot = RunEvent(seq, "snapshot", None, text, full_text=text)
+        return self._lag_snapshot
+
+    def _track(self, message: Dict[str, Any]) -> None:
+        """Keep the fields GET /api/runs/{run_id} reports current."""
+        state_update = (message.get("payload") or {}).get("state_update")
+        if not isinstance(state_update, dict):
+            return
+        for vendor_id, offer in (state_update.get("leaderboard") or {}).items():
+            self.leaderboard[str(vendor_id)] = offer
+        self.rounds_completed = state_update.get("rounds_completed", self.rounds_completed)
+        self.phase = state_update.get("phase", self.phase)
+        self.live_market = state_update.get("live_market", self.live_market)
+        self.final_comparison_report = state_update.get("final_comparison_report", self.final_comparison_report)
+
+    def subscribe(
+        self,
+        protocol: str = PROTOCOL_FULL,
+        last_offset: Optional[int] = None,
+        encoding: str = ENCODING_JSON,
+        ready: Optional[asyncio.Event] = None
+    ) -> RunSubscription:
+        """
+        Attach a subscriber on the calling event loop.
+
+        A new full-protocol subscription replays every event still in the
+        log; a new compact one starts from a snapshot of the current state
+        instead. A resuming subscription (last_offset given) receives only
+        the events after last_offset, or a snapshot if some of them have
+        left the log or would overflow the subscriber's queue. All then
+        follow the live stream, and for a finished job end after its final
+        message.
+
+        Args:
+            protocol: PROTOCOL_FULL or PROTOCOL_COMPACT
+            last_offset: Offset ("seq") of the last event the client received
+            encoding: ENCODING_JSON or ENCODING_MSGPACK (WebSocket subscribers)
+            ready: Event shared with other subscriptions of the same sender
+        """
+        subscription = RunSubscription(
+            self, asyncio.get_running_loop(), protocol, self.subscriber_queue, encoding, ready
+        )
+        with self._lock:
+            first_offset = self._events[0].offset if self._events else self._next_offset
+            if last_offset is not None:
+                replay_from = last_offset + 1
+                needs_snapshot = replay_from < first_offset
+            else:
+                replay_from = first_offset
+                needs_snapshot = protocol == PROTOCOL_COMPACT and self._next_offset > 0
+            needs_snapshot = needs_snapshot or self._next_offset - replay_from > subscription.max_queue
+            if needs_snapshot:
+                # The final message (if any) changes no state; replay it after the snapshot
+                replay_from = self._next_offset - (1 if self.finished else 0)
+                # Serialized now, while the mirror still matches it; both protocols get it
+                subscription._put(self._lag_snapshot_locked(replay_from - 1))
+
+            for event in self._events:
+                if event.offset >= replay_from:
+                    subscription._put(event)
+            if self.finished:
+                subscription._put(None)
+            else:
+                self._subscribers.append(subscription)
+                self._cancel_orphan_timer_locked()
+        return subscription
+
+    def _unsubscribe(self, subscription: RunSubscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+            orphaned = self.cancel_on_disconnect and not self._subscribers and not self.finished
+            if orphaned and self.disconnect_grace > 0:
+                # Give the client time to reconnect and resume
+                self._cancel_orphan_timer_locked()
+                self._orphan_timer = threading.Timer(self.disconnect_grace, self._cancel_if_orphaned)
+                self._orphan_timer.daemon = True
+                self._orphan_timer.start()
+                return
+        if orphaned:
+            self.cancel(REASON_DISCONNECTED)
+
+    def _cancel_if_orphaned(self) -> None:
+        with self._lock:
+            orphaned = not self._subscribers and not self.finished
+            self._orphan_timer = None
+        if orphaned:
+            logger.info(f"[RUNS] No subscriber came back for run {self.run_id}")
+            self.cancel(REASON_DISCONNECTED)
+
+    def _cancel_orphan_timer_locked(self) -> None:
+        if self._orphan_timer is not None:
+            self._orphan_timer.cancel()
+            self._orphan_timer = None
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    # ========== Lifecycle ==========
+
+    def _start(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task) -> bool:
+        """Mark the job running on a worker; False if it was cancelled while queued."""
+        with self._lock:
+            if self.status != JOB_QUEUED or self.cancel_token.cancelled:
+                return False
+            self.status = JOB_RUNNING
+            self.started_at = time.time()
+            self.queue_position = None
+            self._worker_loop = loop
+            self._worker_task = task
+        if self._on_dequeue is not None:
+            self._on_dequeue(self, True)
+        return True
+
+    def _finish(self, status: str, message: Dict[str, Any], error: Optional[str] = None) -> None:
+        """Publish the final message and close every subscription."""
+        with self._lock:
+            events = self._append_locked(message)
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+            for subscription in self._subscribers:
+                for event in events:
+                    subscription._deliver(event)
+                subscription._deliver(None)
+            self._subscribers = []
+            self._cancel_orphan_timer_locked()
+            self._worker_loop = self._worker_task = None
+
+    def cancel(self, reason: str = REASON_REQUESTED) -> bool:
+        """
+        Cancel the job: a queued job ends at once, a running one stops its
+        in-flight calls and ends with its offers so far.
+
+        Returns:
+            False if the job had already finished or been cancelled
+        """
+        with self._lock:
+            if self.finished or not self.cancel_token.cancel(reason):
+                return False
+            queued = self.status == JOB_QUEUED
+            loop, task = self._worker_loop, self._worker_task
+        if queued:
+            self.queue_position = None
+            self._finish(STATUS_CANCELLED, _cancelled_message(self.run_id, reason))
+            if self._on_dequeue is not None:
+                self._on_dequeue(self, False)
+        elif loop is not None and task is not None:
+            loop.call_soon_threadsafe(task.cancel)
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Status and current results, as returned by GET /api/runs/{run_id}."""
+        with self._lock:
+            return {
+                "run_id": self.run_id,
+                "team_id": self.team,
+                "status": self.status,
+                "phase": self.phase,
+                "queue_position": self.queue_position,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "first_event_at": self.first_event_at,
+                "rounds_completed": self.rounds_completed,
+                "leaderboard": dict(self.leaderboard),
+                "live_market": self.live_market,
+                "final_comparison_report": self.final_comparison_report,
+                "error": self.error,
+                "events": self._next_offset,
+                "first_offset": self._events[0].offset if self._events else self._next_offset,
+                "subscribers": len(self._subscribers),
+                "subscriber_queues": [subscription.stats() for subscription in self._subscribers],
+            }
+
+
+def _cancelled_message(run_id: str, reason: Optional[str]) -> Dict[str, Any]:
+    return {"type": "cancelled", "payload": {"run_id": run_id, "reason": reason}}
+
+
+class RunJobManager:
+    """Queues run jobs onto a bounded worker pool and keeps recent ones."""
+
+    def __init__(
+        self,
+        workers: int = RUN_WORKERS,
+        retention: int = RUN_JOB_RETENTION,
+        resume_grace: float = RUN_RESUME_GRACE_SECONDS,
+        max_queue: int = RUN_QUEUE_LIMIT,
+        team_max_runs: int = TEAM_MAX_CONCURRENT_RUNS
+    ):
+        self.workers = max(1, workers)
+        self.retention = max(0, retention)
+        self.resume_grace = resume_grace
+        self.max_queue = max(0, max_queue)
+        # Active (queued or running) runs per team; 0 = unlimited
+        self.team_max_runs = max(0, team_max_runs)
+        self.rejected = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._jobs: "OrderedDict[str, RunJob]" = OrderedDict()
+        self._active_keys: Dict[str, RunJob] = {}
+        # Submitted jobs not yet started, in weighted fair order by team
+        self._waiting = FairQueue()
+        self._running = 0
+        self._lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="run-worker")
+        return self._executor
+
+    def submit(
+        self,
+        request: RunRequest,
+        key: Optional[str] = None,
+        cancel_on_disconnect: bool = False
+    ) -> Tuple[RunJob, bool]:
+        """
+        Queue a run, or return the active run submitted with the same key.
+
+        Args:
+            request: Run parameters
+            key: Dedupe key (e.g. an Idempotency-Key header or request hash);
+                None always starts a new run
+            cancel_on_disconnect: Cancel once the last subscriber leaves
+
+        Returns:
+            (job, created) - created is False for a deduplicated request
+
+        Raises:
+            ValueError: Invalid deadline_seconds
+            AdmissionRejected: RUN_QUEUE_LIMIT runs are already waiting (503),
+                or the team has team_max_runs active runs (429)
+        """
+        resolve_deadline_seconds(request.deadline_seconds)
+        with self._lock:
+            existing = self._active_keys.get(key) if key else None
+            if existing is not None and not existing.finished and not existing.cancel_token.cancelled:
+                logger.info(f"[RUNS] Reusing active run {existing.run_id} for a duplicate request")
+                return existing, False
+
+            team = resolve_team_id(request.team_id)
+            active = self._team_active_locked(team)
+            if self.team_max_runs and active >= self.team_max_runs:
+                self.rejected += 1
+                team_usage.record_run(team, admitted=False)
+                logger.warning(f"[RUNS] Rejected run: team {team} already has {active} active runs")
+                raise AdmissionRejected(
+                    "negotiation run", self._retry_after_locked(), status_code=429,
+                    message=f"Team {team} already has {active} active runs (quota {self.team_max_runs})"
+                )
+            queued = self._queued_locked()
+            if queued >= self.max_queue:
+                self.rejected += 1
+                team_usage.record_run(team, admitted=False)
+                logger.warning(f"[RUNS] Rejected run: {queued} runs already waiting")
+                raise AdmissionRejected("negotiation run", self._retry_after_locked())
+
+            job = RunJob(
+                new_run_id(), request, key=key,
+                cancel_on_disconnect=cancel_on_disconnect, disconnect_grace=self.resume_grace
+            )
+            job._on_dequeue = self._dequeued
+            self._jobs[job.run_id] = job
+            if key:
+                self._active_keys[key] = job
+            self._waiting.push(job.team, job)
+            self._evict_locked()
+            self._publish_positions_locked()
+
+        team_usage.record_run(job.team, admitted=True)
+        # Each pool task starts whichever waiting job is due next
+        self._pool().submit(self._execute_next)
+        logger.info(f"[RUNS] Queued run {job.run_id} (team {job.team})")
+        return job, True
+
+    def get(self, run_id: str) -> Optional[RunJob]:
+        with self._lock:
+            return self._jobs.get(run_id)
+
+    def _evict_locked(self) -> None:
+        """Drop the oldest finished jobs beyond the retention limit."""
+        finished = [run_id for run_id, job in self._jobs.items() if job.finished]
+        for run_id in finished[:max(0, len(finished) - self.retention)]:
+            del self._jobs[run_id]
+
+    def _release(self, job: RunJob) -> None:
+        with self._lock:
+            if job.key and self._active_keys.get(job.key) is job:
+                del self._active_keys[job.key]
+            if job.started_at is not None:
+                self._running -= 1
+            self._evict_locked()
+            self._publish_positions_locked()
+
+    # ========== Admission ==========
+
+    def _dequeued(self, job: RunJob, started: bool) -> None:
+        """A job left the queue: started on a worker, or cancelled while waiting."""
+        with self._lock:
+            if job in self._waiting:
+                self._waiting.remove(job)
+            if started:
+                self._running += 1
+            self._publish_positions_locked()
+
+    def _team_active_locked(self, team: str) -> int:
+        return sum(1 for job in self._jobs.values() if job.team == team and not job.finished)
+
+    def _queued_locked(self) -> int:
+        """Jobs that cannot start yet because every worker is busy."""
+        return max(0, len(self._waiting) - (self.workers - self._running))
+
+    def _publish_positions_locked(self) -> None:
+        """Tell waiting jobs' subscribers their place in line when it changed."""
+        free = self.workers - self._running
+        for index, job in enumerate(self._waiting):
+            position = index - free + 1
+            if position <= 0 or position == job.queue_position:
+                continue
+            job.queue_position = position
+            job.publish({
+                "type": "queued",
+                "message": f"Waiting for a free worker ({position} in line).",
+                "payload": {"run_id": job.run_id, "position": position}
+            })
+
+    def _retry_after_locked(self) -> int:
+        return retry_after_estimate(run_latencies.percentile(50), self._queued_locked(), self.workers)
+
+    def admission_stats(self) -> Dict[str, Any]:
+        """Running and waiting runs and rejections, as returned by GET /api/runs/admission."""
+        with self._lock:
+            return {
+                "running": self._running,
+                "waiting": self._queued_locked(),
+                "max_concurrent": self.workers,
+                "max_queue": self.max_queue,
+                "rejected": self.rejected,
+                "retry_after": self._retry_after_locked(),
+            }
+
+    def team_stats(self) -> Dict[str, Dict[str, int]]:
+        """Running and waiting runs per team."""
+        with self._lock:
+            teams: Dict[str, Dict[str, int]] = {}
+            for job in self._jobs.values():
+                if not job.finished:
+                    counts = teams.setdefault(job.team, {"runs_running": 0, "runs_waiting": 0})
+                    counts["runs_running" if job.status == JOB_RUNNING else "runs_waiting"] += 1
+            return teams
+
+    def _execute_next(self) -> None:
+        """Worker thread entry point: take the next waiting job in fair order and run it."""
+        with self._lock:
+            if not self._waiting:
+                # Its job was cancelled while waiting
+                return
+            _, job = self._waiting.pop()
+        self._execute(job)
+
+    def _execute(self, job: RunJob) -> None:
+        """Run one job on a private event loop."""
+        try:
+            asyncio.run(self._run(job))
+        except Exception as e:
+            logger.error(f"[RUNS] Worker failed on run {job.run_id}: {e}", exc_info=True)
+        finally:
+            self._release(job)
+
+    async def _run(self, job: RunJob) -> None:
+        task = asyncio.current_task()
+        if not job._start(asyncio.get_running_loop(), task):
+            return
+
+        print(f"[RUNS] ▶ Run {job.run_id} started", flush=True)
+        deadline = RunDeadline(resolve_deadline_seconds(job.request.deadline_seconds))
+        deadline_reached = False
+        try:
+            events = astream_run(
+                build_initial_state(job.request), job.run_id, deadline, job.cancel_token,
+                stream_output=True, team_id=job.team
+            )
+            async with aclosing(events):
+                async for event in events:
+                    deadline_reached = deadline_reached or bool((event.get("aggregator") or {}).get("deadline_reached"))
+                    for message in format_event(event):
+                        job.publish(message)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"[RUNS] Run {job.run_id} failed: {e}", exc_info=True)
+            job._finish(JOB_FAILED, {"type": "error", "payload": {"message": str(e)}}, error=str(e))
+            return
+
+        if job.cancel_token.cancelled:
+            job._finish(STATUS_CANCELLED, _cancelled_message(job.run_id, job.cancel_token.reason))
+            print(f"[RUNS] ✗ Run {job.run_id} cancelled", flush=True)
+            return
+        status = STATUS_DEADLINE_REACHED if deadline_reached else STATUS_COMPLETED
+        job._finish(status, {
+            "type": "complete",
+            "payload": {"run_id": job.run_id, "deadline_reached": deadline_reached}
+        })
+        print(f"[RUNS] ✓ Run {job.run_id} {status}", flush=True)
+
+    def shutdown(self) -> None:
+        """Cancel active jobs and stop the worker pool."""
+        with self._lock:
+            active = [job for job in self._jobs.values() if not job.finished]
+        for job in active:
+            job.cancel(REASON_REQUESTED)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Process-wide job manager used by the runs and negotiation routers
+run_jobs = RunJobManager()
+
+
+def _run_samples():
+    """evaepic_runs samples for GET /metrics."""
+    stats = run_jobs.admission_stats()
+    return [(RUNS.name, {"state": state}, stats[state]) for state in ("running", "waiting")]
+
+
+metrics.add_collector(_run_samples)
@@ -0,0 +1,198 @@
+"""
+Multiplexed Run Streams
+
+One WebSocket connection (/api/runs/ws) follows many runs at once, e.g. a
+dashboard watching dozens of orders. The client sends commands:
+
+    {"type": "start", "ref": "order-17", "order_object": {...}, "max_rounds": 3}
+    {"type": "subscribe", "run_id": "...", "protocol": "compact", "last_offset": 41}
+    {"type": "unsubscribe", "run_id": "..."}
+    {"type": "cancel", "run_id": "..."}
+
+"start" takes the same fields as the /api/negotiate/ws start message; the
+run belongs to the connection (cancelled if it is left without subscribers
+past the resume grace period). "ref" is echoed back so the client can match
+the run id to its request.
+
+Every server message is tagged with its run:
+
+    {"run_id": "...", "event": {"type": "subscribed", "payload": {...}}}
+    {"run_id": "...", "event": {"type": "progress", "seq": 12, ...}}
+    {"run_id": null, "event": {"type": "error", "payload": {"message": "...", "ref": ...}}}
+
+A "start" refused because too many runs are waiting gets an error with
+"retry_after" (seconds) in its payload.
+
+Events of each run are exactly those of a single-run subscription
+(protocol, resume offsets, coalescing when the client lags) and use the
+connection's encoding (?encoding=msgpack). A run's subscription ends after
+its final message; the connection stays open for further commands.
+
+A single sender task drains every subscription of the connection, so
+following one more run costs a subscription queue, not another socket or
+task.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Union
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from agents.config import MUX_MAX_RUNS
+from agents.run_cancellation import REASON_REQUESTED
+from api.services.admission import AdmissionRejected
+from api.services.event_protocol import resolve_protocol
+from api.services.run_jobs import EMPTY, RunJobManager, RunRequest, RunSubscription, parse_last_offset
+from api.services.wire_format import ENCODING_JSON, encode, envelope, send_encoded
+
+logger = logging.getLogger(__name__)
+
+# Messages sent from one run before the sender moves on to the next
+SEND_BATCH = 32
+
+REQUEST_FIELDS = ("user_input", "order_object", "max_rounds", "deadline_seconds", "team_id")
+
+
+class RunMultiplexer:
+    """Commands and tagged event streams of the runs followed over one connection."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        manager: RunJobManager,
+        encoding: str = ENCODING_JSON,
+        max_runs: int = MUX_MAX_RUNS
+    ):
+        self.websocket = websocket
+        self.manager = manager
+        self.encoding = encoding
+        self.max_runs = max(1, max_runs)
+        self.subscriptions: Dict[str, RunSubscription] = {}
+        self._ready = asyncio.Event()
+        self._send_lock = asyncio.Lock()
+
+    async def serve(self) -> None:
+        """Handle commands until the client disconnects, then detach from every run."""
+        sender = asyncio.create_task(self._send_events())
+        try:
+            while True:
+                try:
+                    command = await self.websocket.receive_json()
+                except WebSocketDisconnect:
+                    return
+                except ValueError:
+                    await self._send_error(None, "Commands must be JSON objects")
+                    continue
+                if sender.done():
+                    # Surface send failures
+                    sender.result()
+                    return
+                await self.handle(command)
+        finally:
+            sender.cancel()
+            for subscription in self.subscriptions.values():
+                subscription.close()
+            self.subscriptions.clear()
+
+    async def handle(self, command: Any) -> None:
+        """Run one client command; errors are reported to the client, tagged with the command's ref."""
+        if not isinstance(command, dict):
+            await self._send_error(None, "Commands must be JSON objects")
+            return
+        kind, run_id, ref = command.get("type"), command.get("run_id"), command.get("ref")
+        try:
+            if kind == "start":
+                await self._start(command)
+            elif kind == "subscribe":
+                job = self._get_job(run_id)
+                await self._subscribe(
+                    job, resolve_protocol(command.get("protocol")), parse_last_offset(command.get("last_offset")), ref
+                )
+            elif kind == "unsubscribe":
+                subscription = self.subscriptions.pop(run_id, None)
+                if subscription is not None:
+                    subscription.close()
+                await self._send(run_id, {"type": "unsubscribed", "payload": {"ref": ref}})
+            elif kind == "cancel":
+                self._get_job(run_id).cancel(REASON_REQUESTED)
+            else:
+                raise ValueError(f"Unknown command type {kind!r}")
+        except ValueError as e:
+            await self._send_error(run_id, str(e), ref)
+        except AdmissionRejected as e:
+            await self._send(run_id, {"type": "error", "payload": {**e.payload(), "ref": ref}})
+
+    def _get_job(self, run_id: Optional[str]):
+        job = self.manager.get(run_id) if run_id else None
+        if job is None:
+            raise ValueError(f"Unknown run {run_id}")
+        return job
+
+    async def _start(self, command: Dict[str, Any]) -> None:
+        protocol = resolve_protocol(command.get("protocol"))
+        self._check_capacity()
+        request = RunRequest(**{key: command[key] for key in REQUEST_FIELDS if command.get(key) is not None})
+        job, _ = self.manager.submit(request, cancel_on_disconnect=True)
+        await self._subscribe(job, protocol, None, command.get("ref"))
+
+    def _check_capacity(self) -> None:
+        if len(self.subscriptions) >= self.max_runs:
+            raise ValueError(f"A connection can follow at most {self.max_runs} runs")
+
+    async def _subscribe(self, job, protocol: str, last_offset: Optional[int], ref: Any) -> None:
+        previous = self.subscriptions.pop(job.run_id, None)
+        if previous is not None:
+            # Re-subscribing (e.g. to resume from another offset) replaces the old stream
+            previous.close()
+        else:
+            self._check_capacity()
+        # Acknowledged before any of the run's events can be sent
+        await self._send(job.run_id, {
+            "type": "subscribed",
+            "payload": {
+                "run_id": job.run_id,
+                "status": job.status,
+                "protocol": protocol,
+                "last_offset": last_offset,
+                "encoding": self.encoding,
+                "ref": ref,
+            }
+        })
+        self.subscriptions[job.run_id] = job.subscribe(protocol, last_offset, self.encoding, ready=self._ready)
+
+    async def _send_events(self) -> None:
+        """Sender task: forward queued events of every run, tagged with the run id."""
+        while True:
+            self._ready.clear()
+            for run_id, subscription in list(self.subscriptions.items()):
+                for _ in range(SEND_BATCH):
+                    if subscription.closed:
+                        # Unsubscribed or replaced meanwhile
+                        break
+                    event = subscription.poll()
+                    if event is EMPTY:
+                        break
+                    if event is None:
+                        # The run has finished: its final message went out already
+                        if self.subscriptions.get(run_id) is subscription:
+                            del self.subscriptions[run_id]
+                        subscription.close()
+                        break
+                    data = event.encoded(subscription.protocol, subscription.encoding)
+                    if data is not None:
+                        await self._send_data(envelope(run_id, data))
+                else:
+                    # Batch used up: come back after the other runs
+                    self._ready.set()
+            await self._ready.wait()
+
+    async def _send(self, run_id: Optional[str], message: Dict[str, Any]) -> None:
+        await self._send_data(envelope(run_id, encode(message, self.encoding)))
+
+    async def _send_error(self, run_id: Optional[str], message: str, ref: Any = None) -> None:
+        await self._send(run_id, {"type": "error", "payload": {"message": message, "ref": ref}})
+
+    async def _send_data(self, data: Union[str, bytes]) -> None:
+        async with self._send_lock:
+            await send_encoded(self.websocket, data)
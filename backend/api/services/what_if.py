@@ -0,0 +1,157 @@
+"""
+What-if Re-scoring
+
+Re-runs market analysis and the final comparison report over a run's
+stored leaderboard under alternative weights, budgets or quantities.
+Pure computation over persisted offers: no graph run, no LLM calls.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+from agents.nodes.aggregator import create_final_comparison_report, create_market_analysis
+from agents.run_results import RunResult
+from agents.utils.scoring import DEFAULT_WEIGHTS, ScoreWeights
+
+logger = logging.getLogger(__name__)
+
+
+class WhatIfScenario(BaseModel):
+    """One alternative to evaluate; unset fields keep the run's values"""
+    name: Optional[str] = Field(default=None, description="Label echoed back in the result")
+    weights: Optional[Dict[str, float]] = Field(
+        default=None,
+        description="Criterion weights (price, delivery, payment, status); unlisted criteria weigh 0"
+    )
+    budget: Optional[float] = Field(default=None, ge=0, description="Replacement budget")
+    budget_change_percent: Optional[float] = Field(
+        default=None, gt=-100, description="Budget change relative to the run's budget, e.g. 10 for +10%"
+    )
+    quantity: Optional[int] = Field(default=None, gt=0, description="Replacement preferred quantity")
+
+    @model_validator(mode="after")
+    def check_budget_fields(self) -> "WhatIfScenario":
+        """A scenario either replaces the budget or changes it, not both."""
+        if self.budget is not None and self.budget_change_percent is not None:
+            raise ValueError("Set either budget or budget_change_percent, not both")
+        return self
+
+
+class WhatIfRequest(BaseModel):
+    """Batch of scenarios for one run"""
+    scenarios: List[WhatIfScenario] = Field(min_length=1, description="Scenarios to evaluate")
+    include_details: bool = Field(default=True, description="Include full market analysis and report per scenario")
+
+
+class WhatIfResult(BaseModel):
+    """Outcome of one scenario"""
+    name: str
+    budget: Optional[float] = None
+    quantity: Optional[int] = None
+    weights: Dict[str, float] = Field(default_factory=dict)
+    recommended_vendor_id: Optional[str] = None
+    recommended_vendor_name: Optional[str] = None
+    recommendation_reason: Optional[str] = None
+    best_price: Optional[float] = None
+    within_budget: Optional[bool] = None
+    market_analysis: Optional[Dict[str, Any]] = None
+    final_comparison_report: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class WhatIfResponse(BaseModel):
+    """Results for every scenario, in request order"""
+    run_id: str
+    rounds_completed: int
+    offers: int
+    scenarios: List[WhatIfResult]
+    elapsed_ms: float
+
+
+def scenario_order(base_order: Dict[str, Any], scenario: WhatIfScenario) -> Dict[str, Any]:
+    """
+    Apply a scenario's budget/quantity changes to a copy of the run's order.
+
+    Args:
+        base_order: OrderObject dict the run was scored with
+        scenario: Requested changes
+
+    Returns:
+        New order dict (the stored order is not modified)
+    """
+    order = dict(base_order or {})
+    order["quantity"] = dict(order.get("quantity") or {})
+
+    if scenario.budget is not None:
+        order["budget"] = scenario.budget
+    elif scenario.budget_change_percent is not None:
+        order["budget"] = float(order.get("budget") or 0) * (1 + scenario.budget_change_percent / 100)
+
+    if scenario.quantity is not None:
+        order["quantity"]["preferred"] = scenario.quantity
+    return order
+
+
+def evaluate_scenario(result: RunResult, scenario: WhatIfScenario, index: int, include_details: bool = True) -> WhatIfResult:
+    """
+    Score a stored leaderboard under one scenario.
+
+    Invalid scenarios (e.g. unknown criteria) produce a result with `error`
+    set instead of failing the whole batch.
+    """
+    name = scenario.name or f"scenario_{index + 1}"
+    try:
+        weights = ScoreWeights.from_dict(scenario.weights) if scenario.weights is not None else DEFAULT_WEIGHTS
+    except ValueError as e:
+        return WhatIfResult(name=name, error=str(e))
+
+    order = scenario_order(result.order, scenario)
+    analysis = create_market_analysis(result.leaderboard, order, result.rounds_completed, weights=weights)
+    report = create_final_comparison_report(result.leaderboard, order, weights=weights)
+
+    budget = order.get("budget")
+    best_price = analysis.benchmarks.best_price
+    return WhatIfResult(
+        name=name,
+        budget=budget,
+        quantity=order["quantity"].get("preferred"),
+        weights=weights.as_dict(),
+        recommended_vendor_id=report.recommended_vendor_id,
+        recommended_vendor_name=report.recommended_vendor_name,
+        recommendation_reason=report.recommendation_reason,
+        best_price=best_price,
+        within_budget=(best_price <= budget) if best_price is not None and budget else None,
+        market_analysis=analysis.model_dump() if include_details else None,
+        final_comparison_report=report.model_dump() if include_details else None
+    )
+
+
+def evaluate_scenarios(result: RunResult, request: WhatIfRequest) -> WhatIfResponse:
+    """
+    Evaluate a batch of scenarios against one stored run.
+
+    Args:
+        result: Stored run leaderboard
+        request: Scenarios and output options
+
+    Returns:
+        WhatIfResponse with one result per scenario
+    """
+    start = time.perf_counter()
+    results = [
+        evaluate_scenario(result, scenario, index, request.include_details)
+        for index, scenario in enumerate(request.scenarios)
+    ]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    logger.info(f"[WHAT_IF] Run {result.run_id}: {len(results)} scenarios in {elapsed_ms:.1f}ms")
+
+    return WhatIfResponse(
+        run_id=result.run_id,
+        rounds_completed=result.rounds_completed,
+        offers=len(result.leaderboard),
+        scenarios=results,
+        elapsed_ms=round(elapsed_ms, 3)
+    )
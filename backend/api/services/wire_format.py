@@ -0,0 +1,122 @@
+"""
+WebSocket Wire Formats
+
+Clients choose how run events are encoded when they connect ("encoding"
+in the start message, or ?encoding= on /api/runs/{run_id}/ws):
+
+- json (default): text frames, serialized with orjson when it is installed
+  (see event_protocol.dumps)
+- msgpack: binary MessagePack frames with the same message structure
+  (string map keys, as JSON clients see them). Needs the msgpack package
+  (pip install "backend[msgpack]"); without it the connection falls back
+  to json and says so in its "subscribed" message.
+
+Independently of the encoding, frames are compressed with
+permessage-deflate when the client offers it (browsers do) and the server
+allows it (WS_PER_MESSAGE_DEFLATE, passed to uvicorn). Transcripts,
+strategies and vendor messages compress well, and repeated field names
+shrink further across messages because the compression context is kept
+for the whole connection.
+
+Every subscriber of a run using the same protocol and encoding shares one
+encoded copy of each event (see RunEvent.encoded).
+"""
+
+import logging
+from typing import Any, Dict, Optional, Union
+
+from fastapi import WebSocket
+
+from agents.config import WS_PER_MESSAGE_DEFLATE
+from api.services.event_protocol import dumps, normalize
+
+try:
+    import msgpack
+except ImportError:  # optional: pip install "backend[msgpack]"
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+ENCODINGS = (ENCODING_JSON, ENCODING_MSGPACK)
+
+COMPRESSION_DEFLATE = "permessage-deflate"
+
+
+def resolve_encoding(requested: Optional[str]) -> str:
+    """
+    Validate a requested encoding (default: json).
+
+    msgpack falls back to json when the msgpack package is not installed.
+
+    Raises:
+        ValueError: Unknown encoding
+    """
+    if requested is None:
+        return ENCODING_JSON
+    if requested not in ENCODINGS:
+        raise ValueError(f"Unknown encoding {requested!r}, expected one of {', '.join(ENCODINGS)}")
+    if requested == ENCODING_MSGPACK and msgpack is None:
+        logger.warning("[WIRE] msgpack requested but not installed, using json")
+        return ENCODING_JSON
+    return requested
+
+
+def pack(message: Dict[str, Any], normalized: bool = False) -> bytes:
+    """
+    MessagePack form of a message (string keys, like its JSON form).
+
+    Args:
+        message: Message to encode
+        normalized: The message already has string keys only (compact
+            messages, parsed JSON), so it is not copied first
+    """
+    return msgpack.packb(message if normalized else normalize(message), default=str)
+
+
+def encode(message: Dict[str, Any], encoding: str, normalized: bool = False) -> Union[str, bytes]:
+    """Encode one message: str for a text frame, bytes for a binary one."""
+    if encoding == ENCODING_MSGPACK:
+        return pack(message, normalized)
+    return dumps(message)
+
+
+def envelope(run_id: str, data: Union[str, bytes]) -> Union[str, bytes]:
+    """
+    Tag an encoded message with its run: {"run_id": run_id, "event": message}.
+
+    Built around the already encoded message, so multiplexed connections
+    keep sharing each event's single encoding.
+    """
+    if isinstance(data, bytes):
+        # fixmap with 2 entries, then the keys and values
+        return b"\x82" + msgpack.packb("run_id") + msgpack.packb(run_id) + msgpack.packb("event") + data
+    return f'{{"run_id":{dumps(run_id)},"event":{data}}}'
+
+
+def negotiated_compression(websocket: WebSocket) -> Optional[str]:
+    """
+    Compression in effect on the connection, for the "subscribed" message.
+
+    The server (uvicorn, started with ws_per_message_deflate from
+    WS_PER_MESSAGE_DEFLATE) accepts permessage-deflate whenever it is
+    enabled and the client offers it, so that is when it is reported.
+
+    Returns:
+        "permessage-deflate", or None when disabled or not offered
+    """
+    if not WS_PER_MESSAGE_DEFLATE:
+        return None
+    offered = websocket.headers.get("sec-websocket-extensions") or ""
+    # "permessage-deflate; client_max_window_bits, x-webkit-deflate-frame"
+    names = {extension.split(";", 1)[0].strip().lower() for extension in offered.split(",")}
+    return COMPRESSION_DEFLATE if COMPRESSION_DEFLATE in names else None
+
+
+async def send_encoded(websocket: WebSocket, data: Union[str, bytes]) -> None:
+    """Send an encoded message in a frame of the matching type."""
+    if isinstance(data, bytes):
+        await websocket.send_bytes(data)
+    else:
+        await websocket.send_text(data)
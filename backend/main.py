@@ -1,3 +1,4 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
@@ -6,11 +7,23 @@ import os
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="EvaEpic API")
+from api.routers import negotiation, extract, runs, metrics
+from api.services.run_jobs import run_jobs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Cancel active negotiation runs and stop the worker pool
+    run_jobs.shutdown()
+
+
+app = FastAPI(title="EvaEpic API", lifespan=lifespan)
 
-from api.routers import negotiation, extract
 app.include_router(negotiation.router, prefix="/api/negotiate", tags=["negotiation"])
 app.include_router(extract.router, prefix="/api", tags=["extract"])
+app.include_router(runs.router, prefix="/api/runs", tags=["runs"])
+app.include_router(metrics.router, tags=["metrics"])
 
 
 # Configure CORS
@@ -54,4 +67,5 @@ async def hello(name: str = "World"):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    from agents.config import WS_PER_MESSAGE_DEFLATE
+    uvicorn.run(app, host="0.0.0.0", port=8000, ws_per_message_deflate=WS_PER_MESSAGE_DEFLATE)
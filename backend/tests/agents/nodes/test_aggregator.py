@@ -0,0 +1,162 @@
+"""
+Tests for Aggregator Node scoring and ranking
+
+Checks that the columnar scoring engine agrees with the per-offer scoring
+rules and that rankings/overrides come out in score order.
+"""
+
+import random
+import pytest
+
+from agents.nodes.aggregator import (
+    calculate_vendor_score,
+    create_final_comparison_report,
+    create_market_analysis,
+    select_next_round_vendors,
+)
+from agents.utils.scoring import (
+    PAYMENT_CODE_OTHER,
+    OfferColumns,
+    classify_payment_terms,
+    rank_order,
+)
+
+
+def random_leaderboard(rng, size):
+    terms = [None, "", "Net 30", "payment in 30 days", "NET 60", "60 days", "50% advance", "Upfront", "COD"]
+    return {
+        f"v{i}": {
+            "vendor_name": f"Vendor {i}",
+            "price_total": rng.choice([None, 0, 100, round(rng.uniform(50, 500), 2)]),
+            "delivery_days": rng.choice([None, 0, rng.randint(1, 40)]),
+            "payment_terms": rng.choice(terms),
+        }
+        for i in range(size)
+    }
+
+
+@pytest.mark.unit
+class TestColumnarScoring:
+    """Unit tests for agents.utils.scoring"""
+
+    def test_classify_payment_terms(self):
+        assert classify_payment_terms("Net 30") == 0
+        assert classify_payment_terms("Payment within 60 DAYS") == 1
+        assert classify_payment_terms("Full upfront") == 2
+        assert classify_payment_terms(None) == PAYMENT_CODE_OTHER
+        assert classify_payment_terms("COD") == PAYMENT_CODE_OTHER
+
+    def test_scores_match_per_offer_scoring(self):
+        rng = random.Random(3)
+        for _ in range(50):
+            leaderboard = random_leaderboard(rng, rng.randint(1, 40))
+            columns = OfferColumns.from_offers(leaderboard)
+            for best_price in (0, 100.0, rng.uniform(1, 1000)):
+                expected = [calculate_vendor_score(offer, best_price, {}) for offer in leaderboard.values()]
+                assert columns.scores(best_price).tolist() == expected
+
+    def test_rank_order_is_stable_for_ties(self):
+        assert rank_order([50.0, 70.0, 50.0, 70.0]).tolist() == [1, 3, 0, 2]
+
+
+@pytest.mark.unit
+class TestAggregatorRanking:
+    """Unit tests for market analysis and final report ordering"""
+
+    def test_market_analysis_ranks_and_overrides(self):
+        leaderboard = {
+            "a": {"vendor_name": "A", "price_total": 120, "delivery_days": 5, "payment_terms": "Net 30"},
+            "b": {"vendor_name": "B", "price_total": 100, "delivery_days": 5, "payment_terms": "Net 30"},
+            "c": {"vendor_name": "C", "price_total": 300, "delivery_days": 5, "payment_terms": "Net 30"},
+            "d": {"vendor_name": "D", "price_total": None},
+        }
+        order = {"quantity": {"preferred": 1}, "budget": 250}
+
+        analysis = create_market_analysis(leaderboard, order, 1)
+
+        assert [r.vendor_id for r in analysis.rankings] == ["b", "a", "c"]
+        assert [r.rank for r in analysis.rankings] == [1, 2, 3]
+        assert analysis.benchmarks.best_price == 100
+        assert analysis.benchmarks.median_price == 120
+        assert analysis.benchmarks.spread_percent == 200.0
+        assert analysis.vendor_overrides["b"].pressure_level == "low"
+        assert analysis.vendor_overrides["a"].pressure_level == "high"
+        assert analysis.vendor_overrides["c"].walkaway_recommended is True
+        assert list(analysis.vendor_overrides) == ["b", "a", "c"]
+
+    def test_final_report_matches_market_ranking(self):
+        rng = random.Random(11)
+        leaderboard = {
+            vid: offer for vid, offer in random_leaderboard(rng, 30).items() if offer["price_total"]
+        }
+        order = {"quantity": {"preferred": 3}, "budget": 2000}
+
+        analysis = create_market_analysis(leaderboard, order, 1)
+        report = create_final_comparison_report(leaderboard, order)
+
+        assert [v.vendor_id for v in report.vendors] == [r.vendor_id for r in analysis.rankings]
+        assert report.recommended_vendor_id == analysis.rankings[0].vendor_id
+        scores = [v.score for v in report.vendors]
+        assert scores == sorted(scores, reverse=True)
+
+
+def tradeoff_leaderboard(size):
+    """Pricier vendors deliver faster, so every offer is on the Pareto frontier."""
+    return {
+        f"v{i}": {
+            "vendor_name": f"Vendor {i}",
+            "price_total": 100 + 10 * i,
+            "delivery_days": 30 - i,
+            "payment_terms": "Net 30",
+            "status": "in_progress",
+        }
+        for i in range(size)
+    }
+
+
+@pytest.mark.unit
+class TestNextRoundSelection:
+    """Unit tests for choosing the vendors of the next negotiation round"""
+
+    def select(self, leaderboard, history=None, previous_round_size=None, round_index=1, budget=50):
+        order = {"quantity": {"preferred": 1}, "budget": budget}
+        analysis = create_market_analysis(leaderboard, order, round_index)
+        report = create_final_comparison_report(leaderboard, order)
+        if previous_round_size is None:
+            previous_round_size = len(leaderboard)
+        return select_next_round_vendors(analysis, report, history or {}, previous_round_size)
+
+    def test_takes_best_ranked_half(self):
+        selected = self.select(tradeoff_leaderboard(6), budget=1000)
+
+        assert selected == ["v0", "v1", "v2"]
+
+    def test_skips_closed_walkaway_and_dominated_offers(self):
+        leaderboard = tradeoff_leaderboard(4)
+        leaderboard["v1"]["status"] = "walked_away"
+        leaderboard["v2"]["status"] = "finalized"
+        # Dearer, slower and same terms as v0: dominated
+        leaderboard["v4"] = {"vendor_name": "Slow", "price_total": 105, "delivery_days": 31, "payment_terms": "Net 30", "status": "in_progress"}
+        # Far above budget: walk-away recommended
+        leaderboard["v5"] = {"vendor_name": "Dear", "price_total": 500, "delivery_days": 1, "payment_terms": "Net 30", "status": "in_progress"}
+
+        selected = self.select(leaderboard, previous_round_size=20, budget=150)
+
+        assert selected == ["v0", "v3"]
+
+    def test_skips_vendors_that_did_not_improve(self):
+        leaderboard = tradeoff_leaderboard(2)
+        history = {
+            "v0": [{"offer": {"price_total": 100}}, {"offer": {"price_total": 100}}],
+            "v1": [{"offer": {"price_total": 130}}, {"offer": {"price_total": 110}}],
+        }
+
+        selected = self.select(leaderboard, history, previous_round_size=2, round_index=2, budget=1000)
+
+        assert selected == ["v1"]
+
+    def test_rounds_shrink_to_nothing(self):
+        leaderboard = tradeoff_leaderboard(4)
+
+        assert len(self.select(leaderboard, previous_round_size=1, round_index=1, budget=1000)) == 1
+        assert self.select(leaderboard, previous_round_size=1, round_index=2, budget=1000) == []
@@ -0,0 +1,153 @@
+"""
+Tests for the negotiation round loop
+
+The graph is built with stub vendor/strategy/negotiation nodes (no LLM or
+vendor API calls); the aggregator, decision gate and round routing are real.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import agents.graph as graph_module
+import agents.nodes.aggregator as aggregator_module
+from agents.run_deadline import RunDeadline, parse_phase_budgets
+from agents.run_results import RunResultStore
+from agents.state import vendor_ref
+
+
+def build_graph(monkeypatch, num_vendors, max_rounds, calls, slow_vendors=(), delay=0, on_negotiate=None):
+    """Graph whose negotiator lowers each vendor's price 1% per session."""
+    vendors = [{"id": i, "name": f"Vendor {i}"} for i in range(num_vendors)]
+
+    def fetch_vendors(state):
+        return {"all_vendors": vendors}
+
+    def evaluate_vendor(payload):
+        return {"relevant_vendors": [vendor_ref(payload["vendor"], f"p{payload['vendor']['id']}")]}
+
+    def start_strategy_phase(state):
+        return {"max_rounds": max_rounds}
+
+    def generate_strategy(payload):
+        return {"vendor_strategies": {payload["vendor"]["id"]: {"objective": "test"}}}
+
+    def negotiate(payload):
+        calls.append(payload)
+        if payload["vendor_id"] in slow_vendors:
+            time.sleep(delay)
+        if on_negotiate is not None:
+            on_negotiate(payload)
+        vendor_id = payload["vendor_id"]
+        conversation_id = payload["conversation_id"] or f"conv-{vendor_id}"
+        # Pricier vendors deliver faster, so every offer stays on the Pareto frontier
+        offer = {
+            "vendor_id": str(vendor_id),
+            "vendor_name": payload["vendor_name"],
+            "price_total": round((100 + vendor_id) * 0.99 ** payload["round_index"], 2),
+            "delivery_days": 30 - vendor_id,
+            "payment_terms": "Net 30",
+            "status": "in_progress",
+        }
+        turns = [{"role": "agent", "content": f"round {payload['round_index']}"}]
+        return {
+            "leaderboard": {vendor_id: offer},
+            "negotiation_history": {vendor_id: [{"round": payload["round_index"], "turns": turns, "offer": offer}]},
+            "conversation_ids": {vendor_id: conversation_id},
+        }
+
+    monkeypatch.setattr(graph_module, "fetch_vendors_node", fetch_vendors)
+    monkeypatch.setattr(graph_module, "evaluate_vendor_node", evaluate_vendor)
+    monkeypatch.setattr(graph_module, "start_strategy_phase", start_strategy_phase)
+    monkeypatch.setattr(graph_module, "generate_strategy_node", generate_strategy)
+    monkeypatch.setattr(graph_module, "negotiate_node", negotiate)
+    return graph_module.create_negotiation_graph()
+
+
+def run(monkeypatch, num_vendors, max_rounds, budget=95):
+    calls = []
+    app = build_graph(monkeypatch, num_vendors, max_rounds, calls)
+    final = app.invoke({
+        "order_object": {"quantity": {"preferred": 1}, "budget": budget},
+        "relevant_vendors": [],
+        "rounds_completed": 0,
+        "market_analysis": None,
+    })
+    return final, calls
+
+
+@pytest.mark.unit
+class TestNegotiationRounds:
+    """Aggregator-driven multi-round loop"""
+
+    def test_later_rounds_reengage_selected_vendors(self, monkeypatch):
+        final, calls = run(monkeypatch, num_vendors=8, max_rounds=3)
+
+        rounds = [call["round_index"] for call in calls]
+        assert rounds.count(0) == 8
+        assert rounds.count(1) == 4
+        assert rounds.count(2) == 2
+        assert final["rounds_completed"] == 3
+
+        follow_ups = [call for call in calls if call["round_index"] > 0]
+        for call in follow_ups:
+            assert call["conversation_id"] == f"conv-{call['vendor_id']}"
+            assert call["market_analysis"]["round_index"] == call["round_index"]
+            assert str(call["vendor_id"]) in call["market_analysis"]["next_round_vendor_ids"]
+            assert len(call["prior_turns"]) == call["round_index"]
+
+        # History keeps one entry per session played
+        history = final["negotiation_history"]
+        assert sum(len(entries) for entries in history.values()) == len(calls)
+        assert max(len(entries) for entries in history.values()) == 3
+
+    def test_sessions_stay_bounded_as_max_rounds_grows(self, monkeypatch):
+        sessions = {max_rounds: len(run(monkeypatch, 8, max_rounds)[1]) for max_rounds in (1, 2, 4, 8)}
+
+        assert sessions[1] == 8
+        assert sessions[2] == 12
+        assert sessions[8] == sessions[4] <= 2 * 8
+
+    def test_within_budget_ends_after_first_round(self, monkeypatch):
+        final, calls = run(monkeypatch, num_vendors=4, max_rounds=5, budget=10_000)
+
+        assert len(calls) == 4
+        assert final["rounds_completed"] == 1
+
+
+@pytest.mark.unit
+class TestRunDeadlineStream:
+    """astream_run reports the best offers so far at the deadline"""
+
+    def test_stuck_vendor_yields_best_so_far_report(self, monkeypatch, tmp_path):
+        store = RunResultStore(directory=str(tmp_path), cache_size=0)
+        monkeypatch.setattr(graph_module, "run_results", store)
+        monkeypatch.setattr(aggregator_module, "run_results", store)
+        calls = []
+        app = build_graph(monkeypatch, 3, 3, calls, slow_vendors=(2,), delay=1.5)
+        monkeypatch.setattr(graph_module, "app", app)
+        deadline = RunDeadline(0.5, parse_phase_budgets("negotiation:1"))
+
+        async def collect():
+            events = []
+            async for event in graph_module.astream_run(
+                {"order_object": {"quantity": {"preferred": 1}, "budget": 95}, "relevant_vendors": []},
+                "deadlinetest",
+                deadline
+            ):
+                events.append((time.monotonic(), event))
+            return events
+
+        started = time.monotonic()
+        timed_events = asyncio.run(collect())
+
+        # Reported at the deadline, not when the stuck vendor returns
+        reported_at, _ = timed_events[-1]
+        assert reported_at - started < 1.0
+        events = [event for _, event in timed_events]
+        final = events[-1]["aggregator"]
+        assert final["deadline_reached"] is True
+        report = final["final_comparison_report"]
+        assert {v["vendor_id"] for v in report["vendors"]} == {"0", "1"}
+        assert report["market_summary"].startswith("Best so far at the run deadline")
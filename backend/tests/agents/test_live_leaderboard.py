@@ -0,0 +1,117 @@
+"""
+Tests for the incremental live leaderboard
+"""
+
+import random
+from statistics import median
+
+import pytest
+
+from agents.live_leaderboard import LiveLeaderboard, LiveLeaderboardRegistry
+from agents.nodes.aggregator import create_market_analysis
+from agents.state import keep_latest_version
+
+
+def expected_benchmarks(offers, quantity):
+    prices = [float(o["price_total"]) * quantity for o in offers.values() if o.get("price_total") and o["price_total"] > 0]
+    if not prices:
+        return {"best_price": None, "median_price": None, "spread_percent": None, "total_vendors": 0}
+    best = min(prices)
+    return {
+        "best_price": best,
+        "median_price": median(prices) if len(prices) > 1 else best,
+        "spread_percent": round((max(prices) - best) / best * 100, 2),
+        "total_vendors": len(prices),
+    }
+
+
+@pytest.mark.unit
+class TestLiveLeaderboard:
+    """Unit tests for incremental best/median/spread"""
+
+    def test_matches_full_recomputation_under_random_updates(self):
+        rng = random.Random(5)
+        board = LiveLeaderboard(quantity=3)
+        offers = {}
+        for step in range(2000):
+            vendor_id = f"v{rng.randint(0, 60)}"
+            offer = {"vendor_name": vendor_id, "price_total": rng.choice([None, 0, rng.randint(1, 50), round(rng.uniform(1, 500), 2)])}
+            offers[vendor_id] = offer
+            board.update(vendor_id, offer)
+            assert board.benchmarks() == expected_benchmarks(offers, 3), f"diverged at step {step}"
+
+        # Heaps stay bounded despite many superseded offers
+        assert len(board._min) <= 2 * len(board) + 33
+
+    def test_best_and_snapshot(self):
+        board = LiveLeaderboard(quantity=2)
+        assert board.best() is None
+        assert board.snapshot(1)["summary"] == "Live: no valid offers yet"
+
+        board.update("a", {"vendor_name": "Acme", "price_total": 120})
+        board.update("b", {"vendor_name": "Bolt", "price_total": 100})
+        assert board.best() == ("b", "Bolt", 200)
+        assert board.best_unit_price() == 100
+
+        board.update("b", {"vendor_name": "Bolt", "price_total": None})
+        snapshot = board.snapshot(2)
+        assert snapshot["best_vendor_id"] == "a"
+        assert snapshot["round_index"] == 2
+        assert snapshot["version"] == 3
+        assert snapshot["benchmarks"]["total_vendors"] == 1
+
+    def test_aggregator_reuses_live_benchmarks(self):
+        leaderboard = {
+            "a": {"vendor_name": "A", "price_total": 120, "delivery_days": 4},
+            "b": {"vendor_name": "B", "price_total": 100, "payment_terms": "Net 30"},
+            "c": {"vendor_name": "C", "price_total": 150},
+        }
+        order = {"quantity": {"preferred": 5}, "budget": 700}
+        board = LiveLeaderboard(quantity=5)
+        for vendor_id, offer in leaderboard.items():
+            board.update(vendor_id, offer)
+
+        assert board.benchmarks_for({vid: offer["price_total"] for vid, offer in leaderboard.items()}, 5) is not None
+        live = create_market_analysis(leaderboard, order, 1, live_board=board)
+        full = create_market_analysis(leaderboard, order, 1)
+        assert live.model_dump() == full.model_dump()
+
+    def test_aggregator_ignores_a_board_with_other_offers(self):
+        leaderboard = {
+            "a": {"vendor_name": "A", "price_total": 120},
+            "b": {"vendor_name": "B", "price_total": 100},
+        }
+        order = {"quantity": {"preferred": 5}}
+        full = create_market_analysis(leaderboard, order, 1).model_dump()
+
+        # Same number of offers, but a re-engaged vendor changed its price
+        repriced = LiveLeaderboard(quantity=5)
+        repriced.update("a", {"price_total": 120})
+        repriced.update("b", {"price_total": 60})
+        # Same number of offers, but from a different vendor
+        swapped = LiveLeaderboard(quantity=5)
+        swapped.update("a", {"price_total": 120})
+        swapped.update("c", {"price_total": 100})
+        # Same offers, totals for another quantity
+        requantified = LiveLeaderboard(quantity=2)
+        for vendor_id, offer in leaderboard.items():
+            requantified.update(vendor_id, offer)
+
+        for board in (repriced, swapped, requantified):
+            assert board.benchmarks_for({"a": 120.0, "b": 100.0}, 5) is None
+            assert create_market_analysis(leaderboard, order, 1, live_board=board).model_dump() == full
+
+    def test_registry_and_reducer(self):
+        registry = LiveLeaderboardRegistry(max_entries=2)
+        first = registry.get_or_create("r1")
+        assert registry.get_or_create("r1") is first
+        registry.get_or_create("r2")
+        registry.get_or_create("r3")
+        assert registry.get("r1") is None
+        registry.discard("r3")
+        assert registry.get("r3") is None
+
+        older, newer = {"version": 2}, {"version": 5}
+        assert keep_latest_version(newer, older) is newer
+        assert keep_latest_version(older, newer) is newer
+        assert keep_latest_version(newer, None) is newer
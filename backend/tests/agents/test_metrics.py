@@ -0,0 +1,92 @@
+"""
+Tests for the runtime metrics and GET /metrics
+"""
+
+import threading
+
+import pytest
+import requests
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+from requests.adapters import HTTPAdapter
+
+from agents.metrics import CONTENT_TYPE, LLM_CALLS, LLM_TOKENS, MetricsRegistry, metrics, timed_node
+from agents.utils.http import MeteredAdapter
+
+
+def value(name, labels):
+    return metrics.collect().get((name, labels))
+
+
+@pytest.mark.unit
+class TestMetrics:
+    """Unit tests for lock-free recording and the exposition format"""
+
+    def test_shards_of_all_threads_add_up(self):
+        registry = MetricsRegistry()
+        calls = registry.counter("calls_total", "Calls", labels=("node",))
+        latency = registry.histogram("latency_seconds", "Latency", (0.1, 1), labels=("node",))
+
+        def work():
+            for _ in range(100):
+                calls.inc(node='say "hi"')
+            latency.observe(0.5, node="a")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        latency.observe(2, node="a")
+
+        # Ended threads are folded into the base total
+        assert registry.collect()[("calls_total", ('say "hi"',))] == 400
+        assert len(registry._shards) == 1
+
+        text = registry.render()
+        assert "# TYPE latency_seconds histogram" in text
+        assert 'calls_total{node="say \\"hi\\""} 400' in text
+        assert 'latency_seconds_bucket{node="a",le="0.1"} 0' in text
+        assert 'latency_seconds_bucket{node="a",le="1"} 4' in text
+        assert 'latency_seconds_bucket{node="a",le="+Inf"} 5' in text
+        assert 'latency_seconds_sum{node="a"} 4' in text
+        assert 'latency_seconds_count{node="a"} 5' in text
+
+    def test_llm_calls_and_tokens_are_counted_per_node(self):
+        model = FakeMessagesListChatModel(responses=[AIMessage(content="ok", usage_metadata={
+            "input_tokens": 120, "output_tokens": 30, "total_tokens": 150,
+            "input_token_details": {"cache_read": 100}
+        })])
+        before = value(LLM_CALLS.name, ("test_node", "ok")) or 0
+        cached = value(LLM_TOKENS.name, ("test_node", "cache_read")) or 0
+
+        node = timed_node("test_node", lambda: model.invoke("hi", config={"metadata": {"langgraph_node": "test_node"}}))
+        assert node().content == "ok"
+
+        assert value(LLM_CALLS.name, ("test_node", "ok")) == before + 1
+        assert value(LLM_TOKENS.name, ("test_node", "cache_read")) == cached + 100
+        assert value("evaepic_node_duration_seconds", ("test_node",))[-1] >= 1
+
+    def test_metrics_endpoint_reports_vendor_api_outcomes(self, monkeypatch):
+        def send(adapter, request, **kwargs):
+            if "fail" in request.url:
+                raise requests.ConnectionError("refused")
+            response = requests.Response()
+            response.status_code = 502
+            return response
+
+        monkeypatch.setattr(HTTPAdapter, "send", send)
+        session = requests.Session()
+        session.mount("http://", MeteredAdapter())
+        session.get("http://vendors.test/vendors/42")
+        with pytest.raises(requests.ConnectionError):
+            session.get("http://vendors.test/fail/7")
+
+        from main import app
+        response = TestClient(app).get("/metrics")
+        assert response.headers["content-type"] == CONTENT_TYPE
+        assert 'evaepic_vendor_api_requests_total{endpoint="GET /vendors/:id",outcome="5xx"}' in response.text
+        assert 'evaepic_vendor_api_requests_total{endpoint="GET /fail/:id",outcome="error"}' in response.text
+        assert 'evaepic_runs{state="running"}' in response.text
+        assert "# TYPE evaepic_websocket_connections gauge" in response.text
@@ -0,0 +1,174 @@
+"""
+Tests for cooperative run cancellation
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+
+import agents.graph as graph_module
+import agents.nodes.aggregator as aggregator_module
+import agents.run_cancellation as run_cancellation
+import agents.run_stream as run_stream
+from agents.run_cancellation import (
+    CALL_LLM,
+    CancelToken,
+    CancellationMetrics,
+    RunCancelled,
+    cancellable,
+    check_cancelled,
+)
+from agents.run_results import STATUS_CANCELLED, RunResultStore
+from agents.run_stream import invoke_streaming
+from tests.agents.test_graph import build_graph
+
+
+@pytest.fixture
+def metrics(monkeypatch):
+    metrics = CancellationMetrics()
+    monkeypatch.setattr(run_cancellation, "cancellation_metrics", metrics)
+    return metrics
+
+
+@pytest.fixture
+def token(monkeypatch):
+    token = CancelToken()
+    monkeypatch.setattr(run_cancellation, "current_cancel_token", lambda: token)
+    return token
+
+
+@pytest.mark.unit
+class TestCancelToken:
+    """Unit tests for the token and cancellable calls"""
+
+    def test_plain_call_without_a_run(self, metrics):
+        assert cancellable(lambda x: x * 2, 21) == 42
+
+    def test_check_raises_past_broad_handlers(self, token, metrics):
+        token.cancel("cancel_requested")
+
+        with pytest.raises(RunCancelled):
+            try:
+                check_cancelled()
+            except Exception:
+                pytest.fail("RunCancelled caught as an Exception")
+        assert metrics.snapshot()["calls_skipped"] == {"step": 1}
+
+    def test_in_flight_call_is_abandoned(self, token, metrics):
+        finished = threading.Event()
+
+        def slow_call():
+            time.sleep(1.0)
+            finished.set()
+            return "late"
+
+        threading.Timer(0.1, token.cancel, args=("client_disconnected",)).start()
+        started = time.monotonic()
+        with pytest.raises(RunCancelled) as exc:
+            cancellable(slow_call, kind=CALL_LLM)
+
+        assert time.monotonic() - started < 0.8
+        assert not finished.is_set()
+        assert exc.value.reason == "client_disconnected"
+        assert metrics.snapshot()["calls_abandoned"] == {"llm": 1}
+
+    def test_streamed_call_stops_at_the_next_chunk(self, token, metrics, monkeypatch):
+        monkeypatch.setattr(run_stream, "current_cancel_token", lambda: token)
+        generated = []
+
+        class LongAnswer(BaseChatModel):
+            @property
+            def _llm_type(self):
+                return "fake-long"
+
+            def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+                raise AssertionError("cancellable runs stream their LLM calls")
+
+            def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+                for i in range(100):
+                    generated.append(i)
+                    if i == 2:
+                        token.cancel()
+                    chunk = ChatGenerationChunk(message=AIMessageChunk(content=f"word{i} "))
+                    if run_manager:
+                        run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                    yield chunk
+
+        with pytest.raises(RunCancelled):
+            invoke_streaming(LongAnswer(), "hello")
+
+        assert generated == [0, 1, 2]
+        snapshot = metrics.snapshot()
+        assert snapshot["calls_stopped"] == {"llm": 1}
+        assert snapshot["calls_skipped"] == {} and snapshot["calls_abandoned"] == {}
+
+    def test_completed_call_returns_result_and_errors(self, token):
+        assert cancellable(lambda: "ok") == "ok"
+        with pytest.raises(KeyError):
+            cancellable(lambda: {}["missing"])
+
+    def test_cancel_is_idempotent(self):
+        token = CancelToken()
+        assert token.cancel("a") is True
+        assert token.cancel("b") is False
+        assert token.reason == "a"
+
+
+@pytest.mark.unit
+class TestRunCancellation:
+    """Cancelling a streamed run stops its nodes and records it"""
+
+    def test_cancelled_run_is_recorded(self, monkeypatch, tmp_path, metrics):
+        monkeypatch.setattr(graph_module, "cancellation_metrics", metrics)
+        store = RunResultStore(directory=str(tmp_path), cache_size=0)
+        monkeypatch.setattr(graph_module, "run_results", store)
+        monkeypatch.setattr(aggregator_module, "run_results", store)
+
+        # Vendor 2's session hangs on a call until cancelled
+        stopped = threading.Event()
+
+        def hang_on_vendor_2(payload):
+            if payload["vendor_id"] == 2:
+                try:
+                    cancellable(time.sleep, 5)
+                finally:
+                    stopped.set()
+
+        app = build_graph(monkeypatch, 3, 3, [], on_negotiate=hang_on_vendor_2)
+        monkeypatch.setattr(graph_module, "app", app)
+        cancel = CancelToken()
+
+        async def run():
+            events = []
+
+            async def consume():
+                async for event in graph_module.astream_run(
+                    {"order_object": {"quantity": {"preferred": 1}, "budget": 95}, "relevant_vendors": []},
+                    "cancelrun",
+                    cancel=cancel
+                ):
+                    events.append(event)
+
+            task = asyncio.create_task(consume())
+            while len([e for e in events if "negotiate" in e]) < 2:
+                await asyncio.sleep(0.01)
+            cancel.cancel("client_disconnected")
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        started = time.monotonic()
+        asyncio.run(run())
+
+        assert stopped.wait(1.0)
+        assert time.monotonic() - started < 3
+        stored = store.load("cancelrun")
+        assert stored.status == STATUS_CANCELLED
+        assert set(stored.leaderboard) == {"0", "1"}
+        snapshot = metrics.snapshot()
+        assert snapshot["runs_cancelled"] == {"client_disconnected": 1}
+        assert snapshot["calls_abandoned"] == {"llm": 1}
@@ -0,0 +1,121 @@
+"""
+Tests for run deadlines, phase budgets and the latency window
+"""
+
+import pytest
+
+from agents.nodes import strategist
+from agents.run_deadline import (
+    LatencyWindow,
+    RunDeadline,
+    current_deadline,
+    parse_phase_budgets,
+    resolve_deadline_seconds,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.unit
+class TestRunDeadline:
+    """Unit tests for per-phase budgets"""
+
+    def test_phase_budgets_are_cumulative(self):
+        clock = FakeClock()
+        budgets = parse_phase_budgets("evaluation:1,strategy:1,negotiation:6,report:2")
+        deadline = RunDeadline(100, budgets, clock=clock)
+
+        assert deadline.phase_remaining("evaluation") == pytest.approx(10)
+        assert deadline.phase_remaining("negotiation") == pytest.approx(80)
+
+        # Evaluation finished early: its unused time carries over
+        clock.now += 5
+        assert deadline.phase_remaining("strategy") == pytest.approx(15)
+
+        clock.now += 80
+        assert deadline.phase_expired("negotiation")
+        assert not deadline.phase_expired("report")
+        assert deadline.remaining() == pytest.approx(15)
+
+        clock.now += 20
+        assert deadline.expired()
+        assert deadline.remaining() == 0
+
+    def test_call_timeout_is_capped_and_floored(self):
+        clock = FakeClock()
+        deadline = RunDeadline(100, parse_phase_budgets("negotiation:1"), clock=clock)
+
+        assert deadline.call_timeout("negotiation", cap=30) == 30
+        clock.now += 99.5
+        assert deadline.call_timeout("negotiation", cap=30) == 1.0
+
+    def test_parse_phase_budgets_rejects_bad_specs(self):
+        with pytest.raises(ValueError):
+            parse_phase_budgets("unknown:1")
+        with pytest.raises(ValueError):
+            parse_phase_budgets("evaluation:0")
+        with pytest.raises(ValueError):
+            parse_phase_budgets("evaluation:-1,report:2")
+
+    def test_resolve_deadline_seconds(self, monkeypatch):
+        monkeypatch.setattr("agents.run_deadline.RUN_DEADLINE_MAX_SECONDS", 60)
+
+        assert resolve_deadline_seconds("30") == 30
+        assert resolve_deadline_seconds(600) == 60
+        for bad in (0, -5, "soon", float("nan")):
+            with pytest.raises(ValueError):
+                resolve_deadline_seconds(bad)
+
+    def test_no_deadline_outside_a_run(self):
+        assert current_deadline() is None
+
+
+@pytest.mark.unit
+class TestDeadlineFallbacks:
+    """Nodes skip LLM work once their phase budget is spent"""
+
+    def test_strategist_uses_fallback_strategy(self, monkeypatch):
+        monkeypatch.setattr(strategist, "phase_expired", lambda phase: True)
+        monkeypatch.setattr(strategist, "create_strategy_for_vendor", lambda *a, **k: pytest.fail("LLM called"))
+
+        result = strategist.generate_strategy_node({
+            "vendor": {"id": 3, "name": "Acme"},
+            "order": {"item": "bolts", "budget": 1000},
+        })
+
+        strategy = result["vendor_strategies"]["3"]
+        assert strategy["price_targets"]["target"] == 800
+        assert strategy["vendor_name"] == "Acme"
+
+
+@pytest.mark.unit
+class TestLatencyWindow:
+    """Unit tests for the run latency SLO window"""
+
+    def test_percentiles_and_slo(self):
+        window = LatencyWindow(size=200, slo_seconds=9.95)
+        for seconds in range(1, 101):
+            window.record(seconds / 10, deadline_reached=seconds == 100)
+
+        summary = window.summary()
+        assert summary["runs"] == 100
+        assert summary["p50_seconds"] == 5.0
+        assert summary["p99_seconds"] == 9.9
+        assert summary["slo_met"] is True
+        assert summary["slo_breaches"] == 1
+        assert summary["deadline_reached"] == 1
+
+        window.record(60)
+        window.record(60)
+        assert window.summary()["slo_met"] is False
+
+    def test_empty_window(self):
+        summary = LatencyWindow(size=10, slo_seconds=1).summary()
+        assert summary["p99_seconds"] is None
+        assert summary["slo_met"] is True
@@ -0,0 +1,178 @@
+"""
+Tests for streaming node activity, tokens and vendor turns during a run
+
+LLMs are fake chat models, so nothing leaves the process.
+"""
+
+import asyncio
+import json
+from typing import TypedDict
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.output_parsers.openai_tools import PydanticToolsParser
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langgraph.graph import END, START, StateGraph
+from pydantic import BaseModel
+
+import agents.graph as graph_module
+import agents.nodes.aggregator as aggregator_module
+import agents.nodes.negotiator as negotiator_module
+from agents.nodes.negotiator import NegotiationAgent, VendorResponseAnalysis
+from agents.run_context import run_config
+from agents.run_results import RunResultStore
+from agents.run_stream import EVENT_ACTIVITY, EVENT_TOKEN, EVENT_TURN, STREAM_KEY, emit, invoke_streaming
+from tests.agents.test_graph import build_graph
+
+
+class State(TypedDict, total=False):
+    result: str
+
+
+def run_node(node, stream=True):
+    """Run a one-node graph; return (custom events, final result)."""
+    workflow = StateGraph(State)
+    workflow.add_node("node", lambda state: {"result": node()})
+    workflow.add_edge(START, "node")
+    workflow.add_edge("node", END)
+    app = workflow.compile()
+
+    events, result = [], None
+    for mode, chunk in app.stream({}, config=run_config("run", stream=stream), stream_mode=["custom", "updates"]):
+        if mode == "custom":
+            events.append(chunk)
+        else:
+            result = chunk["node"]["result"]
+    return events, result
+
+
+def chat(text):
+    return GenericFakeChatModel(messages=iter([AIMessage(content=text)]))
+
+
+class Plan(BaseModel):
+    objective: str
+    anchor: float
+
+
+PLAN_ARGS = json.dumps({"objective": "lowest total cost", "anchor": 90.0})
+
+
+class FakeToolModel(BaseChatModel):
+    """Streams a forced tool call's JSON arguments in small chunks."""
+
+    @property
+    def _llm_type(self):
+        return "fake-tool"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        tool_call = {"name": "Plan", "args": json.loads(PLAN_ARGS), "id": "call"}
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="", tool_calls=[tool_call]))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for start in range(0, len(PLAN_ARGS), 8):
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[{
+                "name": "Plan" if start == 0 else None,
+                "args": PLAN_ARGS[start:start + 8],
+                "id": "call" if start == 0 else None,
+                "index": 0,
+            }]))
+            if run_manager:
+                run_manager.on_llm_new_token("", chunk=chunk)
+            yield chunk
+
+
+def make_agent(llm):
+    """NegotiationAgent with a fake LLM (no Anthropic client)."""
+    agent = NegotiationAgent.__new__(NegotiationAgent)
+    agent.vendor_id, agent.vendor_name = "7", "Acme"
+    agent.strategy, agent.order_details, agent.market_context = {"objective": "test"}, {"item": "chairs"}, None
+    agent.llm = llm
+    return agent
+
+
+@pytest.mark.unit
+class TestRunStream:
+    """Unit tests for streamed events from inside nodes"""
+
+    def test_tokens_stream_while_the_message_is_generated(self):
+        agent = make_agent(chat("Could you do 90 per chair?"))
+        history = [{"role": "agent", "content": "Hi"}, {"role": "vendor", "content": "100 each"}]
+
+        events, message = run_node(lambda: agent.generate_message(history, None, None))
+
+        assert message == "Could you do 90 per chair?"
+        assert {event["event"] for event in events} == {EVENT_TOKEN}
+        assert len(events) > 1
+        assert "".join(event["payload"]["text"] for event in events) == message
+        assert events[0]["payload"] == {"source": "negotiator", "vendor_id": "7", "exchange": 1, "text": "Could"}
+
+    def test_runs_without_streaming_invoke_once(self):
+        events, message = run_node(lambda: make_agent(chat("Hello")).generate_message([], None, None), stream=False)
+        assert events == [] and message == "Hello"
+
+        # Outside a graph run emit() is a no-op
+        emit(EVENT_ACTIVITY, "ignored")
+
+    def test_session_streams_each_turn(self, monkeypatch):
+        agent = make_agent(chat("Meet me at 95?"))
+        agent.strategy["opening_message"] = "Hello, what is your price?"
+        replies = iter(["100 per chair.", "Deal at 95."])
+        monkeypatch.setattr(negotiator_module, "send_message", lambda conversation_id, text: next(replies))
+        sentiments = iter(["flexible", "deal_agreed"])
+        agent.analyze_response = lambda response, history: VendorResponseAnalysis(
+            has_offer=True, price=95.0, sentiment=next(sentiments), reasoning="", next_action_suggestion="continue"
+        )
+        agent.extract_final_deal_details = lambda history: negotiator_module.DealExtraction(
+            final_price=95.0, list_price=None, bundled_items=[], summary="", deal_status="finalized"
+        )
+
+        events, _ = run_node(lambda: agent.run_negotiation_session("conv", None, round_index=0)[0].status)
+
+        turns = [event["payload"] for event in events if event["event"] == EVENT_TURN]
+        assert [(turn["role"], turn["exchange"], turn["content"]) for turn in turns] == [
+            ("agent", 0, "Hello, what is your price?"),
+            ("vendor", 0, "100 per chair."),
+            ("agent", 1, "Meet me at 95?"),
+            ("vendor", 1, "Deal at 95."),
+        ]
+        # The generated message's tokens arrive before it is sent
+        kinds = [event["event"] for event in events]
+        assert kinds.index(EVENT_TOKEN) < kinds.index(EVENT_TURN, 2)
+
+    def test_structured_output_streams_its_arguments(self):
+        structured = FakeToolModel() | PydanticToolsParser(tools=[Plan], first_tool_only=True)
+
+        events, plan = run_node(lambda: invoke_streaming(structured, "plan", source="strategist", vendor_id="7"))
+
+        assert plan == Plan(objective="lowest total cost", anchor=90.0)
+        assert "".join(event["payload"]["text"] for event in events) == PLAN_ARGS
+        assert all(event["payload"]["source"] == "strategist" for event in events)
+
+    def test_astream_run_interleaves_streamed_events(self, monkeypatch, tmp_path):
+        store = RunResultStore(directory=str(tmp_path), cache_size=0)
+        monkeypatch.setattr(graph_module, "run_results", store)
+        monkeypatch.setattr(aggregator_module, "run_results", store)
+
+        def negotiate(payload):
+            emit(EVENT_ACTIVITY, "working", vendor_id=payload["vendor_id"])
+
+        monkeypatch.setattr(graph_module, "app", build_graph(monkeypatch, 2, 1, [], on_negotiate=negotiate))
+
+        async def collect(stream_output):
+            return [event async for event in graph_module.astream_run(
+                {"order_object": {"quantity": {"preferred": 1}, "budget": 95}, "rounds_completed": 0},
+                "stream-test", stream_output=stream_output
+            )]
+
+        streamed = asyncio.run(collect(True))
+        activity = [event[STREAM_KEY] for event in streamed if STREAM_KEY in event]
+        assert sorted(event["payload"]["vendor_id"] for event in activity) == [0, 1]
+        assert activity[0]["message"] == "working"
+        # Each vendor's activity comes before its negotiate update
+        positions = [next(iter(event)) for event in streamed]
+        assert positions.index(STREAM_KEY) < positions.index("negotiate")
+
+        assert all(STREAM_KEY not in event for event in asyncio.run(collect(False)))
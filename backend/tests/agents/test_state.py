@@ -0,0 +1,120 @@
+"""
+Tests for the graph state reducers
+"""
+
+import pytest
+from langgraph.graph import StateGraph, END, START
+from langgraph.types import Send
+
+from agents.graph import fan_out_to_strategies
+from agents.state import (
+    GraphState,
+    KeyedDict,
+    AppendList,
+    merge_dicts,
+    merge_lists,
+    merge_history,
+    vendor_ref,
+    index_vendors,
+)
+
+
+@pytest.mark.unit
+class TestReducers:
+    """In-place reducers keep the copy-on-merge semantics"""
+
+    def test_merge_dicts_right_wins_and_inputs_untouched(self):
+        initial = {"a": 1, "b": 2}
+        update = {"b": 3, "c": 4}
+
+        merged = merge_dicts(initial, update)
+
+        assert merged == {"a": 1, "b": 3, "c": 4}
+        assert isinstance(merged, KeyedDict)
+        assert initial == {"a": 1, "b": 2}
+        assert update == {"b": 3, "c": 4}
+
+    def test_merge_dicts_updates_owned_value_in_place(self):
+        merged = merge_dicts({}, {"a": 1})
+        again = merge_dicts(merged, {"b": 2})
+
+        assert again is merged
+        assert again == {"a": 1, "b": 2}
+
+    def test_merge_lists_appends_without_aliasing_inputs(self):
+        first = [{"id": "1"}]
+        merged = merge_lists(first, [{"id": "2"}])
+        merged = merge_lists(merged, [{"id": "3"}])
+
+        assert [v["id"] for v in merged] == ["1", "2", "3"]
+        assert isinstance(merged, AppendList)
+        assert first == [{"id": "1"}]
+
+    def test_merge_history_appends_per_vendor(self):
+        round_one = {"v1": [{"round": 0}]}
+        merged = merge_history({}, round_one)
+        merged = merge_history(merged, {"v1": [{"round": 1}], "v2": [{"round": 1}]})
+
+        assert [e["round"] for e in merged["v1"]] == [0, 1]
+        assert [e["round"] for e in merged["v2"]] == [1]
+        assert round_one == {"v1": [{"round": 0}]}
+
+    def test_reducers_accept_missing_left(self):
+        assert merge_dicts(None, {"a": 1}) == {"a": 1}
+        assert merge_lists(None, [1]) == [1]
+
+    def test_parallel_fan_in_through_graph(self):
+        """Parallel node results accumulate; the caller's input is not mutated."""
+        def fan_out(state):
+            return [Send("worker", {"i": i}) for i in range(50)]
+
+        def worker(payload):
+            vid = str(payload["i"])
+            return {"relevant_vendors": [{"id": vid}], "leaderboard": {vid: {"price_total": payload["i"]}}}
+
+        workflow = StateGraph(GraphState)
+        workflow.add_node("start", lambda state: {})
+        workflow.add_node("worker", worker)
+        workflow.add_edge(START, "start")
+        workflow.add_conditional_edges("start", fan_out, ["worker"])
+        workflow.add_edge("worker", END)
+        app = workflow.compile()
+
+        initial_leaderboard = {"seed": {"price_total": 1}}
+        initial_vendors = [{"id": "seed"}]
+        final = app.invoke({"relevant_vendors": initial_vendors, "leaderboard": initial_leaderboard})
+
+        assert len(final["relevant_vendors"]) == 51
+        assert set(final["leaderboard"]) == {"seed"} | {str(i) for i in range(50)}
+        assert initial_vendors == [{"id": "seed"}]
+        assert initial_leaderboard == {"seed": {"price_total": 1}}
+
+
+@pytest.mark.unit
+class TestVendorRefs:
+    """relevant_vendors holds slim references resolved from all_vendors"""
+
+    def test_vendor_ref_is_slim(self):
+        vendor = {"id": 7, "name": "Acme", "behavioral_prompt": "x" * 1000, "documents": ["a.pdf"]}
+
+        assert vendor_ref(vendor, "p-1") == {"id": 7, "name": "Acme", "relevant_product_id": "p-1"}
+
+    def test_strategy_fan_out_resolves_full_vendor(self):
+        full = {"id": 7, "name": "Acme", "behavioral_prompt": "Tough", "documents": ["a.pdf"]}
+        state = {
+            "all_vendors": [full, {"id": 8, "name": "Other"}],
+            "relevant_vendors": [vendor_ref(full, "p-1")],
+            "order_object": {"product": "bolts"},
+        }
+
+        sends = fan_out_to_strategies(state)
+
+        assert len(sends) == 1
+        vendor = sends[0].arg["vendor"]
+        assert vendor["behavioral_prompt"] == "Tough"
+        assert vendor["documents"] == ["a.pdf"]
+        assert vendor["relevant_product_id"] == "p-1"
+        assert "relevant_product_id" not in full
+
+    def test_index_vendors_keys_by_string_id(self):
+        assert set(index_vendors([{"id": 1}, {"id": "2"}])) == {"1", "2"}
@@ -0,0 +1,165 @@
+"""
+Tests for per-team fair scheduling and quotas
+"""
+
+import threading
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+
+import agents.run_cancellation as run_cancellation
+import agents.team_scheduling as team_scheduling
+from agents.run_cancellation import CALL_LLM, CALL_VENDOR_API, CancelToken, cancellable
+from agents.team_scheduling import FairQueue, FairScheduler, TeamScheduler, TeamUsage, parse_team_weights
+from api.services.admission import AdmissionRejected
+from api.services.run_jobs import RunJobManager, RunRequest
+from tests.api.services.test_run_jobs import ORDER, gate, wait_until  # noqa: F401 (fixture)
+
+
+@pytest.fixture
+def usage(monkeypatch):
+    usage = TeamUsage(tokens_per_minute=100, messages_per_minute=0)
+    monkeypatch.setattr(team_scheduling, "team_usage", usage)
+    monkeypatch.setattr(run_cancellation, "team_scheduler", TeamScheduler(usage))
+    return usage
+
+
+@pytest.mark.unit
+class TestFairScheduling:
+    """Unit tests for weighted fair queuing by team"""
+
+    def test_weights(self):
+        assert parse_team_weights("1:2, 7:0.5") == {"1": 2.0, "7": 0.5}
+        with pytest.raises(ValueError):
+            parse_team_weights("1:0")
+
+    def test_teams_share_turns_by_weight(self):
+        queue = FairQueue(weight=lambda team: 2.0 if team == "heavy" else 1.0)
+        for i in range(6):
+            queue.push("bulk", f"bulk-{i}")
+        for i in range(4):
+            queue.push("heavy", f"heavy-{i}")
+        queue.push("light", "light-0")
+
+        order = [queue.pop()[1] for _ in range(len(queue))]
+        # The late teams are not stuck behind the bulk batch
+        assert order[:4] == ["heavy-0", "bulk-0", "heavy-1", "light-0"]
+        assert order.index("heavy-3") < order.index("bulk-2")
+
+        # An idle team does not bank turns for later
+        queue.push("bulk", "bulk-late")
+        queue.push("light", "light-late")
+        assert [queue.pop()[1] for _ in range(2)] == ["bulk-late", "light-late"]
+
+    def test_scheduler_grants_slots_fairly_and_stops_waiting_on_cancel(self):
+        scheduler = FairScheduler("test", capacity=1)
+        granted = []
+        assert scheduler.acquire("bulk")
+
+        def request(team):
+            if scheduler.acquire(team):
+                granted.append(team)
+                scheduler.release()
+
+        threads = [threading.Thread(target=request, args=("bulk",)) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        wait_until(lambda: scheduler.stats()["waiting"] == {"bulk": 3})
+
+        token = CancelToken()
+        cancelled = []
+        waiting = threading.Thread(target=lambda: cancelled.append(scheduler.acquire("gone", token)))
+        waiting.start()
+        threads.append(threading.Thread(target=request, args=("other",)))
+        threads[-1].start()
+        wait_until(lambda: len(scheduler.stats()["waiting"]) == 3)
+        token.cancel()
+        waiting.join(1)
+        assert cancelled == [False]
+
+        scheduler.release()
+        for thread in threads:
+            thread.join(1)
+        assert granted[:2] == ["bulk", "other"]
+        assert scheduler.stats() == {"capacity": 1, "active": 0, "waiting": {}}
+
+    def test_llm_tokens_count_towards_the_team_quota(self, usage):
+        model = FakeMessagesListChatModel(responses=[
+            AIMessage(content="ok", usage_metadata={"input_tokens": 90, "output_tokens": 30, "total_tokens": 120})
+        ])
+        assert cancellable(model.invoke, "hello").content == "ok"
+        assert cancellable(lambda: "sent", kind=CALL_VENDOR_API) == "sent"
+
+        team = team_scheduling.resolve_team_id()
+        counters = usage.snapshot()[team]
+        assert (counters["llm_calls"], counters["input_tokens"], counters["output_tokens"]) == (1, 90, 30)
+        assert counters["vendor_requests"] == 1 and counters["tokens_last_minute"] == 120
+
+        # Over quota: the next LLM call waits, and a cancelled run stops waiting
+        assert 59 < usage.delay(team, CALL_LLM) <= 60
+        token = CancelToken()
+        token.cancel()
+        started = time.monotonic()
+        assert usage.wait_for_quota(team, CALL_LLM, token) is False
+        assert time.monotonic() - started < 1
+
+    def test_abandoned_call_frees_its_slot_at_once(self, usage, monkeypatch):
+        scheduler = run_cancellation.team_scheduler
+        scheduler.resources[CALL_LLM] = FairScheduler(CALL_LLM, capacity=1)
+        token = CancelToken()
+        tokens = {"current": token}
+        monkeypatch.setattr(run_cancellation, "current_cancel_token", lambda: tokens["current"])
+
+        model = FakeMessagesListChatModel(responses=[
+            AIMessage(content="late", usage_metadata={"input_tokens": 50, "output_tokens": 50, "total_tokens": 100})
+        ])
+        unblock, finished = threading.Event(), threading.Event()
+
+        def in_flight():
+            unblock.wait(5)
+            try:
+                return model.invoke("hello")
+            finally:
+                finished.set()
+
+        threading.Timer(0.1, token.cancel).start()
+        with pytest.raises(run_cancellation.RunCancelled):
+            cancellable(in_flight)
+
+        # The request is still running, but its slot already serves the next call
+        assert scheduler.stats()[CALL_LLM]["abandoned_running"] == 1
+        tokens["current"] = None
+        results = []
+        other = threading.Thread(target=lambda: results.append(cancellable(lambda: "next")))
+        other.start()
+        other.join(1)
+        assert results == ["next"]
+
+        unblock.set()
+        assert finished.wait(1)
+        wait_until(lambda: scheduler.stats()[CALL_LLM]["abandoned_running"] == 0)
+        assert scheduler.stats()[CALL_LLM]["active"] == 0
+        # Nobody read the abandoned call's result, so its tokens are not charged
+        assert usage.snapshot() == {}
+
+    def test_runs_start_in_fair_order_within_team_quotas(self, gate):
+        manager = RunJobManager(workers=1, retention=16, max_queue=8, team_max_runs=3)
+        try:
+            blocker, _ = manager.submit(RunRequest(order_object=ORDER, team_id="bulk"))
+            wait_until(lambda: blocker.status == "running")
+            bulk = [manager.submit(RunRequest(order_object=ORDER, max_rounds=i, team_id="bulk"))[0] for i in (2, 3)]
+            light, _ = manager.submit(RunRequest(order_object=ORDER, team_id="light"))
+
+            with pytest.raises(AdmissionRejected) as rejected:
+                manager.submit(RunRequest(order_object=ORDER, max_rounds=4, team_id="bulk"))
+            assert rejected.value.status_code == 429
+            assert light.queue_position == 2 and bulk[1].queue_position == 3
+
+            gate.set()
+            wait_until(lambda: all(job.finished for job in bulk + [light]))
+            started = sorted(bulk + [light], key=lambda job: job.started_at)
+            assert started == [bulk[0], light, bulk[1]]
+        finally:
+            manager.shutdown()
@@ -0,0 +1,119 @@
+"""
+Tests for run tracing and the critical path report
+"""
+
+import asyncio
+import json
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+
+import agents.graph as graph_module
+import agents.nodes.aggregator as aggregator_module
+import agents.tracing as tracing
+from agents.run_context import new_run_id
+from agents.run_results import RunResultStore
+from agents.tracing import RunTraces, Span, critical_path, span, spans_from_otlp
+from tests.agents.test_graph import build_graph
+from tests.api.services.test_run_jobs import ORDER
+
+
+@pytest.fixture
+def traces(monkeypatch, tmp_path):
+    traces = RunTraces(export_dir=str(tmp_path / "traces"))
+    monkeypatch.setattr(tracing, "run_traces", traces)
+    monkeypatch.setattr(graph_module, "run_traces", traces)
+
+    store = RunResultStore(directory=str(tmp_path / "results"), cache_size=0)
+    monkeypatch.setattr(graph_module, "run_results", store)
+    monkeypatch.setattr(aggregator_module, "run_results", store)
+
+    model = FakeMessagesListChatModel(responses=[
+        AIMessage(content="ok", usage_metadata={"input_tokens": 50, "output_tokens": 5, "total_tokens": 55})
+    ])
+
+    def slow_vendor(payload):
+        # Vendor 0 has one slow turn with an LLM call in it
+        if payload["vendor_id"] == 0:
+            with span("negotiation_turn", {"evaepic.turn": 0}):
+                time.sleep(0.1)
+                model.invoke("offer?")
+
+    monkeypatch.setattr(graph_module, "app", build_graph(monkeypatch, 3, 1, [], on_negotiate=slow_vendor))
+    return traces
+
+
+def run(run_id):
+    async def consume():
+        return [event async for event in graph_module.astream_run(
+            {"order_object": ORDER, "max_rounds": 1}, run_id
+        )]
+    return asyncio.run(consume())
+
+
+def make_span(name, start, end, parent=None, span_id=None):
+    span = Span("t" * 32, name, parent, start_ns=int(start * 1e9), span_id=span_id or name)
+    span.end_ns = int(end * 1e9)
+    return span
+
+
+@pytest.mark.unit
+class TestTracing:
+    """Unit tests for run spans, OTLP export and critical paths"""
+
+    def test_run_spans_are_linked_and_exported(self, traces, tmp_path):
+        run_id = new_run_id()
+        run(run_id)
+
+        document = json.loads((tmp_path / "traces" / f"{run_id}.json").read_text())
+        spans = {span.span_id: span for span in spans_from_otlp(document)}
+        assert {span.trace_id for span in spans.values()} == {run_id}
+
+        root = next(span for span in spans.values() if span.parent_id is None)
+        assert root.name == "run" and root.attributes["evaepic.status"] == "completed"
+        negotiations = [span for span in spans.values() if span.name == "negotiate"]
+        assert len(negotiations) == 3 and all(span.parent_id == root.span_id for span in negotiations)
+
+        # The LLM call hangs under the turn it was made in, within vendor 0's node
+        llm = next(span for span in spans.values() if span.name.startswith("llm"))
+        turn = spans[llm.parent_id]
+        assert turn.name == "negotiation_turn"
+        assert spans[turn.parent_id].attributes["evaepic.vendor_id"] == 0
+        assert llm.attributes["gen_ai.usage.input_tokens"] == 50
+        assert llm.attributes["evaepic.node"] == "negotiate"
+
+    def test_critical_path_follows_the_last_finishing_child(self):
+        spans = [
+            make_span("run", 0, 10),
+            make_span("fetch_vendors", 0, 2, "run"),
+            make_span("negotiate", 2, 9, "run", "slow"),
+            make_span("negotiate", 2, 5, "run", "fast"),
+            make_span("llm", 3, 8, "slow"),
+            make_span("aggregator", 9, 10, "run"),
+        ]
+        report = critical_path(spans)
+
+        assert report["wall_seconds"] == 10
+        assert [entry["span_id"] for entry in report["path"]] == ["run", "fetch_vendors", "slow", "llm", "aggregator"]
+        assert {entry["span_id"]: entry["self_seconds"] for entry in report["path"]}["slow"] == 2
+        assert sum(entry["self_seconds"] for entry in report["path"]) == pytest.approx(10)
+        assert list(report["by_name"].items())[0] == ("llm", 5)
+
+    def test_critical_path_endpoint_and_cli(self, traces, tmp_path, monkeypatch, capsys):
+        import api.routers.runs as runs_router
+        from main import app
+        monkeypatch.setattr(runs_router, "run_traces", traces)
+        run_id = new_run_id()
+        run(run_id)
+
+        client = TestClient(app)
+        report = client.get(f"/api/runs/{run_id}/critical-path").json()
+        slowest = max(report["path"], key=lambda entry: entry["self_seconds"])
+        assert slowest["name"] == "negotiation_turn" and slowest["self_seconds"] >= 0.09
+        assert client.get("/api/runs/unknown/trace").status_code == 404
+
+        assert tracing.main([str(tmp_path / "traces" / f"{run_id}.json")]) == 0
+        assert "negotiation_turn" in capsys.readouterr().out
@@ -0,0 +1,127 @@
+"""
+Tests for the speculative pipeline warm-up
+"""
+
+import threading
+import time
+
+import pytest
+
+import agents.nodes.database_fetcher as database_fetcher
+import agents.nodes.vendor_evaluator as vendor_evaluator
+import agents.warmup as warmup_module
+from agents.nodes.database_fetcher import fetch_vendors_node
+from agents.nodes.vendor_evaluator import SuitabilityResult, evaluate_vendor_node
+from agents.warmup import WarmupRegistry, order_fingerprint
+
+ORDER = {
+    "item": "Office Chairs",
+    "quantity": {"min": 10, "max": 20, "preferred": 15},
+    "budget": 3000,
+    "currency": "usd",
+    "requirements": {"mandatory": ["ergonomic", "black"], "optional": []},
+    "urgency": "high",
+}
+
+VENDORS = [
+    {
+        "id": i, "name": f"Vendor {i}", "description": "Office furniture", "behavioral_prompt": "Be firm",
+        "is_predefined": True, "documents": [{"filename": f"catalog-{i}.txt"}],
+    }
+    for i in range(3)
+]
+
+
+def fail(*args, **kwargs):
+    raise AssertionError("cold path taken")
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """Registry whose warm-ups use stub vendor fetches and evaluations."""
+    fetched = threading.Event()
+    evaluated = []
+
+    def load_vendors():
+        fetched.set()
+        return VENDORS
+
+    def evaluate(vendor, order):
+        evaluated.append(vendor["id"])
+        return SuitabilityResult(suitable=vendor["id"] != 1, reasoning="warm", product_id=f"p{vendor['id']}")
+
+    monkeypatch.setattr(warmup_module, "load_vendors", load_vendors)
+    monkeypatch.setattr(warmup_module, "evaluate_vendor_suitability", evaluate)
+    monkeypatch.setattr(warmup_module, "preload_files", lambda filenames: len(filenames))
+
+    registry = WarmupRegistry(ttl_seconds=60, max_entries=2, eval_concurrency=2)
+    registry.evaluated = evaluated
+    monkeypatch.setattr(warmup_module, "warmup_registry", registry)
+    return registry
+
+
+@pytest.mark.unit
+class TestWarmup:
+    """Unit tests for fingerprint matching, reuse by the nodes and expiry"""
+
+    def test_fingerprint_ignores_formatting_but_not_selection_fields(self):
+        reformatted = {
+            **ORDER,
+            "item": "  office   CHAIRS ",
+            "currency": "USD",
+            "requirements": {"mandatory": ["black", "ergonomic"], "optional": []},
+        }
+        assert order_fingerprint(reformatted) == order_fingerprint(ORDER)
+        assert order_fingerprint({**ORDER, "budget": 2500}) != order_fingerprint(ORDER)
+        assert order_fingerprint({**ORDER, "requirements": {"mandatory": ["ergonomic"]}}) != order_fingerprint(ORDER)
+        assert order_fingerprint(None) is None
+
+    def test_nodes_reuse_a_matching_warmup(self, registry, monkeypatch):
+        monkeypatch.setattr(database_fetcher, "load_vendors", fail)
+        monkeypatch.setattr(vendor_evaluator, "evaluate_vendor_suitability", fail)
+        assert registry.start(ORDER) == order_fingerprint(ORDER)
+        # A second extract of the same order does not start another warm-up
+        assert registry.start({**ORDER, "item": "office chairs"}) == order_fingerprint(ORDER)
+
+        update = fetch_vendors_node({"order_object": ORDER})
+        assert update["all_vendors"] == VENDORS
+
+        results = [
+            evaluate_vendor_node({"vendor": vendor, "order_requirements": ORDER}) for vendor in VENDORS
+        ]
+        assert [len(result["relevant_vendors"]) for result in results] == [1, 0, 1]
+        assert results[0]["relevant_vendors"][0]["relevant_product_id"] == "p0"
+        assert sorted(registry.evaluated) == [0, 1, 2]
+
+    def test_different_order_falls_back_to_a_cold_run(self, registry, monkeypatch):
+        cold = []
+        monkeypatch.setattr(database_fetcher, "load_vendors", lambda: cold.append("fetch") or VENDORS[:1])
+
+        def evaluate_cold(vendor, order, timeout=None):
+            cold.append("evaluate")
+            return SuitabilityResult(suitable=False, reasoning="cold")
+
+        monkeypatch.setattr(vendor_evaluator, "evaluate_vendor_suitability", evaluate_cold)
+        registry.start(ORDER)
+        other = {**ORDER, "budget": 2500}
+
+        assert fetch_vendors_node({"order_object": other})["all_vendors"] == VENDORS[:1]
+        result = evaluate_vendor_node({"vendor": VENDORS[0], "order_requirements": other})
+        assert result["relevant_vendors"] == []
+        assert cold == ["fetch", "evaluate"]
+
+    def test_unclaimed_warmups_expire_and_oldest_are_evicted(self, registry):
+        registry.ttl_seconds = 0.05
+        registry.start(ORDER)
+        assert len(registry) == 1
+        time.sleep(0.1)
+        assert len(registry) == 0
+        assert registry.wait_for_vendors(ORDER, timeout=0.1) is None
+
+        registry.ttl_seconds = 60
+        orders = [{**ORDER, "budget": budget} for budget in (1000, 2000, 3000)]
+        for order in orders:
+            registry.start(order)
+        assert len(registry) == 2
+        assert registry.wait_for_vendors(orders[0], timeout=0.1) is None
+        assert registry.wait_for_vendors(orders[2], timeout=1) == VENDORS
@@ -0,0 +1,52 @@
+"""
+Tests for the vendor document content block cache
+"""
+
+import os
+
+import pytest
+
+from agents.utils.file_utils import _read_content_block, get_file_message_content, preload_files
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    _read_content_block.cache_clear()
+    yield
+    _read_content_block.cache_clear()
+
+
+@pytest.mark.unit
+class TestFileCache:
+    """Unit tests for reading documents once per version"""
+
+    def test_repeated_reads_hit_the_cache(self, tmp_path):
+        path = tmp_path / "catalog.txt"
+        path.write_text("Chairs: $100")
+
+        first = get_file_message_content(str(path))
+        assert "Chairs: $100" in first["text"]
+        # Callers get their own copy of the cached block
+        first["text"] = "changed"
+        assert "Chairs: $100" in get_file_message_content(str(path))["text"]
+        assert _read_content_block.cache_info().hits == 1
+
+    def test_edited_file_is_read_again(self, tmp_path):
+        path = tmp_path / "catalog.txt"
+        path.write_text("Chairs: $100")
+        assert preload_files([str(path), str(tmp_path / "missing.txt"), ""]) == 1
+
+        path.write_text("Chairs: $90, desks: $300")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert "desks" in get_file_message_content(str(path))["text"]
+        assert _read_content_block.cache_info().misses == 2
+
+    def test_pdf_is_a_base64_document_block(self, tmp_path):
+        path = tmp_path / "catalog.pdf"
+        path.write_bytes(b"%PDF-1.4 test")
+
+        block = get_file_message_content(str(path))
+        assert block["type"] == "document"
+        assert block["source"] == {"type": "base64", "media_type": "application/pdf", "data": "JVBERi0xLjQgdGVzdA=="}
@@ -0,0 +1,90 @@
+"""
+Tests for the deterministic order parser (extraction fast path)
+"""
+
+import pytest
+
+from agents.config import FAST_PATH_MIN_CONFIDENCE
+from agents.utils.order_parser import parse_order
+
+
+@pytest.mark.unit
+class TestParseOrder:
+    """Unit tests for the rules mirrored from the OrderExtractorAgent prompt"""
+
+    def test_range_and_k_budget(self):
+        """'100-150' → min 100 / max 150 / preferred 125 and '4.5k' → 4500"""
+        result = parse_order("I need 100-150 office chairs, budget 4.5k")
+
+        assert result.resolved
+        assert result.order.item == "office chairs"
+        assert result.order.quantity.model_dump() == {"min": 100, "max": 150, "preferred": 125}
+        assert result.order.budget == 4500
+
+    def test_vague_amount_currency_and_urgency(self):
+        """'around 100' → 90/110/100, '€' → EUR, 'ASAP' → urgent"""
+        result = parse_order("We want to buy around 100 Arduino boards for €3000 ASAP")
+
+        assert result.resolved
+        assert result.order.quantity.model_dump() == {"min": 90, "max": 110, "preferred": 100}
+        assert result.order.currency == "EUR"
+        assert result.order.urgency == "urgent"
+
+    @pytest.mark.parametrize("text,budget", [
+        ("I need 50 laptops for under $20,000", 20000),
+        ("I need 100 Arduino boards, budget is $4500", 4500),
+        ("50 laptops, budget $20k", 20000),
+    ])
+    def test_dollar_budgets(self, text, budget):
+        result = parse_order(text)
+
+        assert result.resolved
+        assert result.order.budget == budget
+        assert result.order.currency == "USD"
+        assert result.confidence == 1.0
+
+    def test_no_budget_resolves_as_unknown(self):
+        """A request without a budget phrase gets budget 0 at reduced confidence"""
+        result = parse_order("I want to buy one coffee machine")
+
+        assert result.resolved
+        assert result.order.quantity.preferred == 1
+        assert result.order.budget == 0
+        assert result.confidence < FAST_PATH_MIN_CONFIDENCE
+
+    @pytest.mark.parametrize("text", [
+        "I need 10 monitors with warranty for $2000",
+        "I need 5 laptops and 3 mice for $5k",
+        "Can you find me 3 chairs for $300?",
+        "I need chairs for $300",
+        "",
+    ])
+    def test_complex_inputs_are_left_to_the_llm(self, text):
+        assert not parse_order(text).resolved
+
+    @pytest.mark.parametrize("text", [
+        "I need 10 laptops at $500",
+        "50 laptops, $20k",
+        "I need 20 chairs $1500",
+    ])
+    def test_amounts_without_a_budget_cue_are_ambiguous(self, text):
+        """A bare amount may be a unit price; the LLM decides"""
+        result = parse_order(text)
+
+        assert not result.resolved
+        assert "budget" in result.missing
+        assert result.confidence < FAST_PATH_MIN_CONFIDENCE
+
+    @pytest.mark.parametrize("text", [
+        "I need 50 laptops in 2 weeks",
+        "I need 30 chairs soon-ish",
+        "I need 10 monitors, 27 inch",
+        "I need 50 laptops in 2 weeks for $20k",
+        "I need 10 monitors, 27 inch, budget $3000",
+    ])
+    def test_timing_and_specs_are_not_swallowed_into_the_item(self, text):
+        """Leftover timing or spec words mean the parse is incomplete"""
+        result = parse_order(text)
+
+        assert not result.resolved
+        assert result.confidence < FAST_PATH_MIN_CONFIDENCE
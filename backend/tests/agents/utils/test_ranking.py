@@ -0,0 +1,91 @@
+"""
+Tests for Pareto-frontier ranking
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from agents.nodes.aggregator import create_final_comparison_report
+from agents.utils.ranking import RANKING_PROFILES, ParetoRanking, pareto_frontier
+from agents.utils.scoring import OfferColumns, ScoreWeights
+
+
+def brute_force_frontier(objectives):
+    keep = []
+    for i, row in enumerate(objectives):
+        dominated = any(
+            np.all(other >= row) and np.any(other > row)
+            for j, other in enumerate(objectives) if j != i
+        )
+        if not dominated:
+            keep.append(i)
+    return keep
+
+
+@pytest.mark.unit
+class TestParetoRanking:
+    """Unit tests for the frontier and weighted re-ranking"""
+
+    def test_frontier_matches_brute_force(self):
+        rng = np.random.default_rng(4)
+        for _ in range(30):
+            objectives = rng.integers(0, 5, size=(rng.integers(1, 40), 3)).astype(float)
+            assert sorted(pareto_frontier(objectives).tolist()) == brute_force_frontier(objectives)
+
+    def test_report_exposes_frontier_and_profiles(self):
+        leaderboard = {
+            "cheap": {"vendor_name": "Cheap", "price_total": 90, "delivery_days": 30, "payment_terms": "Upfront", "status": "in_progress"},
+            "fast": {"vendor_name": "Fast", "price_total": 110, "delivery_days": 2, "payment_terms": "Net 30", "status": "finalized"},
+            "worse": {"vendor_name": "Worse", "price_total": 120, "delivery_days": 10, "payment_terms": "Net 60", "status": "in_progress"},
+        }
+        report = create_final_comparison_report(leaderboard, {"quantity": {"preferred": 1}, "budget": 200})
+
+        assert [offer.vendor_id for offer in report.pareto_frontier] == ["cheap", "fast"]
+        assert {v.vendor_id: v.on_pareto_frontier for v in report.vendors} == {"cheap": True, "fast": True, "worse": False}
+        assert report.weights == {"price": 0.6, "delivery": 0.25, "payment": 0.15, "status": 0.0}
+
+        by_profile = {ranking.profile: ranking for ranking in report.weighted_rankings}
+        assert set(by_profile) == set(RANKING_PROFILES)
+        assert by_profile["configured"].recommended_vendor_id == report.recommended_vendor_id
+        assert by_profile["fast_delivery"].recommended_vendor_id == "fast"
+
+    def test_offer_without_a_price_does_not_dominate_priced_ones(self):
+        columns = OfferColumns.from_offers({
+            "none": {"price_total": 0, "delivery_days": 5},
+            "priced": {"price_total": 90, "delivery_days": 7},
+        })
+        pareto = ParetoRanking(columns, best_price=90)
+
+        assert sorted(pareto.frontier.tolist()) == [0, 1]
+        best, score = pareto.rerank(RANKING_PROFILES["price_first"])[0]
+        assert best == 1
+        assert score == pytest.approx(columns.scores(90, RANKING_PROFILES["price_first"]).max())
+
+    def test_frontier_best_equals_full_ranking_best(self):
+        rng = random.Random(9)
+        terms = [None, "Net 30", "Net 60", "advance"]
+        statuses = ["in_progress", "finalized", "walked_away"]
+        for _ in range(25):
+            leaderboard = {
+                f"v{i}": {
+                    "vendor_name": f"V{i}",
+                    "price_total": round(rng.uniform(50, 150), 2),
+                    "delivery_days": rng.choice([None, rng.randint(1, 30)]),
+                    "payment_terms": rng.choice(terms),
+                    "status": rng.choice(statuses),
+                }
+                for i in range(rng.randint(1, 25))
+            }
+            weights = ScoreWeights(price=rng.random(), delivery=rng.random(), payment=rng.random(), status=rng.random())
+            report = create_final_comparison_report(leaderboard, {"quantity": {"preferred": 1}}, weights=weights)
+            configured = next(r for r in report.weighted_rankings if r.profile == "configured")
+            assert configured.scores[configured.recommended_vendor_id] == report.vendors[0].score
+
+    def test_weights_validation(self):
+        with pytest.raises(ValueError):
+            ScoreWeights(price=-1)
+        with pytest.raises(ValueError):
+            ScoreWeights.from_dict({"quality": 1.0})
+        assert ScoreWeights.from_dict({"price": 1.0}).as_dict() == {"price": 1.0, "delivery": 0.0, "payment": 0.0, "status": 0.0}
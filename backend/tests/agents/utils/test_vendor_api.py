@@ -198,6 +198,78 @@ class TestVendorAPIClientUnit:
         assert len(vendors) == 2
 
 
+@pytest.mark.unit
+class TestVendorDetailsBulkUnit:
+    """Unit tests for bulk vendor detail fetching"""
+    
+    @responses.activate
+    def test_bulk_dedupes_ids(self, mock_api_base_url):
+        """Repeated ids are requested only once"""
+        for vendor_id in (1, 2):
+            responses.add(
+                responses.GET,
+                f"{mock_api_base_url}/vendors/{vendor_id}",
+                json={"id": vendor_id, "documents": [{"filename": f"{vendor_id}.pdf"}]},
+                status=200
+            )
+        
+        client = VendorAPIClient(api_base_url=mock_api_base_url)
+        results = list(client.get_vendor_details_bulk([1, "1", 2, 2], max_concurrency=2))
+        
+        assert len(responses.calls) == 2
+        assert sorted(r.vendor_id for r in results) == ["1", "2"]
+        assert all(r.ok for r in results)
+    
+    @responses.activate
+    def test_bulk_reports_failures_per_vendor(self, mock_api_base_url):
+        """A failing vendor does not abort the rest of the batch"""
+        responses.add(responses.GET, f"{mock_api_base_url}/vendors/1", json={"id": 1}, status=200)
+        responses.add(responses.GET, f"{mock_api_base_url}/vendors/2", json={"error": "boom"}, status=500)
+        
+        client = VendorAPIClient(api_base_url=mock_api_base_url)
+        results = {r.vendor_id: r for r in client.get_vendor_details_bulk([1, 2])}
+        
+        assert results["1"].ok
+        assert results["1"].details == {"id": 1}
+        assert not results["2"].ok
+        assert "500" in results["2"].error
+    
+    @responses.activate
+    def test_async_bulk(self, mock_api_base_url):
+        """Async variant yields one result per unique id"""
+        import asyncio
+        for vendor_id in (1, 2, 3):
+            responses.add(responses.GET, f"{mock_api_base_url}/vendors/{vendor_id}", json={"id": vendor_id}, status=200)
+        
+        client = VendorAPIClient(api_base_url=mock_api_base_url)
+        
+        async def collect():
+            return [r async for r in client.aget_vendor_details_bulk([1, 2, 3, 3], max_concurrency=2)]
+        
+        results = asyncio.run(collect())
+        
+        assert sorted(r.vendor_id for r in results) == ["1", "2", "3"]
+        assert all(r.ok for r in results)
+    
+    @responses.activate
+    def test_enrich_vendors_merges_details(self, mock_api_base_url, sample_vendor_response):
+        """Details are merged into vendors; failures leave vendors unchanged"""
+        responses.add(
+            responses.GET,
+            f"{mock_api_base_url}/vendors/1",
+            json={"id": 1, "documents": [{"filename": "catalog.pdf"}]},
+            status=200
+        )
+        responses.add(responses.GET, f"{mock_api_base_url}/vendors/2", status=404)
+        
+        client = VendorAPIClient(api_base_url=mock_api_base_url)
+        enriched = client.enrich_vendors(sample_vendor_response)
+        
+        assert [v["id"] for v in enriched] == [1, 2]
+        assert enriched[0]["documents"] == [{"filename": "catalog.pdf"}]
+        assert enriched[1] == sample_vendor_response[1]
+
+
 # ========== Integration Tests (Real API) ==========
 
 @pytest.mark.integration
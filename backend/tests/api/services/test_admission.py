@@ -0,0 +1,124 @@
+"""
+Tests for admission control of negotiation runs and extraction requests
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.services.admission import AdmissionPool, AdmissionRejected
+from api.services.run_jobs import RunJobManager, RunRequest
+from tests.api.services.test_run_jobs import ORDER, gate, wait_until  # noqa: F401 (fixture)
+from tests.conftest import make_order
+
+
+@pytest.fixture
+def manager(gate):
+    manager = RunJobManager(workers=1, retention=8, resume_grace=0.3, max_queue=2)
+    yield manager
+    # Let runs still going finish while the stub graph and store are patched in
+    gate.set()
+    wait_until(lambda: manager.admission_stats()["running"] == 0)
+    manager.shutdown()
+
+
+def queued_positions(job):
+    return [event.message["payload"]["position"] for event in job._events if event.type == "queued"]
+
+
+@pytest.mark.unit
+class TestAdmission:
+    """Unit tests for bounded concurrency, wait queues and load shedding"""
+
+    def test_pool_admits_in_order_and_sheds_beyond_the_queue(self):
+        pool = AdmissionPool("test", max_concurrent=1, max_queue=2)
+        order = []
+
+        async def request(name, release):
+            async with pool.admit():
+                order.append(name)
+                await release.wait()
+
+        async def scenario():
+            releases = [asyncio.Event() for _ in range(3)]
+            tasks = [asyncio.create_task(request(i, releases[i])) for i in range(3)]
+            await asyncio.sleep(0)
+            assert pool.stats()["active"] == 1 and pool.stats()["waiting"] == 2
+
+            with pytest.raises(AdmissionRejected) as rejected:
+                async with pool.admit():
+                    pass
+            assert rejected.value.retry_after >= 1
+            assert rejected.value.http_exception().headers["Retry-After"] == str(rejected.value.retry_after)
+
+            # A waiter that gives up leaves the line
+            tasks[1].cancel()
+            releases[0].set()
+            releases[2].set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run(scenario())
+        assert order == [0, 2]
+        assert pool.stats()["active"] == 0 and pool.stats()["rejected"] == 1
+
+    def test_queued_runs_learn_their_position(self, gate, manager):
+        running, _ = manager.submit(RunRequest(order_object=ORDER))
+        wait_until(lambda: running.status == "running")
+        first, _ = manager.submit(RunRequest(order_object=ORDER))
+        second, _ = manager.submit(RunRequest(order_object=ORDER))
+        assert (first.queue_position, second.queue_position) == (1, 2)
+
+        with pytest.raises(AdmissionRejected):
+            manager.submit(RunRequest(order_object=ORDER))
+        assert manager.admission_stats()["rejected"] == 1
+
+        first.cancel()
+        assert queued_positions(second) == [2, 1]
+
+        gate.set()
+        # Workers are released just after their run finishes
+        wait_until(lambda: manager.admission_stats()["running"] == 0)
+        assert second.finished and second.snapshot()["queue_position"] is None
+
+    def test_full_queue_is_rejected_with_retry_after(self, gate, manager, monkeypatch):
+        import api.routers.runs as runs_router
+        from main import app
+        monkeypatch.setattr(runs_router, "run_jobs", manager)
+        client = TestClient(app)
+
+        statuses = [
+            client.post("/api/runs", json={"order_object": ORDER, "max_rounds": rounds}).status_code
+            for rounds in (1, 2, 3, 4)
+        ]
+        assert statuses == [202, 202, 202, 503]
+
+        rejected = client.post("/api/runs", json={"order_object": ORDER, "max_rounds": 5})
+        assert int(rejected.headers["Retry-After"]) >= 1
+        assert client.get("/api/runs/admission").json()["rejected"] == 2
+
+    def test_bulk_rows_are_admitted_one_by_one(self, monkeypatch):
+        import api.routers.extract as extract_router
+        from api.services.extraction import extraction_service
+        from main import app
+
+        pool = AdmissionPool("extraction", max_concurrent=2, max_queue=8)
+        monkeypatch.setattr(extract_router, "extraction_admission", pool)
+        in_flight = peak = 0
+
+        async def fake_extract(text):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return make_order(text)
+
+        monkeypatch.setattr(extraction_service, "extract", fake_extract)
+        body = "\n".join(f'"order {i}"' for i in range(10))
+        response = TestClient(app).post("/api/extract/bulk?format=jsonl&concurrency=8", content=body)
+
+        assert response.status_code == 200 and len(response.text.splitlines()) == 11
+        # The request asked for 8 at once, but the pool allows 2
+        assert peak == 2
+        assert pool.stats()["active"] == 0
@@ -0,0 +1,83 @@
+"""
+Tests for bulk CSV/JSONL order extraction
+"""
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+
+from api.services.bulk_extraction import detect_format, read_rows, stream_bulk_extraction
+from tests.conftest import make_order
+
+
+def collect(rows, extract, max_concurrency=4):
+    async def run():
+        return [record async for record in stream_bulk_extraction(rows, extract=extract, max_concurrency=max_concurrency)]
+    return asyncio.run(run())
+
+
+@pytest.mark.unit
+class TestBulkExtraction:
+    """Unit tests for row parsing, dedupe and the streamed records"""
+
+    def test_read_csv_and_jsonl_rows(self):
+        csv_rows = read_rows("id,text\nr1,I need 5 desks\nr2,\"Chairs, 10\"\n", "csv")
+        assert [(r.row_id, r.text) for r in csv_rows] == [("r1", "I need 5 desks"), ("r2", "Chairs, 10")]
+
+        jsonl_rows = read_rows('"plain text"\n\n{"request": "object text"}\n', "jsonl")
+        assert [(r.index, r.row_id, r.text) for r in jsonl_rows] == [(1, "1", "plain text"), (2, "2", "object text")]
+
+        assert detect_format("orders.csv", "") == "csv"
+        assert detect_format(None, '{"text": "x"}') == "jsonl"
+        with pytest.raises(ValueError):
+            read_rows("{broken\n", "jsonl")
+
+    def test_duplicates_extracted_once_and_errors_reported(self):
+        calls = []
+
+        async def fake_extract(text):
+            calls.append(text)
+            await asyncio.sleep(0.01)
+            if "bad" in text:
+                raise ValueError("cannot parse")
+            return make_order(text)
+
+        rows = read_rows("id,text\n1,five desks\n2,five   desks\n3,bad row\n4,\n", "csv")
+        records = collect(rows, fake_extract)
+
+        summary = records[-1]["summary"]
+        assert summary == {"rows": 4, "unique": 2, "errors": 2}
+        assert sorted(calls) == ["bad row", "five desks"]
+
+        by_row = {r["row"]: r for r in records[:-1]}
+        assert by_row[2]["duplicate_of"] == "1"
+        assert by_row[2]["order"]["item"] == "five desks"
+        assert by_row[3]["error"] == "cannot parse"
+        assert by_row[4]["error"] == "Empty request text"
+
+    def test_concurrency_is_bounded(self):
+        in_flight = 0
+        peak = 0
+
+        async def fake_extract(text):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return make_order(text)
+
+        rows = read_rows("\n".join(f'"order {i}"' for i in range(12)), "jsonl")
+        records = collect(rows, fake_extract, max_concurrency=3)
+
+        assert len(records) == 13
+        assert peak == 3
+
+    @pytest.mark.parametrize("concurrency", [0, 10_000])
+    def test_requested_concurrency_is_validated(self, concurrency):
+        from main import app
+        response = TestClient(app).post(
+            f"/api/extract/bulk?format=jsonl&concurrency={concurrency}", content='"five desks"'
+        )
+
+        assert response.status_code == 422
@@ -0,0 +1,116 @@
+"""
+Tests for the compact (delta) run event protocol
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from api.services.event_protocol import DeltaEncoder, apply_ops, normalize, resolve_protocol
+from api.services.run_jobs import RunJob, RunRequest, format_event
+
+
+def offer(price, status="in_progress"):
+    return {"vendor_id": "1", "price_total": price, "status": status}
+
+
+def progress(node, state_update):
+    return format_event({node: state_update})[0]
+
+
+@pytest.mark.unit
+class TestDeltaEncoder:
+    """Unit tests for diffing node updates against the client state"""
+
+    def test_only_changes_and_appended_entries_are_sent(self):
+        encoder = DeltaEncoder()
+        first = {
+            "leaderboard": {1: offer(100)},
+            "negotiation_history": {1: [{"round": 0, "turns": ["hi"]}]},
+            "relevant_vendors": [{"id": 1}],
+        }
+        assert encoder.encode(first) == [
+            ["s", ["leaderboard", "1"], offer(100)],
+            ["a", ["negotiation_history", "1"], [{"round": 0, "turns": ["hi"]}]],
+            ["a", ["relevant_vendors"], [{"id": 1}]],
+        ]
+
+        ops = encoder.encode({
+            "leaderboard": {1: offer(95)},
+            "negotiation_history": {1: [{"round": 1, "turns": ["again"]}]},
+            "conversation_ids": {},
+        })
+        assert ops == [
+            ["s", ["leaderboard", "1", "price_total"], 95],
+            ["a", ["negotiation_history", "1"], [{"round": 1, "turns": ["again"]}]],
+        ]
+        assert encoder.encode({"leaderboard": {1: offer(95)}}) == []
+
+    def test_replaced_values_are_diffed_recursively(self):
+        encoder = DeltaEncoder()
+        report = {"recommended": "1", "vendors": [{"id": "1", "rank": 1}, {"id": "2", "rank": 2}], "notes": "x"}
+        encoder.encode({"final_comparison_report": report})
+
+        ops = encoder.encode({"final_comparison_report": {
+            "recommended": "2",
+            "vendors": [{"id": "2", "rank": 1}, {"id": "1", "rank": 2}, {"id": "3", "rank": 3}],
+        }})
+        client = apply_ops(normalize({"final_comparison_report": report}), ops)
+
+        assert ["d", ["final_comparison_report", "notes"]] in ops
+        assert client == encoder.state
+
+    def test_ops_rebuild_the_state(self):
+        encoder, client = DeltaEncoder(), {}
+        updates = [
+            {"all_vendors": [{"id": 1}, {"id": 2}], "phase": "evaluation"},
+            {"leaderboard": {1: offer(100), 2: offer(120)}, "live_market": {"version": 1, "best": 100}},
+            {"leaderboard": {2: offer(90, "finalized")}, "live_market": {"version": 2, "best": 90}},
+            {"market_analysis": {"rankings": [{"id": 2}, {"id": 1}]}, "rounds_completed": 1},
+            {"market_analysis": {"rankings": [{"id": 2}]}, "rounds_completed": 2},
+        ]
+        for update in updates:
+            apply_ops(client, json.loads(json.dumps(encoder.encode(update))))
+
+        assert client == encoder.state
+        assert client["leaderboard"]["2"]["status"] == "finalized"
+        assert client["market_analysis"] == {"rankings": [{"id": 2}]}
+
+    def test_protocol_names(self):
+        assert resolve_protocol(None) == "full"
+        assert resolve_protocol("compact") == "compact"
+        with pytest.raises(ValueError):
+            resolve_protocol("msgpack")
+
+
+@pytest.mark.unit
+class TestCompactSubscriptions:
+    """Sequence numbers and snapshots in a job's compact stream"""
+
+    def test_late_subscriber_starts_from_a_snapshot(self):
+        job = RunJob("compact", RunRequest(), snapshot_interval=3)
+
+        async def watch():
+            early = job.subscribe("compact")
+            for price in (100, 95, 90, 85):
+                job.publish(progress("negotiate", {"leaderboard": {1: offer(price)}}))
+            late = job.subscribe("compact")
+            job._finish("completed", {"type": "complete", "payload": {"run_id": "compact"}})
+            finished = job.subscribe("compact")
+
+            async def collect(subscription):
+                return [json.loads(text) async for _, _, text in subscription]
+
+            return await asyncio.gather(collect(early), collect(late), collect(finished))
+
+        early, late, finished = asyncio.run(watch())
+
+        # Every message carries the next sequence number
+        assert [message["seq"] for message in early] == list(range(6))
+        assert [message["type"] for message in early] == ["delta", "delta", "delta", "snapshot", "delta", "complete"]
+        assert early[3]["state"]["leaderboard"]["1"]["price_total"] == 90
+
+        assert [(message["type"], message["seq"]) for message in late] == [("snapshot", 4), ("complete", 5)]
+        assert late[0]["state"]["leaderboard"]["1"]["price_total"] == 85
+        assert finished == late
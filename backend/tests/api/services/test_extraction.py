@@ -0,0 +1,68 @@
+"""
+Tests for ExtractionService (single-flight + micro-batching)
+"""
+
+import asyncio
+import pytest
+
+from api.services.extraction import ExtractionService
+from tests.conftest import make_order
+
+
+class FakeAgent:
+    """Records each batch it is asked to extract"""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.fail_on = fail_on
+
+    async def aextract_many(self, texts):
+        self.batches.append(list(texts))
+        await asyncio.sleep(0.01)
+        return [ValueError("bad input") if text == self.fail_on else make_order(text) for text in texts]
+
+
+@pytest.mark.unit
+class TestExtractionService:
+    """Unit tests for coalescing and batching behaviour"""
+
+    def test_identical_texts_share_one_extraction(self):
+        agent = FakeAgent()
+        service = ExtractionService(agent_factory=lambda: agent, batch_window_ms=5)
+
+        async def run():
+            return await asyncio.gather(*(service.extract("10 chairs  for $500") for _ in range(5)))
+
+        results = asyncio.run(run())
+
+        assert agent.batches == [["10 chairs  for $500"]]
+        assert all(r.item == "10 chairs  for $500" for r in results)
+        assert service.stats.coalesced == 4
+
+    def test_distinct_texts_are_micro_batched(self):
+        agent = FakeAgent()
+        service = ExtractionService(agent_factory=lambda: agent, batch_window_ms=5, max_batch_size=3)
+
+        async def run():
+            return await asyncio.gather(*(service.extract(f"order {i}") for i in range(7)))
+
+        results = asyncio.run(run())
+
+        assert [r.item for r in results] == [f"order {i}" for i in range(7)]
+        assert [len(b) for b in agent.batches] == [3, 3, 1]
+
+    def test_failure_is_isolated_to_its_request(self):
+        agent = FakeAgent(fail_on="broken")
+        service = ExtractionService(agent_factory=lambda: agent, batch_window_ms=5)
+
+        async def run():
+            return await asyncio.gather(
+                service.extract("fine"),
+                service.extract("broken"),
+                return_exceptions=True
+            )
+
+        ok, failed = asyncio.run(run())
+
+        assert ok.item == "fine"
+        assert isinstance(failed, ValueError)
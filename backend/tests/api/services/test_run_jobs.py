@@ -0,0 +1,346 @@
+"""
+Tests for background negotiation run jobs
+
+Runs use the stub graph from tests.agents.test_graph (no LLM or vendor API
+calls) on a private worker pool.
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import agents.graph as graph_module
+import agents.nodes.aggregator as aggregator_module
+from agents.run_results import RunResultStore
+from agents.run_stream import STREAM_KEY
+from api.services.run_jobs import JOB_QUEUED, RunJob, RunJobManager, RunRequest, format_event
+from tests.agents.test_graph import build_graph
+
+ORDER = {"item": "chairs", "quantity": {"preferred": 1}, "budget": 95}
+
+
+@pytest.fixture
+def gate(monkeypatch, tmp_path):
+    """Stub graph whose vendor 0 waits for the returned event in every run."""
+    store = RunResultStore(directory=str(tmp_path), cache_size=0)
+    monkeypatch.setattr(graph_module, "run_results", store)
+    monkeypatch.setattr(aggregator_module, "run_results", store)
+
+    gate = threading.Event()
+
+    def wait_for_gate(payload):
+        if payload["vendor_id"] == 0:
+            gate.wait(5)
+
+    monkeypatch.setattr(graph_module, "app", build_graph(monkeypatch, 3, 2, [], on_negotiate=wait_for_gate))
+    yield gate
+    gate.set()
+
+
+@pytest.fixture
+def manager():
+    manager = RunJobManager(workers=1, retention=8, resume_grace=0.3)
+    yield manager
+    manager.shutdown()
+    # Cancelled runs record their results while the tmp_path store is still patched in
+    wait_until(lambda: manager.admission_stats()["running"] == 0)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.mark.unit
+class TestRunJobs:
+    """Unit tests for the job manager and the runs API"""
+
+    def test_subscribers_share_the_event_stream(self, gate, manager):
+        job, created = manager.submit(RunRequest(order_object=ORDER, max_rounds=2))
+        assert created
+
+        async def watch():
+            early = job.subscribe()
+            wait_until(lambda: job.snapshot()["events"] >= 2)
+            gate.set()
+
+            async def collect(subscription):
+                return [json.loads(text) async for _, _, text in subscription]
+
+            late = job.subscribe()
+            return await asyncio.gather(collect(early), collect(late))
+
+        early, late = asyncio.run(watch())
+
+        assert early == late
+        assert early[-1] == {
+            "type": "complete",
+            "payload": {"run_id": job.run_id, "deadline_reached": False},
+            "seq": len(early) - 1,
+        }
+        snapshot = job.snapshot()
+        assert snapshot["status"] == "completed"
+        assert set(snapshot["leaderboard"]) == {"0", "1", "2"}
+        assert snapshot["subscribers"] == 0
+
+    def test_duplicate_requests_reuse_the_active_run(self, gate, manager):
+        request = RunRequest(order_object=ORDER)
+        first, _ = manager.submit(request, key=request.dedupe_key())
+        again, created = manager.submit(RunRequest(order_object=ORDER), key=request.dedupe_key())
+        assert again is first and not created
+
+        gate.set()
+        wait_until(lambda: first.finished)
+        wait_until(lambda: manager._active_keys == {})
+        rerun, created = manager.submit(request, key=request.dedupe_key())
+        assert created and rerun is not first
+
+    def test_pool_is_bounded_and_queued_runs_cancel_at_once(self, gate, manager):
+        running, _ = manager.submit(RunRequest(order_object=ORDER))
+        queued, _ = manager.submit(RunRequest(order_object=ORDER))
+        wait_until(lambda: running.status == "running")
+        time.sleep(0.1)
+        assert queued.status == JOB_QUEUED
+
+        assert queued.cancel() is True
+        assert queued.status == "cancelled"
+        assert queued.snapshot()["started_at"] is None
+
+        gate.set()
+        wait_until(lambda: running.finished)
+        assert running.status == "completed"
+        assert queued.started_at is None
+
+    def test_runs_api(self, gate, manager, monkeypatch):
+        import api.routers.runs as runs_router
+        from main import app
+        monkeypatch.setattr(runs_router, "run_jobs", manager)
+        client = TestClient(app)
+
+        body = {"order_object": ORDER, "max_rounds": 2}
+        response = client.post("/api/runs", json=body)
+        assert response.status_code == 202
+        run_id = response.json()["run_id"]
+
+        duplicate = client.post("/api/runs", json=body)
+        assert duplicate.status_code == 200
+        assert duplicate.json() == {"run_id": run_id, "status": "running", "deduplicated": True}
+        assert client.post("/api/runs", json={**body, "deadline_seconds": -1}).status_code == 400
+
+        gate.set()
+        wait_until(lambda: client.get(f"/api/runs/{run_id}").json()["status"] == "completed")
+        status = client.get(f"/api/runs/{run_id}").json()
+        assert set(status["leaderboard"]) == {"0", "1", "2"}
+
+        events = client.get(f"/api/runs/{run_id}/events").text
+        assert events.count("event: progress") == status["events"] - 1
+        assert "event: complete" in events
+        assert client.get("/api/runs/unknown/events").status_code == 404
+
+        compact = client.get(f"/api/runs/{run_id}/events?protocol=compact").text
+        assert compact.startswith("id: ") and "event: snapshot" in compact and "event: complete" in compact
+        assert len(compact) < len(events)
+        assert client.get(f"/api/runs/{run_id}/events?protocol=xml").status_code == 400
+
+    def test_ndjson_stream_of_a_new_run(self, gate, manager, monkeypatch):
+        import api.routers.negotiation as negotiation_router
+        from main import app
+        monkeypatch.setattr(negotiation_router, "run_jobs", manager)
+        client = TestClient(app)
+        gate.set()
+
+        with client.stream("POST", "/api/negotiate/stream", json={"order_object": ORDER, "max_rounds": 2}) as response:
+            assert response.headers["content-type"] == "application/x-ndjson"
+            lines = [json.loads(line) for line in response.iter_lines() if line]
+
+        subscribed, *events, complete, result = lines
+        run_id = subscribed["payload"]["run_id"]
+        assert [event["type"] for event in events] == ["progress"] * len(events)
+        assert [event["seq"] for event in events + [complete]] == list(range(len(events) + 1))
+        assert complete["type"] == "complete"
+        assert result["payload"]["run_id"] == run_id and result["payload"]["status"] == "completed"
+        assert set(result["payload"]["leaderboard"]) == {"0", "1", "2"}
+
+        response = client.post("/api/negotiate/stream", json={"order_object": ORDER, "deadline_seconds": -1})
+        assert response.status_code == 400
+
+    def test_websocket_cancel_reaches_every_subscriber(self, gate, manager, monkeypatch):
+        import api.routers.negotiation as negotiation_router
+        import api.routers.runs as runs_router
+        from main import app
+        monkeypatch.setattr(negotiation_router, "run_jobs", manager)
+        monkeypatch.setattr(runs_router, "run_jobs", manager)
+        client = TestClient(app)
+
+        with client.websocket_connect("/api/negotiate/ws") as owner:
+            owner.send_json({"order_object": ORDER})
+            run_id = owner.receive_json()["payload"]["run_id"]
+            assert owner.receive_json()["type"] == "progress"
+            job = manager.get(run_id)
+
+            with client.websocket_connect(f"/api/runs/{run_id}/ws") as viewer:
+                assert viewer.receive_json()["type"] == "subscribed"
+                assert viewer.receive_json()["type"] == "progress"
+                viewer.send_json({"type": "cancel"})
+                while (message := viewer.receive_json())["type"] == "progress":
+                    pass
+                assert message["type"] == "cancelled"
+                assert message["payload"] == {"run_id": run_id, "reason": "cancel_requested"}
+
+            while (message := owner.receive_json())["type"] == "progress":
+                pass
+            assert message["type"] == "cancelled"
+        wait_until(lambda: job.status == "cancelled")
+
+
+@pytest.mark.unit
+class TestResume:
+    """Reconnecting subscribers receive only the events they missed"""
+
+    def test_replay_after_offset_or_snapshot_past_the_log(self):
+        job = RunJob("resume", RunRequest(), max_events=4)
+
+        async def resume(last_offset):
+            subscription = job.subscribe("full", last_offset)
+            subscription.close()
+            messages = []
+            while subscription._pending:
+                event = subscription._pending.popleft()
+                messages.append(json.loads(event.text("full")))
+            return messages
+
+        for price in range(100, 94, -1):
+            job.publish(format_event({"negotiate": {"leaderboard": {1: {"price_total": price}}}})[0])
+
+        missed = asyncio.run(resume(3))
+        assert [message["seq"] for message in missed] == [4, 5]
+        assert missed[-1]["payload"]["state_update"]["leaderboard"] == {"1": {"price_total": 95}}
+        assert asyncio.run(resume(5)) == []
+
+        # Offsets 1 and 2 have left the log: resync from a snapshot
+        (snapshot,) = asyncio.run(resume(0))
+        assert snapshot["type"] == "snapshot" and snapshot["seq"] == 5
+        assert snapshot["state"]["leaderboard"] == {"1": {"price_total": 95}}
+
+    def test_tokens_reach_live_subscribers_only(self):
+        job = RunJob("tokens", RunRequest())
+
+        async def watch():
+            live = job.subscribe()
+            job.publish(format_event({STREAM_KEY: {"event": "activity", "message": "Drafting...", "payload": {}}})[0])
+            job.publish(format_event({STREAM_KEY: {"event": "token", "payload": {"vendor_id": "1", "text": "Hi"}}})[0])
+            job.publish(format_event({"negotiate": {"leaderboard": {1: {"price_total": 90}}}})[0])
+            late = job.subscribe()
+            job._finish("completed", {"type": "complete", "payload": {"run_id": "tokens"}})
+
+            async def collect(subscription):
+                return [(offset, json.loads(text)) async for offset, _, text in subscription]
+
+            return await asyncio.gather(collect(live), collect(late))
+
+        live, late = asyncio.run(watch())
+
+        assert [(offset, message["type"]) for offset, message in live] == [
+            (0, "activity"), (None, "token"), (1, "progress"), (2, "complete")
+        ]
+        assert "seq" not in live[1][1] and live[0][1]["message"] == "Drafting..."
+        assert [message["type"] for _, message in late] == ["activity", "progress", "complete"]
+        assert job.snapshot()["events"] == 3
+
+    def test_websocket_reconnect_resumes_the_same_run(self, gate, manager, monkeypatch):
+        import api.routers.negotiation as negotiation_router
+        from main import app
+        monkeypatch.setattr(negotiation_router, "run_jobs", manager)
+        client = TestClient(app)
+
+        with client.websocket_connect("/api/negotiate/ws") as first:
+            first.send_json({"order_object": ORDER, "max_rounds": 2})
+            run_id = first.receive_json()["payload"]["run_id"]
+            received = [first.receive_json(), first.receive_json()]
+
+        job = manager.get(run_id)
+        gate.set()
+        wait_until(lambda: job.finished)
+
+        with client.websocket_connect("/api/negotiate/ws") as second:
+            second.send_json({"run_id": run_id, "last_offset": received[-1]["seq"]})
+            assert second.receive_json()["payload"]["last_offset"] == received[-1]["seq"]
+            while received[-1]["type"] != "complete":
+                received.append(second.receive_json())
+
+        # Every event exactly once, from the one run
+        assert [message["seq"] for message in received] == list(range(job.snapshot()["events"]))
+        assert list(manager._jobs) == [run_id]
+        assert job.status == "completed"
+
+    def test_abandoned_websocket_run_is_cancelled_after_the_grace_period(self, gate, manager, monkeypatch):
+        import api.routers.negotiation as negotiation_router
+        from main import app
+        monkeypatch.setattr(negotiation_router, "run_jobs", manager)
+        client = TestClient(app)
+
+        with client.websocket_connect("/api/negotiate/ws") as socket:
+            socket.send_json({"order_object": ORDER})
+            job = manager.get(socket.receive_json()["payload"]["run_id"])
+
+        assert not job.cancel_token.cancelled
+        wait_until(lambda: job.status == "cancelled")
+
+
+@pytest.mark.unit
+class TestBackpressure:
+    """Slow subscribers get coalesced progress instead of holding up the run"""
+
+    def test_lagging_subscriber_catches_up_from_the_latest_state(self):
+        job = RunJob("lagging", RunRequest(), subscriber_queue=4)
+
+        async def watch():
+            subscription = job.subscribe()
+            # Nobody reads while the run publishes
+            for price in range(150, 100, -1):
+                job.publish(format_event({"negotiate": {"leaderboard": {1: {"price_total": price}}}})[0])
+                job.publish(format_event({STREAM_KEY: {"event": "token", "payload": {"text": "."}}})[0])
+                assert subscription.depth <= 4
+            stats = subscription.stats()
+            job._finish("completed", {"type": "complete", "payload": {"run_id": "lagging"}})
+            return stats, [json.loads(text) async for _, _, text in subscription]
+
+        stats, received = asyncio.run(watch())
+
+        assert len(received) <= 5
+        assert received[-1]["type"] == "complete" and received[-1]["seq"] == 50
+        snapshots = [message for message in received if message["type"] == "snapshot"]
+        assert snapshots[-1]["state"]["leaderboard"] == {"1": {"price_total": 101}}
+        # Offsets stay contiguous from the snapshot on
+        last = snapshots[-1]["seq"]
+        assert [message["seq"] for message in received[received.index(snapshots[-1]):]] == list(range(last, 51))
+
+        assert stats["coalesced"] > 0
+        assert stats["messages_dropped"]["token"] > 0
+        assert stats["messages_dropped"]["progress"] > 40
+        assert stats["queue_depth_max"] <= 4
+
+    def test_large_backlog_starts_from_a_snapshot(self):
+        job = RunJob("backlog", RunRequest(), subscriber_queue=3)
+        for price in range(100, 90, -1):
+            job.publish(format_event({"negotiate": {"leaderboard": {1: {"price_total": price}}}})[0])
+
+        async def first_message():
+            subscription = job.subscribe(last_offset=2)
+            subscription.close()
+            return json.loads(subscription._pending[0].text("full")), subscription.depth
+
+        message, depth = asyncio.run(first_message())
+        assert message["type"] == "snapshot" and message["seq"] == 9 and depth == 1
+        assert message["state"]["leaderboard"] == {"1": {"price_total": 91}}
+
+    def test_broadcast_metrics_endpoint(self):
+        from main import app
+        metrics = TestClient(app).get("/api/runs/broadcast").json()
+        assert {"subscribers", "queue_depth_max", "messages_dropped", "coalesced"} <= set(metrics)
@@ -0,0 +1,94 @@
+"""
+Tests for following several runs over one multiplexed WebSocket
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.services.run_jobs import RunRequest
+from api.services.wire_format import encode, envelope
+from tests.api.services.test_run_jobs import ORDER, gate, manager, wait_until  # noqa: F401 (fixtures)
+
+
+@pytest.fixture
+def client(manager, monkeypatch):
+    import api.routers.runs as runs_router
+    from main import app
+    monkeypatch.setattr(runs_router, "run_jobs", manager)
+    return TestClient(app)
+
+
+def receive_until(socket, condition):
+    messages = []
+    while True:
+        messages.append(socket.receive_json())
+        if condition(messages[-1]):
+            return messages
+
+
+@pytest.mark.unit
+class TestRunMultiplexer:
+    """Unit tests for the /api/runs/ws command protocol"""
+
+    def test_runs_started_on_one_connection_stream_tagged_events(self, gate, manager, client):
+        with client.websocket_connect("/api/runs/ws") as socket:
+            for ref in ("a", "b"):
+                socket.send_json({"type": "start", "ref": ref, "order_object": ORDER, "max_rounds": 1})
+            gate.set()
+
+            finished = set()
+            messages = receive_until(socket, lambda m: m["event"]["type"] == "complete" and (
+                finished.add(m["run_id"]) or len(finished) == 2
+            ))
+
+            acks = {m["event"]["payload"]["ref"]: m["run_id"] for m in messages if m["event"]["type"] == "subscribed"}
+            assert set(acks) == {"a", "b"} and set(acks.values()) == finished
+            for run_id in finished:
+                seqs = [m["event"]["seq"] for m in messages if m["run_id"] == run_id and "seq" in m["event"]]
+                assert seqs == list(range(manager.get(run_id).snapshot()["events"]))
+
+            # The connection stays open for more commands after the runs end
+            socket.send_json({"type": "subscribe", "run_id": acks["a"], "last_offset": 1})
+            replay = receive_until(socket, lambda m: m["event"]["type"] == "complete")
+            assert {m["run_id"] for m in replay} == {acks["a"]}
+            assert replay[1]["event"]["seq"] == 2
+
+            socket.send_json({"type": "subscribe", "run_id": "unknown", "ref": 7})
+            error = socket.receive_json()
+            assert error["event"]["type"] == "error" and error["event"]["payload"]["ref"] == 7
+
+    def test_unsubscribe_and_cancel_by_run_id(self, gate, manager, client):
+        other, _ = manager.submit(RunRequest(order_object=ORDER))
+
+        with client.websocket_connect("/api/runs/ws") as socket:
+            socket.send_json({"type": "start", "ref": "mine", "order_object": ORDER})
+            run_id = socket.receive_json()["run_id"]
+            # Waits behind the other run for the only worker
+            queued = socket.receive_json()
+            assert queued["run_id"] == run_id and queued["event"]["type"] == "queued"
+            assert queued["event"]["payload"]["position"] == 1
+            socket.send_json({"type": "subscribe", "run_id": other.run_id})
+            assert socket.receive_json()["event"]["type"] == "subscribed"
+            wait_until(lambda: other.subscriber_count == 1)
+
+            socket.send_json({"type": "unsubscribe", "run_id": other.run_id})
+            receive_until(socket, lambda m: m["event"]["type"] == "unsubscribed")
+            assert other.subscriber_count == 0
+
+            socket.send_json({"type": "cancel", "run_id": other.run_id})
+            socket.send_json({"type": "cancel", "run_id": run_id})
+            cancelled = receive_until(socket, lambda m: m["event"]["type"] == "cancelled")[-1]
+            assert cancelled["run_id"] == run_id
+            assert cancelled["event"]["payload"]["reason"] == "cancel_requested"
+
+        wait_until(lambda: other.status == "cancelled")
+
+    def test_msgpack_events_are_tagged_without_reencoding(self):
+        msgpack = pytest.importorskip("msgpack")
+        message = {"type": "progress", "seq": 3, "payload": {"state_update": {"round_index": 1}}}
+
+        tagged = envelope("run-1", encode(message, "msgpack"))
+        assert msgpack.unpackb(tagged) == {"run_id": "run-1", "event": message}
+        assert json.loads(envelope(None, encode(message, "json"))) == {"run_id": None, "event": message}
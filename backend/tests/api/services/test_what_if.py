@@ -0,0 +1,87 @@
+"""
+Tests for what-if re-scoring over stored run results
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+from agents.run_results import RunResultStore
+from api.services.what_if import WhatIfRequest, WhatIfScenario, evaluate_scenarios
+
+
+LEADERBOARD = {
+    "cheap": {"vendor_name": "Cheap", "price_total": 90, "delivery_days": 30, "payment_terms": "Upfront"},
+    "fast": {"vendor_name": "Fast", "price_total": 100, "delivery_days": 2, "payment_terms": "Net 30"},
+}
+ORDER = {"item": "chairs", "quantity": {"min": 1, "max": 1, "preferred": 1}, "budget": 95, "currency": "USD"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = RunResultStore(directory=str(tmp_path), cache_size=0)
+    store.save("run1", ORDER, LEADERBOARD, rounds_completed=2)
+    return store
+
+
+@pytest.mark.unit
+class TestWhatIf:
+    """Unit tests for scenario evaluation and the runs API"""
+
+    def test_store_round_trip_and_validation(self, store):
+        result = store.load("run1")
+        assert result.leaderboard == LEADERBOARD
+        assert result.rounds_completed == 2
+        assert store.load("missing") is None
+        with pytest.raises(ValueError):
+            store.load("../etc/passwd")
+
+    def test_scenarios_change_recommendation(self, store):
+        request = WhatIfRequest(scenarios=[
+            {"name": "baseline"},
+            {"name": "price_only", "weights": {"price": 1}},
+            {"budget_change_percent": 10},
+            {"quantity": 3, "budget": 500},
+            {"name": "bad", "weights": {"quality": 1}},
+        ], include_details=False)
+
+        response = evaluate_scenarios(store.load("run1"), request)
+        results = {r.name: r for r in response.scenarios}
+
+        assert results["baseline"].recommended_vendor_id == "fast"
+        assert results["baseline"].within_budget is True
+        assert results["price_only"].recommended_vendor_id == "cheap"
+        assert results["scenario_3"].budget == pytest.approx(104.5)
+        assert results["scenario_4"].best_price == 270
+        assert results["scenario_4"].quantity == 3
+        assert "Unknown score criteria" in results["bad"].error
+        assert results["baseline"].final_comparison_report is None
+
+    def test_what_if_endpoint(self, store, monkeypatch):
+        from main import app
+        import api.routers.runs as runs_router
+        monkeypatch.setattr(runs_router, "run_results", store)
+        client = TestClient(app)
+
+        response = client.post("/api/runs/run1/what-if", json={"scenarios": [{"weights": {"price": 1}}]})
+        assert response.status_code == 200
+        body = response.json()
+        assert body["offers"] == 2
+        assert body["scenarios"][0]["recommended_vendor_id"] == "cheap"
+        assert body["scenarios"][0]["final_comparison_report"]["pareto_frontier"]
+
+        assert client.post("/api/runs/nope/what-if", json={"scenarios": [{}]}).status_code == 404
+        assert client.post("/api/runs/run1/what-if", json={"scenarios": []}).status_code == 422
+        assert client.get("/api/runs/run1/results").json()["rounds_completed"] == 2
+
+    def test_budget_and_budget_change_are_exclusive(self, store, monkeypatch):
+        with pytest.raises(ValidationError, match="not both"):
+            WhatIfScenario(budget=500, budget_change_percent=10)
+
+        from main import app
+        import api.routers.runs as runs_router
+        monkeypatch.setattr(runs_router, "run_results", store)
+        response = TestClient(app).post(
+            "/api/runs/run1/what-if", json={"scenarios": [{"budget": 500, "budget_change_percent": 10}]}
+        )
+        assert response.status_code == 422
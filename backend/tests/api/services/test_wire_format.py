@@ -0,0 +1,98 @@
+"""
+Tests for the negotiable WebSocket wire formats
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api.services.event_protocol as event_protocol
+import api.services.wire_format as wire_format
+from api.services.run_jobs import RunJob, RunRequest, format_event
+from api.services.wire_format import resolve_encoding
+
+
+@pytest.fixture
+def msgpack():
+    return pytest.importorskip("msgpack")
+
+
+def finished_job():
+    job = RunJob("wire", RunRequest(), snapshot_interval=2)
+    for price in (100, 95, 90):
+        offer = {"price_total": price, "last_vendor_message": "We can do that. " * 20}
+        job.publish(format_event({"negotiate": {"leaderboard": {1: offer}}})[0])
+    job.publish({"type": "token", "payload": {"vendor_id": "1", "text": "Hi"}})
+    job._finish("completed", {"type": "complete", "payload": {"run_id": "wire", "deadline_reached": False}})
+    return job
+
+
+@pytest.mark.unit
+class TestWireFormat:
+    """Unit tests for encoding negotiation and MessagePack frames"""
+
+    def test_encoding_names(self, monkeypatch):
+        assert resolve_encoding(None) == "json"
+        with pytest.raises(ValueError):
+            resolve_encoding("xml")
+
+        # Without the msgpack package clients fall back to JSON
+        monkeypatch.setattr(wire_format, "msgpack", None)
+        assert resolve_encoding("msgpack") == "json"
+
+    def test_msgpack_frames_match_the_json_messages(self, msgpack):
+        job = finished_job()
+        events = list(job._events)
+        events.append(job._lag_snapshot_locked(events[-1].offset))
+
+        for event in events:
+            for protocol in ("full", "compact"):
+                text = event.text(protocol)
+                if text is not None:
+                    assert msgpack.unpackb(event.encoded(protocol, "msgpack")) == json.loads(text)
+        # Encoded once, shared by every subscriber
+        assert events[0].encoded("full", "msgpack") is events[0].encoded("full", "msgpack")
+
+    def test_json_serializer_fallback_is_equivalent(self, monkeypatch):
+        message = {"type": "progress", "payload": {"state_update": {"leaderboard": {1: {"price_total": 9.5}}}}}
+        fast = event_protocol.dumps(message)
+        monkeypatch.setattr(event_protocol, "orjson", None)
+        assert json.loads(event_protocol.dumps(message)) == json.loads(fast)
+
+    def test_websocket_selects_the_encoding_at_connection_start(self, msgpack, monkeypatch):
+        import api.routers.runs as runs_router
+        from main import app
+        job = finished_job()
+        monkeypatch.setattr(runs_router.run_jobs, "get", lambda run_id: job if run_id == "wire" else None)
+        client = TestClient(app)
+
+        headers = {"sec-websocket-extensions": "permessage-deflate; client_max_window_bits"}
+        with client.websocket_connect("/api/runs/wire/ws?encoding=msgpack&protocol=compact", headers=headers) as socket:
+            subscribed = msgpack.unpackb(socket.receive_bytes())
+            assert subscribed["payload"]["encoding"] == "msgpack"
+            assert subscribed["payload"]["compression"] == "permessage-deflate"
+            messages = [msgpack.unpackb(socket.receive_bytes()) for _ in range(2)]
+
+        assert [message["type"] for message in messages] == ["snapshot", "complete"]
+        assert messages[0]["state"]["leaderboard"]["1"]["price_total"] == 90
+
+        with client.websocket_connect("/api/runs/wire/ws") as socket:
+            subscribed = socket.receive_json()
+            assert subscribed["payload"]["encoding"] == "json"
+            assert subscribed["payload"]["compression"] is None
+            assert socket.receive_json()["type"] == "progress"
+
+    @pytest.mark.parametrize("offered,enabled,reported", [
+        ("permessage-deflate; client_max_window_bits", True, "permessage-deflate"),
+        ("permessage-deflate", False, None),
+        ("x-webkit-deflate-frame", True, None),
+        ("x-permessage-deflate-v2, foo", True, None),
+    ])
+    def test_compression_is_reported_only_when_negotiated(self, monkeypatch, offered, enabled, reported):
+        monkeypatch.setattr(wire_format, "WS_PER_MESSAGE_DEFLATE", enabled)
+
+        class Handshake:
+            headers = {"sec-websocket-extensions": offered}
+
+        assert wire_format.negotiated_compression(Handshake()) == reported
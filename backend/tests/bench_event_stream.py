@@ -0,0 +1,205 @@
+"""
+Run Event Stream Benchmark
+
+Replays the node updates of a synthetic negotiation run (default 20
+vendors, 3 rounds with the usual follow-up selection) through both event
+protocols and compares what one subscriber receives:
+
+- full: each node's raw state_update, serialized per subscriber (send_json)
+- compact: deltas against the client's state plus periodic snapshots,
+  serialized once per run (api.services.event_protocol)
+
+Aggregator updates are built with the real market analysis and final
+report code, so their sizes match a live run.
+
+Usage:
+    python tests/bench_event_stream.py [--vendors 20] [--rounds 3] [--subscribers 1] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+# Ensure backend root is in path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from agents.live_leaderboard import LiveLeaderboard
+from agents.nodes.aggregator import create_final_comparison_report, create_market_analysis
+from agents.state import merge_dicts, merge_history, merge_lists, vendor_ref
+from api.services.event_protocol import (
+    APPEND,
+    APPEND_PER_KEY,
+    CHANNEL_MODES,
+    MERGE,
+    apply_ops,
+    dumps,
+    normalize,
+)
+from api.services.run_jobs import RunJob, RunRequest, format_event
+
+ORDER = {"item": "office chairs", "quantity": {"min": 40, "max": 60, "preferred": 50}, "budget": 9000, "currency": "USD"}
+
+
+def make_vendor(i):
+    return {
+        "id": i,
+        "name": f"Vendor {i}",
+        "description": "Office furniture supplier with regional warehouses. " * 3,
+        "behavioral_prompt": "You negotiate firmly and concede slowly on price, faster on delivery. " * 8,
+        "is_predefined": True,
+        "team_id": None,
+        "documents": [{"id": n, "name": f"catalog_{i}_{n}.pdf"} for n in range(3)],
+    }
+
+
+def make_offer(i, round_index):
+    price = round((180 + 3 * i) * 0.97 ** round_index, 2)
+    return {
+        "vendor_id": str(i),
+        "vendor_name": f"Vendor {i}",
+        "conversation_id": f"conv-{i}",
+        "round_index": round_index,
+        "price_total": price,
+        "currency": "USD",
+        "delivery_days": 5 + i % 10,
+        "payment_terms": ["Net 30", "Net 60", "Upfront"][i % 3],
+        "notes": "Volume discount applies above 40 units.",
+        "status": "in_progress",
+        "last_vendor_message": f"We can do ${price} per chair if you confirm this week.",
+        "sentiment": "flexible",
+        "final_offer_summary": f"50 chairs at ${price} each, delivery in {5 + i % 10} days",
+        "bundled_items": ["assembly", "2-year warranty"],
+        "list_price": 199.0,
+        "final_price": price,
+    }
+
+
+def make_turns(i, round_index, count):
+    return [
+        {
+            "role": "agent" if n % 2 == 0 else "vendor",
+            "content": f"Round {round_index} turn {n} with vendor {i}: " + "pricing, delivery and warranty terms discussed. " * 5,
+        }
+        for n in range(count)
+    ]
+
+
+def synthetic_run(num_vendors, rounds):
+    """Node updates of one run, in stream order."""
+    vendors = [make_vendor(i) for i in range(num_vendors)]
+    events = [{"fetch_vendors": {"all_vendors": vendors, "phase": "evaluation"}}]
+    events += [{"evaluate_vendor": {"relevant_vendors": [vendor_ref(v, f"p{v['id']}")]}} for v in vendors]
+    events.append({"start_strategy_phase": {"phase": "strategy"}})
+    events += [
+        {"generate_strategy": {"vendor_strategies": {str(v["id"]): {
+            "objective": "Lowest total cost with delivery under 14 days",
+            "opening_position": "Anchor 15% below list price",
+            "concession_plan": ["bundle assembly", "extend payment terms", "accept 2-week delivery"],
+            "walkaway_price": 170.0,
+        }}}}
+        for v in vendors
+    ]
+    events.append({"start_negotiation_phase": {"phase": "negotiation"}})
+
+    leaderboard, board = {}, LiveLeaderboard(quantity=50)
+    active = list(range(num_vendors))
+    for round_index in range(rounds):
+        for i in active:
+            offer = make_offer(i, round_index)
+            leaderboard[i] = offer
+            board.update(i, offer)
+            turns = make_turns(i, round_index, 8 if round_index == 0 else 4)
+            events.append({"negotiate": {
+                "negotiation_history": {i: [{"round": round_index, "turns": turns, "offer": offer}]},
+                "leaderboard": {i: offer},
+                "conversation_ids": {i: f"conv-{i}"},
+                "live_market": board.snapshot(round_index + 1),
+            }})
+        analysis = create_market_analysis(leaderboard, ORDER, round_index + 1)
+        report = create_final_comparison_report(leaderboard, ORDER)
+        events.append({"aggregator": {
+            "rounds_completed": round_index + 1,
+            "market_analysis": analysis.model_dump(),
+            "final_comparison_report": report.model_dump(),
+            "phase": "negotiation",
+            "live_market": {**board.snapshot(round_index + 1), "is_final": True},
+        }})
+        active = active[:max(1, len(active) // 2)]
+    return events
+
+
+def full_protocol(messages, subscribers):
+    """Previous behaviour: every subscriber's send_json serializes each message."""
+    sent = 0
+    started = time.perf_counter()
+    for message in messages:
+        for _ in range(subscribers):
+            sent += len(json.dumps(message).encode())
+    return sent // subscribers, time.perf_counter() - started
+
+
+def compact_protocol(messages, subscribers):
+    """Delta encoding and serialization happen once per run; subscribers share the text."""
+    job = RunJob("bench", RunRequest(order_object=ORDER))
+    started = time.perf_counter()
+    for message in messages:
+        job.publish(message)
+    elapsed = time.perf_counter() - started
+    texts = [event.compact for event in job._events]
+    return sum(len(text.encode()) for text in texts), elapsed, texts
+
+
+def fold_full_state(messages):
+    """Client state implied by the full stream, folded with the graph's own reducers."""
+    reducers = {MERGE: merge_dicts, APPEND: merge_lists, APPEND_PER_KEY: merge_history}
+    state = {}
+    for message in messages:
+        for channel, value in ((message.get("payload") or {}).get("state_update") or {}).items():
+            reducer = reducers.get(CHANNEL_MODES.get(channel))
+            state[channel] = reducer(state.get(channel), value) if reducer else value
+    return normalize(state)
+
+
+def check_reconstruction(messages, texts):
+    """Applying the compact stream must rebuild the state the full stream implies."""
+    state = {}
+    for text in texts:
+        message = json.loads(text)
+        if message["type"] == "snapshot":
+            state = message["state"]
+        elif message["type"] == "delta":
+            apply_ops(state, message["ops"])
+    assert state == json.loads(dumps(fold_full_state(messages))), "compact stream does not rebuild the run state"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vendors", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--subscribers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    messages = [message for event in synthetic_run(args.vendors, args.rounds) for message in format_event(event)]
+    messages.append({"type": "complete", "payload": {"run_id": "bench", "deadline_reached": False}})
+
+    full_runs = [full_protocol(messages, args.subscribers) for _ in range(args.repeat)]
+    compact_runs = [compact_protocol(messages, args.subscribers) for _ in range(args.repeat)]
+    check_reconstruction(messages, compact_runs[0][2])
+
+    full_bytes, full_time = full_runs[0][0], min(run[1] for run in full_runs)
+    compact_bytes, compact_time = compact_runs[0][0], min(run[1] for run in compact_runs)
+
+    print(f"{args.vendors} vendors, {args.rounds} rounds, {len(messages)} messages, {args.subscribers} subscriber(s)")
+    print(f"{'protocol':<10} {'bytes/subscriber':>18} {'serialize ms':>14}")
+    print(f"{'full':<10} {full_bytes:>18,} {full_time * 1000:>14.2f}")
+    print(f"{'compact':<10} {compact_bytes:>18,} {compact_time * 1000:>14.2f}")
+    print(f"bytes: {full_bytes / compact_bytes:.1f}x smaller, serialization: {full_time / compact_time:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
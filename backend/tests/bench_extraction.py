@@ -0,0 +1,123 @@
+"""
+Extraction Service Load Benchmark
+
+Compares the old /api/extract behaviour (one blocking LLM call per request,
+made on the event loop) against ExtractionService (single-flight +
+micro-batching, fully async) under concurrent load, using a fake model with
+a fixed per-call latency.
+
+Usage:
+    python tests/bench_extraction.py [--requests 200] [--concurrency 50] [--distinct 40]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+# Ensure backend root is in path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from api.services.extraction import ExtractionService
+from models.order import OrderObject, QuantityRange, Requirements
+
+# Fake model cost: fixed call overhead plus a small per-order generation cost
+CALL_LATENCY_S = 0.25
+PER_ITEM_LATENCY_S = 0.02
+
+
+def fake_order(text: str) -> OrderObject:
+    return OrderObject(
+        item=text,
+        quantity=QuantityRange(min=1, max=1, preferred=1),
+        budget=1000,
+        currency="USD",
+        requirements=Requirements(mandatory=[], optional=[]),
+        urgency="medium"
+    )
+
+
+class FakeExtractorAgent:
+    """Stands in for OrderExtractorAgent; counts LLM calls."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def extract(self, text: str) -> OrderObject:
+        self.calls += 1
+        time.sleep(CALL_LATENCY_S + PER_ITEM_LATENCY_S)
+        return fake_order(text)
+
+    async def aextract_many(self, texts):
+        self.calls += 1
+        await asyncio.sleep(CALL_LATENCY_S + PER_ITEM_LATENCY_S * len(texts))
+        return [fake_order(text) for text in texts]
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def drive(handler, texts, concurrency):
+    """Fire requests with bounded concurrency and record per-request latency."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    # Every request is submitted at once, so latency is measured from the
+    # burst start; this also charges the blocking baseline for the time its
+    # requests could not even be picked up by the event loop
+    start = time.perf_counter()
+
+    async def one(text):
+        async with semaphore:
+            await handler(text)
+        latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(text) for text in texts))
+    return latencies, time.perf_counter() - start
+
+
+def report(name, latencies, elapsed, calls):
+    print(
+        f"{name:<22} p50={statistics.median(latencies) * 1000:8.1f}ms "
+        f"p99={percentile(latencies, 99) * 1000:8.1f}ms "
+        f"throughput={len(latencies) / elapsed:7.1f} req/s "
+        f"llm_calls={calls}"
+    )
+
+
+async def main(num_requests, concurrency, distinct):
+    rng = random.Random(7)
+    texts = [f"I need {rng.randint(1, distinct)} widgets for $1k" for _ in range(num_requests)]
+    print(f"{num_requests} requests, {len(set(texts))} distinct texts, concurrency {concurrency}\n")
+
+    # Baseline: blocking sync call inside the async handler
+    baseline_agent = FakeExtractorAgent()
+
+    async def blocking_handler(text):
+        return baseline_agent.extract(text)
+
+    latencies, elapsed = await drive(blocking_handler, texts, concurrency)
+    report("blocking (before)", latencies, elapsed, baseline_agent.calls)
+
+    service_agent = FakeExtractorAgent()
+    service = ExtractionService(agent_factory=lambda: service_agent)
+    latencies, elapsed = await drive(service.extract, texts, concurrency)
+    report("ExtractionService", latencies, elapsed, service_agent.calls)
+    print(f"\nservice stats: {service.stats.as_dict()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--distinct", type=int, default=40)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.distinct))
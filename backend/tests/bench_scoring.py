@@ -0,0 +1,104 @@
+"""
+Leaderboard Scoring Benchmark
+
+Compares per-offer scoring and ranking (calculate_vendor_score for each
+offer, then a list.index() lookup per vendor to find its rank, as the
+aggregator used to do) against the columnar engine in agents.utils.scoring,
+and times the full create_market_analysis / create_final_comparison_report
+calls on the same leaderboard.
+
+Usage:
+    python tests/bench_scoring.py [--offers 10000] [--repeat 3]
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import time
+
+# Ensure backend root is in path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from agents.nodes.aggregator import (
+    calculate_vendor_score,
+    create_final_comparison_report,
+    create_market_analysis,
+)
+from agents.utils.scoring import OfferColumns, rank_order
+
+PAYMENT_TERMS = ["Net 30", "Net 60", "50% advance", "Upfront payment", "COD", None]
+
+
+def make_leaderboard(num_offers, seed=7):
+    rng = random.Random(seed)
+    return {
+        str(i): {
+            "vendor_id": str(i),
+            "vendor_name": f"Vendor {i}",
+            "price_total": round(rng.uniform(80, 200), 2),
+            "delivery_days": rng.choice([None, rng.randint(1, 30)]),
+            "payment_terms": rng.choice(PAYMENT_TERMS),
+            "status": "completed",
+        }
+        for i in range(num_offers)
+    }
+
+
+def per_offer_ranking(leaderboard, order):
+    """Scoring and rank lookup the way the aggregator did it per offer."""
+    quantity = order["quantity"]["preferred"]
+    best_price = min(float(offer["price_total"]) * quantity for offer in leaderboard.values())
+    scored = [
+        {"vendor_id": vid, "score": calculate_vendor_score(offer, best_price, order)}
+        for vid, offer in leaderboard.items()
+    ]
+    scored.sort(key=lambda x: x["score"], reverse=True)
+    return {v["vendor_id"]: scored.index(v) + 1 for v in scored}
+
+
+def columnar_ranking(leaderboard, order):
+    quantity = order["quantity"]["preferred"]
+    columns = OfferColumns.from_offers(leaderboard)
+    best_price = float((columns.unit_prices * quantity).min())
+    order_idx = rank_order(columns.scores(best_price))
+    return {columns.vendor_ids[idx]: rank for rank, idx in enumerate(order_idx.tolist(), 1)}
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(num_offers, repeat):
+    logging.disable(logging.CRITICAL)
+    leaderboard = make_leaderboard(num_offers)
+    order = {"quantity": {"preferred": 10}, "budget": 1500}
+    print(f"{num_offers} offers, best of {repeat}\n")
+
+    before, ranks_before = timed(lambda: per_offer_ranking(leaderboard, order), repeat)
+    after, ranks_after = timed(lambda: columnar_ranking(leaderboard, order), repeat)
+    assert ranks_before == ranks_after, "columnar ranking diverged from per-offer ranking"
+    print(f"{'score+rank per offer':<32} {before * 1000:9.1f}ms")
+    print(f"{'score+rank columnar':<32} {after * 1000:9.1f}ms  ({before / after:.0f}x)")
+
+    analysis_time, _ = timed(lambda: create_market_analysis(leaderboard, order, 1), repeat)
+    report_time, _ = timed(lambda: create_final_comparison_report(leaderboard, order), repeat)
+    print(f"{'create_market_analysis':<32} {analysis_time * 1000:9.1f}ms")
+    print(f"{'create_final_comparison_report':<32} {report_time * 1000:9.1f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--offers", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.offers, args.repeat)
@@ -0,0 +1,139 @@
+"""
+Graph State Merge Benchmark
+
+Fans out to N vendors (default 1,000) and merges one result per vendor into
+the state, the way parallel evaluate/negotiate nodes do. Compares the old
+copy-on-merge reducers ({**left, **right} / left + right, O(n) per result,
+O(n^2) per fan-in) against the in-place reducers in agents.state, and full
+vendor records in relevant_vendors against vendor_ref() references.
+
+Two measurements:
+- reducers only: N sequential merges into each accumulated field
+- graph: a LangGraph fan-out/fan-in over N Send tasks with each state schema
+
+Usage:
+    python tests/bench_state_merge.py [--vendors 1000] [--repeat 3]
+"""
+
+import argparse
+import json
+import logging
+import operator
+import os
+import sys
+import time
+from typing import Annotated, Dict, List, TypedDict
+
+# Ensure backend root is in path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from langgraph.graph import StateGraph, END, START
+from langgraph.types import Send
+
+from agents.state import merge_dicts, merge_lists, vendor_ref
+
+
+def copy_merge_dicts(left: dict, right: dict) -> dict:
+    """Previous reducer: copies everything merged so far on every result."""
+    return {**left, **right}
+
+
+def make_vendor(i):
+    return {
+        "id": str(i),
+        "name": f"Vendor {i}",
+        "rating": 4.2,
+        "behavioral_prompt": "You are a vendor who negotiates firmly on price. " * 20,
+        "documents": [f"catalog_{i}_{n}.pdf" for n in range(5)],
+        "products": [{"id": f"p{i}-{n}", "name": f"Product {n}", "price": 10.0 + n} for n in range(20)],
+    }
+
+
+def make_results(vendors, slim):
+    """One state update per vendor, as evaluate_vendor + negotiate return them."""
+    results = []
+    for vendor in vendors:
+        vid = vendor["id"]
+        if slim:
+            relevant = vendor_ref(vendor, f"p{vid}-0")
+        else:
+            relevant = {**vendor, "relevant_product_id": f"p{vid}-0"}
+        results.append({
+            "relevant_vendors": [relevant],
+            "leaderboard": {vid: {"vendor_id": vid, "price_total": 100.0, "status": "in_progress"}},
+            "negotiation_history": {vid: [{"role": "assistant", "content": "Offer"}]},
+            "conversation_ids": {vid: f"conv-{vid}"},
+        })
+    return results
+
+
+def merge_all(results, dict_reducer, list_reducer):
+    state = {"relevant_vendors": [], "leaderboard": {}, "negotiation_history": {}, "conversation_ids": {}}
+    for update in results:
+        for key, value in update.items():
+            reducer = list_reducer if key == "relevant_vendors" else dict_reducer
+            state[key] = reducer(state[key], value)
+    return state
+
+
+def build_graph(dict_reducer, list_reducer, results):
+    class BenchState(TypedDict, total=False):
+        relevant_vendors: Annotated[List[dict], list_reducer]
+        leaderboard: Annotated[Dict[str, dict], dict_reducer]
+        negotiation_history: Annotated[Dict[str, list], dict_reducer]
+        conversation_ids: Annotated[Dict[str, str], dict_reducer]
+
+    workflow = StateGraph(BenchState)
+    workflow.add_node("start", lambda state: {})
+    workflow.add_node("worker", lambda payload: results[payload["i"]])
+    workflow.add_edge(START, "start")
+    workflow.add_conditional_edges("start", lambda state: [Send("worker", {"i": i}) for i in range(len(results))], ["worker"])
+    workflow.add_edge("worker", END)
+    return workflow.compile()
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(num_vendors, repeat):
+    logging.disable(logging.CRITICAL)
+    vendors = [make_vendor(i) for i in range(num_vendors)]
+    full = make_results(vendors, slim=False)
+    slim = make_results(vendors, slim=True)
+    print(f"{num_vendors} vendors, best of {repeat}\n")
+
+    full_bytes = len(json.dumps([r["relevant_vendors"][0] for r in full]))
+    slim_bytes = len(json.dumps([r["relevant_vendors"][0] for r in slim]))
+    print(f"{'relevant_vendors payload full':<36} {full_bytes / 1024:9.1f}KB")
+    print(f"{'relevant_vendors payload slim':<36} {slim_bytes / 1024:9.1f}KB  ({full_bytes / slim_bytes:.0f}x smaller)\n")
+
+    before, state_before = timed(lambda: merge_all(full, copy_merge_dicts, operator.add), repeat)
+    after, state_after = timed(lambda: merge_all(slim, merge_dicts, merge_lists), repeat)
+    assert state_before["leaderboard"] == state_after["leaderboard"], "in-place merge diverged"
+    print(f"{'reducers copy-on-merge':<36} {before * 1000:9.1f}ms")
+    print(f"{'reducers in place':<36} {after * 1000:9.1f}ms  ({before / after:.0f}x)\n")
+
+    old_graph = build_graph(copy_merge_dicts, operator.add, full)
+    new_graph = build_graph(merge_dicts, merge_lists, slim)
+    before, final_before = timed(lambda: old_graph.invoke({}), repeat)
+    after, final_after = timed(lambda: new_graph.invoke({}), repeat)
+    assert final_before["leaderboard"] == final_after["leaderboard"], "graph fan-in diverged"
+    print(f"{'graph fan-in copy-on-merge':<36} {before * 1000:9.1f}ms")
+    print(f"{'graph fan-in in place':<36} {after * 1000:9.1f}ms  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vendors", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    main(args.vendors, args.repeat)
@@ -0,0 +1,143 @@
+"""
+WebSocket Wire Format Benchmark
+
+Encodes the events of a run in every wire format a client can negotiate
+and compares bandwidth and CPU:
+
+- json / msgpack: message encoding, done once per run and shared by all
+  subscribers (RunEvent.encoded)
+- +deflate: permessage-deflate as the server applies it per connection,
+  with the context kept across messages and the settings of the websockets
+  library's default server extension (12-bit window, memLevel 5)
+
+The events come from a recorded run when --recording is given (the output
+of GET /api/runs/{run_id}/events saved to a file, or one JSON message per
+line), and otherwise from the synthetic run of bench_event_stream.py.
+
+Usage:
+    python tests/bench_wire_format.py [--recording run.sse] [--vendors 20] [--rounds 3] [--repeat 5]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import zlib
+
+# Ensure backend root is in path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from api.services.run_jobs import RunJob, RunRequest, format_event
+from tests.bench_event_stream import ORDER, synthetic_run
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+ENCODINGS = ["json"] + (["msgpack"] if msgpack is not None else [])
+
+
+def load_recording(path):
+    """Messages of a recorded run (SSE capture or JSON lines)."""
+    messages = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("data: "):
+                line = line[len("data: "):]
+            elif not line.startswith("{"):
+                continue
+            message = json.loads(line)
+            message.pop("seq", None)
+            messages.append(message)
+    return messages
+
+
+def build_job(messages):
+    job = RunJob("bench", RunRequest(order_object=ORDER), max_events=len(messages) + 1)
+    for message in messages:
+        job.publish(message)
+    return job
+
+
+def encode_all(events, protocol, encoding):
+    """Encode every event from scratch; returns (frames, seconds)."""
+    started = time.perf_counter()
+    frames = []
+    for event in events:
+        event._full_text = None if event.message is not None and event.offset is not None else event._full_text
+        event._packed = {}
+        data = event.encoded(protocol, encoding)
+        if data is not None:
+            frames.append(data.encode() if isinstance(data, str) else data)
+    return frames, time.perf_counter() - started
+
+
+def deflate_all(frames):
+    """permessage-deflate over one connection; returns (bytes sent, seconds)."""
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -12, 5)
+    sent = 0
+    started = time.perf_counter()
+    for frame in frames:
+        data = compressor.compress(frame) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        sent += len(data) - 4  # the 00 00 ff ff tail is not sent
+    return sent, time.perf_counter() - started
+
+
+def decode_all(frames, encoding):
+    """Client-side decoding time."""
+    started = time.perf_counter()
+    for frame in frames:
+        if encoding == "msgpack":
+            msgpack.unpackb(frame)
+        else:
+            json.loads(frame)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recording")
+    parser.add_argument("--vendors", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.recording:
+        messages = load_recording(args.recording)
+        source = args.recording
+    else:
+        messages = [message for event in synthetic_run(args.vendors, args.rounds) for message in format_event(event)]
+        messages.append({"type": "complete", "payload": {"run_id": "bench", "deadline_reached": False}})
+        source = f"synthetic run, {args.vendors} vendors, {args.rounds} rounds"
+    events = list(build_job(messages)._events)
+
+    print(f"{source}: {len(messages)} messages")
+    if msgpack is None:
+        print("msgpack not installed: json only")
+    print(f"{'protocol':<9} {'format':<16} {'bytes':>10} {'ratio':>7} {'encode ms':>10} {'deflate ms':>11} {'decode ms':>10}")
+    for protocol in ("full", "compact"):
+        baseline = None
+        for encoding in ENCODINGS:
+            runs = [encode_all(events, protocol, encoding) for _ in range(args.repeat)]
+            frames, encode_time = runs[0][0], min(run[1] for run in runs)
+            decode_time = min(decode_all(frames, encoding) for _ in range(args.repeat))
+            raw = sum(len(frame) for frame in frames)
+            baseline = baseline or raw
+            deflate_runs = [deflate_all(frames) for _ in range(args.repeat)]
+            deflated, deflate_time = deflate_runs[0][0], min(run[1] for run in deflate_runs)
+
+            for name, size, extra in ((encoding, raw, None), (f"{encoding}+deflate", deflated, deflate_time)):
+                extra_ms = f"{extra * 1000:>11.2f}" if extra is not None else f"{'-':>11}"
+                print(
+                    f"{protocol:<9} {name:<16} {size:>10,} {baseline / size:>6.1f}x "
+                    f"{encode_time * 1000:>10.2f} {extra_ms} {decode_time * 1000:>10.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
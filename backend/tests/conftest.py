@@ -6,6 +6,8 @@ import pytest
 import os
 from typing import Dict, Any
 
+from models.order import OrderObject, QuantityRange, Requirements
+
 
 def pytest_addoption(parser):
     """Add custom command line options"""
@@ -17,6 +19,18 @@ def pytest_addoption(parser):
     )
 
 
+def make_order(text: str) -> OrderObject:
+    """Minimal valid order for the given item text (stands in for an extraction)"""
+    return OrderObject(
+        item=text,
+        quantity=QuantityRange(min=1, max=1, preferred=1),
+        budget=100,
+        currency="USD",
+        requirements=Requirements(mandatory=[], optional=[]),
+        urgency="low"
+    )
+
+
 @pytest.fixture
 def mock_api_base_url() -> str:
     """Fixture providing the API base URL"""